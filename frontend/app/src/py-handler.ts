@@ -396,6 +396,13 @@ export default class PyHandler {
         if (Object.prototype.hasOwnProperty.call(jsondata, 'sleep-secs')) {
           args.push('--sleep-secs', jsondata['sleep-secs']);
         }
+        if (
+          Object.prototype.hasOwnProperty.call(jsondata, 'profile-startup')
+        ) {
+          if (jsondata['profile-startup'] === true) {
+            args.push('--profile-startup');
+          }
+        }
       } catch (e) {
         // do nothing, act as if there is no config given
         // TODO: Perhaps in the future warn the user inside
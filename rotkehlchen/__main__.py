@@ -3,6 +3,7 @@ monkey.patch_all()  # isort:skip # noqa
 import logging
 
 from rotkehlchen.errors import SystemPermissionError
+from rotkehlchen.utils.profiling import PROFILE_STARTUP_ARG, ImportTimer
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +11,11 @@ logger = logging.getLogger(__name__)
 def main() -> None:
     import traceback
     import sys
+    import_timer = None
+    if PROFILE_STARTUP_ARG in sys.argv:
+        import_timer = ImportTimer()
+        import_timer.install()
+
     from rotkehlchen.server import RotkehlchenServer
     try:
         rotkehlchen_server = RotkehlchenServer()
@@ -34,6 +40,11 @@ def main() -> None:
         print("Failed to start rotkehlchen backend:\n{}".format(tb))
         sys.exit(1)
 
+    if import_timer is not None:
+        # Logging is only configured after the server is created
+        import_timer.uninstall()
+        logger.info(import_timer.report())
+
     rotkehlchen_server.main()
 
 
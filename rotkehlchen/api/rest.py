@@ -30,7 +30,14 @@ from rotkehlchen.chain.ethereum.trades import AMMTrade, AMMTradeLocations
 from rotkehlchen.chain.ethereum.transactions import FREE_ETH_TX_LIMIT
 from rotkehlchen.db.queried_addresses import QueriedAddresses
 from rotkehlchen.db.settings import ModifiableDBSettings
-from rotkehlchen.db.utils import AssetBalance, LocationData
+from rotkehlchen.db.utils import (
+    ASSET_MOVEMENTS_ORDER_BY_ATTRIBUTES,
+    ETHEREUM_TRANSACTIONS_ORDER_BY_ATTRIBUTES,
+    TRADES_ORDER_BY_ATTRIBUTES,
+    AssetBalance,
+    DBPagination,
+    LocationData,
+)
 from rotkehlchen.errors import (
     AuthenticationError,
     DBUpgradeError,
@@ -41,6 +48,7 @@ from rotkehlchen.errors import (
     PremiumAuthenticationError,
     RemoteError,
     RotkehlchenPermissionError,
+    StartupError,
     SystemPermissionError,
     TagConstraintError,
 )
@@ -55,9 +63,9 @@ from rotkehlchen.typing import (
     ApiKey,
     ApiSecret,
     AssetAmount,
+    AssetMovementCategory,
     BlockchainAccountData,
     ChecksumEthAddress,
-    EthereumTransaction,
     ExternalService,
     ExternalServiceApiCredentials,
     Fee,
@@ -118,6 +126,20 @@ def api_response(
     return response
 
 
+def _call_with_startup_check(
+        f: Callable,
+        wrappingobj: 'RestAPI',
+        *args: Any,
+        **kwargs: Any,
+) -> Any:
+    """Calls the RestAPI method and turns the failure of a login step that ran in the
+    background, like the chain manager initialization, into an error response"""
+    try:
+        return f(wrappingobj, *args, **kwargs)
+    except StartupError as e:
+        return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
+
+
 def require_loggedin_user() -> Callable:
     """ This is a decorator for the RestAPI class's methods requiring a logged in user.
     """
@@ -127,7 +149,7 @@ def require_loggedin_user() -> Callable:
             if not wrappingobj.rotkehlchen.user_is_logged_in:
                 result_dict = wrap_in_fail_result('No user is currently logged in')
                 return api_response(result_dict, status_code=HTTPStatus.CONFLICT)
-            return f(wrappingobj, *args, **kwargs)
+            return _call_with_startup_check(f, wrappingobj, *args, **kwargs)
 
         return wrapper
     return _require_loggedin_user
@@ -163,7 +185,7 @@ def require_premium_user(active_check: bool) -> Callable:
                     result_dict = wrap_in_fail_result(msg)
                     return api_response(result_dict, status_code=HTTPStatus.CONFLICT)
 
-            return f(wrappingobj, *args, **kwargs)
+            return _call_with_startup_check(f, wrappingobj, *args, **kwargs)
 
         return wrapper
     return _require_premium_user
@@ -232,7 +254,11 @@ class RestAPI():
             self._write_task_result(task_id, result)
 
     def _do_query_async(self, command: str, task_id: int, **kwargs: Any) -> None:
-        result = getattr(self, command)(**kwargs)
+        try:
+            result = getattr(self, command)(**kwargs)
+        except StartupError as e:
+            # A login step that ran in the background and the query needs has failed
+            result = wrap_in_fail_result(str(e), status_code=HTTPStatus.CONFLICT)
         self._write_task_result(task_id, result)
 
     def _query_async(self, command: str, **kwargs: Any) -> Response:
@@ -530,9 +556,19 @@ class RestAPI():
             from_ts: Timestamp,
             to_ts: Timestamp,
             location: Optional[Location],
+            asset: Optional[Asset],
+            trade_type: Optional[TradeType],
+            pagination: DBPagination,
     ) -> Dict[str, Any]:
         try:
-            trades = self.rotkehlchen.query_trades(from_ts=from_ts, to_ts=to_ts, location=location)
+            trades, entries_filtered = self.rotkehlchen.query_trades_page(
+                from_ts=from_ts,
+                to_ts=to_ts,
+                location=location,
+                asset=asset,
+                trade_type=trade_type,
+                pagination=pagination,
+            )
         except RemoteError as e:
             return {'result': None, 'message': str(e), 'status_code': HTTPStatus.BAD_GATEWAY}
 
@@ -554,6 +590,7 @@ class RestAPI():
         result = {
             'entries': trades_result,
             'entries_found': self.rotkehlchen.data.db.get_entries_count(entry_table),
+            'entries_filtered': entries_filtered,
             'entries_limit': FREE_TRADES_LIMIT if self.rotkehlchen.premium is None else -1,
         }
 
@@ -566,19 +603,37 @@ class RestAPI():
             to_ts: Timestamp,
             location: Optional[Location],
             async_query: bool,
+            asset: Optional[Asset] = None,
+            trade_type: Optional[TradeType] = None,
+            limit: Optional[int] = None,
+            offset: int = 0,
+            order_by_attribute: str = 'timestamp',
+            ascending: bool = False,
     ) -> Response:
+        pagination = DBPagination(
+            order_by_attribute=TRADES_ORDER_BY_ATTRIBUTES[order_by_attribute],
+            ascending=ascending,
+            limit=limit,
+            offset=offset,
+        )
         if async_query:
             return self._query_async(
                 command='_get_trades',
                 from_ts=from_ts,
                 to_ts=to_ts,
                 location=location,
+                asset=asset,
+                trade_type=trade_type,
+                pagination=pagination,
             )
 
         response = self._get_trades(
             from_ts=from_ts,
             to_ts=to_ts,
             location=location,
+            asset=asset,
+            trade_type=trade_type,
+            pagination=pagination,
         )
         result_dict = {'result': response['result'], 'message': response['message']}
         return api_response(process_result(result_dict), status_code=response['status_code'])
@@ -666,15 +721,21 @@ class RestAPI():
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
             location: Optional[Location],
+            asset: Optional[Asset],
+            category: Optional[AssetMovementCategory],
+            pagination: DBPagination,
     ) -> Dict[str, Any]:
         msg = ''
         status_code = HTTPStatus.OK
         result = None
         try:
-            movements = self.rotkehlchen.query_asset_movements(
+            movements, entries_filtered = self.rotkehlchen.query_asset_movements_page(
                 from_ts=from_timestamp,
                 to_ts=to_timestamp,
                 location=location,
+                asset=asset,
+                category=category,
+                pagination=pagination,
             )
         except RemoteError as e:
             return {'result': None, 'message': str(e), 'status_code': HTTPStatus.BAD_GATEWAY}
@@ -684,6 +745,7 @@ class RestAPI():
         result = {
             'entries': process_result_list(serialized_movements),
             'entries_found': self.rotkehlchen.data.db.get_entries_count('asset_movements'),
+            'entries_filtered': entries_filtered,
             'entries_limit': limit,
         }
 
@@ -696,19 +758,37 @@ class RestAPI():
             to_timestamp: Timestamp,
             location: Optional[Location],
             async_query: bool,
+            asset: Optional[Asset] = None,
+            category: Optional[AssetMovementCategory] = None,
+            limit: Optional[int] = None,
+            offset: int = 0,
+            order_by_attribute: str = 'timestamp',
+            ascending: bool = False,
     ) -> Response:
+        pagination = DBPagination(
+            order_by_attribute=ASSET_MOVEMENTS_ORDER_BY_ATTRIBUTES[order_by_attribute],
+            ascending=ascending,
+            limit=limit,
+            offset=offset,
+        )
         if async_query:
             return self._query_async(
                 command='_get_asset_movements',
                 from_timestamp=from_timestamp,
                 to_timestamp=to_timestamp,
                 location=location,
+                asset=asset,
+                category=category,
+                pagination=pagination,
             )
 
         response = self._get_asset_movements(
             from_timestamp=from_timestamp,
             to_timestamp=to_timestamp,
             location=location,
+            asset=asset,
+            category=category,
+            pagination=pagination,
         )
         result_dict = {'result': response['result'], 'message': response['message']}
         return api_response(process_result(result_dict), status_code=response['status_code'])
@@ -1473,6 +1553,11 @@ class RestAPI():
     def ping() -> Response:
         return api_response(_wrap_in_ok_result(True), status_code=HTTPStatus.OK)
 
+    @require_loggedin_user()
+    def get_startup_status(self) -> Response:
+        result = self.rotkehlchen.startup.serialize()
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
     @require_loggedin_user()
     def import_data(
             self,
@@ -1842,30 +1927,26 @@ class RestAPI():
             address: Optional[ChecksumEthAddress],
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            pagination: DBPagination,
     ) -> Dict[str, Any]:
-        transactions: Optional[List[EthereumTransaction]]
         try:
-            transactions = self.rotkehlchen.chain_manager.ethereum.transactions.query(
-                addresses=[address] if address is not None else None,
+            transactions, entries_filtered = self.rotkehlchen.query_ethereum_transactions_page(
                 from_ts=from_timestamp,
                 to_ts=to_timestamp,
-                with_limit=self.rotkehlchen.premium is None,
-                recent_first=True,
+                address=address,
+                pagination=pagination,
             )
-            status_code = HTTPStatus.OK
-            message = ''
         except RemoteError as e:
-            transactions = None
-            status_code = HTTPStatus.BAD_GATEWAY
-            message = str(e)
+            return {'result': None, 'message': str(e), 'status_code': HTTPStatus.BAD_GATEWAY}
 
         result = {
             'entries': transactions,
             'entries_found': self.rotkehlchen.data.db.get_entries_count('ethereum_transactions'),
+            'entries_filtered': entries_filtered,
             'entries_limit': FREE_ETH_TX_LIMIT if self.rotkehlchen.premium is None else -1,
         }
 
-        return {'result': process_result(result), 'message': message, 'status_code': status_code}
+        return {'result': process_result(result), 'message': '', 'status_code': HTTPStatus.OK}
 
     @require_loggedin_user()
     def get_ethereum_transactions(
@@ -1874,16 +1955,32 @@ class RestAPI():
             address: Optional[ChecksumEthAddress],
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            limit: Optional[int] = None,
+            offset: int = 0,
+            order_by_attribute: str = 'timestamp',
+            ascending: bool = False,
     ) -> Response:
+        pagination = DBPagination(
+            order_by_attribute=ETHEREUM_TRANSACTIONS_ORDER_BY_ATTRIBUTES[order_by_attribute],
+            ascending=ascending,
+            limit=limit,
+            offset=offset,
+        )
         if async_query:
             return self._query_async(
                 command='_get_ethereum_transactions',
                 address=address,
                 from_timestamp=from_timestamp,
                 to_timestamp=to_timestamp,
+                pagination=pagination,
             )
 
-        response = self._get_ethereum_transactions(address, from_timestamp, to_timestamp)
+        response = self._get_ethereum_transactions(
+            address=address,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+            pagination=pagination,
+        )
         result = response['result']
         msg = response['message']
 
@@ -51,6 +51,7 @@ from rotkehlchen.api.v1.resources import (
     PingResource,
     QueriedAddressesResource,
     SettingsResource,
+    StartupResource,
     StatisticsAssetBalanceResource,
     StatisticsNetvalueResource,
     StatisticsRendererResource,
@@ -154,6 +155,7 @@ URLS_V1: URLS = [
     ('/assets/ignored', IgnoredAssetsResource),
     ('/version', VersionResource),
     ('/ping', PingResource),
+    ('/startup', StartupResource),
     ('/import', DataImportResource),
 ]
 
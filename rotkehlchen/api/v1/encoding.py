@@ -16,12 +16,18 @@ from rotkehlchen.chain.bitcoin.utils import is_valid_btc_address, is_valid_deriv
 from rotkehlchen.chain.ethereum.manager import EthereumManager
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.settings import ModifiableDBSettings
+from rotkehlchen.db.utils import (
+    ASSET_MOVEMENTS_ORDER_BY_ATTRIBUTES,
+    ETHEREUM_TRANSACTIONS_ORDER_BY_ATTRIBUTES,
+    TRADES_ORDER_BY_ATTRIBUTES,
+)
 from rotkehlchen.errors import DeserializationError, UnknownAsset, XPUBError
 from rotkehlchen.exchanges.kraken import KrakenAccountType
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES
 from rotkehlchen.fval import FVal
 from rotkehlchen.serialization.deserialize import (
     deserialize_asset_amount,
+    deserialize_asset_movement_category,
     deserialize_fee,
     deserialize_hex_color_code,
     deserialize_location,
@@ -35,6 +41,7 @@ from rotkehlchen.typing import (
     ApiKey,
     ApiSecret,
     AssetAmount,
+    AssetMovementCategory,
     ChecksumEthAddress,
     ExternalService,
     ExternalServiceApiCredentials,
@@ -385,6 +392,32 @@ class TradeTypeField(fields.Field):
         return trade_type
 
 
+class AssetMovementCategoryField(fields.Field):
+
+    @staticmethod
+    def _serialize(
+            value: AssetMovementCategory,
+            attr: str,  # pylint: disable=unused-argument
+            obj: Any,  # pylint: disable=unused-argument
+            **_kwargs: Any,
+    ) -> str:
+        return str(value)
+
+    def _deserialize(
+            self,
+            value: str,
+            attr: Optional[str],  # pylint: disable=unused-argument
+            data: Optional[Mapping[str, Any]],  # pylint: disable=unused-argument
+            **_kwargs: Any,
+    ) -> AssetMovementCategory:
+        try:
+            category = deserialize_asset_movement_category(value)
+        except DeserializationError as e:
+            raise ValidationError(str(e))
+
+        return category
+
+
 class TradePairField(fields.Field):
 
     def _deserialize(
@@ -596,11 +629,30 @@ class AsyncTasksQuerySchema(Schema):
     task_id = fields.Integer(strict=True, missing=None)
 
 
-class EthereumTransactionQuerySchema(Schema):
+class PaginationSchema(Schema):
+    """Pagination arguments. Entries are ordered most recent first by default"""
+    limit = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(min=1, error='The limit must be a positive number'),
+        missing=None,
+    )
+    offset = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(min=0, error='The offset can not be negative'),
+        missing=0,
+    )
+    ascending = fields.Boolean(missing=False)
+
+
+class EthereumTransactionQuerySchema(PaginationSchema):
     async_query = fields.Boolean(missing=False)
     address = EthereumAddressField(missing=None)
     from_timestamp = TimestampField(missing=Timestamp(0))
     to_timestamp = TimestampField(missing=ts_now)
+    order_by_attribute = fields.String(
+        validate=webargs.validate.OneOf(choices=list(ETHEREUM_TRANSACTIONS_ORDER_BY_ATTRIBUTES)),
+        missing='timestamp',
+    )
 
 
 class TimerangeLocationQuerySchema(Schema):
@@ -610,6 +662,24 @@ class TimerangeLocationQuerySchema(Schema):
     async_query = fields.Boolean(missing=False)
 
 
+class TradesQuerySchema(TimerangeLocationQuerySchema, PaginationSchema):
+    asset = AssetField(missing=None)
+    trade_type = TradeTypeField(missing=None)
+    order_by_attribute = fields.String(
+        validate=webargs.validate.OneOf(choices=list(TRADES_ORDER_BY_ATTRIBUTES)),
+        missing='timestamp',
+    )
+
+
+class AssetMovementsQuerySchema(TimerangeLocationQuerySchema, PaginationSchema):
+    asset = AssetField(missing=None)
+    category = AssetMovementCategoryField(missing=None)
+    order_by_attribute = fields.String(
+        validate=webargs.validate.OneOf(choices=list(ASSET_MOVEMENTS_ORDER_BY_ATTRIBUTES)),
+        missing='timestamp',
+    )
+
+
 class TradeSchema(Schema):
     timestamp = TimestampField(required=True)
     location = LocationField(required=True)
@@ -717,6 +787,7 @@ class ModifiableSettingsSchema(Schema):
         missing=None,
     )
     kraken_account_type = KrakenAccountTypeField(missing=None)
+    kraken_ledger_sync = fields.Bool(missing=None)
     active_modules = fields.List(fields.String(), missing=None)
     frontend_settings = fields.String(missing=None)
 
@@ -757,6 +828,7 @@ class ModifiableSettingsSchema(Schema):
             currency_location=data['currency_location'],
             submit_usage_analytics=data['submit_usage_analytics'],
             kraken_account_type=data['kraken_account_type'],
+            kraken_ledger_sync=data['kraken_ledger_sync'],
             active_modules=data['active_modules'],
             frontend_settings=data['frontend_settings'],
         )
@@ -13,6 +13,7 @@ from rotkehlchen.api.rest import RestAPI
 from rotkehlchen.api.v1.encoding import (
     AllBalancesQuerySchema,
     AssetIconsSchema,
+    AssetMovementsQuerySchema,
     AsyncHistoricalQuerySchema,
     AsyncQueryArgumentSchema,
     AsyncTasksQuerySchema,
@@ -44,10 +45,10 @@ from rotkehlchen.api.v1.encoding import (
     TagDeleteSchema,
     TagEditSchema,
     TagSchema,
-    TimerangeLocationQuerySchema,
     TradeDeleteSchema,
     TradePatchSchema,
     TradeSchema,
+    TradesQuerySchema,
     UserActionSchema,
     UserPasswordChangeSchema,
     UserPremiumSyncSchema,
@@ -66,6 +67,7 @@ from rotkehlchen.typing import (
     ApiKey,
     ApiSecret,
     AssetAmount,
+    AssetMovementCategory,
     BlockchainAccountData,
     ChecksumEthAddress,
     ExternalService,
@@ -227,12 +229,20 @@ class EthereumTransactionsResource(BaseResource):
             address: Optional[ChecksumEthAddress],
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            limit: Optional[int],
+            offset: int,
+            order_by_attribute: str,
+            ascending: bool,
     ) -> Response:
         return self.rest_api.get_ethereum_transactions(
             async_query=async_query,
             address=address,
             from_timestamp=from_timestamp,
             to_timestamp=to_timestamp,
+            limit=limit,
+            offset=offset,
+            order_by_attribute=order_by_attribute,
+            ascending=ascending,
         )
 
     def delete(self) -> Response:
@@ -343,7 +353,7 @@ class ManuallyTrackedBalancesResource(BaseResource):
 
 class TradesResource(BaseResource):
 
-    get_schema = TimerangeLocationQuerySchema()
+    get_schema = TradesQuerySchema()
     put_schema = TradeSchema()
     patch_schema = TradePatchSchema()
     delete_schema = TradeDeleteSchema()
@@ -355,12 +365,24 @@ class TradesResource(BaseResource):
             to_timestamp: Timestamp,
             location: Optional[Location],
             async_query: bool,
+            asset: Optional[Asset],
+            trade_type: Optional[TradeType],
+            limit: Optional[int],
+            offset: int,
+            order_by_attribute: str,
+            ascending: bool,
     ) -> Response:
         return self.rest_api.get_trades(
             from_ts=from_timestamp,
             to_ts=to_timestamp,
             location=location,
             async_query=async_query,
+            asset=asset,
+            trade_type=trade_type,
+            limit=limit,
+            offset=offset,
+            order_by_attribute=order_by_attribute,
+            ascending=ascending,
         )
 
     @use_kwargs(put_schema, location='json')  # type: ignore
@@ -426,7 +448,7 @@ class TradesResource(BaseResource):
 
 class AssetMovementsResource(BaseResource):
 
-    get_schema = TimerangeLocationQuerySchema()
+    get_schema = AssetMovementsQuerySchema()
 
     @use_kwargs(get_schema, location='json_and_query')  # type: ignore
     def get(
@@ -435,12 +457,24 @@ class AssetMovementsResource(BaseResource):
             to_timestamp: Timestamp,
             location: Optional[Location],
             async_query: bool,
+            asset: Optional[Asset],
+            category: Optional[AssetMovementCategory],
+            limit: Optional[int],
+            offset: int,
+            order_by_attribute: str,
+            ascending: bool,
     ) -> Response:
         return self.rest_api.get_asset_movements(
             from_timestamp=from_timestamp,
             to_timestamp=to_timestamp,
             location=location,
             async_query=async_query,
+            asset=asset,
+            category=category,
+            limit=limit,
+            offset=offset,
+            order_by_attribute=order_by_attribute,
+            ascending=ascending,
         )
 
 
@@ -834,6 +868,12 @@ class PingResource(BaseResource):
         return self.rest_api.ping()
 
 
+class StartupResource(BaseResource):
+
+    def get(self) -> Response:
+        return self.rest_api.get_startup_status()
+
+
 class DataImportResource(BaseResource):
 
     put_schema = DataImportSchema()
@@ -98,6 +98,14 @@ def app_args(prog: str, description: str) -> argparse.ArgumentParser:
         ),
         action='store_true',
     )
+    p.add_argument(
+        '--profile-startup',
+        help=(
+            'If given then the time each module took to import and the time each '
+            'phase of the login took are logged.'
+        ),
+        action='store_true',
+    )
     p.add_argument(
         'version',
         help='Shows the rotkehlchen version',
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from functools import total_ordering
-from typing import Any, Optional, Type, TypeVar
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
 
 from rotkehlchen.assets.resolver import AssetResolver
 from rotkehlchen.errors import DeserializationError, UnknownAsset, UnsupportedAsset
@@ -141,9 +141,45 @@ WORLD_TO_BINANCE = {
 }
 
 
+class InternedAssetMeta(type):
+    """Interns assets so that each identifier gets a single shared instance per class
+
+    Assets are immutable so there is no need to resolve an identifier and copy its
+    data over every time one is created. The first construction resolves the asset
+    and any later construction with the same identifier, in any letter case, returns
+    the same instance. If the asset data of the resolver are replaced, as happens
+    after the remote assets check, the interned instances are forgotten.
+    """
+    _instances: Dict[Tuple[type, str], Any] = {}
+    _instances_assets: Optional[Dict[str, Any]] = None
+
+    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
+        # With an Any return type mypy still infers the type of the created instance
+        identifier = kwargs.get('identifier') if len(args) == 0 else args[0]
+        if len(args) + len(kwargs) != 1 or not isinstance(identifier, str):
+            # Let the normal initialization raise the appropriate error
+            return super().__call__(*args, **kwargs)
+
+        assets = AssetResolver().assets
+        if assets is not InternedAssetMeta._instances_assets:
+            InternedAssetMeta._instances = {}
+            InternedAssetMeta._instances_assets = assets
+
+        instance = InternedAssetMeta._instances.get((cls, identifier))
+        if instance is None:
+            new_instance = super().__call__(identifier)
+            instance = InternedAssetMeta._instances.setdefault(
+                (cls, new_instance.identifier),
+                new_instance,
+            )
+            InternedAssetMeta._instances[(cls, identifier)] = instance
+
+        return instance
+
+
 @total_ordering
 @dataclass(init=True, repr=True, eq=False, order=False, unsafe_hash=False, frozen=True)
-class Asset():
+class Asset(metaclass=InternedAssetMeta):
     identifier: str
     name: str = field(init=False)
     symbol: str = field(init=False)
@@ -241,6 +277,12 @@ class Asset():
     def has_coingecko(self) -> bool:
         return self.coingecko is not None and self.coingecko != ''
 
+    def __copy__(self) -> 'Asset':
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> 'Asset':  # pylint: disable=unused-argument
+        return self
+
     def __hash__(self) -> int:
         return hash(self.identifier)
 
@@ -248,6 +290,9 @@ class Asset():
         if other is None:
             return False
 
+        if self is other:
+            return True
+
         if isinstance(other, Asset):
             return self.identifier == other.identifier
         elif isinstance(other, str):
@@ -83,10 +83,17 @@ def _get_latest_assets(data_directory: Path) -> Dict[str, Any]:
     except (requests.exceptions.ConnectionError, KeyError, json.decoder.JSONDecodeError):
         pass
 
-    if our_downloaded_meta.is_file():
+    return _get_local_assets(data_directory)
+
+
+def _get_local_assets(data_directory: Path) -> Dict[str, Any]:
+    """Gets the assets saved by a previous remote check or if there are none the builtin ones
+
+    Does not contact the remote"""
+    if (data_directory / 'assets' / 'all_assets.meta').is_file():
         assets_file = data_directory / 'assets' / 'all_assets.json'
     else:
-        assets_file = root_dir / 'data' / 'all_assets.json'
+        assets_file = Path(__file__).resolve().parent.parent / 'data' / 'all_assets.json'
 
     with open(assets_file, 'r') as f:
         return json.loads(f.read())
@@ -95,13 +102,16 @@ def _get_latest_assets(data_directory: Path) -> Dict[str, Any]:
 def _attempt_initialization(
         data_directory: Optional[Path],
         saved_assets: Optional[Dict[str, Any]],
+        check_remote: bool,
 ) -> Tuple[Dict[str, Any], bool]:
     """Reads the asset data either from builtin data or from the remote
 
     1. If it's the very first time data is initialized (and data directory is not given)
     then just get assets from the builtin file
     2. If data directory is still not given but we have some saved assets return them directly
-    3. If data directory is given then we can finally do the comparison of local
+    3. If data directory is given but check_remote is False then return the locally
+    saved assets if any, or else the builtin ones, without contacting the remote.
+    4. If data directory is given then we can finally do the comparison of local
     saved and builtin file with the remote and return the most recent assets.
 
     Returns a tuple of the most recent assets mapping it can get and a boolean denoting
@@ -119,6 +129,9 @@ def _attempt_initialization(
 
         return assets, False
 
+    if not check_remote:
+        return _get_local_assets(data_directory), False
+
     # else we got the data directory so we can finally do the remote check
     assets = _get_latest_assets(data_directory)
     return assets, True
@@ -128,19 +141,21 @@ class AssetResolver():
     __instance = None
     remote_check_happened: bool = False
     assets: Dict[str, Dict[str, Any]] = {}
-    lowercase_mapping: Dict[str, str] = {}
+    lowercase_mapping: Optional[Dict[str, str]] = None
     eth_token_info: Optional[List[EthTokenInfo]] = None
 
     def __new__(
             cls,
             data_directory: Path = None,
+            check_remote: bool = True,
     ) -> 'AssetResolver':
         """Lazily initializes AssetResolver
 
         As long as it's called without a data_directory path it uses the builtin
         all_assets file. Once a data directory is given it attempts to see if a
         newer file exists on the remote and uses that. Once that's done the remote
-        check flag is set to True.
+        check flag is set to True. If check_remote is False the assets saved in the
+        data directory are used instead and the remote check is left for later.
 
         From that point on all calls to AssetResolver() return the same data.
         """
@@ -152,29 +167,23 @@ class AssetResolver():
             assets, check_happened = _attempt_initialization(
                 data_directory=data_directory,
                 saved_assets=AssetResolver.__instance.assets,
+                check_remote=check_remote,
             )
         else:
             # first initialization
             assets, check_happened = _attempt_initialization(
                 data_directory=data_directory,
                 saved_assets=None,
+                check_remote=check_remote,
             )
             AssetResolver.__instance = object.__new__(cls)
 
-        AssetResolver.__instance.assets = assets
-        # Mapping of lowercase identifier to file identifier to make sure our comparisons
-        # are case insensitive. TODO: Eventially we can make this go away. We can achieve that by:
-        # 1. Lowercasing all identifiers in the assets.json file
-        # 2. Writing a DB upgrade to do the same everywhere in the DB where
-        # an asset identifier is used for the user. That last part is doable but
-        # a bit more tricky. See v13_v14 upgrade, plus consider all new tables
-        # which have assets added to them.
-        # 3. Everywhere in the code where we use identifiers such as mappings
-        # we should now use the new lowercase identifiers. This is probably also
-        # PITA.
-        # ---> Think about it and if worth doing it address it
-        AssetResolver.__instance.lowercase_mapping = {k.lower(): k for k, _ in assets.items()}
         AssetResolver.__instance.remote_check_happened = check_happened
+        if assets is not AssetResolver.__instance.assets:
+            AssetResolver.__instance.assets = assets
+            # The lookup indices are built from the assets on first use
+            AssetResolver.__instance.lowercase_mapping = None
+            AssetResolver.__instance.eth_token_info = None
 
         return AssetResolver.__instance
 
@@ -184,6 +193,21 @@ class AssetResolver():
 
         The canonical form is the one in the all_assets.json file and in the DB"""
         instance = AssetResolver()
+        if instance.lowercase_mapping is None:
+            # Mapping of lowercase identifier to file identifier to make sure our
+            # comparisons are case insensitive. TODO: Eventially we can make this go
+            # away. We can achieve that by:
+            # 1. Lowercasing all identifiers in the assets.json file
+            # 2. Writing a DB upgrade to do the same everywhere in the DB where
+            # an asset identifier is used for the user. That last part is doable but
+            # a bit more tricky. See v13_v14 upgrade, plus consider all new tables
+            # which have assets added to them.
+            # 3. Everywhere in the code where we use identifiers such as mappings
+            # we should now use the new lowercase identifiers. This is probably also
+            # PITA.
+            # ---> Think about it and if worth doing it address it
+            instance.lowercase_mapping = {k.lower(): k for k in instance.assets}
+
         return instance.lowercase_mapping.get(asset_identifier.lower(), None)
 
     @staticmethod
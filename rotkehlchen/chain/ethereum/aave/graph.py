@@ -14,7 +14,7 @@ from rotkehlchen.chain.ethereum.aave.common import (
     AaveInquirer,
     _get_reserve_address_decimals,
 )
-from rotkehlchen.chain.ethereum.graph import Graph
+from rotkehlchen.chain.ethereum.graph import Graph, query_addresses_concurrently
 from rotkehlchen.chain.ethereum.makerdao.common import RAY
 from rotkehlchen.chain.ethereum.structures import (
     AaveBorrowEvent,
@@ -75,67 +75,45 @@ DEPOSIT_EVENTS_QUERY = """
 }
 """
 
-USER_EVENTS_QUERY = """
-  users (where: {id: $address}) {
+# Each history list of the user is queried and paginated on its own. The nested
+# lists of an entity are also capped so they can't be requested all in one query.
+USER_HISTORY_QUERY = """
+  users (where: {{id: $address}}) {{
     id
-    depositHistory {
-        id
-        amount
-        reserve {
-          id
-        }
-        timestamp
-    }
-    redeemUnderlyingHistory {
-        id
-        amount
-        reserve {
-          id
-        }
-        timestamp
-    }
-    borrowHistory {
-        id
-        amount
-        reserve {
-          id
-        }
-        timestamp
-        borrowRate
-        borrowRateMode
-        accruedBorrowInterest
-    }
-    repayHistory {
-        id
-        amountAfterFee
-        fee
-        reserve {
-          id
-        }
-        timestamp
-    }
-    liquidationCallHistory {
-        id
-        collateralAmount
-        collateralReserve {
-          id
-        }
-        principalAmount
-        principalReserve {
-          id
-        }
-        timestamp
-    }
-    reserves{
-        id
-        aTokenBalanceHistory {
-          id
-          balance
-          userBalanceIndex
-          interestRedirectionAddress
-          redirectedBalance
-          timestamp
-        }
+    {history_name} (first: $limit, orderBy: id, where: {{
+        id_gt: $last_id, timestamp_gte: $start_ts, timestamp_lte: $end_ts
+    }}) {{
+        {fields}
+    }}
+  }}
+}}
+"""
+
+USER_HISTORY_FIELDS = {
+    'depositHistory': 'id amount reserve { id } timestamp',
+    'redeemUnderlyingHistory': 'id amount reserve { id } timestamp',
+    'borrowHistory': (
+        'id amount reserve { id } timestamp borrowRate borrowRateMode accruedBorrowInterest'
+    ),
+    'repayHistory': 'id amountAfterFee fee reserve { id } timestamp',
+    'liquidationCallHistory': (
+        'id collateralAmount collateralReserve { id } principalAmount '
+        'principalReserve { id } timestamp'
+    ),
+}
+
+ATOKEN_BALANCE_HISTORY_QUERY = """
+  userReserves (where: {id: $user_reserve}) {
+    id
+    aTokenBalanceHistory (first: $limit, orderBy: id, where: {
+        id_gt: $last_id, timestamp_gte: $start_ts, timestamp_lte: $end_ts
+    }) {
+      id
+      balance
+      userBalanceIndex
+      interestRedirectionAddress
+      redirectedBalance
+      timestamp
     }
   }
 }
@@ -152,11 +130,15 @@ class ATokenBalanceHistory(NamedTuple):
 class AaveUserReserve(NamedTuple):
     address: ChecksumEthAddress
     symbol: str
+    # The id of the user reserve entity in the subgraph
+    user_reserve_id: str
 
 
 class AaveEventProcessingResult(NamedTuple):
     interest_events: List[AaveSimpleEvent]
     total_earned_interest: Dict[Asset, Balance]
+    # The aToken balances per reserve after processing the new events
+    atoken_balances: Dict[Asset, FVal]
     total_lost: Dict[Asset, Balance]
     total_earned_liquidations: Dict[Asset, Balance]
 
@@ -199,6 +181,25 @@ def _calculate_loss(
     return total_lost, total_earned
 
 
+def _atoken_balances_from_events(events: List[AaveEvent]) -> Dict[Asset, FVal]:
+    """Rebuilds the aToken balances per reserve from saved deposit, withdrawal
+    and interest events. Used for events saved before interest checkpoints existed."""
+    atoken_balances: Dict[Asset, FVal] = defaultdict(FVal)
+    for event in events:
+        if event.event_type == 'deposit':
+            atoken_balances[event.asset] += event.value.amount  # type: ignore
+        elif event.event_type == 'withdrawal':
+            atoken_balances[event.asset] -= event.value.amount  # type: ignore
+        elif event.event_type == 'interest':
+            try:
+                asset = Asset(event.asset.identifier[1:])  # type: ignore
+            except UnknownAsset:
+                continue
+            atoken_balances[asset] += event.value.amount  # type: ignore
+
+    return atoken_balances
+
+
 def _parse_common_event_data(
         entry: Dict[str, Any],
         from_ts: Timestamp,
@@ -313,25 +314,96 @@ class AaveGraphInquirer(AaveInquirer):
             aave_balances: Dict[ChecksumEthAddress, AaveBalances],
     ) -> Dict[ChecksumEthAddress, AaveHistory]:
         """
-        Queries aave history for a list of addresses.
+        Queries aave history for a list of addresses. The subgraph data of all
+        addresses is queried concurrently and then each address is processed
+        and saved in the DB.
 
         This function should be entered while holding the history_lock
         semaphore
         """
-        result = {}
+        now = ts_now()
+        # address -> (timestamp to query from, timestamp of the last query)
+        query_from_ts: Dict[ChecksumEthAddress, Tuple[Timestamp, int]] = {}
         for address in addresses:
-            history_results = self.get_history_for_address(
-                user_address=address,
-                from_timestamp=from_timestamp,
-                to_timestamp=to_timestamp,
+            last_query = self.database.get_used_query_range(f'aave_events_{address}')
+            if last_query is None:
+                query_from_ts[address] = (from_timestamp, 0)
+            else:
+                query_from_ts[address] = (Timestamp(last_query[1] + 1), last_query[1])
+
+        user_results = query_addresses_concurrently(
+            addresses=addresses,
+            query_function=lambda address: self._query_user_result(
+                address=address,
+                from_ts=query_from_ts[address][0],
+                to_ts=to_timestamp,
+                # Skip the events query if the last one was very recent
+                query_events=now - query_from_ts[address][1] > AAVE_GRAPH_RECENT_SECS,
+            ),
+        )
+        result = {}
+        for address, user_result in user_results.items():
+            if user_result is None:
+                continue
+            result[address] = self._get_user_data(
+                from_ts=query_from_ts[address][0],
+                to_ts=to_timestamp,
+                now=now,
+                address=address,
                 balances=aave_balances.get(address, AaveBalances({}, {})),
+                user_result=user_result,
             )
-            if history_results is None:
-                continue
-            result[address] = history_results
 
         return result
 
+    def _query_user_result(
+            self,
+            address: ChecksumEthAddress,
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+            query_events: bool,
+    ) -> Optional[Dict[str, Any]]:
+        """Queries the subgraph for the history lists and the aToken balance history
+        of the address in the given range. Each list is paginated on its own.
+
+        Returns None if the address has never used aave.
+        """
+        reserves = self._get_user_reserves(address=address)
+        if len(reserves) == 0:
+            return None
+
+        user_result: Dict[str, Any] = {name: [] for name in USER_HISTORY_FIELDS}
+        user_result['reserves'] = []
+        if query_events is False:
+            return user_result
+
+        param_types = {'$address': 'ID!', '$start_ts': 'Int!', '$end_ts': 'Int!'}
+        param_values = {'address': address.lower(), 'start_ts': from_ts, 'end_ts': to_ts}
+        for history_name, fields in USER_HISTORY_FIELDS.items():
+            user_result[history_name] = self.graph.query_paginated(
+                querystr=USER_HISTORY_QUERY.format(history_name=history_name, fields=fields),
+                param_types=param_types,
+                param_values=param_values,
+                entity_path=('users', 0, history_name),
+            )
+
+        for reserve in reserves:
+            user_result['reserves'].append({
+                'id': reserve.user_reserve_id,
+                'aTokenBalanceHistory': self.graph.query_paginated(
+                    querystr=ATOKEN_BALANCE_HISTORY_QUERY,
+                    param_types={'$user_reserve': 'ID!', '$start_ts': 'Int!', '$end_ts': 'Int!'},
+                    param_values={
+                        'user_reserve': reserve.user_reserve_id,
+                        'start_ts': from_ts,
+                        'end_ts': to_ts,
+                    },
+                    entity_path=('userReserves', 0, 'aTokenBalanceHistory'),
+                ),
+            })
+
+        return user_result
+
     def _get_user_reserves(self, address: ChecksumEthAddress) -> List[AaveUserReserve]:
         query = self.graph.query(
             querystr=USER_RESERVES_QUERY.format(address=address.lower()),
@@ -342,6 +414,7 @@ class AaveGraphInquirer(AaveInquirer):
             result.append(AaveUserReserve(
                 address=to_checksum_address(reserve['id']),
                 symbol=reserve['symbol'],
+                user_reserve_id=entry['id'],
             ))
 
         return result
@@ -353,9 +426,15 @@ class AaveGraphInquirer(AaveInquirer):
             actions: List[AaveSimpleEvent],
             balances: AaveBalances,
             db_interest_events: Set[AaveSimpleEvent],
+            atoken_balances: Dict[Asset, FVal],
             from_ts: Timestamp,
             to_ts: Timestamp,
     ) -> Tuple[List[AaveSimpleEvent], Dict[Asset, Balance]]:
+        """Creates the interest events of the given new actions
+
+        Interest accrual continues from the given aToken balances of the last
+        checkpoint, which are updated in place.
+        """
         reserve_history = {}
         for reserve in user_result['reserves']:
             pairs = reserve['id'].split('0x')
@@ -373,7 +452,6 @@ class AaveGraphInquirer(AaveInquirer):
             reserve_history[reserve_address] = atoken_history
 
         interest_events: List[AaveSimpleEvent] = []
-        atoken_balances: Dict[Asset, FVal] = defaultdict(FVal)
         used_history_indices = set()
         total_earned: Dict[Asset, Balance] = defaultdict(Balance)
 
@@ -492,21 +570,19 @@ class AaveGraphInquirer(AaveInquirer):
             liquidations: List[AaveLiquidationEvent],
             db_events: List[AaveEvent],
             balances: AaveBalances,
+            atoken_balances: Dict[Asset, FVal],
     ) -> AaveEventProcessingResult:
-        """Calculates the interest events and the total earned from all the given events.
+        """Calculates the interest events of the new events and the total earned.
         Also calculates total loss from borrowing and liquidations.
 
-        Also returns the edited DB events
+        Interest is only calculated for the new deposits and withdrawals, starting
+        from the given aToken balances of the last checkpoint.
         """
-        actions: List[AaveSimpleEvent] = []
         borrow_actions: List[AaveEvent] = []
         db_interest_events: Set[AaveSimpleEvent] = set()
+        new_atoken_balances: Dict[Asset, FVal] = defaultdict(FVal, atoken_balances)
         for db_event in db_events:
-            if db_event.event_type == 'deposit':
-                actions.append(db_event)  # type: ignore
-            elif db_event.event_type == 'withdrawal':
-                actions.append(db_event)  # type: ignore
-            elif db_event.event_type == 'interest':
+            if db_event.event_type == 'interest':
                 db_interest_events.add(db_event)  # type: ignore
             elif db_event.event_type == 'borrow':
                 borrow_actions.append(db_event)
@@ -518,9 +594,10 @@ class AaveGraphInquirer(AaveInquirer):
         interest_events, total_earned = self._calculate_interest_and_profit(
             user_address=user_address,
             user_result=user_result,
-            actions=actions + deposits + withdrawals,
+            actions=deposits + withdrawals,
             balances=balances,
             db_interest_events=db_interest_events,
+            atoken_balances=new_atoken_balances,
             from_ts=from_ts,
             to_ts=to_ts,
         )
@@ -531,6 +608,7 @@ class AaveGraphInquirer(AaveInquirer):
         return AaveEventProcessingResult(
             interest_events=interest_events,
             total_earned_interest=total_earned,
+            atoken_balances=new_atoken_balances,
             total_lost=total_lost,
             total_earned_liquidations=total_earned_liquidations,
         )
@@ -539,43 +617,30 @@ class AaveGraphInquirer(AaveInquirer):
             self,
             from_ts: Timestamp,
             to_ts: Timestamp,
+            now: Timestamp,
             address: ChecksumEthAddress,
             balances: AaveBalances,
+            user_result: Dict[str, Any],
     ) -> AaveHistory:
-        last_query = self.database.get_used_query_range(f'aave_events_{address}')
         db_events = self.database.get_aave_events(address=address)
-
-        now = ts_now()
-        last_query_ts = 0
-        if last_query is not None:
-            last_query_ts = last_query[1]
-            from_ts = Timestamp(last_query_ts + 1)
-
-        deposits = withdrawals = borrows = repays = liquidation_calls = []
-        query = self.graph.query(
-            querystr=USER_EVENTS_QUERY,
-            param_types={'$address': 'ID!'},
-            param_values={'address': address.lower()},
+        atoken_balances = self.database.get_aave_interest_state(address)
+        if len(atoken_balances) == 0:
+            atoken_balances = _atoken_balances_from_events(db_events)
+
+        # Only the events and aToken balance history after the last query were requested
+        deposits = self._parse_deposits(user_result['depositHistory'], from_ts, to_ts)
+        withdrawals = self._parse_withdrawals(
+            withdrawals=user_result['redeemUnderlyingHistory'],
+            from_ts=from_ts,
+            to_ts=to_ts,
+        )
+        borrows = self._parse_borrows(user_result['borrowHistory'], from_ts, to_ts)
+        repays = self._parse_repays(user_result['repayHistory'], from_ts, to_ts)
+        liquidation_calls = self._parse_liquidations(
+            user_result['liquidationCallHistory'],
+            from_ts,
+            to_ts,
         )
-        user_result = query['users'][0]
-        if now - last_query_ts > AAVE_GRAPH_RECENT_SECS:
-            # In theory if these were individual queries we should do them only if
-            # we have not queried recently. In practise since we only do 1 query above
-            # this is useless for now, but keeping the mechanism in case we change
-            # the way we query the subgraph
-            deposits = self._parse_deposits(user_result['depositHistory'], from_ts, to_ts)
-            withdrawals = self._parse_withdrawals(
-                withdrawals=user_result['redeemUnderlyingHistory'],
-                from_ts=from_ts,
-                to_ts=to_ts,
-            )
-            borrows = self._parse_borrows(user_result['borrowHistory'], from_ts, to_ts)
-            repays = self._parse_repays(user_result['repayHistory'], from_ts, to_ts)
-            liquidation_calls = self._parse_liquidations(
-                user_result['liquidationCallHistory'],
-                from_ts,
-                to_ts,
-            )
 
         result = self._process_events(
             user_address=address,
@@ -589,18 +654,21 @@ class AaveGraphInquirer(AaveInquirer):
             liquidations=liquidation_calls,
             db_events=db_events,
             balances=balances,
+            atoken_balances=atoken_balances,
         )
 
-        # Add all new events to the DB
+        # Add all new events and the interest checkpoint to the DB
         new_events: List[AaveEvent] = deposits + withdrawals + result.interest_events + borrows + repays + liquidation_calls  # type: ignore  # noqa: E501
-        self.database.add_aave_events(address, new_events)
-        # After all events have been queried then also update the query range.
-        # Even if no events are found for an address we need to remember the range
-        self.database.update_used_query_range(
-            name=f'aave_events_{address}',
-            start_ts=Timestamp(0),
-            end_ts=now,
-        )
+        with self.database.write_batch():
+            self.database.add_aave_events(address, new_events)
+            self.database.set_aave_interest_state(address, result.atoken_balances)
+            # After all events have been queried then also update the query range.
+            # Even if no events are found for an address we need to remember the range
+            self.database.update_used_query_range(
+                name=f'aave_events_{address}',
+                start_ts=Timestamp(0),
+                end_ts=now,
+            )
 
         # Sort actions so that actions with same time are sorted deposit -> interest -> withdrawal
         all_events: List[AaveEvent] = new_events + db_events
@@ -808,30 +876,6 @@ class AaveGraphInquirer(AaveInquirer):
 
         return events
 
-    def get_history_for_address(
-            self,
-            user_address: ChecksumEthAddress,
-            from_timestamp: Timestamp,
-            to_timestamp: Timestamp,
-            balances: AaveBalances,
-    ) -> Optional[AaveHistory]:
-        """
-        Queries aave history for a single address.
-
-        This function should be entered while holding the history_lock
-        semaphore
-        """
-        reserves = self._get_user_reserves(address=user_address)
-        if len(reserves) != 0:
-            return self._get_user_data(
-                from_ts=from_timestamp,
-                to_ts=to_timestamp,
-                address=user_address,
-                balances=balances,
-            )
-
-        return None
-
     def _get_asset_and_balance(
             self,
             entry: Dict[str, Any],
@@ -2,15 +2,32 @@ import logging
 from collections import defaultdict
 from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
+import gevent
 from eth_utils import to_checksum_address
+from gevent.pool import Pool
 from typing_extensions import Literal
 
 from rotkehlchen.accounting.structures import Balance, BalanceType
 from rotkehlchen.assets.asset import Asset, EthereumToken
-from rotkehlchen.chain.ethereum.graph import Graph, get_common_params
-from rotkehlchen.chain.ethereum.utils import token_normalized_value
+from rotkehlchen.chain.ethereum.contracts import EthereumContract
+from rotkehlchen.chain.ethereum.graph import (
+    Graph,
+    get_common_params,
+    query_addresses_concurrently,
+)
+from rotkehlchen.chain.ethereum.structures import CompoundEvent
+from rotkehlchen.chain.ethereum.utils import (
+    MulticallBatch,
+    MulticallCall,
+    token_normalized_value,
+)
 from rotkehlchen.chain.ethereum.zerion import GIVEN_DEFI_BALANCES
-from rotkehlchen.constants.ethereum import CTOKEN_ABI, ERC20TOKEN_ABI, EthereumConstants
+from rotkehlchen.constants.ethereum import (
+    COMPOUND_EVENTS_PREFIX,
+    CTOKEN_ABI,
+    ERC20TOKEN_ABI,
+    EthereumConstants,
+)
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.errors import BlockchainQueryError, RemoteError, UnknownAsset
@@ -21,7 +38,7 @@ from rotkehlchen.premium.premium import Premium
 from rotkehlchen.typing import ChecksumEthAddress, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.interfaces import EthereumModule
-from rotkehlchen.utils.misc import hexstr_to_int
+from rotkehlchen.utils.misc import hexstr_to_int, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
@@ -34,10 +51,14 @@ A_COMP = EthereumToken('COMP')
 
 COMPTROLLER_PROXY = EthereumConstants().contract('COMPTROLLER_PROXY')
 COMP_DEPLOYED_BLOCK = 9601359
+# The graph event types that are queried concurrently for each address
+COMPOUND_GRAPH_EVENT_TYPES = ('mint', 'redeem', 'borrow', 'repay', 'liquidation')
 
 
 LEND_EVENTS_QUERY_PREFIX = """{graph_event_name}
-(where: {{blockTime_lte: $end_ts, blockTime_gte: $start_ts, {addr_position}: $address}}) {{
+(first: $limit, orderBy: id, where: {{
+    id_gt: $last_id, blockTime_lte: $end_ts, blockTime_gte: $start_ts, {addr_position}: $address
+}}) {{
     id
     amount
     to
@@ -50,7 +71,9 @@ LEND_EVENTS_QUERY_PREFIX = """{graph_event_name}
 
 
 BORROW_EVENTS_QUERY_PREFIX = """{graph_event_name}
- (where: {{blockTime_lte: $end_ts, blockTime_gte: $start_ts, borrower: $address}}) {{
+ (first: $limit, orderBy: id, where: {{
+    id_gt: $last_id, blockTime_lte: $end_ts, blockTime_gte: $start_ts, borrower: $address
+}}) {{
     id
     amount
     borrower
@@ -76,25 +99,6 @@ class CompoundBalance(NamedTuple):
         }
 
 
-class CompoundEvent(NamedTuple):
-    event_type: Literal['mint', 'redeem', 'borrow', 'repay', 'liquidation', 'comp']
-    address: ChecksumEthAddress
-    block_number: int
-    timestamp: Timestamp
-    asset: Asset
-    value: Balance
-    to_asset: Optional[Asset]
-    to_value: Optional[Balance]
-    realized_pnl: Optional[Balance]
-    tx_hash: str
-    log_index: int  # only used to identify uniqueness
-
-    def serialize(self) -> Dict[str, Any]:
-        serialized = self._asdict()  # pylint: disable=no-member
-        del serialized['log_index']
-        return serialized
-
-
 def _get_txhash_and_logidx(identifier: str) -> Optional[Tuple[str, int]]:
     result = identifier.split('-')
     if len(result) != 2:
@@ -145,17 +149,30 @@ class Compound(EthereumModule):
             method_name='comptrollerImplementation',
         ))
 
-    def _get_apy(self, address: ChecksumEthAddress, supply: bool) -> Optional[FVal]:
-        method_name = 'supplyRatePerBlock' if supply else 'borrowRatePerBlock'
-
+    def _queue_apy(
+            self,
+            batch: MulticallBatch,
+            apy_calls: Dict[Tuple[ChecksumEthAddress, bool], MulticallCall],
+            address: ChecksumEthAddress,
+            supply: bool,
+    ) -> MulticallCall:
+        """Queues the rate query of a cToken in the batch, once for each cToken"""
+        call = apy_calls.get((address, supply))
+        if call is None:
+            method_name = 'supplyRatePerBlock' if supply else 'borrowRatePerBlock'
+            contract = EthereumContract(address=address, abi=CTOKEN_ABI, deployed_block=0)
+            call = batch.add(contract, method_name)
+            apy_calls[(address, supply)] = call
+        return call
+
+    def _get_apy(self, call: MulticallCall) -> Optional[FVal]:
         try:
-            rate = self.ethereum.call_contract(
-                contract_address=address,
-                abi=CTOKEN_ABI,
-                method_name=method_name,
-            )
+            rate = call.result
         except (RemoteError, BlockchainQueryError) as e:
-            log.error(f'Could not query cToken {address} for supply/borrow rate: {str(e)}')
+            log.error(
+                f'Could not query cToken {call.contract.address} for supply/borrow '
+                f'rate: {str(e)}',
+            )
             return None
 
         apy = ((FVal(rate) / ETH_MANTISSA * BLOCKS_PER_DAY) + 1) ** (DAYS_PER_YEAR - 1) - 1  # noqa: E501
@@ -171,6 +188,10 @@ class Compound(EthereumModule):
         else:
             defi_balances = given_defi_balances()
 
+        # The cToken rates are all queried in one batch after going through the balances
+        batch = MulticallBatch(self.ethereum)
+        apy_calls: Dict[Tuple[ChecksumEthAddress, bool], MulticallCall] = {}
+        pending_apys: List[Tuple[Dict[str, CompoundBalance], str, MulticallCall]] = []
         for account, balance_entries in defi_balances.items():
             lending_map = {}
             borrowing_map = {}
@@ -210,8 +231,13 @@ class Compound(EthereumModule):
                     lending_map[underlying_asset.identifier] = CompoundBalance(
                         balance_type=BalanceType.ASSET,
                         balance=balance_entry.underlying_balances[0].balance,
-                        apy=self._get_apy(entry.token_address, supply=True),
+                        apy=None,
                     )
+                    pending_apys.append((
+                        lending_map,
+                        underlying_asset.identifier,
+                        self._queue_apy(batch, apy_calls, entry.token_address, supply=True),
+                    ))
                 else:  # 'Debt'
                     try:
                         ctoken = EthereumToken('c' + entry.token_symbol)
@@ -225,8 +251,13 @@ class Compound(EthereumModule):
                     borrowing_map[asset.identifier] = CompoundBalance(
                         balance_type=BalanceType.LIABILITY,
                         balance=entry.balance,
-                        apy=self._get_apy(ctoken.ethereum_address, supply=False),
+                        apy=None,
                     )
+                    pending_apys.append((
+                        borrowing_map,
+                        asset.identifier,
+                        self._queue_apy(batch, apy_calls, ctoken.ethereum_address, supply=False),
+                    ))
 
             if lending_map == {} and borrowing_map == {} and rewards_map == {}:
                 # no balances for the account
@@ -237,6 +268,10 @@ class Compound(EthereumModule):
                 'borrowing': borrowing_map,
             }
 
+        batch.execute()
+        for balances_map, identifier, call in pending_apys:
+            balances_map[identifier] = balances_map[identifier]._replace(apy=self._get_apy(call))
+
         return compound_balances
 
     def _get_borrow_events(
@@ -254,17 +289,18 @@ class Compound(EthereumModule):
             graph_event_name = 'repayEvents'
             payer_or_empty = 'payer'
 
-        result = self.graph.query(  # type: ignore
+        entries = self.graph.query_paginated(  # type: ignore
             querystr=BORROW_EVENTS_QUERY_PREFIX.format(
                 graph_event_name=graph_event_name,
                 payer_or_empty=payer_or_empty,
             ),
             param_types=param_types,
             param_values=param_values,
+            entity_path=(graph_event_name,),
         )
 
         events = []
-        for entry in result[graph_event_name]:
+        for entry in entries:
             underlying_symbol = entry['underlyingSymbol']
             try:
                 underlying_asset = Asset(underlying_symbol)
@@ -313,8 +349,10 @@ class Compound(EthereumModule):
     ) -> List[CompoundEvent]:
         """https://compound.finance/docs/ctokens#liquidate-borrow"""
         param_types, param_values = get_common_params(from_ts, to_ts, address)
-        result = self.graph.query(  # type: ignore
-            querystr="""liquidationEvents (where: {blockTime_lte: $end_ts, blockTime_gte: $start_ts, from: $address}) {
+        entries = self.graph.query_paginated(  # type: ignore
+            querystr="""liquidationEvents (first: $limit, orderBy: id, where: {
+    id_gt: $last_id, blockTime_lte: $end_ts, blockTime_gte: $start_ts, from: $address
+}) {
     id
     amount
     from
@@ -326,10 +364,11 @@ class Compound(EthereumModule):
 }}""",
             param_types=param_types,
             param_values=param_values,
+            entity_path=('liquidationEvents',),
         )
 
         events = []
-        for entry in result['liquidationEvents']:
+        for entry in entries:
             ctoken_symbol = entry['cTokenSymbol']
             try:
                 ctoken_asset = Asset(ctoken_symbol)
@@ -407,17 +446,18 @@ class Compound(EthereumModule):
             graph_event_name = 'redeemEvents'
             addr_position = 'from'
 
-        result = self.graph.query(  # type: ignore
+        entries = self.graph.query_paginated(  # type: ignore
             querystr=LEND_EVENTS_QUERY_PREFIX.format(
                 graph_event_name=graph_event_name,
                 addr_position=addr_position,
             ),
             param_types=param_types,
             param_values=param_values,
+            entity_path=(graph_event_name,),
         )
 
         events = []
-        for entry in result[graph_event_name]:
+        for entry in entries:
             ctoken_symbol = entry['cTokenSymbol']
             try:
                 ctoken_asset = Asset(ctoken_symbol)
@@ -504,6 +544,11 @@ class Compound(EthereumModule):
         events = []
         for event in comp_events:
             timestamp = self.ethereum.get_event_timestamp(event)
+            if timestamp < from_ts:
+                # The block of from_ts is the last block of the previously queried
+                # range, so its events are already saved
+                continue
+
             amount = token_normalized_value(hexstr_to_int(event['data']), A_COMP)
             usd_price = query_usd_price_zero_if_error(
                 asset=A_COMP,
@@ -640,11 +685,107 @@ class Compound(EthereumModule):
 
         return profit_so_far, loss_so_far, liquidation_profit, rewards_assets
 
+    def _query_graph_events(
+            self,
+            event_type: str,
+            address: ChecksumEthAddress,
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+    ) -> List[CompoundEvent]:
+        if event_type in ('mint', 'redeem'):
+            return self._get_lend_events(event_type, address, from_ts, to_ts)  # type: ignore
+        if event_type in ('borrow', 'repay'):
+            return self._get_borrow_events(event_type, address, from_ts, to_ts)  # type: ignore
+        # else liquidation
+        return self._get_liquidation_events(address, from_ts, to_ts)
+
+    def _query_new_events(
+            self,
+            address: ChecksumEthAddress,
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+    ) -> List[CompoundEvent]:
+        """Queries all compound events of an address in the given range. The graph
+        queries of the different event types are independent so they run concurrently.
+
+        May raise:
+        - RemoteError due to the graph query failure
+        """
+        pool = Pool(len(COMPOUND_GRAPH_EVENT_TYPES))
+        greenlets = {
+            event_type: pool.spawn(
+                self._query_graph_events,
+                event_type=event_type,
+                address=address,
+                from_ts=from_ts,
+                to_ts=to_ts,
+            ) for event_type in COMPOUND_GRAPH_EVENT_TYPES
+        }
+        try:
+            gevent.joinall(list(greenlets.values()), raise_error=True)
+        finally:
+            pool.kill()
+
+        # A liquidation also emits a repay event in the same transaction. Those repays
+        # are accounted for by the liquidation so they should not be counted twice
+        liquidation_events = greenlets['liquidation'].value
+        liquidation_tx_hashes = {x.tx_hash for x in liquidation_events}
+        events = []
+        for event_type in ('mint', 'redeem', 'borrow'):
+            events.extend(greenlets[event_type].value)
+        events.extend(
+            x for x in greenlets['repay'].value if x.tx_hash not in liquidation_tx_hashes
+        )
+        events.extend(liquidation_events)
+        return events
+
+    def _update_events(
+            self,
+            addresses: List[ChecksumEthAddress],
+            to_ts: Timestamp,
+    ) -> None:
+        """Queries only the compound events of the addresses that happened after their
+        last queried range and saves them in the DB along with the new ranges. The graph
+        queries of the different addresses run concurrently.
+
+        May raise:
+        - RemoteError due to the graph query failure or etherscan
+        """
+        query_from_ts: Dict[ChecksumEthAddress, Timestamp] = {}
+        for address in addresses:
+            last_query = self.database.get_used_query_range(f'{COMPOUND_EVENTS_PREFIX}_{address}')
+            if last_query is None:
+                query_from_ts[address] = Timestamp(0)
+            elif last_query[1] < to_ts:
+                query_from_ts[address] = Timestamp(last_query[1] + 1)
+
+        address_new_events = query_addresses_concurrently(
+            addresses=list(query_from_ts.keys()),
+            query_function=lambda address: self._query_new_events(
+                address=address,
+                from_ts=query_from_ts[address],
+                to_ts=to_ts,
+            ),
+        )
+        for address, new_events in address_new_events.items():
+            if len(new_events) != 0 or self.database.has_compound_events(address):
+                # query comp events only if any other event has happened
+                new_events.extend(self._get_comp_events(address, query_from_ts[address], to_ts))
+
+            with self.database.write_batch():
+                self.database.add_compound_events(new_events)
+                # Even if no events are found for an address we need to remember the range
+                self.database.update_used_query_range(
+                    name=f'{COMPOUND_EVENTS_PREFIX}_{address}',
+                    start_ts=Timestamp(0),
+                    end_ts=to_ts,
+                )
+
     def get_history(
             self,
             given_defi_balances: GIVEN_DEFI_BALANCES,
             addresses: List[ChecksumEthAddress],
-            reset_db_data: bool,  # pylint: disable=unused-argument
+            reset_db_data: bool,
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
     ) -> Dict[str, Any]:
@@ -657,27 +798,18 @@ class Compound(EthereumModule):
         if self.graph is None:  # could not initialize graph
             return {}
 
+        if reset_db_data is True:
+            self.database.delete_compound_data()
+
+        # Events are always queried up until now so that the saved range is contiguous
+        now = ts_now()
+        self._update_events(addresses, now)
         for address in addresses:
-            user_events = self._get_lend_events('mint', address, from_timestamp, to_timestamp)
-            user_events.extend(self._get_lend_events('redeem', address, from_timestamp, to_timestamp))  # noqa: E501
-            user_events.extend(self._get_borrow_events('borrow', address, from_timestamp, to_timestamp))  # noqa: E501
-            repay_events = self._get_borrow_events('repay', address, from_timestamp, to_timestamp)
-            liquidation_events = self._get_liquidation_events(address, from_timestamp, to_timestamp)  # noqa: E501
-            indices_to_remove = []
-            for levent in liquidation_events:
-                for ridx, revent in enumerate(repay_events):
-                    if levent.tx_hash == revent.tx_hash:
-                        indices_to_remove.append(ridx)
-
-            for i in sorted(indices_to_remove, reverse=True):
-                del repay_events[i]
-
-            user_events.extend(repay_events)
-            user_events.extend(liquidation_events)
-            if len(user_events) != 0:
-                # query comp events only if any other event has happened
-                user_events.extend(self._get_comp_events(address, from_timestamp, to_timestamp))
-                events.extend(user_events)
+            events.extend(self.database.get_compound_events(
+                address=address,
+                from_ts=from_timestamp,
+                to_ts=to_timestamp,
+            ))
 
         events.sort(key=lambda x: x.timestamp)
         history['events'] = events
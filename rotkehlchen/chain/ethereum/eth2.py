@@ -1,25 +1,33 @@
 from collections import defaultdict
 from typing import TYPE_CHECKING, DefaultDict, Dict, List, NamedTuple
 
+from eth_utils import to_checksum_address
+
 from rotkehlchen.accounting.structures import Balance
+from rotkehlchen.chain.ethereum.structures import Eth2DepositEvent
 from rotkehlchen.chain.ethereum.utils import decode_event_data
 from rotkehlchen.constants.assets import A_ETH
-from rotkehlchen.constants.ethereum import EthereumConstants
+from rotkehlchen.constants.ethereum import ETH2_DEPOSITS_PREFIX, EthereumConstants
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.price import query_usd_price_zero_if_error
 from rotkehlchen.inquirer import Inquirer
-from rotkehlchen.typing import ChecksumEthAddress
+from rotkehlchen.typing import ChecksumEthAddress, EthereumTransaction, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.misc import hex_or_bytes_to_int, hexstr_to_int, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
+    from rotkehlchen.db.dbhandler import DBHandler
 
 ETH2_DEPOSIT = EthereumConstants().contract('ETH2_DEPOSIT')
-ETH2_DEPLOYED_TS = 1602667372
+ETH2_DEPLOYED_TS = Timestamp(1602667372)
 
 EVENT_ABI = [x for x in ETH2_DEPOSIT.abi if x['type'] == 'event'][0]
+# keccak of DepositEvent(bytes,bytes,bytes,bytes,bytes)
+DEPOSIT_EVENT_TOPIC = hexstr_to_int(
+    '0x649bbc62d0e31342afea4e5cd82d4049e7e1ee912fc0889aa790803be39038c5',
+)
 
 
 class Eth2Deposit(NamedTuple):
@@ -37,66 +45,129 @@ class Eth2DepositResult(NamedTuple):
     totals: Dict[ChecksumEthAddress, Balance]
 
 
+def _get_transaction_deposits(
+        ethereum: 'EthereumManager',
+        transaction: EthereumTransaction,
+) -> List[Eth2DepositEvent]:
+    """Decodes the deposits from the logs of a transaction sent to the deposit contract.
+
+    If no deposit event is found the transaction probably failed or was something
+    other than a deposit.
+
+    May raise:
+    - RemoteError if there is a problem querying the transaction receipt
+    """
+    tx_hash = '0x' + transaction.tx_hash.hex()
+    tx_receipt = ethereum.get_transaction_receipt(tx_hash)
+    deposits = []
+    for log in tx_receipt['logs']:
+        if (
+            to_checksum_address(log['address']) != ETH2_DEPOSIT.address or
+            len(log['topics']) == 0 or
+            hex_or_bytes_to_int(log['topics'][0]) != DEPOSIT_EVENT_TOPIC
+        ):
+            continue
+
+        decoded_data = decode_event_data(log['data'], EVENT_ABI)
+        amount = int.from_bytes(decoded_data[2], byteorder='little')
+        deposits.append(Eth2DepositEvent(
+            from_address=transaction.from_address,
+            pubkey='0x' + decoded_data[0].hex(),
+            withdrawal_credentials='0x' + decoded_data[1].hex(),
+            amount=FVal(amount) / 10 ** 9,
+            validator_index=int.from_bytes(decoded_data[4], byteorder='little'),
+            tx_hash=tx_hash,
+            log_index=log['logIndex'],
+            timestamp=transaction.timestamp,
+        ))
+
+    return deposits
+
+
+def _sync_eth2_deposits(
+        ethereum: 'EthereumManager',
+        database: 'DBHandler',
+        addresses: List[ChecksumEthAddress],
+) -> None:
+    """Saves in the DB the eth2 deposits of the given addresses made since the last sync.
+
+    Only the receipts of the addresses' own transactions to the deposit contract are
+    queried so there is no need to go through the logs of all deposits ever made.
+
+    May raise:
+    - RemoteError if there is a problem querying the transactions or their receipts
+    """
+    now = ts_now()
+    for address in addresses:
+        query_name = f'{ETH2_DEPOSITS_PREFIX}_{address}'
+        query_range = database.get_used_query_range(query_name)
+        from_ts = ETH2_DEPLOYED_TS if query_range is None else Timestamp(query_range[1] + 1)
+        if from_ts > now:
+            continue
+
+        transactions = ethereum.transactions.query(
+            addresses=[address],
+            from_ts=from_ts,
+            to_ts=now,
+            with_limit=False,
+            recent_first=False,
+        )
+        deposits = []
+        for transaction in transactions:
+            if (
+                transaction.from_address != address or
+                transaction.to_address != ETH2_DEPOSIT.address
+            ):
+                continue
+
+            deposits.extend(_get_transaction_deposits(ethereum, transaction))
+
+        database.add_eth2_deposits(deposits)
+        database.update_used_query_range(name=query_name, start_ts=ETH2_DEPLOYED_TS, end_ts=now)
+
+
 def get_eth2_staked_amount(
         ethereum: 'EthereumManager',
+        database: 'DBHandler',
         addresses: List[ChecksumEthAddress],
         has_premium: bool,
         msg_aggregator: MessagesAggregator,
 ) -> Eth2DepositResult:
-    events = ETH2_DEPOSIT.get_logs(
-        ethereum=ethereum,
-        event_name='DepositEvent',
-        argument_filters={},
-        from_block=ETH2_DEPOSIT.deployed_block,
-        to_block='latest',
-    )
-    transactions = ethereum.transactions.query(
-        addresses=addresses,
-        from_ts=ETH2_DEPLOYED_TS,
-        to_ts=ts_now(),
-        with_limit=False,
-        recent_first=False,
-    )
-    totals: DefaultDict[ChecksumEthAddress, int] = defaultdict(int)
-    deposits = []
+    """Returns the eth2 deposits of the given addresses and their totals.
 
-    for transaction in transactions:
-        if transaction.to_address != ETH2_DEPOSIT.address:
-            continue
+    The deposits are kept in the DB so only the ones made since the last call are queried.
+
+    May raise:
+    - RemoteError if there is a problem querying the transactions or their receipts
+    """
+    _sync_eth2_deposits(ethereum=ethereum, database=database, addresses=addresses)
 
-        tx_hash = '0x' + transaction.tx_hash.hex()
-        for event in events:
-            # Now find the corresponding event. If no event is found the transaction
-            # probably failed or was something other than a deposit
-            if event['transactionHash'] == tx_hash:
-                decoded_data = decode_event_data(event['data'], EVENT_ABI)
-                amount = int.from_bytes(decoded_data[2], byteorder='little')
-                usd_price = ZERO
-                if has_premium:  # won't show this to non-premium so don't bother
-                    usd_price = query_usd_price_zero_if_error(
-                        asset=A_ETH,
-                        time=transaction.timestamp,
-                        location='Eth2 staking query',
-                        msg_aggregator=msg_aggregator,
-                    )
-                normalized_amount = FVal(amount) / 10 ** 9
-                deposits.append(Eth2Deposit(
-                    from_address=transaction.from_address,
-                    pubkey='0x' + decoded_data[0].hex(),
-                    withdrawal_credentials='0x' + decoded_data[1].hex(),
-                    value=Balance(normalized_amount, usd_price * normalized_amount),
-                    validator_index=int.from_bytes(decoded_data[4], byteorder='little'),
-                    tx_hash=tx_hash,
-                    log_index=event['logIndex'],
-                ))
-                totals[transaction.from_address] += amount
-                break
+    totals: DefaultDict[ChecksumEthAddress, FVal] = defaultdict(FVal)
+    deposits = []
+    for event in database.get_eth2_deposits(addresses):
+        usd_price = ZERO
+        if has_premium:  # won't show this to non-premium so don't bother
+            usd_price = query_usd_price_zero_if_error(
+                asset=A_ETH,
+                time=event.timestamp,
+                location='Eth2 staking query',
+                msg_aggregator=msg_aggregator,
+            )
+        deposits.append(Eth2Deposit(
+            from_address=event.from_address,
+            pubkey=event.pubkey,
+            withdrawal_credentials=event.withdrawal_credentials,
+            value=Balance(event.amount, usd_price * event.amount),
+            validator_index=event.validator_index,
+            tx_hash=event.tx_hash,
+            log_index=event.log_index,
+        ))
+        totals[event.from_address] += event.amount
 
     current_usd_price = Inquirer().find_usd_price(A_ETH)
     normalized_totals = {}
     for k, v in totals.items():
-        normalized_amount = FVal(v) / 10 ** 9
-        normalized_totals[k] = Balance(normalized_amount, normalized_amount * current_usd_price)
+        normalized_totals[k] = Balance(v, v * current_usd_price)
 
     return Eth2DepositResult(
         deposits=deposits,
@@ -1,22 +1,49 @@
 import json
 import logging
 import re
-from typing import Any, Dict, Optional, Tuple
-
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import gevent
 import requests
-from gql import Client, gql
-from gql.transport.requests import RequestsHTTPTransport
+from gevent.pool import Pool
 from typing_extensions import Literal
 
 from rotkehlchen.errors import RemoteError
 from rotkehlchen.typing import ChecksumEthAddress, Timestamp
 
+if TYPE_CHECKING:
+    from graphql.language.ast import Document
+
 log = logging.getLogger(__name__)
 
 
 GRAPH_QUERY_LIMIT = 1000
+# Max number of addresses whose subgraph data is queried at the same time
+GRAPH_CONCURRENT_QUERIES = 4
 RE_MULTIPLE_WHITESPACE = re.compile(r'\s+')
 
+T = TypeVar('T')
+
+
+@lru_cache(maxsize=128)
+def _parse_query(querystr: str) -> 'Document':
+    """Parses a query string into a GraphQL document. The query strings are the
+    same for every page and address so the parsing is only done once per query"""
+    from gql import gql  # gql is imported lazily, see Graph.__init__
+    return gql(querystr)
+
 
 def format_query_indentation(querystr: str) -> str:
     """Format a triple quote and indented GraphQL query by:
@@ -46,11 +73,84 @@ def get_common_params(
     return param_types, param_values
 
 
+def paginated_query(
+        graph_query: Callable[..., Dict[str, Any]],
+        querystr: str,
+        param_types: Dict[str, Any],
+        param_values: Dict[str, Any],
+        entity_path: Sequence[Union[str, int]],
+) -> List[Dict[str, Any]]:
+    """Queries all the entities found at `entity_path` of the query result page by page
+
+    The paginated entities of the query should be selected with
+    `first: $limit, orderBy: id, where: {id_gt: $last_id, ...}` and contain the `id`
+    field. Each page continues after the id of the last entity of the previous one,
+    which unlike `skip` stays fast for deep pages and is not capped by the subgraph.
+
+    If the path can't be followed in a result, for example because the parent entity
+    does not exist, there are no more entities to return.
+
+    May raise:
+    - RemoteError: If there is a problem querying the subgraph
+    """
+    entities: List[Dict[str, Any]] = []
+    param_types = {**param_types, '$limit': 'Int!', '$last_id': 'ID!'}
+    last_id = ''
+    while True:
+        result = graph_query(
+            querystr=querystr,
+            param_types=param_types,
+            param_values={**param_values, 'limit': GRAPH_QUERY_LIMIT, 'last_id': last_id},
+        )
+        page: Any = result
+        for key in entity_path:
+            try:
+                page = page[key]
+            except (KeyError, IndexError, TypeError):
+                return entities
+
+        entities.extend(page)
+        # Check whether an extra request is needed
+        if len(page) < GRAPH_QUERY_LIMIT:
+            break
+
+        last_id = page[-1]['id']
+
+    return entities
+
+
+def query_addresses_concurrently(
+        addresses: Sequence[ChecksumEthAddress],
+        query_function: Callable[[ChecksumEthAddress], T],
+) -> Dict[ChecksumEthAddress, T]:
+    """Runs the given subgraph query function for each address with a bounded
+    number of concurrent queries and returns the results per address
+
+    The query function should only talk to the subgraph. Any DB reads or writes
+    should happen before or after calling this.
+
+    May raise:
+    - Any error raised by the query function
+    """
+    pool = Pool(GRAPH_CONCURRENT_QUERIES)
+    greenlets = {address: pool.spawn(query_function, address) for address in addresses}
+    try:
+        gevent.joinall(list(greenlets.values()), raise_error=True)
+    finally:
+        pool.kill()
+
+    return {address: greenlet.value for address, greenlet in greenlets.items()}
+
+
 class Graph():
 
     def __init__(self, url: str) -> None:
         """
         - May raise requests.RequestException if there is a problem connecting to the subgraph"""
+        # gql and graphql-core take a noticeable part of the startup time to import and
+        # are only needed once a module that queries a subgraph is activated
+        from gql import Client
+        from gql.transport.requests import RequestsHTTPTransport
         transport = RequestsHTTPTransport(url=url)
         try:
             self.client = Client(transport=transport, fetch_schema_from_transport=True)
@@ -77,9 +177,30 @@ class Graph():
         querystr = prefix + querystr
         log.debug(f'Querying The Graph for {querystr}')
         try:
-            result = self.client.execute(gql(querystr), variable_values=param_values)
+            result = self.client.execute(_parse_query(querystr), variable_values=param_values)
         except (requests.exceptions.RequestException, Exception) as e:
             raise RemoteError(f'Failed to query the graph for {querystr} due to {str(e)}') from e
 
         log.debug('Got result from The Graph query')
         return result
+
+    def query_paginated(
+            self,
+            querystr: str,
+            param_types: Dict[str, Any],
+            param_values: Dict[str, Any],
+            entity_path: Sequence[Union[str, int]],
+    ) -> List[Dict[str, Any]]:
+        """Queries The Graph for all the entities at `entity_path`, following the
+        id cursor of each page. See `paginated_query`.
+
+        May raise:
+        - RemoteError: If there is a problem querying the subgraph
+        """
+        return paginated_query(
+            graph_query=self.query,
+            querystr=querystr,
+            param_types=param_types,
+            param_values=param_values,
+            entity_path=entity_path,
+        )
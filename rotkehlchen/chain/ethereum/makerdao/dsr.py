@@ -1,7 +1,6 @@
 import logging
-import operator
-from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 from gevent.lock import Semaphore
 from typing_extensions import Literal
@@ -13,9 +12,16 @@ from rotkehlchen.chain.ethereum.makerdao.common import (
     RAY,
     MakerDAOCommon,
 )
+from rotkehlchen.chain.ethereum.structures import DSRMovement, DSRRateChange
+from rotkehlchen.chain.ethereum.utils import MulticallBatch
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_DAI
-from rotkehlchen.constants.ethereum import MAKERDAO_DAI_JOIN, MAKERDAO_POT
+from rotkehlchen.constants.ethereum import (
+    DSR_MOVEMENTS_PREFIX,
+    DSR_RATE_CHANGES_RANGE,
+    MAKERDAO_DAI_JOIN,
+    MAKERDAO_POT,
+)
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.errors import BlockchainQueryError, ConversionError, RemoteError
 from rotkehlchen.fval import FVal
@@ -24,7 +30,7 @@ from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.premium.premium import Premium
 from rotkehlchen.typing import ChecksumEthAddress, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import hex_or_bytes_to_address, hexstr_to_int, ts_now
+from rotkehlchen.utils.misc import hex_or_bytes_to_int, hexstr_to_int, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
@@ -32,25 +38,8 @@ if TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 POT_CREATION_TIMESTAMP = 1573672721
-CHI_BLOCKS_SEARCH_DISTANCE = 250  # Blocks per call query per side (before/after)
-MAX_BLOCKS_TO_QUERY = 346000  # query about a month's worth of blocks in each side before giving up
-
-
-@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
-class DSRMovement:
-    movement_type: Literal['deposit', 'withdrawal']
-    address: ChecksumEthAddress
-    # normalized balance in DSR DAI (RAD precision 10**45)
-    normalized_balance: int
-    # gain so far in DSR DAI (RAD precision 10**45)
-    gain_so_far: int = field(init=False)
-    gain_so_far_usd_value: FVal = field(init=False)
-    # dai balance in DSR DAI (RAD precision 10**45)
-    amount: int
-    amount_usd_value: FVal
-    block_number: int
-    timestamp: Timestamp
-    tx_hash: str
+# The "what" argument of the pot's file(bytes32,uint256) when the dsr is changed
+POT_FILE_DSR_WHAT = int.from_bytes(b'dsr'.ljust(32, b'\0'), byteorder='big')
 
 
 class DSRCurrentBalances(NamedTuple):
@@ -100,31 +89,25 @@ class ChiRetrievalError(Exception):
     pass
 
 
-def _find_closest_event(
-        join_events: List[Dict[str, Any]],
-        exit_events: List[Dict[str, Any]],
-        index: int,
-        comparison: Callable,
-) -> Optional[Dict[str, Any]]:
-    """Given lists of events and index/comparisonop find the closest event
+def _rpow(x: int, n: int, base: int = RAY) -> int:
+    """Port of the rpow() of the MakerDAO dss contracts
 
-    Index and comparisonon depend on whether we are searching for the events
-    backwards or forwards.
+    Calculates x^n with rounding in base precision exactly as the Pot contract
+    does when it accumulates the rate into chi.
     """
-    found_event = None
-    if len(join_events) != 0:
-        found_event = join_events[index]
-    if len(exit_events) != 0:
-        if found_event:
-            join_number = found_event['blockNumber']
-            exit_number = exit_events[index]['blockNumber']
-
-            if comparison(exit_number, join_number):
-                found_event = exit_events[index]
-        else:
-            found_event = exit_events[index]
+    if x == 0:
+        return base if n == 0 else 0
+
+    z = base if n % 2 == 0 else x
+    half = base // 2
+    n //= 2
+    while n != 0:
+        x = (x * x + half) // base
+        if n % 2 == 1:
+            z = (z * x + half) // base
+        n //= 2
 
-    return found_event
+    return z
 
 
 class MakerDAODSR(MakerDAOCommon):
@@ -146,6 +129,8 @@ class MakerDAODSR(MakerDAOCommon):
         self.reset_last_query_ts()
         self.historical_dsr_reports: Dict[ChecksumEthAddress, DSRAccountReport] = {}
         self.lock = Semaphore()
+        # Time of the last rate changes sync. Up to then the DB rate changes are complete
+        self.dsr_rate_changes_synced_ts = Timestamp(0)
 
     def reset_last_query_ts(self) -> None:
         """Reset the last query timestamps, effectively cleaning the caches"""
@@ -169,19 +154,26 @@ class MakerDAODSR(MakerDAOCommon):
                 current_dai_price = Inquirer().find_usd_price(A_DAI)
             except RemoteError:
                 current_dai_price = Price(FVal(1))
-            for account, proxy in proxy_mappings.items():
-                guy_slice = MAKERDAO_POT.call(self.ethereum, 'pie', arguments=[proxy])
+            with MulticallBatch(self.ethereum) as batch:
+                pie_calls = {
+                    account: batch.add(MAKERDAO_POT, 'pie', [proxy])
+                    for account, proxy in proxy_mappings.items()
+                }
+                chi_call = batch.add(MAKERDAO_POT, 'chi')
+                dsr_call = batch.add(MAKERDAO_POT, 'dsr')
+
+            for account, pie_call in pie_calls.items():
+                guy_slice = pie_call.result
                 if guy_slice == 0:
                     # no current DSR balance for this proxy
                     continue
-                chi = MAKERDAO_POT.call(self.ethereum, 'chi')
-                dai_balance = _dsrdai_to_dai(guy_slice * chi)
+                dai_balance = _dsrdai_to_dai(guy_slice * chi_call.result)
                 balances[account] = Balance(
                     amount=dai_balance,
                     usd_value=current_dai_price * dai_balance,
                 )
 
-            current_dsr = MAKERDAO_POT.call(self.ethereum, 'dsr')
+            current_dsr = dsr_call.result
             # Calculation is from here:
             # https://docs.makerdao.com/smart-contract-modules/rates-module#a-note-on-setting-rates
             current_dsr_percentage = ((FVal(current_dsr / RAY) ** 31622400) % 1) * 100
@@ -237,12 +229,16 @@ class MakerDAODSR(MakerDAOCommon):
                     value = None
         return value * RAY  # turn it from DAI to RAD
 
-    def _historical_dsr_for_account(
+    def _query_dsr_movements(
             self,
             account: ChecksumEthAddress,
             proxy: ChecksumEthAddress,
-    ) -> DSRAccountReport:
-        """Creates a historical DSR report for a single account
+            from_block: int,
+            to_block: int,
+    ) -> List[DSRMovement]:
+        """Queries the DSR movements of an account's proxy in the given block range
+
+        The gain so far of the returned movements is not populated.
 
         May raise:
         - RemoteError if etherscan is used and there is a problem with
@@ -262,7 +258,8 @@ class MakerDAODSR(MakerDAOCommon):
             abi=MAKERDAO_POT.abi,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_POT.deployed_block,
+            from_block=from_block,
+            to_block=to_block,
         )
         for join_event in join_events:
             try:
@@ -304,6 +301,7 @@ class MakerDAODSR(MakerDAOCommon):
                     block_number=join_event['blockNumber'],
                     timestamp=timestamp,
                     tx_hash=join_event['transactionHash'],
+                    log_index=join_event['logIndex'],
                 ),
             )
 
@@ -316,7 +314,8 @@ class MakerDAODSR(MakerDAOCommon):
             abi=MAKERDAO_POT.abi,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_POT.deployed_block,
+            from_block=from_block,
+            to_block=to_block,
         )
         for exit_event in exit_events:
             try:
@@ -358,12 +357,49 @@ class MakerDAODSR(MakerDAOCommon):
                     block_number=exit_event['blockNumber'],
                     timestamp=timestamp,
                     tx_hash=exit_event['transactionHash'],
+                    log_index=exit_event['logIndex'],
                 ),
             )
 
+        return movements
+
+    def _historical_dsr_for_account(
+            self,
+            account: ChecksumEthAddress,
+            proxy: ChecksumEthAddress,
+    ) -> DSRAccountReport:
+        """Creates a historical DSR report for a single account
+
+        Only the DSR movements that happened since the last query are queried
+        from the chain. All others come from the DB.
+
+        May raise:
+        - RemoteError if etherscan is used and there is a problem with
+        reaching it or with the returned result.
+        - BlockchainQueryError if an ethereum node is used and the contract call
+        queries fail for some reason
+        """
+        range_name = f'{DSR_MOVEMENTS_PREFIX}_{account}'
+        last_range = self.database.get_used_query_range(range_name)
+        from_block = MAKERDAO_POT.deployed_block if last_range is None else last_range[1] + 1
+        to_block = self.ethereum.get_latest_block_number()
+        if from_block <= to_block:
+            new_movements = self._query_dsr_movements(
+                account=account,
+                proxy=proxy,
+                from_block=from_block,
+                to_block=to_block,
+            )
+            self.database.add_dsr_movements(new_movements)
+            self.database.update_used_block_query_range(
+                name=range_name,
+                from_block=MAKERDAO_POT.deployed_block,
+                to_block=to_block,
+            )
+
+        movements = self.database.get_dsr_movements(account)
         normalized_balance = 0
         amount_in_dsr = 0
-        movements.sort(key=lambda x: x.block_number)
 
         for idx, m in enumerate(movements):
             if m.normalized_balance == 0:
@@ -445,139 +481,105 @@ class MakerDAODSR(MakerDAOCommon):
         self.last_historical_dsr_query_ts = ts_now()
         return self.historical_dsr_reports
 
-    def _get_join_exit_events(
-            self,
-            from_block: int,
-            to_block: int,
-    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        join_events = self.ethereum.get_logs(
+    def _sync_dsr_rate_changes(self) -> None:
+        """Saves in the DB all DSR changes of the Pot contract since the last sync
+
+        For each change the chi at that time is also calculated and saved. Since
+        the Pot only allows changing the dsr right after a drip, chi at any point
+        can then be calculated locally from the last change before it. The last
+        scanned block is kept in the DB so that each sync only scans the new blocks.
+
+        May raise:
+        - RemoteError if etherscan is used and there is a problem with
+        reaching it or with the returned result.
+        - BlockchainQueryError if an ethereum node is used and the contract call
+        queries fail for some reason
+        - ChiRetrievalError if a pot file event can't be read
+        """
+        now = ts_now()
+        to_block = self.ethereum.get_latest_block_number()
+        last_range = self.database.get_used_query_range(DSR_RATE_CHANGES_RANGE)
+        from_block = MAKERDAO_POT.deployed_block if last_range is None else last_range[1] + 1
+        if from_block > to_block:
+            self.dsr_rate_changes_synced_ts = now
+            return
+
+        rate_changes = self.database.get_dsr_rate_changes()
+        if len(rate_changes) == 0:
+            # The pot is deployed with both chi and dsr set to ONE
+            dsr, chi, last_ts = RAY, RAY, Timestamp(POT_CREATION_TIMESTAMP)
+        else:
+            dsr, chi, last_ts = (
+                rate_changes[-1].dsr,
+                rate_changes[-1].chi,
+                rate_changes[-1].timestamp,
+            )
+
+        file_events = self.ethereum.get_logs(
             contract_address=MAKERDAO_POT.address,
             abi=MAKERDAO_POT.abi,
             event_name='LogNote',
-            argument_filters={'sig': '0x049878f3'},  # join
+            argument_filters={'sig': '0x29ae8114'},  # file(bytes32,uint256)
             from_block=from_block,
             to_block=to_block,
         )
-        exit_events = self.ethereum.get_logs(
-            contract_address=MAKERDAO_POT.address,
-            abi=MAKERDAO_POT.abi,
-            event_name='LogNote',
-            argument_filters={'sig': '0x7f8661a1'},  # exit
-            from_block=from_block,
+        new_rate_changes = []
+        for event in file_events:
+            try:
+                what = hex_or_bytes_to_int(event['topics'][2])
+                new_dsr = hex_or_bytes_to_int(event['topics'][3])
+            except ConversionError as e:
+                raise ChiRetrievalError(
+                    f'Could not read the pot file event at block {event["blockNumber"]}: {str(e)}',
+                ) from e
+
+            if what != POT_FILE_DSR_WHAT:
+                continue
+
+            timestamp = self.ethereum.get_event_timestamp(event)
+            chi = _rpow(dsr, timestamp - last_ts) * chi // RAY
+            dsr = new_dsr
+            last_ts = timestamp
+            new_rate_changes.append(DSRRateChange(
+                block_number=event['blockNumber'],
+                log_index=event['logIndex'],
+                timestamp=timestamp,
+                dsr=dsr,
+                chi=chi,
+            ))
+
+        self.database.add_dsr_rate_changes(new_rate_changes)
+        self.database.update_used_block_query_range(
+            name=DSR_RATE_CHANGES_RANGE,
+            from_block=MAKERDAO_POT.deployed_block,
             to_block=to_block,
         )
-        return join_events, exit_events
+        self.dsr_rate_changes_synced_ts = now
 
-    def _try_get_chi_close_to(self, time: Timestamp) -> FVal:
-        """Best effort attempt to get a chi value close to the given timestamp
+    def _get_chi_at(self, time: Timestamp) -> FVal:
+        """Gets the chi at the given timestamp from the saved DSR rate changes
 
-        It can't be 100% accurate since we use the logs of join() or exit()
-        in order to find the closest time chi was changed. It also may not work
-        if for some reason there is no logs in the block range we are looking for.
-
-        Better solution would have been an archive node's query.
+        The network is only queried if the rate changes have not yet been synced
+        up to the given timestamp. After a restart that means a single sync of the
+        blocks after the last scanned one.
 
         May raise:
         - RemoteError if there are problems with querying etherscan
-        - ChiRetrievalError if we are unable to query chi at the given timestamp
+        - ChiRetrievalError if the pot file events can't be read
         - BlockchainQueryError if an ethereum node is used and the contract call
         queries fail for some reason
         """
+        if time > self.dsr_rate_changes_synced_ts:
+            self._sync_dsr_rate_changes()
 
-        if time > 1584386100:
-            # If the time is after 16/03/2020 19:15 GMT we know that
-            # makerdao DSR was set to 0% we know chi has not changed
-            # https://twitter.com/MakerDAO/status/1239270910810411008
-            return FVal('1018008449363110619399951035')
-
-        block_number = self.ethereum.etherscan.get_blocknumber_by_time(time)
-        latest_block = self.ethereum.get_latest_block_number()
-        blocks_queried = 0
-        counter = 1
-        # Keep trying to find events that could reveal the chi to us. Go back
-        # as far as MAX_BLOCKS_TO_QUERY and only then give up
-        while blocks_queried < MAX_BLOCKS_TO_QUERY:
-            back_from_block = max(
-                MAKERDAO_POT.deployed_block,
-                block_number - counter * CHI_BLOCKS_SEARCH_DISTANCE,
-            )
-            back_to_block = block_number - (counter - 1) * CHI_BLOCKS_SEARCH_DISTANCE
-            forward_from_block = min(
-                latest_block,
-                block_number + (counter - 1) * CHI_BLOCKS_SEARCH_DISTANCE,
-            )
-            forward_to_block = min(
-                latest_block,
-                block_number + CHI_BLOCKS_SEARCH_DISTANCE,
-            )
-            back_joins, back_exits = self._get_join_exit_events(back_from_block, back_to_block)
-            forward_joins, forward_exits = self._get_join_exit_events(
-                from_block=forward_from_block,
-                to_block=forward_to_block,
-            )
-
-            no_results = all(
-                len(x) == 0 for x in (back_joins, back_exits, forward_joins, forward_exits)
-            )
-            if latest_block == forward_to_block and no_results:
-                # if our forward querying got us to the latest block and there is
-                # still no other results, then take current chi
-                return self.ethereum.call_contract(
-                    contract_address=MAKERDAO_POT.address,
-                    abi=MAKERDAO_POT.abi,
-                    method_name='chi',
-                )
-
-            if not no_results:
-                # got results!
-                break
-
-            blocks_queried += 2 * CHI_BLOCKS_SEARCH_DISTANCE
-            counter += 1
-
-        if no_results:
-            raise ChiRetrievalError(
-                f'Found no DSR events around timestamp {time}. Cant query chi.',
-            )
-
-        # Find the closest event to the to_block number, looking both at events
-        # in the blocks before and in the blocks after block_number
-        found_event = None
-        back_event = _find_closest_event(back_joins, back_exits, -1, operator.gt)
-        forward_event = _find_closest_event(forward_joins, forward_exits, 0, operator.lt)
-
-        if back_event and not forward_event:
-            found_event = back_event
-        elif forward_event and not back_event:
-            found_event = forward_event
-        else:
-            # We have both backward and forward events, get the one closer to block number
-            back_block_number = back_event['blockNumber']  # type: ignore
-            forward_block_number = forward_event['blockNumber']  # type: ignore
-
-            if block_number - back_block_number <= forward_block_number - block_number:
-                found_event = back_event
-            else:
-                found_event = forward_event
-
-        assert found_event, 'at this point found_event should be populated'  # helps mypy
-        event_block_number = found_event['blockNumber']
-        first_topic = found_event['topics'][0]
-
-        amount = self._get_vat_join_exit_at_transaction(
-            movement_type='join' if first_topic.startswith('0x049878f3') else 'exit',
-            proxy_address=hex_or_bytes_to_address(found_event['topics'][1]),
-            block_number=event_block_number,
-            transaction_index=found_event['transactionIndex'],
-        )
-        if amount is None:
-            raise ChiRetrievalError(
-                f'Found no VAT.move events around timestamp {time}. Cant query chi.',
-            )
+        rate_changes = self.database.get_dsr_rate_changes()
+        idx = bisect_right([x.timestamp for x in rate_changes], time) - 1
+        if idx < 0:
+            # Before the first dsr change chi stays at ONE
+            return FVal(RAY)
 
-        wad_val = hexstr_to_int(found_event['topics'][2])
-        chi = FVal(amount) / FVal(wad_val)
-        return chi
+        change = rate_changes[idx]
+        return FVal(_rpow(change.dsr, time - change.timestamp) * change.chi // RAY)
 
     def _get_dsr_account_gain_in_period(
             self,
@@ -600,8 +602,8 @@ class MakerDAODSR(MakerDAOCommon):
         if to_ts < POT_CREATION_TIMESTAMP:
             to_ts = Timestamp(POT_CREATION_TIMESTAMP + 432000)
 
-        from_chi = self._try_get_chi_close_to(from_ts)
-        to_chi = self._try_get_chi_close_to(to_ts)
+        from_chi = self._get_chi_at(from_ts)
+        to_chi = self._get_chi_at(to_ts)
         normalized_balance = 0
         amount_in_dsr = 0
         gain_at_from_ts = ZERO
@@ -643,8 +645,8 @@ class MakerDAODSR(MakerDAOCommon):
     ) -> List[Tuple[FVal, Timestamp]]:
         """Get DSR gains for all accounts in a given period
 
-        This is a best effort attempt and may also fail due to inability to find
-        the required data via logs
+        Chi at the period edges is calculated from the DSR rate changes saved
+        in the DB so only a period ending after the last sync hits the network.
         """
         history = self.get_historical_dsr()
 
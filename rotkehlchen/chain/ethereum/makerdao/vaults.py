@@ -1,10 +1,11 @@
 import logging
 from collections import defaultdict
-from enum import Enum
-from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, NamedTuple, Optional
+from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, NamedTuple, Optional, Tuple
 
+import gevent
 from eth_utils.address import to_checksum_address
 from gevent.lock import Semaphore
+from gevent.pool import Pool
 
 from rotkehlchen.accounting.structures import Balance, BalanceSheet
 from rotkehlchen.assets.asset import Asset
@@ -15,7 +16,13 @@ from rotkehlchen.chain.ethereum.makerdao.common import (
     WAD,
     MakerDAOCommon,
 )
-from rotkehlchen.chain.ethereum.utils import asset_normalized_value, token_normalized_value
+from rotkehlchen.chain.ethereum.structures import VaultEvent, VaultEventType
+from rotkehlchen.chain.ethereum.utils import (
+    MulticallBatch,
+    MulticallCall,
+    asset_normalized_value,
+    token_normalized_value,
+)
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import (
     A_BAL,
@@ -57,6 +64,7 @@ from rotkehlchen.constants.ethereum import (
     MAKERDAO_USDC_B_JOIN,
     MAKERDAO_USDT_A_JOIN,
     MAKERDAO_VAT,
+    MAKERDAO_VAULT_EVENTS_PREFIX,
     MAKERDAO_WBTC_A_JOIN,
     MAKERDAO_YFI_A_JOIN,
     MAKERDAO_ZRX_A_JOIN,
@@ -67,7 +75,7 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.history.price import query_usd_price_or_use_default
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.premium.premium import Premium
-from rotkehlchen.typing import ChecksumEthAddress, Timestamp
+from rotkehlchen.typing import ChecksumEthAddress, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import address_to_bytes32, hexstr_to_int, ts_now
 
@@ -76,6 +84,9 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+MAKERDAO_CONCURRENT_VAULT_QUERIES = 4
+MAKERDAO_CONCURRENT_PRICE_QUERIES = 8
+
 
 GEMJOIN_MAPPING = {
     'BAT-A': MAKERDAO_BAT_A_JOIN,
@@ -117,6 +128,16 @@ COLLATERAL_TYPE_MAPPING = {
 }
 
 
+# The default usd price and the location to use when querying the price of each event type
+VAULT_EVENT_PRICE_DEFAULTS = {
+    VaultEventType.DEPOSIT_COLLATERAL: (ZERO, 'vault collateral deposit'),
+    VaultEventType.WITHDRAW_COLLATERAL: (ZERO, 'vault collateral withdrawal'),
+    VaultEventType.GENERATE_DEBT: (FVal(1), 'vault debt generation'),
+    VaultEventType.PAYBACK_DEBT: (FVal(1), 'vault debt payback'),
+    VaultEventType.LIQUIDATION: (ZERO, 'vault collateral liquidation'),
+}
+
+
 def _shift_num_right_by(num: int, digits: int) -> int:
     """Shift a number to the right by discarding some digits
 
@@ -128,35 +149,6 @@ def _shift_num_right_by(num: int, digits: int) -> int:
     return int(str(num)[:-digits])
 
 
-class VaultEventType(Enum):
-    DEPOSIT_COLLATERAL = 1
-    WITHDRAW_COLLATERAL = 2
-    GENERATE_DEBT = 3
-    PAYBACK_DEBT = 4
-    LIQUIDATION = 5
-
-    def __str__(self) -> str:
-        if self == VaultEventType.DEPOSIT_COLLATERAL:
-            return 'deposit'
-        elif self == VaultEventType.WITHDRAW_COLLATERAL:
-            return 'withdraw'
-        elif self == VaultEventType.GENERATE_DEBT:
-            return 'generate'
-        elif self == VaultEventType.PAYBACK_DEBT:
-            return 'payback'
-        elif self == VaultEventType.LIQUIDATION:
-            return 'liquidation'
-
-        raise RuntimeError(f'Corrupt value {self} for VaultEventType -- Should never happen')
-
-
-class VaultEvent(NamedTuple):
-    event_type: VaultEventType
-    value: Balance
-    timestamp: Timestamp
-    tx_hash: str
-
-
 class MakerDAOVault(NamedTuple):
     identifier: int
     # The type of collateral used for the vault. asset + set of parameters.
@@ -216,6 +208,46 @@ class MakerDAOVaultDetails(NamedTuple):
     events: List[VaultEvent]
 
 
+class _IlkCalls(NamedTuple):
+    """The contract calls for the data of a collateral type, shared by all its vaults"""
+    vat_ilks: MulticallCall
+    spot_ilks: MulticallCall
+    jug_ilks: MulticallCall
+
+
+class _VaultDataCalls(NamedTuple):
+    """The contract calls whose results are needed to create a vault"""
+    vat_urns: MulticallCall
+    vat_ilks: MulticallCall
+    spot_ilks: MulticallCall
+    jug_ilks: MulticallCall
+
+
+def _stability_fee_from_jug_ilk(result: Any) -> FVal:
+    # result[0] is the duty variable of the ilks in the contract
+    return FVal(result[0] / RAY) ** (YEAR_IN_SECONDS) - 1
+
+
+class _PendingVaultEvent(NamedTuple):
+    """A vault event read from the logs whose usd value is not yet known"""
+    event_type: VaultEventType
+    asset: Asset
+    amount: FVal
+    timestamp: Timestamp
+    tx_hash: str
+    log_index: int
+
+
+class _VaultUpdate(NamedTuple):
+    # Only set if the creation time of the vault was not known and got queried
+    creation_ts: Optional[Timestamp]
+    events: List[_PendingVaultEvent]
+
+
+def _vault_query_range_name(vault: MakerDAOVault) -> str:
+    return f'{MAKERDAO_VAULT_EVENTS_PREFIX}_{vault.identifier}'
+
+
 class MakerDAOVaults(MakerDAOCommon):
 
     def __init__(
@@ -236,7 +268,6 @@ class MakerDAOVaults(MakerDAOCommon):
         self.lock = Semaphore()
         self.usd_price: Dict[str, FVal] = defaultdict(FVal)
         self.vault_mappings: Dict[ChecksumEthAddress, List[MakerDAOVault]] = defaultdict(list)
-        self.ilk_to_stability_fee: Dict[bytes, FVal] = {}
         self.vault_details: List[MakerDAOVaultDetails] = []
 
     def reset_last_query_ts(self) -> None:
@@ -245,23 +276,19 @@ class MakerDAOVaults(MakerDAOCommon):
         self.last_vault_mapping_query_ts = 0
         self.last_vault_details_query_ts = 0
 
-    def get_stability_fee(self, ilk: bytes) -> FVal:
-        """If we already know the current stability_fee for ilk return it. If not query it"""
-        if ilk in self.ilk_to_stability_fee:
-            return self.ilk_to_stability_fee[ilk]
-
-        result = MAKERDAO_JUG.call(self.ethereum, 'ilks', arguments=[ilk])
-        # result[0] is the duty variable of the ilks in the contract
-        stability_fee = FVal(result[0] / RAY) ** (YEAR_IN_SECONDS) - 1
-        return stability_fee
-
     def _query_vault_data(
             self,
             identifier: int,
             owner: ChecksumEthAddress,
             urn: ChecksumEthAddress,
             ilk: bytes,
+            calls: '_VaultDataCalls',
     ) -> Optional[MakerDAOVault]:
+        """Creates the vault from the results of its already executed contract calls
+
+        May raise:
+        - RemoteError/BlockchainQueryError if any of the vault's contract calls failed
+        """
         collateral_type = ilk.split(b'\0', 1)[0].decode()
         asset = COLLATERAL_TYPE_MAPPING.get(collateral_type, None)
         if asset is None:
@@ -271,16 +298,16 @@ class MakerDAOVaults(MakerDAOCommon):
             )
             return None
 
-        result = MAKERDAO_VAT.call(self.ethereum, 'urns', arguments=[ilk, urn])
+        result = calls.vat_urns.result
         # also known as ink in their contract
         collateral_amount = FVal(result[0] / WAD)
         normalized_debt = result[1]  # known as art in their contract
-        result = MAKERDAO_VAT.call(self.ethereum, 'ilks', arguments=[ilk])
+        result = calls.vat_ilks.result
         rate = result[1]  # Accumulated Rates
         spot = FVal(result[2])  # Price with Safety Margin
         # How many DAI owner needs to pay back to the vault
         debt_value = FVal(((normalized_debt / WAD) * rate) / RAY)
-        result = MAKERDAO_SPOT.call(self.ethereum, 'ilks', arguments=[ilk])
+        result = calls.spot_ilks.result
         mat = result[1]
         liquidation_ratio = FVal(mat / RAY)
         price = FVal((spot / RAY) * liquidation_ratio)
@@ -309,18 +336,23 @@ class MakerDAOVaults(MakerDAOCommon):
             collateralization_ratio=collateralization_ratio,
             liquidation_price=liquidation_price,
             urn=urn,
-            stability_fee=self.get_stability_fee(ilk),
+            stability_fee=_stability_fee_from_jug_ilk(calls.jug_ilks.result),
         )
 
-    def _query_vault_details(
+    def _get_event_timestamp(
             self,
-            vault: MakerDAOVault,
-            proxy: ChecksumEthAddress,
-            urn: ChecksumEthAddress,
-    ) -> Optional[MakerDAOVaultDetails]:
-        # They can raise:
-        # ConversionError due to hex_or_bytes_to_address, hexstr_to_int
-        # RemoteError due to external query errors
+            event: Dict[str, Any],
+            block_timestamps: Dict[int, Timestamp],
+    ) -> Timestamp:
+        """Like EthereumManager.get_event_timestamp() but queries each block only once"""
+        block_number = event['blockNumber']
+        timestamp = block_timestamps.get(block_number)
+        if timestamp is None:
+            timestamp = self.ethereum.get_event_timestamp(event)
+            block_timestamps[block_number] = timestamp
+        return timestamp
+
+    def _query_vault_creation_ts(self, vault: MakerDAOVault) -> Optional[Timestamp]:
         events = self.ethereum.get_logs(
             contract_address=MAKERDAO_CDP_MANAGER.address,
             abi=MAKERDAO_CDP_MANAGER.abi,
@@ -343,8 +375,45 @@ class MakerDAOVaults(MakerDAOCommon):
                 'Multiple events found for a Vault creation. This should never '
                 'happen. Please open a bug report: https://github.com/rotki/rotki/issues',
             )
-        creation_ts = self.ethereum.get_event_timestamp(events[0])
+        return self.ethereum.get_event_timestamp(events[0])
+
+    def _query_vault_update(
+            self,
+            vault: MakerDAOVault,
+            proxy: ChecksumEthAddress,
+            creation_ts: Optional[Timestamp],
+            from_block: int,
+            to_block: int,
+    ) -> Optional[_VaultUpdate]:
+        """Queries the creation time of the vault if not already known and the vault
+        events that happened in the given block range.
+
+        Returns None if the vault should be skipped.
+
+        May raise:
+        - ConversionError due to hex_or_bytes_to_address, hexstr_to_int
+        - RemoteError due to external query errors
+        """
+        new_creation_ts = None
+        if creation_ts is None:
+            new_creation_ts = self._query_vault_creation_ts(vault)
+            if new_creation_ts is None:
+                return None
+
+        gemjoin = GEMJOIN_MAPPING.get(vault.collateral_type, None)
+        if gemjoin is None:
+            self.msg_aggregator.add_warning(
+                f'Unknown makerdao vault collateral type detected {vault.collateral_type}.'
+                'Skipping ...',
+            )
+            return None
+
+        if from_block > to_block:  # already queried up to the latest block
+            return _VaultUpdate(creation_ts=new_creation_ts, events=[])
 
+        urn = vault.urn
+        block_timestamps: Dict[int, Timestamp] = {}
+        vault_events = []
         # get vat frob events for cross-checking
         argument_filters = {
             'sig': '0x76088703',  # frob
@@ -359,19 +428,11 @@ class MakerDAOVaults(MakerDAOCommon):
             abi=MAKERDAO_VAT.abi,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_VAT.deployed_block,
+            from_block=max(MAKERDAO_VAT.deployed_block, from_block),
+            to_block=to_block,
         )
-        frob_event_tx_hashes = [x['transactionHash'] for x in frob_events]
-
-        gemjoin = GEMJOIN_MAPPING.get(vault.collateral_type, None)
-        if gemjoin is None:
-            self.msg_aggregator.add_warning(
-                f'Unknown makerdao vault collateral type detected {vault.collateral_type}.'
-                'Skipping ...',
-            )
-            return None
+        frob_event_tx_hashes = {x['transactionHash'] for x in frob_events}
 
-        vault_events = []
         # Get the collateral deposit events
         argument_filters = {
             'sig': '0x3b4da69f',  # join
@@ -387,7 +448,8 @@ class MakerDAOVaults(MakerDAOCommon):
             abi=gemjoin.abi,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=gemjoin.deployed_block,
+            from_block=max(gemjoin.deployed_block, from_block),
+            to_block=to_block,
         )
         # all subsequent deposits should have the proxy as a usr
         # but for non-migrated CDPS the previous query would also work
@@ -401,7 +463,8 @@ class MakerDAOVaults(MakerDAOCommon):
             abi=gemjoin.abi,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=gemjoin.deployed_block,
+            from_block=max(gemjoin.deployed_block, from_block),
+            to_block=to_block,
         ))
         deposit_tx_hashes = set()
         for event in events:
@@ -419,18 +482,13 @@ class MakerDAOVaults(MakerDAOCommon):
                 amount=hexstr_to_int(event['topics'][3]),
                 asset=vault.collateral_asset,
             )
-            timestamp = self.ethereum.get_event_timestamp(event)
-            usd_price = query_usd_price_or_use_default(
-                asset=vault.collateral_asset,
-                time=timestamp,
-                default_value=ZERO,
-                location='vault collateral deposit',
-            )
-            vault_events.append(VaultEvent(
+            vault_events.append(_PendingVaultEvent(
                 event_type=VaultEventType.DEPOSIT_COLLATERAL,
-                value=Balance(amount, amount * usd_price),
-                timestamp=timestamp,
+                asset=vault.collateral_asset,
+                amount=amount,
+                timestamp=self._get_event_timestamp(event, block_timestamps),
                 tx_hash=tx_hash,
+                log_index=event['logIndex'],
             ))
 
         # Get the collateral withdrawal events
@@ -443,7 +501,8 @@ class MakerDAOVaults(MakerDAOCommon):
             abi=gemjoin.abi,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=gemjoin.deployed_block,
+            from_block=max(gemjoin.deployed_block, from_block),
+            to_block=to_block,
         )
         for event in events:
             tx_hash = event['transactionHash']
@@ -454,21 +513,15 @@ class MakerDAOVaults(MakerDAOCommon):
                 amount=hexstr_to_int(event['topics'][3]),
                 asset=vault.collateral_asset,
             )
-            timestamp = self.ethereum.get_event_timestamp(event)
-            usd_price = query_usd_price_or_use_default(
-                asset=vault.collateral_asset,
-                time=timestamp,
-                default_value=ZERO,
-                location='vault collateral withdrawal',
-            )
-            vault_events.append(VaultEvent(
+            vault_events.append(_PendingVaultEvent(
                 event_type=VaultEventType.WITHDRAW_COLLATERAL,
-                value=Balance(amount, amount * usd_price),
-                timestamp=timestamp,
-                tx_hash=event['transactionHash'],
+                asset=vault.collateral_asset,
+                amount=amount,
+                timestamp=self._get_event_timestamp(event, block_timestamps),
+                tx_hash=tx_hash,
+                log_index=event['logIndex'],
             ))
 
-        total_dai_wei = 0
         # Get the dai generation events
         argument_filters = {
             'sig': '0xbb35783b',  # move
@@ -483,27 +536,22 @@ class MakerDAOVaults(MakerDAOCommon):
             abi=MAKERDAO_VAT.abi,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_VAT.deployed_block,
+            from_block=max(MAKERDAO_VAT.deployed_block, from_block),
+            to_block=to_block,
         )
         for event in events:
             given_amount = _shift_num_right_by(hexstr_to_int(event['topics'][3]), RAY_DIGITS)
-            total_dai_wei += given_amount
             amount = token_normalized_value(
                 token_amount=given_amount,
                 token=A_DAI,
             )
-            timestamp = self.ethereum.get_event_timestamp(event)
-            usd_price = query_usd_price_or_use_default(
-                asset=A_DAI,
-                time=timestamp,
-                default_value=FVal(1),
-                location='vault debt generation',
-            )
-            vault_events.append(VaultEvent(
+            vault_events.append(_PendingVaultEvent(
                 event_type=VaultEventType.GENERATE_DEBT,
-                value=Balance(amount, amount * usd_price),
-                timestamp=timestamp,
+                asset=A_DAI,
+                amount=amount,
+                timestamp=self._get_event_timestamp(event, block_timestamps),
                 tx_hash=event['transactionHash'],
+                log_index=event['logIndex'],
             ))
 
         # Get the dai payback events
@@ -517,11 +565,11 @@ class MakerDAOVaults(MakerDAOCommon):
             abi=MAKERDAO_DAI_JOIN.abi,
             event_name='LogNote',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_DAI_JOIN.deployed_block,
+            from_block=max(MAKERDAO_DAI_JOIN.deployed_block, from_block),
+            to_block=to_block,
         )
         for event in events:
             given_amount = hexstr_to_int(event['topics'][3])
-            total_dai_wei -= given_amount
             amount = token_normalized_value(
                 token_amount=given_amount,
                 token=A_DAI,
@@ -531,19 +579,13 @@ class MakerDAOVaults(MakerDAOCommon):
                 # withdrawing ETH. So we should ignore these as events
                 continue
 
-            timestamp = self.ethereum.get_event_timestamp(event)
-            usd_price = query_usd_price_or_use_default(
-                asset=A_DAI,
-                time=timestamp,
-                default_value=FVal(1),
-                location='vault debt payback',
-            )
-
-            vault_events.append(VaultEvent(
+            vault_events.append(_PendingVaultEvent(
                 event_type=VaultEventType.PAYBACK_DEBT,
-                value=Balance(amount, amount * usd_price),
-                timestamp=timestamp,
+                asset=A_DAI,
+                amount=amount,
+                timestamp=self._get_event_timestamp(event, block_timestamps),
                 tx_hash=event['transactionHash'],
+                log_index=event['logIndex'],
             ))
 
         # Get the liquidation events
@@ -553,10 +595,9 @@ class MakerDAOVaults(MakerDAOCommon):
             abi=MAKERDAO_CAT.abi,
             event_name='Bite',
             argument_filters=argument_filters,
-            from_block=MAKERDAO_CAT.deployed_block,
+            from_block=max(MAKERDAO_CAT.deployed_block, from_block),
+            to_block=to_block,
         )
-        sum_liquidation_amount = ZERO
-        sum_liquidation_usd = ZERO
         for event in events:
             if isinstance(event['data'], str):
                 lot = event['data'][:66]
@@ -566,36 +607,71 @@ class MakerDAOVaults(MakerDAOCommon):
                 amount=hexstr_to_int(lot),
                 asset=vault.collateral_asset,
             )
-            timestamp = self.ethereum.get_event_timestamp(event)
-            sum_liquidation_amount += amount
-            usd_price = query_usd_price_or_use_default(
-                asset=vault.collateral_asset,
-                time=timestamp,
-                default_value=ZERO,
-                location='vault collateral liquidation',
-            )
-            amount_usd_value = amount * usd_price
-            sum_liquidation_usd += amount_usd_value
-            vault_events.append(VaultEvent(
+            vault_events.append(_PendingVaultEvent(
                 event_type=VaultEventType.LIQUIDATION,
-                value=Balance(amount, amount_usd_value),
-                timestamp=timestamp,
+                asset=vault.collateral_asset,
+                amount=amount,
+                timestamp=self._get_event_timestamp(event, block_timestamps),
                 tx_hash=event['transactionHash'],
+                log_index=event['logIndex'],
             ))
 
-        total_interest_owed = vault.debt.amount - token_normalized_value(
-            token_amount=total_dai_wei,
-            token=A_DAI,
-        )
-        # sort vault events by timestamp
-        vault_events.sort(key=lambda event: event.timestamp)
+        return _VaultUpdate(creation_ts=new_creation_ts, events=vault_events)
+
+    def _query_vault_events_prices(
+            self,
+            events: List[_PendingVaultEvent],
+    ) -> Dict[Tuple[Asset, Timestamp], Price]:
+        """Queries the usd prices of the given events. Each asset/timestamp pair is
+        queried only once and all the price queries run concurrently"""
+        price_queries: Dict[Tuple[Asset, Timestamp], Tuple[FVal, str]] = {}
+        for event in events:
+            price_queries.setdefault(
+                (event.asset, event.timestamp),
+                VAULT_EVENT_PRICE_DEFAULTS[event.event_type],
+            )
+
+        pool = Pool(MAKERDAO_CONCURRENT_PRICE_QUERIES)
+        greenlets = {
+            (asset, timestamp): pool.spawn(
+                query_usd_price_or_use_default,
+                asset=asset,
+                time=timestamp,
+                default_value=default_value,
+                location=location,
+            ) for (asset, timestamp), (default_value, location) in price_queries.items()
+        }
+        try:
+            gevent.joinall(list(greenlets.values()), raise_error=True)
+        finally:
+            pool.kill()
+
+        return {key: greenlet.value for key, greenlet in greenlets.items()}
+
+    def _vault_details_from_events(
+            self,
+            vault: MakerDAOVault,
+            creation_ts: Timestamp,
+            events: List[VaultEvent],
+    ) -> MakerDAOVaultDetails:
+        total_dai = ZERO
+        sum_liquidation_amount = ZERO
+        sum_liquidation_usd = ZERO
+        for event in events:
+            if event.event_type == VaultEventType.GENERATE_DEBT:
+                total_dai += event.value.amount
+            elif event.event_type == VaultEventType.PAYBACK_DEBT:
+                total_dai -= event.value.amount
+            elif event.event_type == VaultEventType.LIQUIDATION:
+                sum_liquidation_amount += event.value.amount
+                sum_liquidation_usd += event.value.usd_value
 
         return MakerDAOVaultDetails(
             identifier=vault.identifier,
-            total_interest_owed=total_interest_owed,
+            total_interest_owed=vault.debt.amount - total_dai,
             creation_ts=creation_ts,
             total_liquidated=Balance(sum_liquidation_amount, sum_liquidation_usd),
-            events=vault_events,
+            events=events,
         )
 
     def _get_vaults_of_address(
@@ -617,14 +693,37 @@ class MakerDAOVaults(MakerDAOCommon):
             arguments=[MAKERDAO_CDP_MANAGER.address, proxy_address],
         )
 
+        # All the contract calls needed for the vaults' data are independent so they
+        # are all aggregated in as few calls as possible
+        vault_calls = []
+        ilks_calls: Dict[bytes, _IlkCalls] = {}
+        with MulticallBatch(self.ethereum) as batch:
+            for idx, identifier in enumerate(result[0]):
+                urn = to_checksum_address(result[1][idx])
+                ilk = result[2][idx]
+                ilk_calls = ilks_calls.get(ilk)
+                if ilk_calls is None:
+                    ilk_calls = _IlkCalls(
+                        vat_ilks=batch.add(MAKERDAO_VAT, 'ilks', [ilk]),
+                        spot_ilks=batch.add(MAKERDAO_SPOT, 'ilks', [ilk]),
+                        jug_ilks=batch.add(MAKERDAO_JUG, 'ilks', [ilk]),
+                    )
+                    ilks_calls[ilk] = ilk_calls
+                vault_calls.append((identifier, urn, ilk, _VaultDataCalls(
+                    vat_urns=batch.add(MAKERDAO_VAT, 'urns', [ilk, urn]),
+                    vat_ilks=ilk_calls.vat_ilks,
+                    spot_ilks=ilk_calls.spot_ilks,
+                    jug_ilks=ilk_calls.jug_ilks,
+                )))
+
         vaults = []
-        for idx, identifier in enumerate(result[0]):
-            urn = to_checksum_address(result[1][idx])
+        for identifier, urn, ilk, calls in vault_calls:
             vault = self._query_vault_data(
                 identifier=identifier,
                 owner=user_address,
                 urn=urn,
-                ilk=result[2][idx],
+                ilk=ilk,
+                calls=calls,
             )
             if vault:
                 vaults.append(vault)
@@ -675,6 +774,9 @@ class MakerDAOVaults(MakerDAOCommon):
         If the details have been queried in the past REQUERY_PERIOD
         seconds then the old result is used.
 
+        The vault events are saved in the DB along with the last queried block of
+        each vault so that only new blocks are queried for events each time.
+
         May raise:
         - RemoteError if etherscan is used and there is a problem with
         reaching it or with the returned result.
@@ -689,11 +791,60 @@ class MakerDAOVaults(MakerDAOCommon):
         proxy_mappings = self._get_accounts_having_maker_proxy()
         # Make sure that before querying vault details there has been a recent vaults call
         vaults = self.get_vaults()
+        to_block = self.ethereum.get_latest_block_number()
+        creation_timestamps = {}
+        pool = Pool(MAKERDAO_CONCURRENT_VAULT_QUERIES)
+        greenlets = {}
         for vault in vaults:
-            proxy = proxy_mappings[vault.owner]
-            vault_detail = self._query_vault_details(vault, proxy, vault.urn)
-            if vault_detail:
-                self.vault_details.append(vault_detail)
+            creation_timestamps[vault.identifier] = self.database.get_makerdao_vault_creation_ts(
+                vault.identifier,
+            )
+            last_range = self.database.get_used_query_range(_vault_query_range_name(vault))
+            greenlets[vault.identifier] = pool.spawn(
+                self._query_vault_update,
+                vault=vault,
+                proxy=proxy_mappings[vault.owner],
+                creation_ts=creation_timestamps[vault.identifier],
+                from_block=0 if last_range is None else last_range[1] + 1,
+                to_block=to_block,
+            )
+        try:
+            gevent.joinall(list(greenlets.values()), raise_error=True)
+        finally:
+            pool.kill()
+
+        updates: Dict[int, Optional[_VaultUpdate]] = {
+            identifier: greenlet.value for identifier, greenlet in greenlets.items()
+        }
+        prices = self._query_vault_events_prices([
+            event for update in updates.values() if update is not None
+            for event in update.events
+        ])
+        for vault in vaults:
+            update = updates[vault.identifier]
+            if update is None:
+                continue
+
+            if update.creation_ts is not None:
+                creation_timestamps[vault.identifier] = update.creation_ts
+                self.database.add_makerdao_vault_creation(vault.identifier, update.creation_ts)
+            self.database.add_makerdao_vault_events(vault.identifier, [VaultEvent(
+                event_type=x.event_type,
+                value=Balance(x.amount, x.amount * prices[(x.asset, x.timestamp)]),
+                timestamp=x.timestamp,
+                tx_hash=x.tx_hash,
+                log_index=x.log_index,
+            ) for x in update.events])
+            self.database.update_used_block_query_range(
+                name=_vault_query_range_name(vault),
+                from_block=0,
+                to_block=to_block,
+            )
+            self.vault_details.append(self._vault_details_from_events(
+                vault=vault,
+                creation_ts=creation_timestamps[vault.identifier],  # type: ignore
+                events=self.database.get_makerdao_vault_events(vault.identifier),
+            ))
 
         # Returns vault details sorted. Oldest identifier first
         self.vault_details.sort(key=lambda details: details.identifier)
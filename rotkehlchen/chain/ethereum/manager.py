@@ -64,6 +64,22 @@ def _is_synchronized(current_block: int, latest_block: int) -> Tuple[bool, str]:
     return True, message
 
 
+def _expand_topics(
+        topics: Sequence[Union[None, str, List[str]]],
+) -> List[List[Optional[str]]]:
+    """Turns a list of topics where each topic can be a list of OR-ed values into
+    all the topic lists with a single value per topic that together match the same logs"""
+    expanded: List[List[Optional[str]]] = [[]]
+    for topic in topics:
+        values: Sequence[Optional[str]]
+        if isinstance(topic, list):
+            values = topic
+        else:
+            values = [topic]
+        expanded = [previous + [value] for previous in expanded for value in values]
+    return expanded
+
+
 class NodeName(Enum):
     OWN = 0
     ETHERSCAN = 1
@@ -445,6 +461,29 @@ class EthereumManager():
 
         return hex_or_bytes_to_str(web3.eth.getCode(account))
 
+    def get_transaction_count(
+            self,
+            account: ChecksumEthAddress,
+            call_order: Optional[Sequence[NodeName]] = None,
+    ) -> int:
+        return self.query(
+            method=self._get_transaction_count,
+            call_order=call_order if call_order is not None else self.default_call_order(),
+            account=account,
+        )
+
+    def _get_transaction_count(self, web3: Optional[Web3], account: ChecksumEthAddress) -> int:
+        """Gets the number of transactions sent from the given address
+
+        May raise:
+        - RemoteError if Etherscan is used and there is a problem querying it or
+        parsing its response
+        """
+        if web3 is None:
+            return self.etherscan.get_transaction_count(account)
+
+        return web3.eth.getTransactionCount(account)
+
     def ens_lookup(
             self,
             name: str,
@@ -652,6 +691,9 @@ class EthereumManager():
     ) -> List[Dict[str, Any]]:
         """Queries logs of an ethereum contract
 
+        An argument filter can also be a list of values in which case logs
+        matching any of them are returned.
+
         May raise:
         - RemoteError if etherscan is used and there is a problem with
         reaching it or with the returned result
@@ -699,74 +741,101 @@ class EthereumManager():
                 start_block = end_block + 1
                 events.extend(new_events_web3)
         else:  # etherscan
-            until_block = (
-                self.etherscan.get_latest_block_number() if to_block == 'latest' else to_block
-            )
-            while start_block <= until_block:
-                end_block = min(start_block + 300000, until_block)
-                new_events = self.etherscan.get_logs(
+            # Etherscan can't OR the values of a topic so query each combination
+            for topics in _expand_topics(filter_args['topics']):  # type: ignore
+                events.extend(self._get_logs_etherscan(
                     contract_address=contract_address,
-                    topics=filter_args['topics'],  # type: ignore
-                    from_block=start_block,
-                    to_block=end_block,
-                )
+                    topics=topics,
+                    from_block=from_block,
+                    to_block=to_block,
+                ))
+            events.sort(key=lambda event: (event['blockNumber'], event['logIndex']))
 
-                # Turn all Hex ints to ints
-                for e_idx, event in enumerate(new_events):
-                    try:
-                        block_number = deserialize_int_from_hex(
-                            symbol=event['blockNumber'],
-                            location='etherscan log query',
-                        )
-                        log_index = deserialize_int_from_hex(
-                            symbol=event['logIndex'],
-                            location='etherscan log query',
-                        )
-                        # Try to see if the event is a duplicate that got returned
-                        # in the previous iteration
-                        for previous_event in reversed(events):
-                            if previous_event['blockNumber'] < block_number:
-                                break
-
-                            same_event = (
-                                previous_event['logIndex'] == log_index and
-                                previous_event['transactionHash'] == event['transactionHash']
-                            )
-                            if same_event:
-                                events.pop()
-
-                        new_events[e_idx]['address'] = to_checksum_address(event['address'])
-                        new_events[e_idx]['blockNumber'] = block_number
-                        new_events[e_idx]['timeStamp'] = deserialize_int_from_hex(
-                            symbol=event['timeStamp'],
-                            location='etherscan log query',
-                        )
-                        new_events[e_idx]['gasPrice'] = deserialize_int_from_hex(
-                            symbol=event['gasPrice'],
-                            location='etherscan log query',
-                        )
-                        new_events[e_idx]['gasUsed'] = deserialize_int_from_hex(
-                            symbol=event['gasUsed'],
-                            location='etherscan log query',
-                        )
-                        new_events[e_idx]['logIndex'] = log_index
-                        new_events[e_idx]['transactionIndex'] = deserialize_int_from_hex(
-                            symbol=event['transactionIndex'],
-                            location='etherscan log query',
+        return events
+
+    def _get_logs_etherscan(
+            self,
+            contract_address: ChecksumEthAddress,
+            topics: List[Optional[str]],
+            from_block: int,
+            to_block: Union[int, Literal['latest']] = 'latest',
+    ) -> List[Dict[str, Any]]:
+        """Queries logs of an ethereum contract from etherscan for a single set of topics
+
+        May raise:
+        - RemoteError if there is a problem with reaching etherscan or with the
+        returned result
+        """
+        events: List[Dict[str, Any]] = []
+        start_block = from_block
+        until_block = (
+            self.etherscan.get_latest_block_number() if to_block == 'latest' else to_block
+        )
+        while start_block <= until_block:
+            end_block = min(start_block + 300000, until_block)
+            new_events = self.etherscan.get_logs(
+                contract_address=contract_address,
+                topics=topics,
+                from_block=start_block,
+                to_block=end_block,
+            )
+
+            # Turn all Hex ints to ints
+            for e_idx, event in enumerate(new_events):
+                try:
+                    block_number = deserialize_int_from_hex(
+                        symbol=event['blockNumber'],
+                        location='etherscan log query',
+                    )
+                    log_index = deserialize_int_from_hex(
+                        symbol=event['logIndex'],
+                        location='etherscan log query',
+                    )
+                    # Try to see if the event is a duplicate that got returned
+                    # in the previous iteration
+                    for previous_event in reversed(events):
+                        if previous_event['blockNumber'] < block_number:
+                            break
+
+                        same_event = (
+                            previous_event['logIndex'] == log_index and
+                            previous_event['transactionHash'] == event['transactionHash']
                         )
-                    except DeserializationError as e:
-                        raise RemoteError(
-                            'Couldnt decode an etherscan event due to {str(e)}}',
-                        ) from e
-
-                # etherscan will only return 1000 events in one go. If more than 1000
-                # are returned such as when no filter args are provided then continue
-                # the query from the last block
-                if len(new_events) == 1000:
-                    start_block = new_events[-1]['blockNumber']
-                else:
-                    start_block = end_block + 1
-                events.extend(new_events)
+                        if same_event:
+                            events.pop()
+
+                    new_events[e_idx]['address'] = to_checksum_address(event['address'])
+                    new_events[e_idx]['blockNumber'] = block_number
+                    new_events[e_idx]['timeStamp'] = deserialize_int_from_hex(
+                        symbol=event['timeStamp'],
+                        location='etherscan log query',
+                    )
+                    new_events[e_idx]['gasPrice'] = deserialize_int_from_hex(
+                        symbol=event['gasPrice'],
+                        location='etherscan log query',
+                    )
+                    new_events[e_idx]['gasUsed'] = deserialize_int_from_hex(
+                        symbol=event['gasUsed'],
+                        location='etherscan log query',
+                    )
+                    new_events[e_idx]['logIndex'] = log_index
+                    new_events[e_idx]['transactionIndex'] = deserialize_int_from_hex(
+                        symbol=event['transactionIndex'],
+                        location='etherscan log query',
+                    )
+                except DeserializationError as e:
+                    raise RemoteError(
+                        'Couldnt decode an etherscan event due to {str(e)}}',
+                    ) from e
+
+            # etherscan will only return 1000 events in one go. If more than 1000
+            # are returned such as when no filter args are provided then continue
+            # the query from the last block
+            if len(new_events) == 1000:
+                start_block = new_events[-1]['blockNumber']
+            else:
+                start_block = end_block + 1
+            events.extend(new_events)
 
         return events
 
@@ -1,6 +1,7 @@
 """Ethereum/defi protocol structures that need to be accessed from multiple places"""
 
 import dataclasses
+from enum import Enum
 from typing import Any, Dict, NamedTuple, Optional, Tuple
 
 from typing_extensions import Literal
@@ -317,3 +318,99 @@ class YearnVault(NamedTuple):
     contract: EthereumContract
     underlying_token: EthereumToken
     token: EthereumToken
+
+
+class Eth2DepositEvent(NamedTuple):
+    """An Eth2 deposit as decoded from the DepositEvent log of a deposit transaction"""
+    from_address: ChecksumEthAddress
+    pubkey: str  # hexstring
+    withdrawal_credentials: str  # hexstring
+    amount: FVal  # in ETH
+    validator_index: int
+    tx_hash: str
+    log_index: int
+    timestamp: Timestamp
+
+
+class CompoundEvent(NamedTuple):
+    event_type: Literal['mint', 'redeem', 'borrow', 'repay', 'liquidation', 'comp']
+    address: ChecksumEthAddress
+    block_number: int
+    timestamp: Timestamp
+    asset: Asset
+    value: Balance
+    to_asset: Optional[Asset]
+    to_value: Optional[Balance]
+    realized_pnl: Optional[Balance]
+    tx_hash: str
+    log_index: int  # only used to identify uniqueness
+
+    def serialize(self) -> Dict[str, Any]:
+        serialized = self._asdict()  # pylint: disable=no-member
+        del serialized['log_index']
+        return serialized
+
+
+class VaultEventType(Enum):
+    DEPOSIT_COLLATERAL = 1
+    WITHDRAW_COLLATERAL = 2
+    GENERATE_DEBT = 3
+    PAYBACK_DEBT = 4
+    LIQUIDATION = 5
+
+    def __str__(self) -> str:
+        if self == VaultEventType.DEPOSIT_COLLATERAL:
+            return 'deposit'
+        elif self == VaultEventType.WITHDRAW_COLLATERAL:
+            return 'withdraw'
+        elif self == VaultEventType.GENERATE_DEBT:
+            return 'generate'
+        elif self == VaultEventType.PAYBACK_DEBT:
+            return 'payback'
+        elif self == VaultEventType.LIQUIDATION:
+            return 'liquidation'
+
+        raise RuntimeError(f'Corrupt value {self} for VaultEventType -- Should never happen')
+
+
+class VaultEvent(NamedTuple):
+    event_type: VaultEventType
+    value: Balance
+    timestamp: Timestamp
+    tx_hash: str
+    log_index: int  # only used to identify uniqueness
+
+    def serialize(self) -> Dict[str, Any]:
+        serialized = self._asdict()  # pylint: disable=no-member
+        del serialized['log_index']
+        return serialized
+
+
+@dataclasses.dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class DSRMovement:
+    movement_type: Literal['deposit', 'withdrawal']
+    address: ChecksumEthAddress
+    # normalized balance in DSR DAI (RAD precision 10**45)
+    normalized_balance: int
+    # gain so far in DSR DAI (RAD precision 10**45)
+    gain_so_far: int = dataclasses.field(init=False)
+    gain_so_far_usd_value: FVal = dataclasses.field(init=False)
+    # dai balance in DSR DAI (RAD precision 10**45)
+    amount: int
+    amount_usd_value: FVal
+    block_number: int
+    timestamp: Timestamp
+    tx_hash: str
+    log_index: int  # only used to identify uniqueness
+
+
+class DSRRateChange(NamedTuple):
+    """A change of the DSR by the Pot contract's file() along with the chi at that time
+
+    Both dsr and chi are in RAY precision (10**27)
+    """
+    block_number: int
+    log_index: int
+    timestamp: Timestamp
+    dsr: int
+    chi: int
@@ -20,8 +20,9 @@ from rotkehlchen.utils.misc import get_chunks, ts_now
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Token balances are in the token's base units, as returned by the chain
 TokensReturn = Tuple[
-    Dict[ChecksumEthAddress, Dict[EthereumToken, FVal]],
+    Dict[ChecksumEthAddress, Dict[EthereumToken, int]],
     Dict[EthereumToken, Price],
 ]
 
@@ -68,8 +69,9 @@ class EthTokens():
             token_usd_price: Dict[EthereumToken, Price],
             etherscan_chunks: List[List[EthTokenInfo]],
             other_chunks: List[List[EthTokenInfo]],
-    ) -> Dict[EthereumToken, FVal]:
-        balances: Dict[EthereumToken, FVal] = defaultdict(FVal)
+    ) -> Dict[EthereumToken, int]:
+        """Detects the tokens of an address and returns their balances in base units"""
+        balances: Dict[EthereumToken, int] = defaultdict(int)
         if self.ethereum.connected_to_any_web3():
             call_order = []
             if NodeName.OWN in self.ethereum.web3_mapping:
@@ -110,7 +112,9 @@ class EthTokens():
         If an address's tokens were recently autodetected they are not detected again but the
         balances are simply queried. Unless force_detection is True.
 
-        Returns the token balances of each address and the usd prices of the tokens
+        Returns the token balances of each address and the usd prices of the tokens.
+        The balances are kept in the tokens' base units so that they can be
+        aggregated exactly and only normalized by the caller when needed.
         """
         log.debug(
             'Querying/detecting token balances for all addresses',
@@ -138,7 +142,7 @@ class EthTokens():
                 if len(saved_list) == 0:
                     continue  # Do not query if we know the address has no tokens
 
-                balances = defaultdict(FVal)
+                balances = defaultdict(int)
                 self._get_tokens_balance_and_price(
                     address=address,
                     tokens=[x.token_info() for x in saved_list],
@@ -155,7 +159,7 @@ class EthTokens():
             self,
             address: ChecksumEthAddress,
             tokens: List[EthTokenInfo],
-            balances: Dict[EthereumToken, FVal],
+            balances: Dict[EthereumToken, int],
             token_usd_price: Dict[EthereumToken, Price],
             call_order: Optional[Sequence[NodeName]],
     ) -> None:
@@ -217,11 +221,11 @@ class EthTokens():
             tokens: List[EthTokenInfo],
             account: ChecksumEthAddress,
             call_order: Optional[Sequence[NodeName]],
-    ) -> Dict[str, FVal]:
+    ) -> Dict[str, int]:
         """Queries balances of multiple tokens for an account
 
-        Return a dictionary with keys being tokens and value a dictionary of
-        account to balances
+        Return a dictionary with keys being tokens and values their balances
+        in the tokens' base units
 
         May raise:
         - RemoteError if an external service such as Etherscan is queried and
@@ -234,7 +238,7 @@ class EthTokens():
             eth_address=account,
             tokens_num=len(tokens),
         )
-        balances: Dict[str, FVal] = {}
+        balances: Dict[str, int] = {}
         result = ETH_SCAN.call(
             ethereum=self.ethereum,
             method_name='tokensBalance',
@@ -244,5 +248,5 @@ class EthTokens():
         for tk_idx, token in enumerate(tokens):
             token_amount = result[tk_idx]
             if token_amount != 0:
-                balances[token.identifier] = token_normalized_value(token_amount, token)
+                balances[token.identifier] = token_amount
         return balances
@@ -31,19 +31,14 @@ class EthTransactions(LockableQueryObject):
         self.msg_aggregator = msg_aggregator
         self.tx_per_address: Dict[ChecksumEthAddress, int] = defaultdict(int)
 
-    def _single_address_query_transactions(
+    def _single_address_sync_transactions(
             self,
             address: ChecksumEthAddress,
             start_ts: Timestamp,
             end_ts: Timestamp,
-            with_limit: bool,
-    ) -> List[EthereumTransaction]:
-        self.tx_per_address[address] = 0
-        transactions = self.database.get_ethereum_transactions(
-            from_ts=start_ts,
-            to_ts=end_ts,
-            address=address,
-        )
+    ) -> None:
+        """Queries etherscan for the transactions of the address in all the time ranges
+        not yet queried and saves them in the DB"""
         ranges = DBQueryRanges(self.database)
         ranges_to_query = ranges.get_location_query_ranges(
             location_string=f'ethtxs_{address}',
@@ -72,14 +67,6 @@ class EthTransactions(LockableQueryObject):
         # add new transactions to the DB
         if new_transactions != []:
             self.database.add_ethereum_transactions(new_transactions, from_etherscan=True)
-            # And since at least for now the increasingly negative nonce for the internal
-            # transactions happens only in the DB writing, requery the entire batch from
-            # the DB to get the updated transactions
-            transactions = self.database.get_ethereum_transactions(
-                from_ts=start_ts,
-                to_ts=end_ts,
-                address=address,
-            )
 
         # and also set the last queried timestamps for the address
         ranges.update_used_query_range(
@@ -89,6 +76,26 @@ class EthTransactions(LockableQueryObject):
             ranges_to_query=ranges_to_query,
         )
 
+    def _single_address_query_transactions(
+            self,
+            address: ChecksumEthAddress,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            with_limit: bool,
+    ) -> List[EthereumTransaction]:
+        """Reads the already synced transactions of the address from the DB
+
+        Since at least for now the increasingly negative nonce for the internal
+        transactions happens only in the DB writing, the DB is the only source
+        of the final transactions.
+        """
+        self.tx_per_address[address] = 0
+        transactions = self.database.get_ethereum_transactions(
+            from_ts=start_ts,
+            to_ts=end_ts,
+            address=address,
+        )
+
         if with_limit:
             transactions_queried_so_far = sum(x for _, x in self.tx_per_address.items())
             remaining_num_tx = FREE_ETH_TX_LIMIT - transactions_queried_so_far
@@ -99,6 +106,30 @@ class EthTransactions(LockableQueryObject):
 
         return transactions
 
+    @protect_with_lock()
+    def sync(
+            self,
+            addresses: Optional[List[ChecksumEthAddress]],
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+    ) -> None:
+        """Makes sure that all transactions (normal AND internal) of the given ethereum
+        accounts in the time range are saved in the DB so they can be read from there.
+
+        If no addresses are given then all tracked ethereum accounts are synced.
+        """
+        if addresses is not None:
+            accounts = addresses
+        else:
+            accounts = self.database.get_blockchain_accounts().eth
+
+        for address in accounts:
+            self._single_address_sync_transactions(
+                address=address,
+                start_ts=from_ts,
+                end_ts=to_ts,
+            )
+
     @protect_with_lock()
     def query(
             self,
@@ -127,6 +158,7 @@ class EthTransactions(LockableQueryObject):
         else:
             accounts = self.database.get_blockchain_accounts().eth
 
+        self.sync(addresses=accounts, from_ts=from_ts, to_ts=to_ts)
         for address in accounts:
             new_transactions = self._single_address_query_transactions(
                 address=address,
@@ -5,8 +5,9 @@ LIQUIDITY_POSITIONS_QUERY = (
     liquidityPositions
     (
         first: $limit,
-        skip: $offset,
+        orderBy: id,
         where: {{
+            id_gt: $last_id,
             user_in: $addresses,
             liquidityTokenBalance_gt: $balance,
         }}
@@ -43,12 +44,14 @@ TOKEN_DAY_DATAS_QUERY = (
     tokenDayDatas
     (
         first: $limit,
-        skip: $offset,
+        orderBy: id,
         where: {{
+            id_gt: $last_id,
             token_in: $token_ids,
             date: $datetime,
         }}
     ) {{
+        id
         date
         token {{
             id
@@ -65,13 +68,15 @@ SWAPS_QUERY = (
     swaps
     (
         first: $limit,
-        skip: $offset,
+        orderBy: id,
         where: {{
+            id_gt: $last_id,
             to: $address,
             timestamp_gte: $start_ts,
             timestamp_lte: $end_ts,
         }}
     ) {{
+        id
         transaction {{
             swaps {{
                 id
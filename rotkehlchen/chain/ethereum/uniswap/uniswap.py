@@ -2,7 +2,18 @@ import logging
 from collections import defaultdict
 from datetime import datetime, time
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, List, Optional, Sequence, Set, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from eth_utils import to_checksum_address
 from gevent.lock import Semaphore
@@ -11,7 +22,12 @@ from rotkehlchen.accounting.structures import Balance
 from rotkehlchen.assets.asset import EthereumToken
 from rotkehlchen.assets.unknown_asset import UnknownEthereumToken
 from rotkehlchen.assets.utils import get_ethereum_token
-from rotkehlchen.chain.ethereum.graph import GRAPH_QUERY_LIMIT, Graph, format_query_indentation
+from rotkehlchen.chain.ethereum.graph import (
+    Graph,
+    format_query_indentation,
+    paginated_query,
+    query_addresses_concurrently,
+)
 from rotkehlchen.chain.ethereum.trades import AMMSwap, AMMTrade
 from rotkehlchen.constants import ZERO
 from rotkehlchen.errors import RemoteError
@@ -98,6 +114,10 @@ class Uniswap(EthereumModule):
         self.msg_aggregator = msg_aggregator
         self.data_directory = data_directory
         self.trades_lock = Semaphore()
+        # The trades reconstructed from the DB swaps of each address. New trades
+        # are added to them so that the DB swaps are only turned to trades once
+        self.address_trades: AddressTrades = {}
+        self.swap_tokens: Dict[ChecksumEthAddress, Union[EthereumToken, UnknownEthereumToken]] = {}
         try:
             self.graph: Optional[Graph] = Graph(
                 'https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v2',
@@ -126,85 +146,70 @@ class Uniswap(EthereumModule):
         addresses_lower = [address.lower() for address in addresses]
         querystr = format_query_indentation(LIQUIDITY_POSITIONS_QUERY.format())
         param_types = {
-            '$limit': 'Int!',
-            '$offset': 'Int!',
             '$addresses': '[String!]',
             '$balance': 'BigDecimal!',
         }
         param_values = {
-            'limit': GRAPH_QUERY_LIMIT,
-            'offset': 0,
             'addresses': addresses_lower,
             'balance': '0',
         }
-        while True:
-            result = graph_query(
-                querystr=querystr,
-                param_types=param_types,
-                param_values=param_values,
-            )
-            result_data = result['liquidityPositions']
-
-            for lp in result_data:
-                user_address = to_checksum_address(lp['user']['id'])
-                user_lp_balance = FVal(lp['liquidityTokenBalance'])
-                lp_pair = lp['pair']
-                lp_address = to_checksum_address(lp_pair['id'])
-                lp_total_supply = FVal(lp_pair['totalSupply'])
-
-                # Insert LP tokens reserves within tokens dicts
-                token0 = lp_pair['token0']
-                token0['total_amount'] = lp_pair['reserve0']
-                token1 = lp_pair['token1']
-                token1['total_amount'] = lp_pair['reserve1']
-
-                liquidity_pool_assets = []
-
-                for token in token0, token1:
-                    # Get the token <EthereumToken> or <UnknownEthereumToken>
-                    asset = get_ethereum_token(
-                        symbol=token['symbol'],
-                        ethereum_address=to_checksum_address(token['id']),
-                        name=token['name'],
-                        decimals=int(token['decimals']),
-                    )
-
-                    # Classify the asset either as known or unknown
-                    if isinstance(asset, EthereumToken):
-                        known_assets.add(asset)
-                    elif isinstance(asset, UnknownEthereumToken):
-                        unknown_assets.add(asset)
-
-                    # Estimate the underlying asset total_amount
-                    asset_total_amount = FVal(token['total_amount'])
-                    user_asset_balance = (
-                        user_lp_balance / lp_total_supply * asset_total_amount
-                    )
+        result_data = paginated_query(
+            graph_query=graph_query,
+            querystr=querystr,
+            param_types=param_types,
+            param_values=param_values,
+            entity_path=('liquidityPositions',),
+        )
+        for lp in result_data:
+            user_address = to_checksum_address(lp['user']['id'])
+            user_lp_balance = FVal(lp['liquidityTokenBalance'])
+            lp_pair = lp['pair']
+            lp_address = to_checksum_address(lp_pair['id'])
+            lp_total_supply = FVal(lp_pair['totalSupply'])
+
+            # Insert LP tokens reserves within tokens dicts
+            token0 = lp_pair['token0']
+            token0['total_amount'] = lp_pair['reserve0']
+            token1 = lp_pair['token1']
+            token1['total_amount'] = lp_pair['reserve1']
+
+            liquidity_pool_assets = []
+
+            for token in token0, token1:
+                # Get the token <EthereumToken> or <UnknownEthereumToken>
+                asset = get_ethereum_token(
+                    symbol=token['symbol'],
+                    ethereum_address=to_checksum_address(token['id']),
+                    name=token['name'],
+                    decimals=int(token['decimals']),
+                )
 
-                    liquidity_pool_asset = LiquidityPoolAsset(
-                        asset=asset,
-                        total_amount=asset_total_amount,
-                        user_balance=Balance(amount=user_asset_balance),
-                    )
-                    liquidity_pool_assets.append(liquidity_pool_asset)
+                # Classify the asset either as known or unknown
+                if isinstance(asset, EthereumToken):
+                    known_assets.add(asset)
+                elif isinstance(asset, UnknownEthereumToken):
+                    unknown_assets.add(asset)
 
-                liquidity_pool = LiquidityPool(
-                    address=lp_address,
-                    assets=liquidity_pool_assets,
-                    total_supply=lp_total_supply,
-                    user_balance=Balance(amount=user_lp_balance),
+                # Estimate the underlying asset total_amount
+                asset_total_amount = FVal(token['total_amount'])
+                user_asset_balance = (
+                    user_lp_balance / lp_total_supply * asset_total_amount
                 )
-                address_balances[user_address].append(liquidity_pool)
 
-            # Check whether an extra request is needed
-            if len(result_data) < GRAPH_QUERY_LIMIT:
-                break
+                liquidity_pool_asset = LiquidityPoolAsset(
+                    asset=asset,
+                    total_amount=asset_total_amount,
+                    user_balance=Balance(amount=user_asset_balance),
+                )
+                liquidity_pool_assets.append(liquidity_pool_asset)
 
-            # Update pagination step
-            param_values = {
-                **param_values,
-                'offset': param_values['offset'] + GRAPH_QUERY_LIMIT,  # type: ignore
-            }
+            liquidity_pool = LiquidityPool(
+                address=lp_address,
+                assets=liquidity_pool_assets,
+                total_supply=lp_total_supply,
+                user_balance=Balance(amount=user_lp_balance),
+            )
+            address_balances[user_address].append(liquidity_pool)
 
         protocol_balance = ProtocolBalance(
             address_balances=dict(address_balances),
@@ -332,86 +337,71 @@ class Uniswap(EthereumModule):
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
     ) -> AddressTrades:
-        """Request via graph all trades for new addresses and the latest ones
-        for already existing addresses. Then the requested trade are written in
-        DB and finally all DB trades are read and returned.
+        """Request via graph only the trades of each address that happened after its
+        last queried range. The new swaps are written in the DB and the new trades are
+        added to the trades already reconstructed from the DB. Finally the trades
+        within the time range are returned.
         """
-        address_amm_trades: AddressTrades = {}
-        db_address_trades: AddressTrades = {}
-        new_addresses: List[ChecksumEthAddress] = []
-        existing_addresses: List[ChecksumEthAddress] = []
-        min_end_ts: Timestamp = to_timestamp
-
         # Get addresses' last used query range for Uniswap trades
+        address_start_ts: Dict[ChecksumEthAddress, Timestamp] = {}
         for address in addresses:
             entry_name = f'{UNISWAP_TRADES_PREFIX}_{address}'
             trades_range = self.database.get_used_query_range(name=entry_name)
-
             if not trades_range:
-                new_addresses.append(address)
-            else:
-                existing_addresses.append(address)
-                min_end_ts = min(min_end_ts, trades_range[1])
-
-        # Request new addresses' trades
-        if new_addresses:
-            start_ts = Timestamp(0)
-            new_address_trades = self._get_trades_graph(
-                addresses=new_addresses,
-                start_ts=start_ts,
-                end_ts=to_timestamp,
-            )
-            address_amm_trades.update(new_address_trades)
-
-            # Insert last used query range for new addresses
-            for address in new_addresses:
-                entry_name = f'{UNISWAP_TRADES_PREFIX}_{address}'
-                self.database.update_used_query_range(
-                    name=entry_name,
-                    start_ts=start_ts,
-                    end_ts=to_timestamp,
+                address_start_ts[address] = Timestamp(0)
+            elif trades_range[1] < to_timestamp:
+                address_start_ts[address] = Timestamp(trades_range[1] + 1)
+
+            if address not in self.address_trades:
+                db_swaps = self.database.get_amm_swaps(
+                    location=Location.UNISWAP,
+                    address=address,
                 )
+                self.address_trades[address] = self.swaps_to_trades(db_swaps)
 
-        # Request existing DB addresses' trades
-        if existing_addresses and min_end_ts <= to_timestamp:
-            address_new_trades = self._get_trades_graph(
-                addresses=existing_addresses,
-                start_ts=min_end_ts,
-                end_ts=to_timestamp,
-            )
-            address_amm_trades.update(address_new_trades)
+        # Request the new trades of the addresses whose range is not up to date
+        address_new_trades = self._get_trades_graph(
+            address_start_ts=address_start_ts,
+            end_ts=to_timestamp,
+        )
 
-            # Update last used query range for existing addresses
-            for address in existing_addresses:
+        # Insert all unique new swaps to the DB
+        all_swaps = set()
+        for address in address_start_ts:
+            new_trades = address_new_trades.get(address, [])
+            for trade in new_trades:
+                for swap in trade.swaps:
+                    all_swaps.add(swap)
+
+            if len(new_trades) != 0:
+                # Keep the same order as the trades reconstructed from the DB
+                self.address_trades[address] = sorted(
+                    self.address_trades[address] + new_trades,
+                    key=lambda trade: (trade.timestamp, -trade.swaps[0].log_index),
+                    reverse=True,
+                )
+
+        with self.database.write_batch():
+            self.database.add_amm_swaps(list(all_swaps))
+            # Update last used query range for the queried addresses
+            for address in address_start_ts:
                 entry_name = f'{UNISWAP_TRADES_PREFIX}_{address}'
                 self.database.update_used_query_range(
                     name=entry_name,
-                    start_ts=min_end_ts,
+                    start_ts=Timestamp(0),
                     end_ts=to_timestamp,
                 )
 
-        # Insert all unique swaps to the D
-        all_swaps = set()
-        for address in filter(lambda address: address in address_amm_trades, addresses):
-            for trade in address_amm_trades[address]:
-                for swap in trade.swaps:
-                    all_swaps.add(swap)
-
-        self.database.add_amm_swaps(list(all_swaps))
-
-        # Fetch all DB Uniswap trades within the time range
+        address_trades: AddressTrades = {}
         for address in addresses:
-            db_swaps = self.database.get_amm_swaps(
-                from_ts=from_timestamp,
-                to_ts=to_timestamp,
-                location=Location.UNISWAP,
-                address=address,
-            )
-            db_trades = self.swaps_to_trades(db_swaps)
-            if db_trades:
-                db_address_trades[address] = db_trades
+            trades = [
+                trade for trade in self.address_trades[address]
+                if from_timestamp <= trade.timestamp <= to_timestamp
+            ]
+            if trades:
+                address_trades[address] = trades
 
-        return db_address_trades
+        return address_trades
 
     @staticmethod
     def swaps_to_trades(swaps: List[AMMSwap]) -> List[AMMTrade]:
@@ -437,17 +427,39 @@ class Uniswap(EthereumModule):
 
     def _get_trades_graph(
             self,
-            addresses: List[ChecksumEthAddress],
-            start_ts: Timestamp,
+            address_start_ts: Dict[ChecksumEthAddress, Timestamp],
             end_ts: Timestamp,
     ) -> AddressTrades:
-        address_trades = {}
-        for address in addresses:
-            trades = self._get_trades_graph_for_address(address, start_ts, end_ts)
-            if len(trades) != 0:
-                address_trades[address] = trades
+        """Queries the trades of each address starting from its own start timestamp"""
+        address_trades = query_addresses_concurrently(
+            addresses=list(address_start_ts.keys()),
+            query_function=lambda address: self._get_trades_graph_for_address(
+                address=address,
+                start_ts=address_start_ts[address],
+                end_ts=end_ts,
+            ),
+        )
+        return {address: trades for address, trades in address_trades.items() if len(trades) != 0}
 
-        return address_trades
+    def _get_swap_token(
+            self,
+            token: Dict[str, Any],
+    ) -> Union[EthereumToken, UnknownEthereumToken]:
+        """Returns the <EthereumToken> or <UnknownEthereumToken> of a swap's subgraph
+        token. Each token address is only resolved once.
+        """
+        token_address = to_checksum_address(token['id'])
+        swap_token = self.swap_tokens.get(token_address, None)
+        if swap_token is None:
+            swap_token = get_ethereum_token(
+                symbol=token['symbol'],
+                ethereum_address=token_address,
+                name=token['name'],
+                decimals=int(token['decimals']),
+            )
+            self.swap_tokens[token_address] = swap_token
+
+        return swap_token
 
     def _get_trades_graph_for_address(
             self,
@@ -472,78 +484,60 @@ class Uniswap(EthereumModule):
         """
         trades: List[AMMTrade] = []
         param_types = {
-            '$limit': 'Int!',
-            '$offset': 'Int!',
             '$address': 'Bytes!',
             '$start_ts': 'BigInt!',
             '$end_ts': 'BigInt!',
         }
         param_values = {
-            'limit': GRAPH_QUERY_LIMIT,
-            'offset': 0,
             'address': address.lower(),
             'start_ts': str(start_ts),
             'end_ts': str(end_ts),
         }
         querystr = format_query_indentation(SWAPS_QUERY.format())
 
-        while True:
-            result = self.graph.query(  # type: ignore # caller already checks
-                querystr=querystr,
-                param_types=param_types,
-                param_values=param_values,
-            )
-            result_data = result['swaps']
-            for entry in result_data:
-                swaps = []
-                for swap in entry['transaction']['swaps']:
-                    timestamp = swap['timestamp']
-                    swap_token0 = swap['pair']['token0']
-                    swap_token1 = swap['pair']['token1']
-                    token0 = get_ethereum_token(
-                        symbol=swap_token0['symbol'],
-                        ethereum_address=to_checksum_address(swap_token0['id']),
-                        name=swap_token0['name'],
-                        decimals=swap_token0['decimals'],
-                    )
-                    token1 = get_ethereum_token(
-                        symbol=swap_token1['symbol'],
-                        ethereum_address=to_checksum_address(swap_token1['id']),
-                        name=swap_token1['name'],
-                        decimals=int(swap_token1['decimals']),
-                    )
-                    amount0_in = FVal(swap['amount0In'])
-                    amount1_in = FVal(swap['amount1In'])
-                    amount0_out = FVal(swap['amount0Out'])
-                    amount1_out = FVal(swap['amount1Out'])
-                    swaps.append(AMMSwap(
-                        tx_hash=swap['id'].split('-')[0],
-                        log_index=int(swap['logIndex']),
-                        address=address,
-                        from_address=to_checksum_address(swap['sender']),
-                        to_address=to_checksum_address(swap['to']),
-                        timestamp=Timestamp(int(timestamp)),
-                        location=Location.UNISWAP,
-                        token0=token0,
-                        token1=token1,
-                        amount0_in=AssetAmount(amount0_in),
-                        amount1_in=AssetAmount(amount1_in),
-                        amount0_out=AssetAmount(amount0_out),
-                        amount1_out=AssetAmount(amount1_out),
-                    ))
-
-                # Now that we got all swaps for a transaction, create the trade object
-                trades.extend(self._tx_swaps_to_trades(swaps))
-
-            # Check whether an extra request is needed
-            if len(result_data) < GRAPH_QUERY_LIMIT:
-                break
-
-            # Update pagination step
-            param_values = {
-                **param_values,
-                'offset': param_values['offset'] + GRAPH_QUERY_LIMIT,  # type: ignore
-            }
+        result_data = paginated_query(
+            graph_query=self.graph.query,  # type: ignore # caller already checks
+            querystr=querystr,
+            param_types=param_types,
+            param_values=param_values,
+            entity_path=('swaps',),
+        )
+        seen_tx_hashes = set()
+        for entry in result_data:
+            # All swaps of a transaction are returned for each swap to the address
+            tx_hash = entry['id'].split('-')[0]
+            if tx_hash in seen_tx_hashes:
+                continue
+
+            seen_tx_hashes.add(tx_hash)
+            swaps = []
+            for swap in entry['transaction']['swaps']:
+                timestamp = swap['timestamp']
+                token0 = self._get_swap_token(swap['pair']['token0'])
+                token1 = self._get_swap_token(swap['pair']['token1'])
+                amount0_in = FVal(swap['amount0In'])
+                amount1_in = FVal(swap['amount1In'])
+                amount0_out = FVal(swap['amount0Out'])
+                amount1_out = FVal(swap['amount1Out'])
+                swaps.append(AMMSwap(
+                    tx_hash=swap['id'].split('-')[0],
+                    log_index=int(swap['logIndex']),
+                    address=address,
+                    from_address=to_checksum_address(swap['sender']),
+                    to_address=to_checksum_address(swap['to']),
+                    timestamp=Timestamp(int(timestamp)),
+                    location=Location.UNISWAP,
+                    token0=token0,
+                    token1=token1,
+                    amount0_in=AssetAmount(amount0_in),
+                    amount1_in=AssetAmount(amount1_in),
+                    amount0_out=AssetAmount(amount0_out),
+                    amount1_out=AssetAmount(amount1_out),
+                ))
+
+            # Now that we got all swaps for a transaction, create the trade object
+            trades.extend(self._tx_swaps_to_trades(swaps))
+
         return trades
 
     @staticmethod
@@ -569,38 +563,23 @@ class Uniswap(EthereumModule):
             datetime.combine(datetime.utcnow().date(), time.min).timestamp(),
         )
         param_types = {
-            '$limit': 'Int!',
-            '$offset': 'Int!',
             '$token_ids': '[String!]',
             '$datetime': 'Int!',
         }
         param_values = {
-            'limit': GRAPH_QUERY_LIMIT,
-            'offset': 0,
             'token_ids': unknown_assets_addresses_lower,
             'datetime': today_epoch,
         }
-        while True:
-            result = graph_query(
-                querystr=querystr,
-                param_types=param_types,
-                param_values=param_values,
-            )
-            result_data = result['tokenDayDatas']
-
-            for tdd in result_data:
-                token_address = to_checksum_address(tdd['token']['id'])
-                asset_price[token_address] = Price(FVal(tdd['priceUSD']))
-
-            # Check whether an extra request is needed
-            if len(result_data) < GRAPH_QUERY_LIMIT:
-                break
-
-            # Update pagination step
-            param_values = {
-                **param_values,
-                'offset': param_values['offset'] + GRAPH_QUERY_LIMIT,  # type: ignore
-            }
+        result_data = paginated_query(
+            graph_query=graph_query,
+            querystr=querystr,
+            param_types=param_types,
+            param_values=param_values,
+            entity_path=('tokenDayDatas',),
+        )
+        for tdd in result_data:
+            token_address = to_checksum_address(tdd['token']['id'])
+            asset_price[token_address] = Price(FVal(tdd['priceUSD']))
 
         return asset_price
 
@@ -713,6 +692,7 @@ class Uniswap(EthereumModule):
         with self.trades_lock:
             if reset_db_data is True:
                 self.database.delete_uniswap_data()
+                self.address_trades = {}
 
             trades = self._get_trades(
                 addresses=addresses,
@@ -730,4 +710,4 @@ class Uniswap(EthereumModule):
         pass
 
     def on_account_removal(self, address: ChecksumEthAddress) -> None:
-        pass
+        self.address_trades.pop(address, None)
@@ -1,4 +1,7 @@
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+import logging
+from functools import lru_cache
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Type, Union
 
 from eth_utils import to_bytes
 from web3 import Web3
@@ -9,18 +12,29 @@ from web3._utils.events import get_event_abi_types_for_decoding
 from rotkehlchen.assets.asset import Asset, EthereumToken
 from rotkehlchen.chain.ethereum.contracts import EthereumContract
 from rotkehlchen.constants.ethereum import ETH_MULTICALL
-from rotkehlchen.errors import UnsupportedAsset
+from rotkehlchen.errors import BlockchainQueryError, RemoteError, UnsupportedAsset
 from rotkehlchen.fval import FVal
+from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import AssetType, ChecksumEthAddress, EthTokenInfo
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager, NodeName
 
 ABI_CODEC = Web3().codec
+# Maximum number of calls aggregated in a single multicall. Bigger batches are split
+MULTICALL_MAX_CALLS = 64
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+@lru_cache(maxsize=None)
+def _token_decimals_divisor(token_decimals: int) -> FVal:
+    return FVal(10) ** FVal(token_decimals)
 
 
 def token_normalized_value_decimals(token_amount: int, token_decimals: int) -> FVal:
-    return token_amount / (FVal(10) ** FVal(token_decimals))
+    return token_amount / _token_decimals_divisor(token_decimals)
 
 
 def token_normalized_value(token_amount: int, token: Union[EthereumToken, EthTokenInfo]) -> FVal:
@@ -73,6 +87,143 @@ def multicall_specific(
     return [contract.decode(x, method_name, arguments[0]) for x in output]
 
 
+class MulticallCall():
+    """A contract call queued in a MulticallBatch. Its result is available after
+    the batch has been executed"""
+
+    def __init__(
+            self,
+            contract: EthereumContract,
+            method_name: str,
+            arguments: Optional[List[Any]],
+    ) -> None:
+        self.contract = contract
+        self.method_name = method_name
+        self.arguments = arguments
+        self._result: Any = None
+        self._error: Optional[Exception] = None
+        self._done = False
+
+    def encoded(self) -> Tuple[ChecksumEthAddress, str]:
+        return self.contract.address, self.contract.encode(self.method_name, self.arguments)
+
+    def set_output(self, output: bytes) -> None:
+        decoded = self.contract.decode(output, self.method_name, self.arguments)
+        # Same as a direct contract call, single outputs are not wrapped in a tuple
+        self._result = decoded[0] if len(decoded) == 1 else decoded
+        self._done = True
+
+    def set_result(self, result: Any) -> None:
+        self._result = result
+        self._done = True
+
+    def set_error(self, error: Exception) -> None:
+        self._error = error
+        self._done = True
+
+    @property
+    def result(self) -> Any:
+        """The result of the call, as EthereumContract.call() would have returned it
+
+        May raise:
+        - RemoteError/BlockchainQueryError if the call failed
+        """
+        assert self._done, 'Result of a multicall call accessed before the batch was executed'
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class MulticallBatch():
+    """Queues independent contract calls and executes them with as few eth_calls
+    as possible by aggregating them through the Multicall contract.
+
+    Can be used as a context manager, in which case the calls are executed at exit:
+
+        with MulticallBatch(ethereum) as batch:
+            urn = batch.add(MAKERDAO_VAT, 'urns', [ilk, urn_address])
+        urn.result
+
+    Batches bigger than MULTICALL_MAX_CALLS are split. If an aggregate call fails,
+    for example due to hitting the gas limit of the node or the URI length limit
+    of etherscan, it is split in half and retried. A single call that keeps failing
+    is done as a normal contract call and its error is raised when accessing its result.
+    """
+
+    def __init__(
+            self,
+            ethereum: 'EthereumManager',
+            call_order: Optional[Sequence['NodeName']] = None,
+    ) -> None:
+        self.ethereum = ethereum
+        self.call_order = call_order
+        self.calls: List[MulticallCall] = []
+
+    def add(
+            self,
+            contract: EthereumContract,
+            method_name: str,
+            arguments: Optional[List[Any]] = None,
+    ) -> MulticallCall:
+        call = MulticallCall(contract=contract, method_name=method_name, arguments=arguments)
+        self.calls.append(call)
+        return call
+
+    def _execute_single(self, call: MulticallCall) -> None:
+        try:
+            result = call.contract.call(
+                ethereum=self.ethereum,
+                method_name=call.method_name,
+                arguments=call.arguments,
+                call_order=self.call_order,
+            )
+        except (RemoteError, BlockchainQueryError) as e:
+            call.set_error(e)
+            return
+
+        call.set_result(result)
+
+    def _execute_calls(self, calls: List[MulticallCall]) -> None:
+        if len(calls) == 1:
+            self._execute_single(calls[0])
+            return
+
+        try:
+            outputs = multicall(
+                ethereum=self.ethereum,
+                calls=[x.encoded() for x in calls],
+                call_order=self.call_order,
+            )
+        except (RemoteError, BlockchainQueryError) as e:
+            log.debug(f'Multicall of {len(calls)} calls failed due to {str(e)}. Splitting it')
+            middle = len(calls) // 2
+            self._execute_calls(calls[:middle])
+            self._execute_calls(calls[middle:])
+            return
+
+        for call, output in zip(calls, outputs):
+            call.set_output(output)
+
+    def execute(self) -> None:
+        """Executes all queued calls. Errors of individual calls are raised only
+        when accessing their result"""
+        calls, self.calls = self.calls, []
+        for idx in range(0, len(calls), MULTICALL_MAX_CALLS):
+            self._execute_calls(calls[idx:idx + MULTICALL_MAX_CALLS])
+
+    def __enter__(self) -> 'MulticallBatch':
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_value: Optional[BaseException],
+            traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.execute()
+
+
 def decode_event_data(data: str, event_abi: Dict[str, Any]) -> Tuple:
     """Decode the data of an event according to the event's abi entry"""
     log_data = hexstr_if_str(to_bytes, data)
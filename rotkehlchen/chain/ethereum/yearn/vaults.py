@@ -1,6 +1,9 @@
-from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, NamedTuple, Optional, Set
 
+import gevent
 from gevent.lock import Semaphore
+from gevent.pool import Pool
 
 from rotkehlchen.accounting.structures import Balance
 from rotkehlchen.assets.asset import Asset, EthereumToken
@@ -32,7 +35,12 @@ from rotkehlchen.premium.premium import Premium
 from rotkehlchen.typing import ChecksumEthAddress, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.interfaces import EthereumModule
-from rotkehlchen.utils.misc import address_to_bytes32, hexstr_to_int, ts_now
+from rotkehlchen.utils.misc import (
+    address_to_bytes32,
+    hex_or_bytes_to_address,
+    hexstr_to_int,
+    ts_now,
+)
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
@@ -40,6 +48,7 @@ if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
 
 BLOCKS_PER_YEAR = 2425846
+YEARN_CONCURRENT_VAULT_QUERIES = 4
 
 
 YEARN_VAULTS = {
@@ -112,6 +121,10 @@ YEARN_VAULTS = {
 }
 
 
+def _vault_query_range_name(vault: YearnVault, address: ChecksumEthAddress) -> str:
+    return f'{YEARN_VAULTS_PREFIX}_{vault.name.replace(" ", "_")}_{address}'
+
+
 class YearnVaultHistory(NamedTuple):
     events: List[YearnVaultEvent]
     profit_loss: Balance
@@ -253,22 +266,29 @@ class YearnVaults(EthereumModule):
     def _get_vault_deposit_events(
             self,
             vault: YearnVault,
-            address: ChecksumEthAddress,
-            from_block: int,
+            from_blocks: Dict[ChecksumEthAddress, int],
             to_block: int,
-    ) -> List[YearnVaultEvent]:
-        """Get all deposit events of the underlying token to the vault"""
-        events: List[YearnVaultEvent] = []
-        argument_filters = {'from': address, 'to': vault.contract.address}
+    ) -> DefaultDict[ChecksumEthAddress, List[YearnVaultEvent]]:
+        """Get all deposit events of the underlying token to the vault made by
+        any of the given addresses, each one from its own from block onwards.
+
+        All addresses are queried with a single log scan of the underlying token.
+        """
+        events: DefaultDict[ChecksumEthAddress, List[YearnVaultEvent]] = defaultdict(list)
+        argument_filters = {'from': list(from_blocks.keys()), 'to': vault.contract.address}
         deposit_events = self.ethereum.get_logs(
             contract_address=vault.underlying_token.ethereum_address,
             abi=ERC20TOKEN_ABI,
             event_name='Transfer',
             argument_filters=argument_filters,
-            from_block=from_block,
+            from_block=min(from_blocks.values()),
             to_block=to_block,
         )
         for deposit_event in deposit_events:
+            address = hex_or_bytes_to_address(deposit_event['topics'][1])
+            if deposit_event['blockNumber'] < from_blocks.get(address, to_block + 1):
+                continue  # already queried for this address
+
             timestamp = self.ethereum.get_event_timestamp(deposit_event)
             deposit_amount = token_normalized_value(
                 token_amount=hexstr_to_int(deposit_event['data']),
@@ -310,7 +330,7 @@ class YearnVaults(EthereumModule):
                 location='yearn vault deposit',
                 msg_aggregator=self.msg_aggregator,
             )
-            events.append(YearnVaultEvent(
+            events[address].append(YearnVaultEvent(
                 event_type='deposit',
                 block_number=deposit_event['blockNumber'],
                 timestamp=timestamp,
@@ -334,22 +354,29 @@ class YearnVaults(EthereumModule):
     def _get_vault_withdraw_events(
             self,
             vault: YearnVault,
-            address: ChecksumEthAddress,
-            from_block: int,
+            from_blocks: Dict[ChecksumEthAddress, int],
             to_block: int,
-    ) -> List[YearnVaultEvent]:
-        """Get all withdraw events of the underlying token to the vault"""
-        events: List[YearnVaultEvent] = []
-        argument_filters = {'from': vault.contract.address, 'to': address}
+    ) -> DefaultDict[ChecksumEthAddress, List[YearnVaultEvent]]:
+        """Get all withdraw events of the underlying token from the vault to any
+        of the given addresses, each one from its own from block onwards.
+
+        All addresses are queried with a single log scan of the underlying token.
+        """
+        events: DefaultDict[ChecksumEthAddress, List[YearnVaultEvent]] = defaultdict(list)
+        argument_filters = {'from': vault.contract.address, 'to': list(from_blocks.keys())}
         withdraw_events = self.ethereum.get_logs(
             contract_address=vault.underlying_token.ethereum_address,
             abi=ERC20TOKEN_ABI,
             event_name='Transfer',
             argument_filters=argument_filters,
-            from_block=from_block,
+            from_block=min(from_blocks.values()),
             to_block=to_block,
         )
         for withdraw_event in withdraw_events:
+            address = hex_or_bytes_to_address(withdraw_event['topics'][2])
+            if withdraw_event['blockNumber'] < from_blocks.get(address, to_block + 1):
+                continue  # already queried for this address
+
             timestamp = self.ethereum.get_event_timestamp(withdraw_event)
             withdraw_amount = token_normalized_value(
                 token_amount=hexstr_to_int(withdraw_event['data']),
@@ -391,7 +418,7 @@ class YearnVaults(EthereumModule):
                 location='yearn vault withdraw',
                 msg_aggregator=self.msg_aggregator,
             )
-            events.append(YearnVaultEvent(
+            events[address].append(YearnVaultEvent(
                 event_type='withdraw',
                 block_number=withdraw_event['blockNumber'],
                 timestamp=timestamp,
@@ -439,48 +466,37 @@ class YearnVaults(EthereumModule):
 
         return total
 
-    def get_vault_history(
+    def _query_vault_events(
             self,
-            defi_balances: List['DefiProtocolBalances'],
             vault: YearnVault,
-            address: ChecksumEthAddress,
-            from_block: int,
+            from_blocks: Dict[ChecksumEthAddress, int],
+            addresses_with_events: Set[ChecksumEthAddress],
             to_block: int,
-    ) -> Optional[YearnVaultHistory]:
-        from_block = max(from_block, vault.contract.deployed_block)
-        last_query = self.database.get_used_query_range(
-            name=f'{YEARN_VAULTS_PREFIX}_{vault.name.replace(" ", "_")}_{address}',
-        )
-        skip_query = last_query and to_block - last_query[1] < MAX_BLOCKTIME_CACHE
+    ) -> DefaultDict[ChecksumEthAddress, List[YearnVaultEvent]]:
+        """Queries the new deposit and withdraw events of a vault for all given addresses"""
+        events = self._get_vault_deposit_events(vault, from_blocks, to_block)
+        # There can't be any withdrawals for addresses that never deposited
+        withdraw_from_blocks = {
+            address: from_block for address, from_block in from_blocks.items()
+            if address in addresses_with_events or len(events[address]) != 0
+        }
+        if len(withdraw_from_blocks) != 0:
+            withdraw_events = self._get_vault_withdraw_events(
+                vault=vault,
+                from_blocks=withdraw_from_blocks,
+                to_block=to_block,
+            )
+            for address, address_events in withdraw_events.items():
+                events[address].extend(address_events)
 
-        events = self.database.get_yearn_vaults_events(address=address, vault=vault)
-        if not skip_query:
-            query_from_block = last_query[1] + 1 if last_query else from_block
-            new_events = self._get_vault_deposit_events(vault, address, query_from_block, to_block)
-            if len(events) == 0 and len(new_events) == 0:
-                # After all events have been queried then also update the query range.
-                # Even if no events are found for an address we need to remember the range
-                self.database.update_used_block_query_range(
-                    name=f'{YEARN_VAULTS_PREFIX}_{vault.name.replace(" ", "_")}_{address}',
-                    from_block=from_block,
-                    to_block=to_block,
-                )
-                return None
+        return events
 
-            new_events.extend(
-                self._get_vault_withdraw_events(vault, address, query_from_block, to_block),
-            )
-            # Now update the DB with the new events
-            self.database.add_yearn_vaults_events(address, new_events)
-            events.extend(new_events)
-
-        # After all events have been queried then also update the query range.
-        # Even if no events are found for an address we need to remember the range
-        self.database.update_used_block_query_range(
-            name=f'{YEARN_VAULTS_PREFIX}_{vault.name.replace(" ", "_")}_{address}',
-            from_block=from_block,
-            to_block=to_block,
-        )
+    def _get_vault_history(
+            self,
+            defi_balances: List['DefiProtocolBalances'],
+            vault: YearnVault,
+            events: List[YearnVaultEvent],
+    ) -> Optional[YearnVaultHistory]:
         if len(events) == 0:
             return None
 
@@ -511,13 +527,82 @@ class YearnVaults(EthereumModule):
 
         return YearnVaultHistory(events=events, profit_loss=total_pnl)
 
+    def _update_vaults_events(
+            self,
+            addresses: List[ChecksumEthAddress],
+            from_block: int,
+            to_block: int,
+    ) -> Dict[str, Dict[ChecksumEthAddress, List[YearnVaultEvent]]]:
+        """Queries the new events of all vaults for all addresses, saves them in the DB
+        and returns all events of each vault per address.
+
+        Each vault is scanned once for all addresses whose query range for it is not
+        recent enough and the scans of different vaults run concurrently.
+        """
+        vaults_events: Dict[str, Dict[ChecksumEthAddress, List[YearnVaultEvent]]] = {}
+        vaults_from_blocks: Dict[str, Dict[ChecksumEthAddress, int]] = {}
+        pool = Pool(YEARN_CONCURRENT_VAULT_QUERIES)
+        greenlets = {}
+        for vault in YEARN_VAULTS.values():
+            vault_from_block = max(from_block, vault.contract.deployed_block)
+            vaults_events[vault.name] = {}
+            from_blocks = {}
+            addresses_with_events = set()
+            for address in addresses:
+                events = self.database.get_yearn_vaults_events(address=address, vault=vault)
+                vaults_events[vault.name][address] = events
+                if len(events) != 0:
+                    addresses_with_events.add(address)
+                last_query = self.database.get_used_query_range(
+                    name=_vault_query_range_name(vault, address),
+                )
+                if last_query and to_block - last_query[1] < MAX_BLOCKTIME_CACHE:
+                    continue
+                from_blocks[address] = last_query[1] + 1 if last_query else vault_from_block
+
+            if len(from_blocks) == 0:
+                continue
+
+            vaults_from_blocks[vault.name] = from_blocks
+            greenlets[vault.name] = pool.spawn(
+                self._query_vault_events,
+                vault=vault,
+                from_blocks=from_blocks,
+                addresses_with_events=addresses_with_events,
+                to_block=to_block,
+            )
+
+        try:
+            gevent.joinall(list(greenlets.values()), raise_error=True)
+        finally:
+            # If one vault failed there is no point in querying the rest
+            pool.kill()
+
+        for vault in YEARN_VAULTS.values():
+            if vault.name not in greenlets:
+                continue
+
+            new_events = greenlets[vault.name].get()
+            for address in vaults_from_blocks[vault.name]:
+                self.database.add_yearn_vaults_events(address, new_events[address])
+                vaults_events[vault.name][address].extend(new_events[address])
+                # After all events have been queried then also update the query range.
+                # Even if no events are found for an address we need to remember the range
+                self.database.update_used_block_query_range(
+                    name=_vault_query_range_name(vault, address),
+                    from_block=max(from_block, vault.contract.deployed_block),
+                    to_block=to_block,
+                )
+
+        return vaults_events
+
     def get_history(
             self,
             given_defi_balances: 'GIVEN_DEFI_BALANCES',
             addresses: List[ChecksumEthAddress],
             reset_db_data: bool,
-            from_timestamp: Timestamp,  # pylint: disable=unused-argument
-            to_timestamp: Timestamp,  # pylint: disable=unused-argument
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
     ) -> Dict[ChecksumEthAddress, Dict[str, YearnVaultHistory]]:
         with self.history_lock:
 
@@ -531,17 +616,19 @@ class YearnVaults(EthereumModule):
 
             from_block = self.ethereum.etherscan.get_blocknumber_by_time(from_timestamp)
             to_block = self.ethereum.etherscan.get_blocknumber_by_time(to_timestamp)
+            vaults_events = self._update_vaults_events(
+                addresses=addresses,
+                from_block=from_block,
+                to_block=to_block,
+            )
             history: Dict[ChecksumEthAddress, Dict[str, YearnVaultHistory]] = {}
-
             for address in addresses:
                 history[address] = {}
-                for _, vault in YEARN_VAULTS.items():
-                    vault_history = self.get_vault_history(
+                for vault in YEARN_VAULTS.values():
+                    vault_history = self._get_vault_history(
                         defi_balances=defi_balances.get(address, []),
                         vault=vault,
-                        address=address,
-                        from_block=from_block,
-                        to_block=to_block,
+                        events=vaults_events[vault.name][address],
                     )
                     if vault_history:
                         history[address][vault.name] = vault_history
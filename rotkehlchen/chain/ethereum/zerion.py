@@ -1,7 +1,9 @@
 import logging
-from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
+import gevent
 from eth_utils.address import to_checksum_address
+from gevent.pool import Pool
 from typing_extensions import Literal
 
 from rotkehlchen.accounting.structures import Balance
@@ -11,13 +13,14 @@ from rotkehlchen.chain.ethereum.defi import handle_defi_price_query
 from rotkehlchen.chain.ethereum.utils import token_normalized_value_decimals
 from rotkehlchen.constants.assets import A_DAI, A_USDC
 from rotkehlchen.constants.ethereum import ZERION_ABI
-from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.constants.misc import ONE, ZERO
 from rotkehlchen.errors import UnknownAsset, UnsupportedAsset
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FVal, sum_fvals
 from rotkehlchen.inquirer import Inquirer, get_underlying_asset_price
 from rotkehlchen.serialization.deserialize import deserialize_ethereum_address
-from rotkehlchen.typing import ChecksumEthAddress, Price
+from rotkehlchen.typing import ChecksumEthAddress, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
@@ -100,6 +103,14 @@ def _handle_pooltogether(normalized_balance: FVal, token_name: str) -> Optional[
 
 # supported zerion adapter address
 ZERION_ADAPTER_ADDRESS = deserialize_ethereum_address('0x06FE76B2f432fdfEcAEf1a7d4f6C3d41B5861672')
+ZERION_CONCURRENT_ACCOUNT_QUERIES = 4
+# DeFi positions an account only received do not change its transaction count.
+# So accounts without DeFi balances are requeried at least this often.
+ZERION_EMPTY_ACCOUNT_RECHECK_SECONDS = 3600
+
+
+# Token as seen in a zerion adapter balance: (protocol name, address, symbol, name)
+ZerionToken = Tuple[str, ChecksumEthAddress, str, str]
 
 
 class Zerion():
@@ -117,17 +128,102 @@ class Zerion():
             abi=ZERION_ABI,
             deployed_block=1586199170,
         )
+        # Accounts that had no DeFi balances, mapped to their transaction count and
+        # the time they were queried. Skipped for as long as they send no new
+        # transaction, up to ZERION_EMPTY_ACCOUNT_RECHECK_SECONDS
+        self.empty_accounts: Dict[ChecksumEthAddress, Tuple[int, Timestamp]] = {}
 
     def all_balances_for_account(self, account: ChecksumEthAddress) -> List[DefiProtocolBalances]:
         """Calls the contract's getBalances() to get all protocol balances for account
 
         https://docs.zerion.io/smart-contracts/adapterregistry-v3#getbalances
         """
+        return self.all_balances_for_accounts([account]).get(account, [])
+
+    def all_balances_for_accounts(
+            self,
+            accounts: List[ChecksumEthAddress],
+    ) -> Dict[ChecksumEthAddress, List[DefiProtocolBalances]]:
+        """Gets all protocol balances for the given accounts
+
+        The contract's getBalances() is called for all accounts concurrently. Then
+        each unique token of all results is priced only once and the protocol
+        balances are created. Only accounts with DeFi balances are returned.
+
+        May raise:
+        - RemoteError if etherscan is used and there is a problem with
+        reaching it or with the returned result.
+        - BlockchainQueryError if an ethereum node is used and the contract call
+        queries fail for some reason
+        """
+        now = ts_now()
+        pool = Pool(ZERION_CONCURRENT_ACCOUNT_QUERIES)
+        greenlets = {
+            account: pool.spawn(self._query_raw_balances, account=account, now=now)
+            for account in accounts
+        }
+        try:
+            gevent.joinall(list(greenlets.values()), raise_error=True)
+        finally:
+            pool.kill()
+
+        raw_results = {}
+        for account, greenlet in greenlets.items():
+            transaction_count, result = greenlet.get()
+            if result is None:
+                continue  # known to be empty
+            raw_results[account] = result
+            self.empty_accounts[account] = (transaction_count, now)
+
+        tokens = set()
+        for result in raw_results.values():
+            for entry in result:
+                for adapter_balance in entry[1]:
+                    for balances in adapter_balance[1]:
+                        for balance in [balances[0]] + list(balances[1]):
+                            tokens.add(_zerion_token(entry[0][0], balance))
+        token_balances = self._query_token_balances(tokens)
+
+        all_balances = {}
+        for account, result in raw_results.items():
+            protocol_balances = self._protocol_balances_from_result(result, token_balances)
+            if len(protocol_balances) != 0:
+                self.empty_accounts.pop(account, None)
+                all_balances[account] = protocol_balances
+
+        return all_balances
+
+    def _query_raw_balances(
+            self,
+            account: ChecksumEthAddress,
+            now: Timestamp,
+    ) -> Tuple[int, Optional[List]]:
+        """Calls the contract's getBalances() for account unless it's known to be empty
+
+        Returns the account's transaction count along with the raw result. The
+        result is None if the account had no DeFi balances at its last query, which
+        was recent enough, and has sent no transaction since.
+        """
+        transaction_count = self.ethereum.get_transaction_count(account)
+        empty_entry = self.empty_accounts.get(account)
+        if (
+            empty_entry is not None and empty_entry[0] == transaction_count and
+            now - empty_entry[1] < ZERION_EMPTY_ACCOUNT_RECHECK_SECONDS
+        ):
+            return transaction_count, None
+
         result = self.contract.call(
             ethereum=self.ethereum,
             method_name='getBalances',
             arguments=[account],
         )
+        return transaction_count, result
+
+    def _protocol_balances_from_result(
+            self,
+            result: List,
+            token_balances: Dict[ZerionToken, DefiBalance],
+    ) -> List[DefiProtocolBalances]:
         protocol_balances = []
         for entry in result:
             protocol = DefiProtocol(
@@ -140,17 +236,18 @@ class Zerion():
                 balance_type = adapter_balance[0][1]  # can be either 'Asset' or 'Debt'
                 for balances in adapter_balance[1]:
                     underlying_balances = []
-                    base_balance = self._get_single_balance(protocol.name, balances[0])
+                    base_balance = _get_single_balance(protocol.name, balances[0], token_balances)
                     for balance in balances[1]:
-                        defi_balance = self._get_single_balance(protocol.name, balance)
+                        defi_balance = _get_single_balance(protocol.name, balance, token_balances)
                         underlying_balances.append(defi_balance)
 
                     if base_balance.balance.usd_value == ZERO:
                         # This can happen. We can't find a price for some assets
                         # such as combined pool assets. But we can instead use
                         # the sum of the usd_value of the underlying_balances
-                        usd_sum = sum(x.balance.usd_value for x in underlying_balances)
-                        base_balance.balance.usd_value = usd_sum  # type: ignore
+                        base_balance.balance.usd_value = sum_fvals(
+                            x.balance.usd_value for x in underlying_balances
+                        )
 
                     protocol_balances.append(DefiProtocolBalances(
                         protocol=protocol,
@@ -161,48 +258,48 @@ class Zerion():
 
         return protocol_balances
 
-    def _get_single_balance(
-            self,
-            protocol_name: str,
-            entry: Tuple[Tuple[str, str, str, int], int],
-    ) -> DefiBalance:
-        metadata = entry[0]
-        balance_value = entry[1]
-        decimals = metadata[3]
-        normalized_value = token_normalized_value_decimals(balance_value, decimals)
-        token_symbol = metadata[2]
-        token_address = to_checksum_address(metadata[0])
-        token_name = metadata[1]
-
-        special_handling = self.handle_protocols(
-            protocol_name=protocol_name,
-            token_symbol=token_symbol,
-            normalized_balance=normalized_value,
-            token_address=token_address,
-            token_name=token_name,
-        )
-        if special_handling:
-            return special_handling
+    def _query_token_balances(self, tokens: Set[ZerionToken]) -> Dict[ZerionToken, DefiBalance]:
+        """Prices each of the given tokens once
 
-        try:
-            asset = Asset(token_symbol)
-            usd_price = Inquirer().find_usd_price(asset)
-        except (UnknownAsset, UnsupportedAsset):
-            if not _is_token_non_standard(token_symbol, token_address):
-                self.msg_aggregator.add_warning(
-                    f'Unsupported asset {token_symbol} with address '
-                    f'{token_address} encountered during DeFi protocol queries',
-                )
-            usd_price = Price(ZERO)
-
-        usd_value = normalized_value * usd_price
-        defi_balance = DefiBalance(
-            token_address=token_address,
-            token_name=token_name,
-            token_symbol=token_symbol,
-            balance=Balance(amount=normalized_value, usd_value=usd_value),
-        )
-        return defi_balance
+        Returns the balance of one unit of each token. Prices are memoized per
+        symbol so that tokens appearing in multiple protocols are priced only once.
+        """
+        usd_prices: Dict[str, Price] = {}
+        token_balances = {}
+        for token in tokens:
+            protocol_name, token_address, token_symbol, token_name = token
+            special_handling = self.handle_protocols(
+                protocol_name=protocol_name,
+                token_symbol=token_symbol,
+                normalized_balance=ONE,
+                token_address=token_address,
+                token_name=token_name,
+            )
+            if special_handling:
+                token_balances[token] = special_handling
+                continue
+
+            usd_price = usd_prices.get(token_symbol)
+            if usd_price is None:
+                try:
+                    usd_price = Inquirer().find_usd_price(Asset(token_symbol))
+                except (UnknownAsset, UnsupportedAsset):
+                    if not _is_token_non_standard(token_symbol, token_address):
+                        self.msg_aggregator.add_warning(
+                            f'Unsupported asset {token_symbol} with address '
+                            f'{token_address} encountered during DeFi protocol queries',
+                        )
+                    usd_price = Price(ZERO)
+                usd_prices[token_symbol] = usd_price
+
+            token_balances[token] = DefiBalance(
+                token_address=token_address,
+                token_name=token_name,
+                token_symbol=token_symbol,
+                balance=Balance(amount=ONE, usd_value=usd_price),
+            )
+
+        return token_balances
 
     def handle_protocols(
             self,
@@ -231,3 +328,26 @@ class Zerion():
             token_symbol=token_symbol,
             balance=Balance(amount=normalized_balance, usd_value=normalized_balance * usd_price),
         )
+
+
+def _zerion_token(
+        protocol_name: str,
+        entry: Tuple[Tuple[str, str, str, int], int],
+) -> ZerionToken:
+    metadata = entry[0]
+    return protocol_name, to_checksum_address(metadata[0]), metadata[2], metadata[1]
+
+
+def _get_single_balance(
+        protocol_name: str,
+        entry: Tuple[Tuple[str, str, str, int], int],
+        token_balances: Dict[ZerionToken, DefiBalance],
+) -> DefiBalance:
+    """Creates the DefiBalance of an adapter balance entry from the priced unit balances"""
+    decimals = entry[0][3]
+    normalized_value = token_normalized_value_decimals(entry[1], decimals)
+    unit_balance = token_balances[_zerion_token(protocol_name, entry)]
+    return unit_balance._replace(balance=Balance(
+        amount=normalized_value,
+        usd_value=normalized_value * unit_balance.balance.usd_value,
+    ))
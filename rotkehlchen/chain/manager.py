@@ -1,5 +1,6 @@
 import logging
 import operator
+import traceback
 from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
@@ -31,6 +32,7 @@ from rotkehlchen.chain.ethereum.eth2 import Eth2DepositResult, get_eth2_staked_a
 from rotkehlchen.chain.ethereum.makerdao import MakerDAODSR, MakerDAOVaults
 from rotkehlchen.chain.ethereum.tokens import EthTokens
 from rotkehlchen.chain.ethereum.uniswap import Uniswap
+from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.chain.ethereum.yearn import YearnVaults
 from rotkehlchen.chain.ethereum.zerion import DefiProtocolBalances, Zerion
 from rotkehlchen.constants.assets import A_BTC, A_DAI, A_ETH, A_ETH2
@@ -200,29 +202,20 @@ class ChainManager(CacheableObject, LockableQueryObject):
         # TODO: Perhaps turn this mapping into a typed dict?
         self.eth_modules: Dict[str, Union[EthereumModule, Literal['loading']]] = {}
         if eth_modules:
+            # The modules are created concurrently since many of them need to contact
+            # a remote server, like a subgraph, when created
+            module_greenlets = {
+                given_module: gevent.spawn(
+                    self._create_module,
+                    name=given_module,
+                    premium=premium,
+                ) for given_module in eth_modules if given_module != 'compound'
+            }
+            # A module that fails to be created is skipped without affecting the others
+            gevent.joinall(list(module_greenlets.values()))
+            # Keep the order in which the modules were given
             for given_module in eth_modules:
-                if given_module == 'makerdao_dsr':
-                    self.eth_modules['makerdao_dsr'] = MakerDAODSR(
-                        ethereum_manager=ethereum_manager,
-                        database=self.database,
-                        premium=premium,
-                        msg_aggregator=msg_aggregator,
-                    )
-                elif given_module == 'makerdao_vaults':
-                    self.eth_modules['makerdao_vaults'] = MakerDAOVaults(
-                        ethereum_manager=ethereum_manager,
-                        database=self.database,
-                        premium=premium,
-                        msg_aggregator=msg_aggregator,
-                    )
-                elif given_module == 'aave':
-                    self.eth_modules['aave'] = Aave(
-                        ethereum_manager=ethereum_manager,
-                        database=self.database,
-                        premium=premium,
-                        msg_aggregator=msg_aggregator,
-                    )
-                elif given_module == 'compound':
+                if given_module == 'compound':
                     self.eth_modules['compound'] = 'loading'
                     # Since Compound initialization needs a few network calls we do it async
                     greenlet_manager.spawn_and_track(
@@ -231,23 +224,11 @@ class ChainManager(CacheableObject, LockableQueryObject):
                         method=self._initialize_compound,
                         premium=premium,
                     )
-                elif given_module == 'uniswap':
-                    self.eth_modules['uniswap'] = Uniswap(
-                        ethereum_manager=ethereum_manager,
-                        database=self.database,
-                        premium=premium,
-                        msg_aggregator=msg_aggregator,
-                        data_directory=self.data_directory,
-                    )
-                elif given_module == 'yearn_vaults':
-                    self.eth_modules['yearn_vaults'] = YearnVaults(
-                        ethereum_manager=ethereum_manager,
-                        database=self.database,
-                        premium=premium,
-                        msg_aggregator=msg_aggregator,
-                    )
-                else:
-                    log.error(f'Unrecognized module value {given_module} given. Skipping...')
+                    continue
+
+                module = module_greenlets[given_module].value
+                if module is not None:
+                    self.eth_modules[given_module] = module
 
         self.premium = premium
         self.greenlet_manager = greenlet_manager
@@ -260,13 +241,83 @@ class ChainManager(CacheableObject, LockableQueryObject):
                 method=module.on_startup,
             )
 
+    def _create_module(self, name: str, premium: Optional[Premium]) -> Optional[EthereumModule]:
+        """Creates the ethereum module with the given name
+
+        Returns None for unknown names or if the module could not be created, in which
+        case the error is reported to the user and the rest of the modules are unaffected.
+        """
+        try:
+            return self._instantiate_module(name=name, premium=premium)
+        except Exception as e:  # pylint: disable=broad-except
+            log.error(
+                f'Failed to initialize the {name} module due to {str(e)}. '
+                f'Traceback:\n{traceback.format_exc()}',
+            )
+            self.msg_aggregator.add_error(
+                f'Failed to initialize the {name} module due to {str(e)}. '
+                f'The module will not be available until the next login',
+            )
+            return None
+
+    def _instantiate_module(
+            self,
+            name: str,
+            premium: Optional[Premium],
+    ) -> Optional[EthereumModule]:
+        if name == 'makerdao_dsr':
+            return MakerDAODSR(
+                ethereum_manager=self.ethereum,
+                database=self.database,
+                premium=premium,
+                msg_aggregator=self.msg_aggregator,
+            )
+        elif name == 'makerdao_vaults':
+            return MakerDAOVaults(
+                ethereum_manager=self.ethereum,
+                database=self.database,
+                premium=premium,
+                msg_aggregator=self.msg_aggregator,
+            )
+        elif name == 'aave':
+            return Aave(
+                ethereum_manager=self.ethereum,
+                database=self.database,
+                premium=premium,
+                msg_aggregator=self.msg_aggregator,
+            )
+        elif name == 'uniswap':
+            return Uniswap(
+                ethereum_manager=self.ethereum,
+                database=self.database,
+                premium=premium,
+                msg_aggregator=self.msg_aggregator,
+                data_directory=self.data_directory,
+            )
+        elif name == 'compound':
+            return Compound(
+                ethereum_manager=self.ethereum,
+                database=self.database,
+                premium=premium,
+                msg_aggregator=self.msg_aggregator,
+            )
+        elif name == 'yearn_vaults':
+            return YearnVaults(
+                ethereum_manager=self.ethereum,
+                database=self.database,
+                premium=premium,
+                msg_aggregator=self.msg_aggregator,
+            )
+
+        log.error(f'Unrecognized module value {name} given. Skipping...')
+        return None
+
     def _initialize_compound(self, premium: Optional[Premium]) -> None:
-        self.eth_modules['compound'] = Compound(
-            ethereum_manager=self.ethereum,
-            database=self.database,
-            premium=premium,
-            msg_aggregator=self.msg_aggregator,
-        )
+        module = self._create_module(name='compound', premium=premium)
+        if module is None:
+            self.eth_modules.pop('compound', None)
+        else:
+            self.eth_modules['compound'] = module
 
     def __del__(self) -> None:
         del self.ethereum
@@ -682,6 +733,7 @@ class ChainManager(CacheableObject, LockableQueryObject):
                         )
                 else:  # remove
                     self.defi_balances.pop(address, None)
+                    self.zerion.empty_accounts.pop(address, None)
                 # For each module run the corresponding callback for the address
                 for _, module in self.iterate_modules():
                     if append_or_remove == 'append':
@@ -739,16 +791,18 @@ class ChainManager(CacheableObject, LockableQueryObject):
                 'token balances but the chain is not synced.',
             )
 
-        # Update the per account token balance and usd value
-        token_totals: Dict[EthereumToken, FVal] = defaultdict(FVal)
+        # Update the per account token balance and usd value. The totals are summed
+        # exactly in the tokens' base units and only normalized once per token
+        token_totals: Dict[EthereumToken, int] = defaultdict(int)
         eth_balances = self.balances.eth
         for account, token_balances in balance_result.items():
-            for token, token_balance in token_balances.items():
+            for token, token_raw_balance in token_balances.items():
                 if token_usd_price[token] == ZERO:
                     # skip tokens that have no price
                     continue
 
-                token_totals[token] += token_balance
+                token_totals[token] += token_raw_balance
+                token_balance = token_normalized_value(token_raw_balance, token)
                 usd_value = token_balance * token_usd_price[token]
                 eth_balances[account].assets[token] = Balance(
                     amount=token_balance,
@@ -756,7 +810,8 @@ class ChainManager(CacheableObject, LockableQueryObject):
                 )
 
         # Update the totals
-        for token, token_total_balance in token_totals.items():
+        for token, token_total_raw_balance in token_totals.items():
+            token_total_balance = token_normalized_value(token_total_raw_balance, token)
             if action == AccountAction.QUERY:
                 self.totals.assets[token] = Balance(
                     amount=token_total_balance,
@@ -798,11 +853,7 @@ class ChainManager(CacheableObject, LockableQueryObject):
                 return self.defi_balances
 
             # query zerion for defi balances
-            self.defi_balances = {}
-            for account in self.accounts.eth:
-                balances = self.zerion.all_balances_for_account(account)
-                if len(balances) != 0:
-                    self.defi_balances[account] = balances
+            self.defi_balances = self.zerion.all_balances_for_accounts(self.accounts.eth)
 
             self.defi_balances_last_query_ts = ts_now()
             return self.defi_balances
@@ -948,6 +999,7 @@ class ChainManager(CacheableObject, LockableQueryObject):
         with self.eth2_lock:
             result = get_eth2_staked_amount(
                 ethereum=self.ethereum,
+                database=self.database,
                 addresses=list(self.balances.eth.keys()),
                 has_premium=self.premium is not None,
                 msg_aggregator=self.msg_aggregator,
@@ -969,6 +1021,7 @@ class ChainManager(CacheableObject, LockableQueryObject):
 
             result = get_eth2_staked_amount(
                 ethereum=self.ethereum,
+                database=self.database,
                 addresses=list(self.balances.eth.keys()),
                 has_premium=self.premium is not None,
                 msg_aggregator=self.msg_aggregator,
@@ -137,3 +137,8 @@ ERC20TOKEN_ABI = EthereumConstants.abi('ERC20_TOKEN')
 FARM_ASSET_ABI = EthereumConstants.abi('FARM_ASSET')
 
 YEARN_VAULTS_PREFIX = 'yearn_vaults_events'
+ETH2_DEPOSITS_PREFIX = 'eth2_deposits'
+COMPOUND_EVENTS_PREFIX = 'compound_events'
+MAKERDAO_VAULT_EVENTS_PREFIX = 'makerdao_vault_events'
+DSR_MOVEMENTS_PREFIX = 'dsr_movements'
+DSR_RATE_CHANGES_RANGE = 'dsr_rate_changes'
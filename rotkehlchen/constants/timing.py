@@ -14,3 +14,6 @@ QUERY_RETRY_TIMES = 5
 # By default 10 minutes.
 # TODO: Make configurable!
 CACHE_RESPONSE_FOR_SECS = 600
+# Seconds after which a cached response is considered too old to be served while it
+# is being refreshed in the background. By default 1 hour.
+CACHE_MAX_STALE_SECS = 3600
@@ -1,5 +1,6 @@
 import base64
 from binascii import hexlify
+from typing import Iterable, Iterator
 
 from coincurve import PrivateKey
 from Crypto import Random
@@ -23,6 +24,29 @@ def encrypt(key: bytes, source: bytes) -> str:
     return base64.b64encode(data).decode("latin-1")
 
 
+def encrypt_chunks(key: bytes, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Same encryption as encrypt() but for source data given in chunks
+
+    Yields the iv and then the encrypted blocks, without any base64 encoding,
+    so that the whole source never needs to be in memory.
+    """
+    assert isinstance(key, bytes), 'key should be given in bytes'
+    key = SHA256.new(key).digest()  # use SHA-256 over our key to get a proper-sized AES key
+    iv = Random.new().read(AES.block_size)  # generate iv
+    encryptor = AES.new(key, AES.MODE_CBC, iv)
+    yield iv
+    pending = b''
+    for chunk in chunks:
+        pending += chunk
+        full_blocks_size = len(pending) - len(pending) % AES.block_size
+        if full_blocks_size != 0:
+            yield encryptor.encrypt(pending[:full_blocks_size])
+            pending = pending[full_blocks_size:]
+
+    padding = AES.block_size - len(pending) % AES.block_size  # calculate needed padding
+    yield encryptor.encrypt(pending + bytes([padding]) * padding)
+
+
 def decrypt(key: bytes, given_source: str) -> bytes:
     """
     Decrypts the given source data we with the given key.
@@ -161,7 +161,7 @@ class DataImporter():
             )
 
     def import_cointracking_csv(self, filepath: Path) -> None:
-        with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
+        with open(filepath, 'r', encoding='utf-8-sig') as csvfile, self.db.write_batch():
             data = csv.reader(csvfile, delimiter=',', quotechar='"')
             header = remap_header(next(data))
             for row in data:
@@ -374,7 +374,7 @@ class DataImporter():
                 self.db.add_trades([trade])
 
     def import_cryptocom_csv(self, filepath: Path) -> None:
-        with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
+        with open(filepath, 'r', encoding='utf-8-sig') as csvfile, self.db.write_batch():
             data = csv.DictReader(csvfile)
             self._import_cryptocom_swap(data)
             # reset the iterator
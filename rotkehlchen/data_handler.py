@@ -1,15 +1,16 @@
 import base64
 import hashlib
+import io
 import logging
 import shutil
 import tempfile
 import time
 import zlib
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from rotkehlchen.assets.asset import Asset
-from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.crypto import decrypt, encrypt_chunks
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.errors import AuthenticationError, SystemPermissionError
@@ -22,6 +23,8 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 DEFAULT_START_DATE = "01/08/2015"
+# Size of the chunks in which the plaintext DB is read when preparing it for upload
+DB_EXPORT_CHUNK_SIZE = 1024 * 1024
 
 
 class DataHandler():
@@ -185,21 +188,39 @@ class DataHandler():
         """Decrypt the DB, dump in temporary plaintextdb, compress it,
         and then re-encrypt it
 
+        The plaintext DB is read, hashed, compressed and encrypted in chunks
+        so that only the final encoded blob is kept in memory.
+
         Returns a b64 encoded binary blob"""
         log.info('Compress and encrypt DB')
+        data_hash = hashlib.sha256()
+        compressor = zlib.compressobj(level=9)
+        encoded_data = io.BytesIO()
         with tempfile.TemporaryDirectory() as tmpdirname:
             tempdb = Path(tmpdirname) / 'temp.db'
             self.db.export_unencrypted(tempdb)
-            with open(tempdb, 'rb') as f:
-                data_blob = f.read()
-
-        original_data_hash = base64.b64encode(
-            hashlib.sha256(data_blob).digest(),
-        ).decode()
-        compressed_data = zlib.compress(data_blob, level=9)
-        encrypted_data = encrypt(password.encode(), compressed_data)
 
-        return B64EncodedBytes(encrypted_data.encode()), original_data_hash
+            def compressed_chunks() -> Iterator[bytes]:
+                with open(tempdb, 'rb') as f:
+                    while True:
+                        chunk = f.read(DB_EXPORT_CHUNK_SIZE)
+                        if len(chunk) == 0:
+                            break
+                        data_hash.update(chunk)
+                        yield compressor.compress(chunk)
+                yield compressor.flush()
+
+            # base64 encodes groups of 3 bytes so only those can be encoded right away
+            pending = b''
+            for encrypted_chunk in encrypt_chunks(password.encode(), compressed_chunks()):
+                pending += encrypted_chunk
+                encodable_size = len(pending) - len(pending) % 3
+                encoded_data.write(base64.b64encode(pending[:encodable_size]))
+                pending = pending[encodable_size:]
+            encoded_data.write(base64.b64encode(pending))
+
+        original_data_hash = base64.b64encode(data_hash.digest()).decode()
+        return B64EncodedBytes(encoded_data.getvalue()), original_data_hash
 
     def decompress_and_decrypt_db(self, password: str, encrypted_data: B64EncodedString) -> None:
         """Decrypt and decompress the encrypted data we receive from the server
@@ -216,6 +237,7 @@ class DataHandler():
 
         # First make a backup of the DB we are about to replace
         date = timestamp_to_date(ts=ts_now(), formatstr='%Y_%m_%d_%H_%M_%S')
+        self.db.checkpoint()
         shutil.copyfile(
             self.data_directory / self.username / 'rotkehlchen.db',
             self.data_directory / self.username / f'rotkehlchen_db_{date}.backup',
@@ -4,11 +4,27 @@ import os
 import re
 import shutil
 import tempfile
+from collections import defaultdict
+from contextlib import contextmanager
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union, cast
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
+import gevent
 from eth_utils import is_checksum_address
+from gevent import Greenlet
 from pysqlcipher3 import dbapi2 as sqlcipher
 from typing_extensions import Literal
 
@@ -23,6 +39,12 @@ from rotkehlchen.chain.bitcoin.xpub import (
 )
 from rotkehlchen.chain.ethereum.structures import (
     AaveEvent,
+    CompoundEvent,
+    DSRMovement,
+    DSRRateChange,
+    Eth2DepositEvent,
+    VaultEvent,
+    VaultEventType,
     YearnVault,
     YearnVaultEvent,
     aave_event_from_db,
@@ -30,8 +52,13 @@ from rotkehlchen.chain.ethereum.structures import (
 from rotkehlchen.chain.ethereum.trades import AMMSwap
 from rotkehlchen.chain.ethereum.uniswap import UNISWAP_TRADES_PREFIX
 from rotkehlchen.constants.assets import A_USD, S_BTC, S_ETH
-from rotkehlchen.constants.ethereum import YEARN_VAULTS_PREFIX
-from rotkehlchen.db.schema import DB_SCRIPT_CREATE_TABLES
+from rotkehlchen.constants.ethereum import (
+    COMPOUND_EVENTS_PREFIX,
+    DSR_MOVEMENTS_PREFIX,
+    ETH2_DEPOSITS_PREFIX,
+    YEARN_VAULTS_PREFIX,
+)
+from rotkehlchen.db.schema import DB_SCRIPT_CREATE_INDICES, DB_SCRIPT_CREATE_TABLES
 from rotkehlchen.db.settings import (
     DEFAULT_PREMIUM_SHOULD_SYNC,
     ROTKEHLCHEN_DB_VERSION,
@@ -43,12 +70,16 @@ from rotkehlchen.db.upgrade_manager import DBUpgradeManager
 from rotkehlchen.db.utils import (
     AssetBalance,
     BlockchainAccounts,
+    DBPagination,
     DBStartupAction,
     LocationData,
     SingleAssetBalance,
     Tag,
     deserialize_tags_from_db,
+    escape_like_pattern,
+    form_count_query_with_filters,
     form_query_to_filter_timestamps,
+    form_query_with_filters,
     insert_tag_mappings,
     str_to_bool,
 )
@@ -82,6 +113,7 @@ from rotkehlchen.typing import (
     ApiCredentials,
     ApiKey,
     ApiSecret,
+    AssetMovementCategory,
     BlockchainAccountData,
     BTCAddress,
     ChecksumEthAddress,
@@ -93,9 +125,10 @@ from rotkehlchen.typing import (
     Location,
     SupportedBlockchain,
     Timestamp,
+    TradeType,
 )
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.hashing import file_md5
+from rotkehlchen.utils.hashing import file_fingerprint, file_md5
 from rotkehlchen.utils.misc import ts_now
 from rotkehlchen.utils.serialization import rlk_jsondumps, rlk_jsonloads_dict
 
@@ -104,6 +137,10 @@ log = RotkehlchenLogsAdapter(logger)
 
 KDF_ITER = 64000
 DBINFO_FILENAME = 'dbinfo.json'
+# Stays below the default SQLITE_MAX_VARIABLE_NUMBER of 999 for IN (...) queries
+SQL_VARIABLES_CHUNK_SIZE = 500
+
+DBFilters = List[Tuple[str, Tuple[Any, ...]]]
 
 DBTupleType = Literal[
     'trade',
@@ -137,45 +174,6 @@ def detect_sqlcipher_version() -> int:
     return sqlcipher_version
 
 
-def db_tuple_to_str(
-        data: Tuple[Any, ...],
-        tuple_type: DBTupleType,
-) -> str:
-    """Turns a tuple DB entry for trade, or asset_movement into a user readable string
-
-    This is only intended for error messages.
-
-    TODO: Add some unit tests
-    """
-    if tuple_type == 'trade':
-        return (
-            f'{deserialize_trade_type_from_db(data[4])} trade with id {data[0]} '
-            f'in {deserialize_location_from_db(data[2])} and pair {data[3]} '
-            f'at timestamp {data[1]}'
-        )
-    elif tuple_type == 'asset_movement':
-        return (
-            f'{deserialize_asset_movement_category_from_db(data[2])} of '
-            f' {data[4]} with id {data[0]} '
-            f'in {deserialize_location_from_db(data[1])} at timestamp {data[3]}'
-        )
-    elif tuple_type == 'margin_position':
-        return (
-            f'Margin position with id {data[0]} in  {deserialize_location_from_db(data[1])} '
-            f'for {data[5]} closed at timestamp {data[3]}'
-        )
-    elif tuple_type == 'ethereum_transaction':
-        return f'Ethereum transaction with hash "{data[0].hex()}"'
-
-    elif tuple_type == 'amm_swap':
-        return (
-            f'AMM swap with id {data[0]}-{data[1]} '
-            f'in {deserialize_location_from_db(data[6])} '
-        )
-
-    raise AssertionError('db_tuple_to_str() called with invalid tuple_type {tuple_type}')
-
-
 # https://stackoverflow.com/questions/4814167/storing-time-series-data-relational-or-non
 # http://www.sql-join.com/sql-join-types
 class DBHandler:
@@ -198,6 +196,10 @@ class DBHandler:
         self.user_data_dir = user_data_dir
         self.sqlcipher_version = detect_sqlcipher_version()
         self.last_write_ts: Optional[Timestamp] = None
+        # Greenlet owning the active write batch and its depth. See write_batch()
+        self._write_batch_owner: Optional[Greenlet] = None
+        self._write_batch_depth = 0
+        self._last_write_pending = False
         action = self.read_info_at_start()
         if action == DBStartupAction.UPGRADE_3_4:
             result, msg = self.upgrade_db_sqlcipher_3_to_4(password)
@@ -227,7 +229,10 @@ class DBHandler:
     def __del__(self) -> None:
         self.disconnect()
         try:
-            dbinfo = {'sqlcipher_version': self.sqlcipher_version, 'md5_hash': self.get_md5hash()}
+            dbinfo = {
+                'sqlcipher_version': self.sqlcipher_version,
+                'fingerprint': self.get_fingerprint(),
+            }
         except (SystemPermissionError, FileNotFoundError) as e:
             # If there is problems opening the DB at destruction just log and exit
             log.error(f'At DB teardown could not open the DB: {str(e)}')
@@ -264,8 +269,18 @@ class DBHandler:
                 )
                 raise AuthenticationError('Wrong password or invalid/corrupt database for user')
 
+        # Upgrades back up and restore the DB file by copying it, so they need all
+        # changes to be in that file. The WAL journal mode persists in the DB file
+        # so switch to the rollback journal, which also checkpoints the WAL.
+        self.conn.execute('PRAGMA journal_mode=DELETE;')
         # Run upgrades if needed
         DBUpgradeManager(self).run_upgrades()
+        self.conn.executescript(DB_SCRIPT_CREATE_INDICES)
+        # With WAL a commit only appends the changed pages to the WAL file, and with
+        # synchronous=NORMAL that file is only synced at checkpoints. Both read the
+        # DB file so they can only run once the key is known to be correct.
+        self.conn.execute('PRAGMA journal_mode=WAL;')
+        self.conn.execute('PRAGMA synchronous=NORMAL;')
 
     def get_md5hash(self) -> str:
         """Get the md5hash of the DB
@@ -277,6 +292,30 @@ class DBHandler:
         assert no_active_connection, 'md5hash should be taken only with a closed DB'
         return file_md5(self.user_data_dir / 'rotkehlchen.db')
 
+    def get_fingerprint(self) -> str:
+        """Get a fingerprint of the DB file that is cheap to compute even for big DBs
+
+        May raise:
+        - SystemPermissionError if there are permission errors when accessing the DB
+        """
+        no_active_connection = not hasattr(self, 'conn') or not self.conn
+        assert no_active_connection, 'fingerprint should be taken only with a closed DB'
+        return file_fingerprint(self.user_data_dir / 'rotkehlchen.db')
+
+    def _dbinfo_matches_db(self, dbinfo: Dict[str, Any]) -> bool:
+        """Checks that the DB file was not changed since dbinfo was written
+
+        Older dbinfo files only contain the md5 hash of the whole DB, so only
+        for them do we have to read the whole file.
+
+        May raise:
+        - SystemPermissionError if there are permission errors when accessing the DB
+        """
+        if 'fingerprint' in dbinfo:
+            return dbinfo['fingerprint'] == self.get_fingerprint()
+
+        return dbinfo['md5_hash'] == self.get_md5hash()
+
     def read_info_at_start(self) -> DBStartupAction:
         """Read some metadata info at initialization
 
@@ -296,27 +335,25 @@ class DBHandler:
             except JSONDecodeError:
                 log.warning('dbinfo.json file is corrupt. Does not contain expected keys')
                 return action
-        current_md5_hash = self.get_md5hash()
 
         if not dbinfo:
             return action
 
-        if 'sqlcipher_version' not in dbinfo or 'md5_hash' not in dbinfo:
+        has_db_hash = 'fingerprint' in dbinfo or 'md5_hash' in dbinfo
+        if 'sqlcipher_version' not in dbinfo or not has_db_hash:
             log.warning('dbinfo.json file is corrupt. Does not contain expected keys')
             return action
 
-        if dbinfo['md5_hash'] != current_md5_hash:
+        if dbinfo['sqlcipher_version'] == self.sqlcipher_version:
+            # Nothing to do whether the DB changed since or not, so don't check it
+            return DBStartupAction.NOTHING
+
+        if not self._dbinfo_matches_db(dbinfo):
             log.warning(
                 'dbinfo.json contains an outdated hash. Was data changed outside the program?',
             )
             return action
 
-        if dbinfo['sqlcipher_version'] == 3 and self.sqlcipher_version == 3:
-            return DBStartupAction.NOTHING
-
-        if dbinfo['sqlcipher_version'] == 4 and self.sqlcipher_version == 4:
-            return DBStartupAction.NOTHING
-
         if dbinfo['sqlcipher_version'] == 3 and self.sqlcipher_version == 4:
             return DBStartupAction.UPGRADE_3_4
 
@@ -343,7 +380,7 @@ class DBHandler:
             'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
             ('version', str(version)),
         )
-        self.conn.commit()
+        self._commit()
 
     def connect(self, password: str) -> None:
         """Connect to the DB using password
@@ -408,6 +445,11 @@ class DBHandler:
             self.conn.close()
             self.conn = None
 
+    def checkpoint(self) -> None:
+        """Moves all changes of the WAL file into the DB file so that the
+        DB file can be copied on its own"""
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE);')
+
     def export_unencrypted(self, temppath: Path) -> None:
         self.conn.executescript(
             'ATTACH DATABASE "{}" AS plaintext KEY "";'
@@ -458,8 +500,14 @@ class DBHandler:
         (self.user_data_dir / 'rotkehlchen_temp_backup.db').unlink()
 
     def update_last_write(self) -> None:
+        """Saves the last write timestamp and commits the current transaction
+        along with it. Inside a write batch both happen once when the batch ends."""
         # Also keep it in memory for faster querying
         self.last_write_ts = ts_now()
+        if self._in_write_batch():
+            self._last_write_pending = True
+            return
+
         cursor = self.conn.cursor()
         cursor.execute(
             'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
@@ -467,6 +515,51 @@ class DBHandler:
         )
         self.conn.commit()
 
+    def _in_write_batch(self) -> bool:
+        """Whether the current greenlet is inside a write batch it started"""
+        return self._write_batch_depth != 0 and self._write_batch_owner is gevent.getcurrent()
+
+    def _commit(self) -> None:
+        """Commits the current transaction unless inside a write batch"""
+        if not self._in_write_batch():
+            self.conn.commit()
+
+    @contextmanager
+    def write_batch(self) -> Iterator[None]:
+        """Groups all the DB writes done inside the context in a single transaction
+
+        The commits and last write updates of the DB writes are deferred until the
+        outermost batch exits, where they are done once. On SQLCipher each commit
+        encrypts and syncs the changed pages so this should wrap code doing many
+        writes in a row.
+
+        Only the commits of the greenlet that started the batch are deferred. Other
+        greenlets keep committing as usual, which also commits the batch's writes so
+        far since the connection is shared. If another greenlet asks for a batch while
+        one is active its writes are simply not batched.
+
+        Writes done before an error are still committed when the batch exits,
+        just as they would have been without the batch.
+        """
+        current = gevent.getcurrent()
+        if self._write_batch_depth != 0 and self._write_batch_owner is not current:
+            yield
+            return
+
+        self._write_batch_owner = current
+        self._write_batch_depth += 1
+        try:
+            yield
+        finally:
+            self._write_batch_depth -= 1
+            if self._write_batch_depth == 0:
+                self._write_batch_owner = None
+                if self._last_write_pending:
+                    self._last_write_pending = False
+                    self.update_last_write()
+                else:
+                    self.conn.commit()
+
     def get_last_write_ts(self) -> Timestamp:
         cursor = self.conn.cursor()
         query = cursor.execute(
@@ -481,13 +574,14 @@ class DBHandler:
         return Timestamp(ts)
 
     def update_last_data_upload_ts(self, ts: Timestamp) -> None:
+        """Saves the last data upload timestamp. This does not count as a write
+        since otherwise the DB would always look modified after an upload"""
         cursor = self.conn.cursor()
         cursor.execute(
             'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
             ('last_data_upload_ts', str(ts)),
         )
-        self.conn.commit()
-        self.update_last_write()
+        self._commit()
 
     def get_last_data_upload_ts(self) -> Timestamp:
         cursor = self.conn.cursor()
@@ -508,7 +602,6 @@ class DBHandler:
             'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
             ('premium_should_sync', str(should_sync)),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def get_premium_sync(self) -> bool:
@@ -558,7 +651,6 @@ class DBHandler:
             'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
             list(settings_dict.items()),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def add_external_service_credentials(
@@ -570,7 +662,6 @@ class DBHandler:
             'INSERT OR REPLACE INTO external_service_credentials(name, api_key) VALUES(?, ?)',
             [c.serialize_for_db() for c in credentials],
         )
-        self.conn.commit()
         self.update_last_write()
 
     def delete_external_service_credentials(self, services: List[ExternalService]) -> None:
@@ -579,7 +670,7 @@ class DBHandler:
             'DELETE FROM external_service_credentials WHERE name=?;',
             [(service.name.lower(),) for service in services],
         )
-        self.conn.commit()
+        self._commit()
 
     def get_all_external_service_credentials(self) -> List[ExternalServiceApiCredentials]:
         """Returns a list with all the external service credentials saved in the DB"""
@@ -622,7 +713,6 @@ class DBHandler:
             'INSERT INTO multisettings(name, value) VALUES(?, ?)',
             ('ignored_asset', asset.identifier),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def remove_from_ignored_assets(self, asset: Asset) -> None:
@@ -631,7 +721,7 @@ class DBHandler:
             'DELETE FROM multisettings WHERE name="ignored_asset" AND value=?;',
             (asset.identifier,),
         )
-        self.conn.commit()
+        self._commit()
 
     def get_ignored_assets(self) -> List[Asset]:
         cursor = self.conn.cursor()
@@ -658,7 +748,6 @@ class DBHandler:
                     f' already existing timestamp {entry.time}. Skipping.',
                 )
                 continue
-        self.conn.commit()
         self.update_last_write()
 
     def add_aave_events(self, address: ChecksumEthAddress, events: Sequence[AaveEvent]) -> None:
@@ -692,7 +781,6 @@ class DBHandler:
                 )
                 continue
 
-        self.conn.commit()
         self.update_last_write()
 
     def get_aave_events(
@@ -737,12 +825,46 @@ class DBHandler:
 
         return events
 
+    def set_aave_interest_state(
+            self,
+            address: ChecksumEthAddress,
+            atoken_balances: Dict[Asset, FVal],
+    ) -> None:
+        """Saves the aToken balances per reserve calculated by the last aave graph query"""
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            'INSERT OR REPLACE INTO aave_interest_state(address, asset, atoken_balance) '
+            'VALUES (?, ?, ?)',
+            [(address, asset.identifier, str(x)) for asset, x in atoken_balances.items()],
+        )
+        self.update_last_write()
+
+    def get_aave_interest_state(self, address: ChecksumEthAddress) -> Dict[Asset, FVal]:
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT asset, atoken_balance FROM aave_interest_state WHERE address=?;',
+            (address,),
+        )
+        atoken_balances = {}
+        for result in query:
+            try:
+                asset = Asset(result[0])
+            except UnknownAsset as e:
+                self.msg_aggregator.add_warning(
+                    f'Unknown asset {e.asset_name} found in the saved aave interest state. '
+                    f'Ignoring it',
+                )
+                continue
+            atoken_balances[asset] = FVal(result[1])
+
+        return atoken_balances
+
     def delete_aave_data(self) -> None:
         """Delete all historical aave event data"""
         cursor = self.conn.cursor()
         cursor.execute('DELETE FROM aave_events;')
+        cursor.execute('DELETE FROM aave_interest_state;')
         cursor.execute('DELETE FROM used_query_ranges WHERE name LIKE "aave_events%";')
-        self.conn.commit()
         self.update_last_write()
 
     def delete_uniswap_data(self) -> None:
@@ -752,7 +874,6 @@ class DBHandler:
             f'DELETE FROM amm_swaps WHERE location="{Location.UNISWAP.serialize_for_db()}";',
         )
         cursor.execute('DELETE FROM used_query_ranges WHERE name LIKE "uniswap%";')
-        self.conn.commit()
         self.update_last_write()
 
     def add_yearn_vaults_events(
@@ -809,7 +930,6 @@ class DBHandler:
                     f'Event data: {event_tuple}. Skipping...',
                 )
 
-        self.conn.commit()
         self.update_last_write()
 
     def get_yearn_vaults_events(
@@ -860,9 +980,381 @@ class DBHandler:
         cursor = self.conn.cursor()
         cursor.execute('DELETE FROM yearn_vaults_events;')
         cursor.execute(f'DELETE FROM used_query_ranges WHERE name LIKE "{YEARN_VAULTS_PREFIX}%";')
-        self.conn.commit()
         self.update_last_write()
 
+    def add_compound_events(self, events: List[CompoundEvent]) -> None:
+        cursor = self.conn.cursor()
+        for e in events:
+            event_tuple = (
+                e.address,
+                e.event_type,
+                e.block_number,
+                e.timestamp,
+                e.asset.identifier,
+                str(e.value.amount),
+                str(e.value.usd_value),
+                e.to_asset.identifier if e.to_asset else None,
+                str(e.to_value.amount) if e.to_value else None,
+                str(e.to_value.usd_value) if e.to_value else None,
+                str(e.realized_pnl.amount) if e.realized_pnl else None,
+                str(e.realized_pnl.usd_value) if e.realized_pnl else None,
+                e.tx_hash,
+                e.log_index,
+            )
+            try:
+                cursor.execute(
+                    'INSERT INTO compound_events( '
+                    'address, '
+                    'event_type, '
+                    'block_number, '
+                    'timestamp, '
+                    'asset, '
+                    'value_amount, '
+                    'value_usd_value, '
+                    'to_asset, '
+                    'to_value_amount, '
+                    'to_value_usd_value, '
+                    'realized_pnl_amount, '
+                    'realized_pnl_usd_value, '
+                    'tx_hash, '
+                    'log_index) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    event_tuple,
+                )
+            except sqlcipher.IntegrityError:  # pylint: disable=no-member
+                self.msg_aggregator.add_warning(
+                    f'Tried to add a compound event that already exists in the DB. '
+                    f'Event data: {event_tuple}. Skipping...',
+                )
+
+        self.update_last_write()
+
+    def has_compound_events(self, address: ChecksumEthAddress) -> bool:
+        """Returns whether any compound events of the address are stored"""
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT EXISTS(SELECT 1 FROM compound_events WHERE address=?);',
+            (address,),
+        )
+        return query.fetchone()[0] == 1
+
+    def get_compound_events(
+            self,
+            address: ChecksumEthAddress,
+            from_ts: Optional[Timestamp] = None,
+            to_ts: Optional[Timestamp] = None,
+    ) -> List[CompoundEvent]:
+        """Get the stored compound events of a single address ordered by time
+
+        If from_ts and to_ts are given only the events between them are returned
+        """
+        cursor = self.conn.cursor()
+        querystr = (
+            'SELECT '
+            'address, '
+            'event_type, '
+            'block_number, '
+            'timestamp, '
+            'asset, '
+            'value_amount, '
+            'value_usd_value, '
+            'to_asset, '
+            'to_value_amount, '
+            'to_value_usd_value, '
+            'realized_pnl_amount, '
+            'realized_pnl_usd_value, '
+            'tx_hash, '
+            'log_index '
+            'FROM compound_events WHERE address=?'
+        )
+        bindings: Tuple = (address,)
+        if from_ts is not None and to_ts is not None:
+            querystr += ' AND timestamp BETWEEN ? AND ?'
+            bindings = (address, from_ts, to_ts)
+        querystr += ' ORDER BY timestamp ASC, log_index ASC;'
+        query = cursor.execute(querystr, bindings)
+        events = []
+        for result in query:
+            try:
+                asset = Asset(result[4])
+                to_asset = Asset(result[7]) if result[7] is not None else None
+            except UnknownAsset as e:
+                self.msg_aggregator.add_warning(
+                    f'Found compound event with unknown asset {e.asset_name} in the DB. '
+                    f'Skipping it.',
+                )
+                continue
+
+            to_value = None
+            if result[8] is not None:
+                to_value = Balance(amount=FVal(result[8]), usd_value=FVal(result[9]))
+            realized_pnl = None
+            if result[10] is not None:
+                realized_pnl = Balance(amount=FVal(result[10]), usd_value=FVal(result[11]))
+            events.append(CompoundEvent(
+                event_type=result[1],
+                address=result[0],
+                block_number=result[2],
+                timestamp=Timestamp(result[3]),
+                asset=asset,
+                value=Balance(amount=FVal(result[5]), usd_value=FVal(result[6])),
+                to_asset=to_asset,
+                to_value=to_value,
+                realized_pnl=realized_pnl,
+                tx_hash=result[12],
+                log_index=result[13],
+            ))
+
+        return events
+
+    def delete_compound_data(self) -> None:
+        """Delete all historical compound event data"""
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM compound_events;')
+        cursor.execute(
+            f'DELETE FROM used_query_ranges WHERE name LIKE "{COMPOUND_EVENTS_PREFIX}%";',
+        )
+        self.update_last_write()
+
+    def add_makerdao_vault_events(self, vault_identifier: int, events: List[VaultEvent]) -> None:
+        cursor = self.conn.cursor()
+        for e in events:
+            event_tuple = (
+                vault_identifier,
+                e.event_type.value,
+                str(e.value.amount),
+                str(e.value.usd_value),
+                e.timestamp,
+                e.tx_hash,
+                e.log_index,
+            )
+            try:
+                cursor.execute(
+                    'INSERT INTO makerdao_vault_events( '
+                    'vault_identifier, '
+                    'event_type, '
+                    'amount, '
+                    'usd_value, '
+                    'timestamp, '
+                    'tx_hash, '
+                    'log_index) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    event_tuple,
+                )
+            except sqlcipher.IntegrityError:  # pylint: disable=no-member
+                self.msg_aggregator.add_warning(
+                    f'Tried to add a makerdao vault event that already exists in the DB. '
+                    f'Event data: {event_tuple}. Skipping...',
+                )
+
+        self.update_last_write()
+
+    def get_makerdao_vault_events(self, vault_identifier: int) -> List[VaultEvent]:
+        """Get the stored events of a makerdao vault ordered by time and type"""
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT event_type, amount, usd_value, timestamp, tx_hash, log_index '
+            'FROM makerdao_vault_events WHERE vault_identifier=? '
+            'ORDER BY timestamp ASC, event_type ASC, log_index ASC;',
+            (vault_identifier,),
+        )
+        return [VaultEvent(
+            event_type=VaultEventType(result[0]),
+            value=Balance(amount=FVal(result[1]), usd_value=FVal(result[2])),
+            timestamp=Timestamp(result[3]),
+            tx_hash=result[4],
+            log_index=result[5],
+        ) for result in query]
+
+    def add_makerdao_vault_creation(self, vault_identifier: int, creation_ts: Timestamp) -> None:
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'INSERT OR REPLACE INTO makerdao_vault_creations(identifier, creation_ts) '
+            'VALUES (?, ?)',
+            (vault_identifier, creation_ts),
+        )
+        self.update_last_write()
+
+    def get_makerdao_vault_creation_ts(self, vault_identifier: int) -> Optional[Timestamp]:
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT creation_ts FROM makerdao_vault_creations WHERE identifier=?;',
+            (vault_identifier,),
+        )
+        result = query.fetchall()
+        if len(result) == 0:
+            return None
+        return Timestamp(result[0][0])
+
+    def add_dsr_movements(self, movements: List[DSRMovement]) -> None:
+        cursor = self.conn.cursor()
+        for m in movements:
+            movement_tuple = (
+                m.address,
+                m.movement_type,
+                str(m.normalized_balance),
+                str(m.amount),
+                str(m.amount_usd_value),
+                m.block_number,
+                m.timestamp,
+                m.tx_hash,
+                m.log_index,
+            )
+            try:
+                cursor.execute(
+                    'INSERT INTO dsr_movements( '
+                    'address, '
+                    'movement_type, '
+                    'normalized_balance, '
+                    'amount, '
+                    'amount_usd_value, '
+                    'block_number, '
+                    'timestamp, '
+                    'tx_hash, '
+                    'log_index) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    movement_tuple,
+                )
+            except sqlcipher.IntegrityError:  # pylint: disable=no-member
+                self.msg_aggregator.add_warning(
+                    f'Tried to add a DSR movement that already exists in the DB. '
+                    f'Movement data: {movement_tuple}. Skipping...',
+                )
+
+        self.update_last_write()
+
+    def get_dsr_movements(self, address: ChecksumEthAddress) -> List[DSRMovement]:
+        """Get the stored DSR movements of an address ordered by block and log index
+
+        The gain so far of each movement is not stored and needs to be calculated
+        by the caller
+        """
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT movement_type, normalized_balance, amount, amount_usd_value, '
+            'block_number, timestamp, tx_hash, log_index '
+            'FROM dsr_movements WHERE address=? ORDER BY block_number ASC, log_index ASC;',
+            (address,),
+        )
+        return [DSRMovement(
+            movement_type=result[0],
+            address=address,
+            normalized_balance=int(result[1]),
+            amount=int(result[2]),
+            amount_usd_value=FVal(result[3]),
+            block_number=result[4],
+            timestamp=Timestamp(result[5]),
+            tx_hash=result[6],
+            log_index=result[7],
+        ) for result in query]
+
+    def add_dsr_rate_changes(self, rate_changes: List[DSRRateChange]) -> None:
+        cursor = self.conn.cursor()
+        for change in rate_changes:
+            change_tuple = (
+                change.block_number,
+                change.log_index,
+                change.timestamp,
+                str(change.dsr),
+                str(change.chi),
+            )
+            try:
+                cursor.execute(
+                    'INSERT INTO dsr_rate_changes( '
+                    'block_number, log_index, timestamp, dsr, chi) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    change_tuple,
+                )
+            except sqlcipher.IntegrityError:  # pylint: disable=no-member
+                self.msg_aggregator.add_warning(
+                    f'Tried to add a DSR rate change that already exists in the DB. '
+                    f'Rate change data: {change_tuple}. Skipping...',
+                )
+
+        self.update_last_write()
+
+    def get_dsr_rate_changes(self) -> List[DSRRateChange]:
+        """Get all stored DSR rate changes ordered by block and log index"""
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT block_number, log_index, timestamp, dsr, chi FROM dsr_rate_changes '
+            'ORDER BY block_number ASC, log_index ASC;',
+        )
+        return [DSRRateChange(
+            block_number=result[0],
+            log_index=result[1],
+            timestamp=Timestamp(result[2]),
+            dsr=int(result[3]),
+            chi=int(result[4]),
+        ) for result in query]
+
+    def add_eth2_deposits(self, deposits: List[Eth2DepositEvent]) -> None:
+        cursor = self.conn.cursor()
+        for deposit in deposits:
+            deposit_tuple = (
+                deposit.tx_hash,
+                deposit.log_index,
+                deposit.from_address,
+                deposit.timestamp,
+                deposit.pubkey,
+                deposit.withdrawal_credentials,
+                str(deposit.amount),
+                deposit.validator_index,
+            )
+            try:
+                cursor.execute(
+                    'INSERT INTO eth2_deposits( '
+                    'tx_hash, '
+                    'log_index, '
+                    'from_address, '
+                    'timestamp, '
+                    'pubkey, '
+                    'withdrawal_credentials, '
+                    'amount, '
+                    'validator_index) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    deposit_tuple,
+                )
+            except sqlcipher.IntegrityError:  # pylint: disable=no-member
+                self.msg_aggregator.add_warning(
+                    f'Tried to add an eth2 deposit that already exists in the DB. '
+                    f'Deposit data: {deposit_tuple}. Skipping...',
+                )
+
+        self.update_last_write()
+
+    def get_eth2_deposits(self, addresses: List[ChecksumEthAddress]) -> List[Eth2DepositEvent]:
+        """Get the eth2 deposits made by any of the given addresses ordered by time"""
+        if len(addresses) == 0:
+            return []
+
+        cursor = self.conn.cursor()
+        questionmarks = ','.join('?' * len(addresses))
+        query = cursor.execute(
+            'SELECT '
+            'tx_hash, '
+            'log_index, '
+            'from_address, '
+            'timestamp, '
+            'pubkey, '
+            'withdrawal_credentials, '
+            'amount, '
+            'validator_index '
+            f'FROM eth2_deposits WHERE from_address IN ({questionmarks}) '
+            'ORDER BY timestamp ASC, log_index ASC;',
+            addresses,
+        )
+        return [Eth2DepositEvent(
+            from_address=result[2],
+            pubkey=result[4],
+            withdrawal_credentials=result[5],
+            amount=FVal(result[6]),
+            validator_index=result[7],
+            tx_hash=result[0],
+            log_index=result[1],
+            timestamp=Timestamp(result[3]),
+        ) for result in query]
+
     def get_used_query_range(self, name: str) -> Optional[Tuple[Timestamp, Timestamp]]:
         """Get the last start/end timestamp range that has been queried for name
 
@@ -872,6 +1364,7 @@ class DBHandler:
         - {exchange_name}_asset_movements
         - aave_events_{address}
         - yearn_vaults_events_{address}
+        - eth2_deposits_{address}
         """
         cursor = self.conn.cursor()
         query = cursor.execute(
@@ -890,7 +1383,6 @@ class DBHandler:
             'DELETE FROM used_query_ranges WHERE name LIKE ? ESCAPE ?;',
             (f'{exchange_name}\\_%', '\\'),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def purge_exchange_data(self, exchange_name: str) -> None:
@@ -904,7 +1396,6 @@ class DBHandler:
             'DELETE FROM asset_movements WHERE location = ?;',
             (deserialize_location(exchange_name).serialize_for_db(),),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def purge_ethereum_transaction_data(self) -> None:
@@ -915,7 +1406,6 @@ class DBHandler:
             ('ethtxs\\_%', '\\'),
         )
         cursor.execute('DELETE FROM ethereum_transactions;')
-        self.conn.commit()
         self.update_last_write()
 
     def update_used_query_range(self, name: str, start_ts: Timestamp, end_ts: Timestamp) -> None:
@@ -924,7 +1414,6 @@ class DBHandler:
             'INSERT OR REPLACE INTO used_query_ranges(name, start_ts, end_ts) VALUES (?, ?, ?)',
             (name, str(start_ts), str(end_ts)),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def update_used_block_query_range(self, name: str, from_block: int, to_block: int) -> None:
@@ -959,7 +1448,6 @@ class DBHandler:
                     f' already existing timestamp {entry.time}. Skipping.',
                 )
                 continue
-        self.conn.commit()
         self.update_last_write()
 
     def add_blockchain_accounts(
@@ -986,7 +1474,6 @@ class DBHandler:
 
         insert_tag_mappings(cursor=cursor, data=account_data, object_reference_keys=['address'])
 
-        self.conn.commit()
         self.update_last_write()
 
     def edit_blockchain_accounts(
@@ -1025,7 +1512,6 @@ class DBHandler:
             raise AssertionError(msg)
         insert_tag_mappings(cursor=cursor, data=account_data, object_reference_keys=['address'])
 
-        self.conn.commit()
         self.update_last_write()
 
     def remove_blockchain_accounts(
@@ -1063,7 +1549,6 @@ class DBHandler:
             for address in accounts:
                 self.delete_data_for_ethereum_address(address)  # type: ignore
 
-        self.conn.commit()
         self.update_last_write()
 
     def _get_address_details_if_time(
@@ -1201,7 +1686,6 @@ class DBHandler:
             '(account, tokens_list, time) VALUES (?, ?, ?)',
             (address, json.dumps(new_details), now),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def save_univ2_lp_tokens_for_address(
@@ -1222,7 +1706,6 @@ class DBHandler:
             '(account, tokens_list, time) VALUES (?, ?, ?)',
             (address, json.dumps(new_details), now),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def get_blockchain_accounts(self) -> BlockchainAccounts:
@@ -1337,7 +1820,6 @@ class DBHandler:
             )
         insert_tag_mappings(cursor=cursor, data=data, object_reference_keys=['label'])
 
-        self.conn.commit()
         self.update_last_write()
 
     def edit_manually_tracked_balances(self, data: List[ManuallyTrackedBalance]) -> None:
@@ -1376,7 +1858,6 @@ class DBHandler:
             raise InputError(msg)
         insert_tag_mappings(cursor=cursor, data=data, object_reference_keys=['label'])
 
-        self.conn.commit()
         self.update_last_write()
 
     def remove_manually_tracked_balances(self, labels: List[str]) -> None:
@@ -1403,7 +1884,6 @@ class DBHandler:
                 f'manually tracked balance labels that do not exist',
             )
 
-        self.conn.commit()
         self.update_last_write()
 
     def remove(self) -> None:
@@ -1411,7 +1891,7 @@ class DBHandler:
         cursor.execute('DROP TABLE IF EXISTS timed_balances')
         cursor.execute('DROP TABLE IF EXISTS timed_location_data')
         cursor.execute('DROP TABLE IF EXISTS timed_unique_data')
-        self.conn.commit()
+        self._commit()
 
     def save_balances_data(self, data: Dict[str, Any], timestamp: Timestamp) -> None:
         """ The keys of the data dictionary can be any kind of asset plus 'location'
@@ -1457,8 +1937,9 @@ class DBHandler:
             usd_value=str(data['net_usd']),
         ))
 
-        self.add_multiple_balances(balances)
-        self.add_multiple_location_data(locations)
+        with self.write_batch():
+            self.add_multiple_balances(balances)
+            self.add_multiple_location_data(locations)
 
     def add_exchange(
             self,
@@ -1476,7 +1957,6 @@ class DBHandler:
             '(name, api_key, api_secret, passphrase) VALUES (?, ?, ?, ?)',
             (name, api_key, api_secret.decode(), passphrase),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def remove_exchange(self, name: str) -> None:
@@ -1484,7 +1964,6 @@ class DBHandler:
         cursor.execute(
             'DELETE FROM user_credentials WHERE name =?', (name,),
         )
-        self.conn.commit()
         self.update_last_write()
 
     def get_exchange_credentials(self) -> Dict[str, ApiCredentials]:
@@ -1513,76 +1992,49 @@ class DBHandler:
             tuple_type: DBTupleType,
             query: str,
             tuples: List[Tuple[Any, ...]],
-            **kwargs: Any,
     ) -> None:
+        """Writes all tuples with as few executemany calls as possible
+
+        Tuples that hit a uniqueness constraint, most probably because they already
+        exist in the DB, are skipped and reported together. Any other constraint
+        violation is reported as an error for the offending tuple. In both cases the
+        rest of the tuples are still written.
+        """
         cursor = self.conn.cursor()
-        try:
-            cursor.executemany(query, tuples)
-        except sqlcipher.IntegrityError:  # pylint: disable=no-member
-            # That means that one of the tuples hit a constraint, most probably
-            # already existing in the DB, in which case we resort to writing them
-            # one by one to only reject the duplicates
+        duplicates = 0
+        idx = 0
+        while idx < len(tuples):
+            changes_before = self.conn.total_changes
+            try:
+                cursor.executemany(query, (tuples[i] for i in range(idx, len(tuples))))
+                break
+            except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
+                # executemany stops at the failing tuple and keeps the ones before it
+                idx += self.conn.total_changes - changes_before
+                if 'UNIQUE constraint failed' in str(e):
+                    duplicates += 1
+                else:
+                    log.error(f'Failed to add {tuple_type} {tuples[idx]} to the DB due to {e}')
+                    self.msg_aggregator.add_error(
+                        f'Failed to add a {tuple_type.replace("_", " ")} entry to the DB '
+                        f'due to {str(e)}. Check the logs for more details.',
+                    )
+                idx += 1
 
-            nonces_set: Set[int] = set()
+        if duplicates > 0:
+            msg = (
+                f'Did not add {duplicates} out of {len(tuples)} '
+                f'{tuple_type.replace("_", " ")} entries to the DB since they already exist.'
+            )
             if tuple_type == 'ethereum_transaction':
-                nonces_set = set(range(len([t for t in tuples if t[10] == -1])))
-
-            for entry in tuples:
-                try:
-                    cursor.execute(query, entry)
-                except sqlcipher.IntegrityError:  # pylint: disable=no-member
-                    if tuple_type == 'ethereum_transaction':
-                        nonce = entry[10]
-                        # If it's not an internal transaction with the same hash
-                        # ignore it. That is since it's indeed a duplicate because
-                        # when we query etherscan we get all transactions where
-                        # the given address is either the from or the to.
-                        if nonce != -1:
-                            continue
-
-                        if 'from_etherscan' in kwargs and kwargs['from_etherscan'] is True:
-                            # If it's an internal transaction with the same hash then
-                            # still input it as there is no way to distinguish between
-                            # multiple etherscan internal transactions with the same
-                            # original transaction hash. Here we trust the data source.
-                            # To differentiate between them in Rotkehlchen we use a
-                            # more negative nonce
-                            entry_list = list(entry)
-                            # Make sure that the internal etherscan transaction nonce
-                            # is increasingly negative (> -1)
-                            # If a key error is thrown here due to popping from an empty
-                            # set then something is really wrong so not catching it
-                            entry_list[10] = -1 - nonces_set.pop() - 1
-                            entry = tuple(entry_list)
-                            try:
-                                cursor.execute(query, entry)
-                                # Success so just go to the next entry
-                                continue
-                            except sqlcipher.IntegrityError:  # pylint: disable=no-member
-                                # the error is logged right below
-                                pass
-
-                        # if we reach here it means the transaction is already in the DB
-                        # But this can't be avoided with the way we query etherscan
-                        # right now since we don't query transactions in a specific
-                        # time range, so duplicate addition attempts can happen.
-                        # Also if we have transactions of one account sending to the
-                        # other and both accounts are being tracked.
-                        string_repr = db_tuple_to_str(entry, tuple_type)
-                        logger.debug(
-                            f'Did not add "{string_repr}" to the DB since'
-                            f'it already exists.',
-                        )
-                        continue
-
-                    string_repr = db_tuple_to_str(entry, tuple_type)
-                    self.msg_aggregator.add_warning(
-                        f'Failed to add "{string_repr}" to the DB. It already exists.',
-                    )
-                except sqlcipher.InterfaceError:  # pylint: disable=no-member
-                    log.critical(f'Interface error with tuple: {entry}')
+                # This can't be avoided with the way we query etherscan right now
+                # since we don't query transactions in a specific time range, so
+                # duplicate addition attempts can happen. Also if we have transactions
+                # of one account sending to the other and both accounts are tracked.
+                log.debug(msg)
+            else:
+                self.msg_aggregator.add_warning(msg)
 
-        self.conn.commit()
         self.update_last_write()
 
     def add_margin_positions(self, margin_positions: List[MarginPosition]) -> None:
@@ -1715,33 +2167,65 @@ class DBHandler:
         """
         self.write_tuples(tuple_type='asset_movement', query=query, tuples=movement_tuples)
 
+    @staticmethod
+    def _asset_movements_filters(
+            locations: Optional[List[Location]],
+            asset: Optional[Asset],
+            category: Optional[AssetMovementCategory],
+    ) -> DBFilters:
+        filters: DBFilters = []
+        if locations is not None:
+            questionmarks = ','.join('?' * len(locations))
+            filters.append((
+                f'location IN ({questionmarks})',
+                tuple(x.serialize_for_db() for x in locations),
+            ))
+        if asset is not None:
+            filters.append(('asset = ?', (asset.identifier,)))
+        if category is not None:
+            filters.append(('category = ?', (category.serialize_for_db(),)))
+        return filters
+
     def get_asset_movements(
             self,
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
             location: Optional[str] = None,
+            locations: Optional[List[Location]] = None,
+            asset: Optional[Asset] = None,
+            category: Optional[AssetMovementCategory] = None,
+            pagination: Optional[DBPagination] = None,
     ) -> List[AssetMovement]:
-        """Returns a list of asset movements optionally filtered by time and location
+        """Returns a list of asset movements optionally filtered by time, location(s),
+        asset and category
 
-        The returned list is ordered from oldest to newest
+        If no pagination is given the returned list is ordered from oldest to newest.
+        Otherwise ordering, limit and offset are all applied in the DB.
         """
-        cursor = self.conn.cursor()
-        query = (
-            'SELECT id,'
-            '  location,'
-            '  category,'
-            '  time,'
-            '  asset,'
-            '  amount,'
-            '  fee_asset,'
-            '  fee,'
-            '  link,'
-            '  address,'
-            '  transaction_id FROM asset_movements '
-        )
         if location is not None:
-            query += f'WHERE location="{deserialize_location(location).serialize_for_db()}" '
-        query, bindings = form_query_to_filter_timestamps(query, 'time', from_ts, to_ts)
+            locations = [deserialize_location(location)]
+        cursor = self.conn.cursor()
+        query, bindings = form_query_with_filters(
+            query=(
+                'SELECT id,'
+                '  location,'
+                '  category,'
+                '  time,'
+                '  asset,'
+                '  amount,'
+                '  fee_asset,'
+                '  fee,'
+                '  link,'
+                '  address,'
+                '  transaction_id FROM asset_movements '
+            ),
+            filters=self._asset_movements_filters(locations, asset, category),
+            timestamp_attribute='time',
+            from_ts=from_ts,
+            to_ts=to_ts,
+            pagination=pagination,
+            id_attribute='id',
+        )
         results = cursor.execute(query, bindings)
 
         asset_movements = []
@@ -1777,6 +2261,24 @@ class DBHandler:
 
         return asset_movements
 
+    def get_asset_movements_count(
+            self,
+            from_ts: Optional[Timestamp] = None,
+            to_ts: Optional[Timestamp] = None,
+            locations: Optional[List[Location]] = None,
+            asset: Optional[Asset] = None,
+            category: Optional[AssetMovementCategory] = None,
+    ) -> int:
+        """Returns how many asset movements match the given filters"""
+        query, bindings = form_count_query_with_filters(
+            table='asset_movements',
+            filters=self._asset_movements_filters(locations, asset, category),
+            timestamp_attribute='time',
+            from_ts=from_ts,
+            to_ts=to_ts,
+        )
+        return self.conn.cursor().execute(query, bindings).fetchone()[0]
+
     def get_entries_count(
             self,
             entries_table: Literal[
@@ -1798,6 +2300,59 @@ class DBHandler:
         query = cursor.execute(cursorstr)
         return query.fetchone()[0]
 
+    def _key_internal_transactions(
+            self,
+            tx_tuples: List[Tuple[Any, ...]],
+    ) -> List[Tuple[Any, ...]]:
+        """Gives every etherscan internal transaction (nonce -1) a deterministic nonce
+
+        There is no way to distinguish between multiple etherscan internal transactions
+        with the same original transaction hash. So they are keyed by hash, from, to
+        and value plus the order in which they appear. An internal transaction already
+        in the DB under that key keeps its stored nonce so that adding it again is
+        ignored. Any new one takes the next increasingly negative nonce for its
+        hash and sender.
+        """
+        internal_hashes = list({entry[0] for entry in tx_tuples if entry[10] == -1})
+        if len(internal_hashes) == 0:
+            return tx_tuples
+
+        stored_nonces: DefaultDict[Tuple[Any, ...], List[int]] = defaultdict(list)
+        next_nonces: Dict[Tuple[bytes, str], int] = {}
+        cursor = self.conn.cursor()
+        for idx in range(0, len(internal_hashes), SQL_VARIABLES_CHUNK_SIZE):
+            chunk = internal_hashes[idx:idx + SQL_VARIABLES_CHUNK_SIZE]
+            query = cursor.execute(
+                'SELECT tx_hash, from_address, to_address, value, nonce '
+                f'FROM ethereum_transactions WHERE nonce < 0 AND tx_hash IN '
+                f'({",".join("?" * len(chunk))}) ORDER BY nonce DESC;',
+                chunk,
+            )
+            for tx_hash, from_address, to_address, value, nonce in query:
+                stored_nonces[(tx_hash, from_address, to_address, value)].append(nonce)
+                sender = (tx_hash, from_address)
+                next_nonces[sender] = min(next_nonces.get(sender, -1), nonce - 1)
+
+        occurrences: DefaultDict[Tuple[Any, ...], int] = defaultdict(int)
+        keyed_tuples = []
+        for entry in tx_tuples:
+            if entry[10] != -1:
+                keyed_tuples.append(entry)
+                continue
+
+            key = (entry[0], entry[3], entry[4], entry[5])
+            occurrence = occurrences[key]
+            occurrences[key] += 1
+            if occurrence < len(stored_nonces[key]):
+                nonce = stored_nonces[key][occurrence]
+            else:
+                sender = (entry[0], entry[3])
+                nonce = next_nonces.get(sender, -1)
+                next_nonces[sender] = nonce - 1
+            keyed_tuples.append(entry[:10] + (nonce,))
+
+        return keyed_tuples
+
     def add_ethereum_transactions(
             self,
             ethereum_transactions: List[EthereumTransaction],
@@ -1841,25 +2396,42 @@ class DBHandler:
               nonce)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        self.write_tuples(
-            tuple_type='ethereum_transaction',
-            query=query,
-            tuples=tx_tuples,
-            from_etherscan=from_etherscan,
-        )
+        if from_etherscan:
+            tx_tuples = self._key_internal_transactions(tx_tuples)
+        self.write_tuples(tuple_type='ethereum_transaction', query=query, tuples=tx_tuples)
+
+    @staticmethod
+    def _ethereum_transactions_filters(
+            addresses: Optional[List[ChecksumEthAddress]],
+    ) -> DBFilters:
+        if addresses is None:
+            return []
+
+        questionmarks = ','.join('?' * len(addresses))
+        return [(
+            f'(from_address IN ({questionmarks}) OR to_address IN ({questionmarks}))',
+            tuple(addresses) * 2,
+        )]
 
     def get_ethereum_transactions(
             self,
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
             address: Optional[ChecksumEthAddress] = None,
+            addresses: Optional[List[ChecksumEthAddress]] = None,
+            pagination: Optional[DBPagination] = None,
     ) -> List[EthereumTransaction]:
-        """Returns a list of ethereum transactions optionally filtered by time and/or from address
+        """Returns a list of ethereum transactions optionally filtered by time and/or
+        the addresses appearing in either from or to
 
-        The returned list is ordered from oldest to newest
+        If no pagination is given the returned list is ordered from oldest to newest.
+        Otherwise ordering, limit and offset are all applied in the DB.
         """
+        if address is not None:
+            addresses = [address]
         cursor = self.conn.cursor()
-        query = """
+        query, bindings = form_query_with_filters(
+            query="""
             SELECT tx_hash,
               timestamp,
               block_number,
@@ -1871,10 +2443,13 @@ class DBHandler:
               gas_used,
               input_data,
               nonce FROM ethereum_transactions
-        """
-        if address is not None:
-            query += f'WHERE (from_address="{address}" OR to_address="{address}") '
-        query, bindings = form_query_to_filter_timestamps(query, 'timestamp', from_ts, to_ts)
+            """,
+            filters=self._ethereum_transactions_filters(addresses),
+            timestamp_attribute='timestamp',
+            from_ts=from_ts,
+            to_ts=to_ts,
+            pagination=pagination,
+        )
         results = cursor.execute(query, bindings)
 
         ethereum_transactions = []
@@ -1904,6 +2479,22 @@ class DBHandler:
 
         return ethereum_transactions
 
+    def get_ethereum_transactions_count(
+            self,
+            from_ts: Optional[Timestamp] = None,
+            to_ts: Optional[Timestamp] = None,
+            addresses: Optional[List[ChecksumEthAddress]] = None,
+    ) -> int:
+        """Returns how many ethereum transactions match the given filters"""
+        query, bindings = form_count_query_with_filters(
+            table='ethereum_transactions',
+            filters=self._ethereum_transactions_filters(addresses),
+            timestamp_attribute='timestamp',
+            from_ts=from_ts,
+            to_ts=to_ts,
+        )
+        return self.conn.cursor().execute(query, bindings).fetchone()[0]
+
     def delete_data_for_ethereum_address(self, address: ChecksumEthAddress) -> None:
         """Deletes all ethereum related data from the DB for a single ethereum address"""
         other_eth_accounts = self.get_blockchain_accounts().eth
@@ -1918,6 +2509,7 @@ class DBHandler:
         )
         cursor.execute('DELETE FROM ethereum_accounts_details WHERE account = ?', (address,))
         cursor.execute('DELETE FROM aave_events WHERE address = ?', (address,))
+        cursor.execute('DELETE FROM aave_interest_state WHERE address = ?', (address,))
         cursor.execute(
             'DELETE FROM multisettings WHERE name LIKE "queried_address_%" AND value = ?',
             (address,),
@@ -1940,8 +2532,19 @@ class DBHandler:
             other_eth_accounts,
         )
         cursor.execute('DELETE FROM amm_swaps WHERE address=?;', (address,))
+        cursor.execute(
+            f'DELETE FROM used_query_ranges WHERE name="{ETH2_DEPOSITS_PREFIX}_{address}";',
+        )
+        cursor.execute('DELETE FROM eth2_deposits WHERE from_address=?;', (address,))
+        cursor.execute(
+            f'DELETE FROM used_query_ranges WHERE name="{COMPOUND_EVENTS_PREFIX}_{address}";',
+        )
+        cursor.execute('DELETE FROM compound_events WHERE address=?;', (address,))
+        cursor.execute(
+            f'DELETE FROM used_query_ranges WHERE name="{DSR_MOVEMENTS_PREFIX}_{address}";',
+        )
+        cursor.execute('DELETE FROM dsr_movements WHERE address=?;', (address,))
 
-        self.conn.commit()
         self.update_last_write()
 
     def add_trades(self, trades: List[Trade]) -> None:
@@ -2016,36 +2619,73 @@ class DBHandler:
         if cursor.rowcount == 0:
             return False, 'Tried to edit non existing trade id'
 
-        self.conn.commit()
+        self._commit()
         return True, ''
 
+    @staticmethod
+    def _trades_filters(
+            locations: Optional[List[Location]],
+            asset: Optional[Asset],
+            trade_type: Optional[TradeType],
+    ) -> DBFilters:
+        filters: DBFilters = []
+        if locations is not None:
+            questionmarks = ','.join('?' * len(locations))
+            filters.append((
+                f'location IN ({questionmarks})',
+                tuple(x.serialize_for_db() for x in locations),
+            ))
+        if asset is not None:
+            # The asset can be either the base or the quote part of the pair
+            escaped_identifier = escape_like_pattern(asset.identifier)
+            filters.append((
+                '(pair LIKE ? ESCAPE ? OR pair LIKE ? ESCAPE ?)',
+                (f'{escaped_identifier}\\_%', '\\', f'%\\_{escaped_identifier}', '\\'),
+            ))
+        if trade_type is not None:
+            filters.append(('type = ?', (trade_type.serialize_for_db(),)))
+        return filters
+
     def get_trades(
             self,
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
             location: Optional[Location] = None,
+            locations: Optional[List[Location]] = None,
+            asset: Optional[Asset] = None,
+            trade_type: Optional[TradeType] = None,
+            pagination: Optional[DBPagination] = None,
     ) -> List[Trade]:
-        """Returns a list of trades optionally filtered by time and location
+        """Returns a list of trades optionally filtered by time, location(s), asset
+        and trade type
 
-        The returned list is ordered from oldest to newest
+        If no pagination is given the returned list is ordered from oldest to newest.
+        Otherwise ordering, limit and offset are all applied in the DB.
         """
-        cursor = self.conn.cursor()
-        query = (
-            'SELECT id,'
-            '  time,'
-            '  location,'
-            '  pair,'
-            '  type,'
-            '  amount,'
-            '  rate,'
-            '  fee,'
-            '  fee_currency,'
-            '  link,'
-            '  notes FROM trades '
-        )
         if location is not None:
-            query += f'WHERE location="{location.serialize_for_db()}" '
-        query, bindings = form_query_to_filter_timestamps(query, 'time', from_ts, to_ts)
+            locations = [location]
+        cursor = self.conn.cursor()
+        query, bindings = form_query_with_filters(
+            query=(
+                'SELECT id,'
+                '  time,'
+                '  location,'
+                '  pair,'
+                '  type,'
+                '  amount,'
+                '  rate,'
+                '  fee,'
+                '  fee_currency,'
+                '  link,'
+                '  notes FROM trades '
+            ),
+            filters=self._trades_filters(locations, asset, trade_type),
+            timestamp_attribute='time',
+            from_ts=from_ts,
+            to_ts=to_ts,
+            pagination=pagination,
+            id_attribute='id',
+        )
         results = cursor.execute(query, bindings)
 
         trades = []
@@ -2078,12 +2718,40 @@ class DBHandler:
 
         return trades
 
+    def get_trades_count(
+            self,
+            from_ts: Optional[Timestamp] = None,
+            to_ts: Optional[Timestamp] = None,
+            locations: Optional[List[Location]] = None,
+            asset: Optional[Asset] = None,
+            trade_type: Optional[TradeType] = None,
+    ) -> int:
+        """Returns how many trades match the given filters"""
+        query, bindings = form_count_query_with_filters(
+            table='trades',
+            filters=self._trades_filters(locations, asset, trade_type),
+            timestamp_attribute='time',
+            from_ts=from_ts,
+            to_ts=to_ts,
+        )
+        return self.conn.cursor().execute(query, bindings).fetchone()[0]
+
+    def get_location_links(self, location: Location) -> Set[str]:
+        """Returns the links of all stored trades and asset movements of a location"""
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT link FROM trades WHERE location=? '
+            'UNION SELECT link FROM asset_movements WHERE location=?;',
+            (location.serialize_for_db(), location.serialize_for_db()),
+        )
+        return {entry[0] for entry in query}
+
     def delete_trade(self, trade_id: str) -> Tuple[bool, str]:
         cursor = self.conn.cursor()
         cursor.execute('DELETE FROM trades WHERE id=?', (trade_id,))
         if cursor.rowcount == 0:
             return False, 'Tried to delete non-existing trade'
-        self.conn.commit()
+        self._commit()
         return True, ''
 
     def add_amm_swaps(self, swaps: List[AMMSwap]) -> None:
@@ -2196,7 +2864,7 @@ class DBHandler:
         cursor.execute('DELETE FROM amm_swaps WHERE id=?', (swap_id,))
         if cursor.rowcount == 0:
             return False, 'Tried to delete non-existing AMM swap'
-        self.conn.commit()
+        self._commit()
         return True, ''
 
     def set_rotkehlchen_premium(self, credentials: PremiumCredentials) -> None:
@@ -2208,7 +2876,7 @@ class DBHandler:
             '(name, api_key, api_secret, passphrase) VALUES (?, ?, ?, ?)',
             ('rotkehlchen', credentials.serialize_key(), credentials.serialize_secret(), None),
         )
-        self.conn.commit()
+        self._commit()
         # Do not update the last write here. If we are starting in a new machine
         # then this write is mandatory and to sync with data from server we need
         # an empty last write ts in that case
@@ -2221,7 +2889,7 @@ class DBHandler:
             cursor.execute(
                 'DELETE FROM user_credentials WHERE name=?', ('rotkehlchen',),
             )
-            self.conn.commit()
+            self._commit()
         except sqlcipher.OperationalError as e:  # pylint: disable=no-member
             log.error(f'Could not delete rotki premium keys: {str(e)}')
             return False
@@ -2456,7 +3124,6 @@ class DBHandler:
             log.error('Unexpected DB error: {msg} while adding a tag')
             raise
 
-        self.conn.commit()
         self.update_last_write()
 
     def edit_tag(
@@ -2495,7 +3162,6 @@ class DBHandler:
             raise TagConstraintError(
                 f'Tried to edit tag with name "{name}" which does not exist',
             )
-        self.conn.commit()
         self.update_last_write()
 
     def delete_tag(self, name: str) -> None:
@@ -2515,7 +3181,6 @@ class DBHandler:
             raise TagConstraintError(
                 f'Tried to delete tag with name "{name}" which does not exist',
             )
-        self.conn.commit()
         self.update_last_write()
 
     def ensure_tags_exist(
@@ -2574,7 +3239,6 @@ class DBHandler:
                 f'Xpub {xpub_data.xpub.xpub} with derivation path '
                 f'{xpub_data.derivation_path} is already tracked',
             )
-        self.conn.commit()
         self.update_last_write()
 
     def delete_bitcoin_xpub(self, xpub_data: XpubData) -> None:
@@ -2627,7 +3291,6 @@ class DBHandler:
             (xpub_data.xpub.xpub, xpub_data.serialize_derivation_path_for_db()),
         )
 
-        self.conn.commit()
         self.update_last_write()
 
     def edit_bitcoin_xpub(self, xpub_data: XpubData) -> None:
@@ -2660,7 +3323,6 @@ class DBHandler:
                 f'There was an error when updating Xpub {xpub_data.xpub.xpub} with '
                 f'derivation path {xpub_data.derivation_path}',
             )
-        self.conn.commit()
         self.update_last_write()
 
     def get_bitcoin_xpub_data(self) -> List[XpubData]:
@@ -2755,5 +3417,4 @@ class DBHandler:
                 # mapping already exists
                 continue
 
-        self.conn.commit()
         self.update_last_write()
@@ -25,7 +25,6 @@ class QueriedAddresses():
             )
         except sqlcipher.DatabaseError:  # pylint: disable=no-member
             raise InputError(f'Address {address} is already in the queried addresses for {module}')
-        self.db.conn.commit()
         self.db.update_last_write()
 
     def remove_queried_address_for_module(
@@ -44,7 +43,6 @@ class QueriedAddresses():
         )
         if cursor.rowcount != 1:
             raise InputError(f'Address {address} is not in the queried addresses for {module}')
-        self.db.conn.commit()
         self.db.update_last_write()
 
     def get_queried_addresses_for_module(
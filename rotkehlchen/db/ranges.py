@@ -6,6 +6,20 @@ if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
 
 
+def merge_query_ranges(
+        ranges: List[Tuple[Timestamp, Timestamp]],
+) -> List[Tuple[Timestamp, Timestamp]]:
+    """Merges the overlapping or adjacent ones of the given ranges and returns them sorted"""
+    merged: List[Tuple[Timestamp, Timestamp]] = []
+    for start_ts, end_ts in sorted(ranges):
+        if len(merged) != 0 and start_ts <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end_ts))
+        else:
+            merged.append((start_ts, end_ts))
+
+    return merged
+
+
 class DBQueryRanges():
 
     def __init__(self, database: 'DBHandler') -> None:
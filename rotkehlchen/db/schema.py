@@ -128,6 +128,16 @@ CREATE TABLE IF NOT EXISTS aave_events (
 );
 """
 
+# The aToken balances of an address per aave reserve as of the last aave graph query
+DB_CREATE_AAVE_INTEREST_STATE = """
+CREATE TABLE IF NOT EXISTS aave_interest_state (
+    address VARCHAR[42] NOT NULL,
+    asset VARCHAR[12] NOT NULL,
+    atoken_balance TEXT NOT NULL,
+    PRIMARY KEY (address, asset)
+);
+"""
+
 DB_CREATE_YEARN_VAULT_EVENTS = """
 CREATE TABLE IF NOT EXISTS yearn_vaults_events (
     address VARCHAR[42] NOT NULL,
@@ -148,6 +158,72 @@ CREATE TABLE IF NOT EXISTS yearn_vaults_events (
 );
 """
 
+DB_CREATE_COMPOUND_EVENTS = """
+CREATE TABLE IF NOT EXISTS compound_events (
+    address VARCHAR[42] NOT NULL,
+    event_type VARCHAR[12] NOT NULL,
+    block_number INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    asset VARCHAR[44] NOT NULL,
+    value_amount TEXT NOT NULL,
+    value_usd_value TEXT NOT NULL,
+    to_asset VARCHAR[44],
+    to_value_amount TEXT,
+    to_value_usd_value TEXT,
+    realized_pnl_amount TEXT,
+    realized_pnl_usd_value TEXT,
+    tx_hash VARCHAR[66] NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (event_type, tx_hash, log_index)
+);
+"""
+
+DB_CREATE_MAKERDAO_VAULT_CREATIONS = """
+CREATE TABLE IF NOT EXISTS makerdao_vault_creations (
+    identifier INTEGER NOT NULL PRIMARY KEY,
+    creation_ts INTEGER NOT NULL
+);
+"""
+
+DB_CREATE_MAKERDAO_VAULT_EVENTS = """
+CREATE TABLE IF NOT EXISTS makerdao_vault_events (
+    vault_identifier INTEGER NOT NULL,
+    event_type INTEGER NOT NULL,
+    amount TEXT NOT NULL,
+    usd_value TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    tx_hash VARCHAR[66] NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (vault_identifier, event_type, tx_hash, log_index)
+);
+"""
+
+DB_CREATE_DSR_MOVEMENTS = """
+CREATE TABLE IF NOT EXISTS dsr_movements (
+    address VARCHAR[42] NOT NULL,
+    movement_type VARCHAR[10] NOT NULL,
+    normalized_balance TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    amount_usd_value TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    tx_hash VARCHAR[66] NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (address, tx_hash, log_index)
+);
+"""
+
+DB_CREATE_DSR_RATE_CHANGES = """
+CREATE TABLE IF NOT EXISTS dsr_rate_changes (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    dsr TEXT NOT NULL,
+    chi TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+"""
+
 DB_CREATE_EXTERNAL_SERVICE_CREDENTIALS = """
 CREATE TABLE IF NOT EXISTS external_service_credentials (
     name VARCHAR[30] NOT NULL PRIMARY KEY,
@@ -311,6 +387,20 @@ CREATE TABLE IF NOT EXISTS settings (
 );
 """
 
+DB_CREATE_ETH2_DEPOSITS = """
+CREATE TABLE IF NOT EXISTS eth2_deposits (
+    tx_hash VARCHAR[66] NOT NULL,
+    log_index INTEGER NOT NULL,
+    from_address VARCHAR[42] NOT NULL,
+    timestamp INTEGER NOT NULL,
+    pubkey TEXT NOT NULL,
+    withdrawal_credentials TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    validator_index INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+"""
+
 DB_CREATE_AMM_SWAPS = """
 CREATE TABLE IF NOT EXISTS amm_swaps (
     tx_hash VARCHAR[42] NOT NULL,
@@ -341,7 +431,7 @@ CREATE TABLE IF NOT EXISTS amm_swaps (
 DB_SCRIPT_CREATE_TABLES = """
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
-{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}
+{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}{}
 COMMIT;
 PRAGMA foreign_keys=on;
 """.format(
@@ -370,4 +460,24 @@ PRAGMA foreign_keys=on;
     DB_CREATE_XPUBS,
     DB_CREATE_XPUB_MAPPINGS,
     DB_CREATE_AMM_SWAPS,
+    DB_CREATE_ETH2_DEPOSITS,
+    DB_CREATE_COMPOUND_EVENTS,
+    DB_CREATE_MAKERDAO_VAULT_CREATIONS,
+    DB_CREATE_MAKERDAO_VAULT_EVENTS,
+    DB_CREATE_DSR_MOVEMENTS,
+    DB_CREATE_DSR_RATE_CHANGES,
+    DB_CREATE_AAVE_INTEREST_STATE,
 )
+
+# Indices used by the filtered and paginated history queries and the per address
+# queries. Created after the DB upgrades run so that they always refer to columns
+# of the latest schema
+DB_SCRIPT_CREATE_INDICES = """
+CREATE INDEX IF NOT EXISTS idx_trades_time ON trades(time);
+CREATE INDEX IF NOT EXISTS idx_trades_location_time ON trades(location, time);
+CREATE INDEX IF NOT EXISTS idx_asset_movements_time ON asset_movements(time);
+CREATE INDEX IF NOT EXISTS idx_asset_movements_location_time ON asset_movements(location, time);
+CREATE INDEX IF NOT EXISTS idx_ethereum_transactions_timestamp ON ethereum_transactions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_eth2_deposits_from_address ON eth2_deposits(from_address);
+CREATE INDEX IF NOT EXISTS idx_compound_events_address ON compound_events(address);
+"""
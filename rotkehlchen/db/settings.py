@@ -26,6 +26,7 @@ DEFAULT_DECIMAL_SEPARATOR = '.'
 DEFAULT_CURRENCY_LOCATION = 'after'
 DEFAULT_SUBMIT_USAGE_ANALYTICS = True
 DEFAULT_KRAKEN_ACCOUNT_TYPE = KrakenAccountType.STARTER
+DEFAULT_KRAKEN_LEDGER_SYNC = False
 DEFAULT_ACTIVE_MODULES = AVAILABLE_MODULES
 
 
@@ -51,6 +52,7 @@ class DBSettings(NamedTuple):
     last_balance_save: Timestamp = Timestamp(0)
     submit_usage_analytics: bool = DEFAULT_SUBMIT_USAGE_ANALYTICS
     kraken_account_type: KrakenAccountType = DEFAULT_KRAKEN_ACCOUNT_TYPE
+    kraken_ledger_sync: bool = DEFAULT_KRAKEN_LEDGER_SYNC
     active_modules: List[str] = DEFAULT_ACTIVE_MODULES
     frontend_settings: str = ''
 
@@ -72,6 +74,7 @@ class ModifiableDBSettings(NamedTuple):
     currency_location: Optional[str] = None
     submit_usage_analytics: Optional[bool] = None
     kraken_account_type: Optional[KrakenAccountType] = None
+    kraken_ledger_sync: Optional[bool] = None
     active_modules: Optional[List[str]] = None
     frontend_settings: Optional[str] = None
 
@@ -174,6 +177,8 @@ def db_settings_from_dict(
             specified_args[key] = read_boolean(value)
         elif key == 'kraken_account_type':
             specified_args[key] = KrakenAccountType.deserialize(value)
+        elif key == 'kraken_ledger_sync':
+            specified_args[key] = read_boolean(value)
         elif key == 'active_modules':
             specified_args[key] = json.loads(value)
         elif key == 'frontend_settings':
@@ -1,6 +1,6 @@
 from enum import Enum
 from sqlite3 import Cursor
-from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 from typing_extensions import Literal
 
@@ -64,6 +64,38 @@ class Tag(NamedTuple):
         return self._asdict()  # pylint: disable=no-member
 
 
+# Mappings of the attributes by which entries can be ordered to their DB columns
+TRADES_ORDER_BY_ATTRIBUTES = {
+    'timestamp': 'time',
+    'location': 'location',
+    'pair': 'pair',
+    'trade_type': 'type',
+}
+ASSET_MOVEMENTS_ORDER_BY_ATTRIBUTES = {
+    'timestamp': 'time',
+    'location': 'location',
+    'category': 'category',
+    'asset': 'asset',
+}
+ETHEREUM_TRANSACTIONS_ORDER_BY_ATTRIBUTES = {
+    'timestamp': 'timestamp',
+    'block_number': 'block_number',
+    'from_address': 'from_address',
+    'to_address': 'to_address',
+}
+
+
+class DBPagination(NamedTuple):
+    """Ordering and pagination settings for queries that are pushed down to the DB
+
+    A limit of None means that all the entries after the offset are returned
+    """
+    order_by_attribute: str
+    ascending: bool = True
+    limit: Optional[int] = None
+    offset: int = 0
+
+
 class DBStartupAction(Enum):
     NOTHING = 1
     UPGRADE_3_4 = 2
@@ -104,6 +136,89 @@ def form_query_to_filter_timestamps(
     return query, bindings
 
 
+def escape_like_pattern(value: str) -> str:
+    """Escapes the wildcard characters of a value that goes in a LIKE pattern
+
+    To be used along with a backslash as the ESCAPE character of the query
+    """
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _form_where_clause(
+        filters: List[Tuple[str, Tuple[Any, ...]]],
+        timestamp_attribute: str,
+        from_ts: Optional[Timestamp],
+        to_ts: Optional[Timestamp],
+) -> Tuple[str, List[Any]]:
+    """Joins all filters and the timestamp range with AND in a WHERE clause"""
+    conditions = [condition for condition, _ in filters]
+    bindings: List[Any] = [x for _, filter_bindings in filters for x in filter_bindings]
+    if from_ts is not None:
+        conditions.append(f'{timestamp_attribute} >= ?')
+        bindings.append(from_ts)
+    if to_ts is not None:
+        conditions.append(f'{timestamp_attribute} <= ?')
+        bindings.append(to_ts)
+
+    if len(conditions) == 0:
+        return '', bindings
+
+    return 'WHERE ' + ' AND '.join(conditions) + ' ', bindings
+
+
+def form_query_with_filters(
+        query: str,
+        filters: List[Tuple[str, Tuple[Any, ...]]],
+        timestamp_attribute: str,
+        from_ts: Optional[Timestamp],
+        to_ts: Optional[Timestamp],
+        pagination: Optional[DBPagination] = None,
+        id_attribute: str = 'rowid',
+) -> Tuple[str, List[Any]]:
+    """Formulates the query string and its bindings to filter, order and paginate a query
+
+    Each filter is a tuple of an SQL condition using question marks and the bindings
+    for those question marks.
+
+    If no pagination is given the results are ordered by the timestamp attribute
+    in ascending order. The order by attribute of the pagination can't be a binding
+    so it should always come from a whitelist. Entries with the same order by
+    attribute and timestamp are ordered by the unique id attribute so that pages
+    are stable.
+    """
+    where_clause, bindings = _form_where_clause(filters, timestamp_attribute, from_ts, to_ts)
+    query += where_clause
+    if pagination is None:
+        return query + f'ORDER BY {timestamp_attribute} ASC;', bindings
+
+    order = 'ASC' if pagination.ascending else 'DESC'
+    query += f'ORDER BY {pagination.order_by_attribute} {order}'
+    if pagination.order_by_attribute != timestamp_attribute:
+        query += f', {timestamp_attribute} {order}'
+    query += f', {id_attribute} {order}'
+    if pagination.limit is not None:
+        query += ' LIMIT ? OFFSET ?'
+        bindings.extend((pagination.limit, pagination.offset))
+    elif pagination.offset != 0:
+        # sqlite requires a LIMIT for an OFFSET and -1 means no limit
+        query += ' LIMIT -1 OFFSET ?'
+        bindings.append(pagination.offset)
+
+    return query + ';', bindings
+
+
+def form_count_query_with_filters(
+        table: str,
+        filters: List[Tuple[str, Tuple[Any, ...]]],
+        timestamp_attribute: str,
+        from_ts: Optional[Timestamp],
+        to_ts: Optional[Timestamp],
+) -> Tuple[str, List[Any]]:
+    """Formulates the query string and its bindings to count the entries matching the filters"""
+    where_clause, bindings = _form_where_clause(filters, timestamp_attribute, from_ts, to_ts)
+    return f'SELECT COUNT(*) FROM {table} {where_clause};', bindings
+
+
 def deserialize_tags_from_db(val: Optional[str]) -> Optional[List[str]]:
     """Read tags from the DB and turn it into a List of tags"""
     if val is None:
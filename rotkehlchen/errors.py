@@ -47,6 +47,11 @@ class SystemPermissionError(Exception):
     pass
 
 
+class StartupError(Exception):
+    """Raised when something that is initialized in the background after login failed"""
+    pass
+
+
 class RemoteError(Exception):
     """Thrown when a remote API can't be reached or throws unexpected error"""
     pass
@@ -1,9 +0,0 @@
-from rotkehlchen.exchanges.binance import Binance  # noqa: F401
-from rotkehlchen.exchanges.bitmex import Bitmex  # noqa: F401
-from rotkehlchen.exchanges.bittrex import Bittrex  # noqa: F401
-from rotkehlchen.exchanges.coinbase import Coinbase  # noqa: F401
-from rotkehlchen.exchanges.coinbasepro import Coinbasepro  # noqa: F401
-from rotkehlchen.exchanges.exchange import ExchangeInterface  # noqa: F401
-from rotkehlchen.exchanges.gemini import Gemini  # noqa: F401
-from rotkehlchen.exchanges.kraken import Kraken  # noqa: F401
-from rotkehlchen.exchanges.poloniex import Poloniex  # noqa: F401
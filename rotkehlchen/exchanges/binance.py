@@ -19,7 +19,7 @@ from rotkehlchen.exchanges.data_structures import (
     TradeType,
     trade_pair_from_assets,
 )
-from rotkehlchen.exchanges.exchange import ExchangeInterface
+from rotkehlchen.exchanges.exchange import ExchangeInterface, balances_query_failed
 from rotkehlchen.exchanges.utils import deserialize_asset_movement_address, get_key_if_has_val
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
@@ -33,7 +33,7 @@ from rotkehlchen.serialization.deserialize import (
 )
 from rotkehlchen.typing import ApiKey, ApiSecret, AssetMovementCategory, Fee, Location, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.interfaces import cache_response_timewise, protect_with_lock
+from rotkehlchen.utils.interfaces import cache_response_stale_while_revalidate, protect_with_lock
 from rotkehlchen.utils.misc import ts_now_in_ms
 from rotkehlchen.utils.serialization import rlk_jsonloads
 
@@ -311,8 +311,8 @@ class Binance(ExchangeInterface):
         assert isinstance(result, List)
         return result
 
+    @cache_response_stale_while_revalidate(keep_stale_if=balances_query_failed)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> Tuple[Optional[dict], str]:
         self.first_connection()
 
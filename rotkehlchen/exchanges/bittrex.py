@@ -22,7 +22,7 @@ from rotkehlchen.errors import (
     UnsupportedAsset,
 )
 from rotkehlchen.exchanges.data_structures import AssetMovement, Trade, get_pair_position_asset
-from rotkehlchen.exchanges.exchange import ExchangeInterface
+from rotkehlchen.exchanges.exchange import ExchangeInterface, balances_query_failed
 from rotkehlchen.exchanges.utils import deserialize_asset_movement_address, get_key_if_has_val
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
@@ -48,7 +48,7 @@ from rotkehlchen.typing import (
     TradePair,
 )
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.interfaces import cache_response_timewise, protect_with_lock
+from rotkehlchen.utils.interfaces import cache_response_stale_while_revalidate, protect_with_lock
 from rotkehlchen.utils.misc import timestamp_to_iso8601, ts_now_in_ms
 from rotkehlchen.utils.serialization import rlk_jsonloads_list
 
@@ -281,8 +281,8 @@ class Bittrex(ExchangeInterface):
         result = self.api_query('currencies')
         return result
 
+    @cache_response_stale_while_revalidate(keep_stale_if=balances_query_failed)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> Tuple[Optional[Dict[Asset, Dict[str, Any]]], str]:
         try:
             resp = self.api_query('balances')
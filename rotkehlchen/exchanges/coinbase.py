@@ -3,17 +3,21 @@ import hmac
 import logging
 import time
 from json.decoder import JSONDecodeError
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 from urllib.parse import urlencode
 
+import gevent
 import requests
+from gevent.lock import Semaphore
+from gevent.pool import Pool
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.converters import asset_from_coinbase
 from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.db.ranges import DBQueryRanges
 from rotkehlchen.errors import DeserializationError, RemoteError, UnknownAsset, UnsupportedAsset
 from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
-from rotkehlchen.exchanges.exchange import ExchangeInterface
+from rotkehlchen.exchanges.exchange import ExchangeInterface, balances_query_failed
 from rotkehlchen.exchanges.utils import deserialize_asset_movement_address, get_key_if_has_val
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -36,7 +40,12 @@ from rotkehlchen.typing import (
     TradePair,
 )
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.interfaces import cache_response_timewise, protect_with_lock
+from rotkehlchen.utils.interfaces import (
+    cache_response_stale_while_revalidate,
+    cache_response_timewise,
+    protect_with_lock,
+)
+from rotkehlchen.utils.misc import ts_now
 from rotkehlchen.utils.serialization import rlk_jsonloads_dict
 
 if TYPE_CHECKING:
@@ -45,6 +54,44 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# https://developers.coinbase.com/api/v2#rate-limiting
+COINBASE_REQUESTS_PER_SEC = 10000 / 3600
+COINBASE_REQUESTS_BURST = 15
+COINBASE_CONCURRENT_ACCOUNT_QUERIES = 5
+COINBASE_TRADE_ENDPOINTS = ('buys', 'sells')
+COINBASE_MOVEMENT_ENDPOINTS = ('deposits', 'withdrawals', 'transactions')
+# Statuses after which a coinbase buy/sell/deposit/withdrawal/send does not change anymore
+COINBASE_FINAL_STATUSES = ('completed', 'canceled', 'failed', 'expired')
+# Keys with which an entry of the transactions endpoint refers to the resource of the
+# buys, sells, deposits or withdrawals endpoint that it was created for
+COINBASE_TRANSACTION_RESOURCES = ('buy', 'sell', 'fiat_deposit', 'fiat_withdrawal')
+
+
+def _entry_created_ts(entry: Any) -> Optional[Timestamp]:
+    """Returns the creation timestamp of a raw coinbase entry or None if it has none"""
+    if not isinstance(entry, dict) or not isinstance(entry.get('created_at'), str):
+        return None
+
+    try:
+        return deserialize_timestamp_from_date(entry['created_at'], 'iso8601', 'coinbase')
+    except DeserializationError:
+        return None
+
+
+def _entry_ids(entry: Any) -> Set[str]:
+    """Returns the ids with which a raw coinbase entry may be stored as a trade or
+    asset movement link. For an entry of the transactions endpoint that is its own id
+    and the id of the buy, sell, deposit or withdrawal it refers to, if any."""
+    if not isinstance(entry, dict):
+        return set()
+
+    ids = set()
+    for value in [entry] + [entry.get(key) for key in COINBASE_TRANSACTION_RESOURCES]:
+        if isinstance(value, dict) and isinstance(value.get('id'), str):
+            ids.add(value['id'])
+
+    return ids
+
 
 def trade_from_coinbase(raw_trade: Dict[str, Any]) -> Optional[Trade]:
     """Turns a coinbase transaction into a rotkehlchen Trade.
@@ -110,6 +157,10 @@ class Coinbase(ExchangeInterface):
         self.apiversion = 'v2'
         self.base_uri = 'https://api.coinbase.com'
         self.msg_aggregator = msg_aggregator
+        # Token bucket shared by all the concurrent queries of this instance
+        self.rate_limit_lock = Semaphore()
+        self.rate_limit_tokens = float(COINBASE_REQUESTS_BURST)
+        self.rate_limit_last_ts = time.time()
 
     def first_connection(self) -> None:
         self.first_connection_made = True
@@ -239,12 +290,18 @@ class Coinbase(ExchangeInterface):
             options: Optional[Dict[str, Any]] = None,
             pagination_next_uri: str = None,
             ignore_pagination: bool = False,
+            stop_at_ids: Optional[Set[str]] = None,
+            recheck_from_ts: Optional[Timestamp] = None,
     ) -> List[Any]:
         """Performs a coinbase API Query for endpoint
 
         You can optionally provide extra arguments to the endpoint via the options argument.
         If this is an ongoing paginating call then provide pagination_next_uri.
         If you want just the first results then set ignore_pagination to True.
+        Coinbase returns results newest first, so if stop_at_ids is given pagination
+        stops at the first page containing an entry with one of those ids. If
+        recheck_from_ts is also given pagination goes on at least until the entries
+        created before that timestamp, since newer ones may have changed since stored.
         """
         request_verb = "GET"
         if pagination_next_uri:
@@ -264,17 +321,20 @@ class Coinbase(ExchangeInterface):
         ).hexdigest()
         log.debug('Coinbase API query', request_url=request_url)
 
-        self.session.headers.update({
+        # The headers are given per request since queries for different accounts
+        # run concurrently and share the session
+        headers = {
             'CB-ACCESS-SIGN': signature,
             'CB-ACCESS-TIMESTAMP': timestamp,
             'CB-ACCESS-KEY': self.api_key,
             # This is needed to guarantee the up to the given date
             # API version response.
             'CB-VERSION': '2019-08-25',
-        })
+        }
         full_url = self.base_uri + request_url
+        self._wait_for_rate_limit()
         try:
-            response = self.session.get(full_url)
+            response = self.session.get(full_url, headers=headers)
         except requests.exceptions.ConnectionError as e:
             raise RemoteError(f'Coinbase API request failed due to {str(e)}')
 
@@ -308,17 +368,46 @@ class Coinbase(ExchangeInterface):
                 # once we get an empty next_uri we are done
                 return final_data
 
+            if stop_at_ids and any(
+                    not _entry_ids(entry).isdisjoint(stop_at_ids) for entry in final_data
+            ):
+                oldest_ts = _entry_created_ts(final_data[-1])
+                if recheck_from_ts is None or (
+                        oldest_ts is not None and oldest_ts < recheck_from_ts
+                ):
+                    # Reached entries we already know. Anything older is known too.
+                    return final_data
+
             additional_data = self._api_query(
                 endpoint=endpoint,
                 options=options,
                 pagination_next_uri=next_uri,
+                stop_at_ids=stop_at_ids,
+                recheck_from_ts=recheck_from_ts,
             )
             final_data.extend(additional_data)
 
         return final_data
 
+    def _wait_for_rate_limit(self) -> None:
+        """Token bucket limiting the rate of queries to what coinbase allows per API key"""
+        with self.rate_limit_lock:
+            now = time.time()
+            refill = (now - self.rate_limit_last_ts) * COINBASE_REQUESTS_PER_SEC
+            self.rate_limit_tokens = min(
+                float(COINBASE_REQUESTS_BURST),
+                self.rate_limit_tokens + refill,
+            )
+            self.rate_limit_last_ts = now
+            if self.rate_limit_tokens < 1:
+                gevent.sleep((1 - self.rate_limit_tokens) / COINBASE_REQUESTS_PER_SEC)
+                self.rate_limit_tokens = 1.0
+                self.rate_limit_last_ts = time.time()
+
+            self.rate_limit_tokens -= 1
+
+    @cache_response_stale_while_revalidate(keep_stale_if=balances_query_failed)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> Tuple[Optional[Dict[Asset, Dict[str, Any]]], str]:
         try:
             resp = self._api_query('accounts')
@@ -392,55 +481,135 @@ class Coinbase(ExchangeInterface):
 
         return returned_balances, ''
 
+    @cache_response_timewise()
+    def _query_accounts(self) -> List[Dict[str, Any]]:
+        """Queries the coinbase accounts. Cached so that the trades and the
+        deposits/withdrawals queries share the same accounts list.
+
+        May raise:
+        - RemoteError if coinbase can't be reached
+        """
+        return self._api_query('accounts')
+
+    def _query_account_history(
+            self,
+            account_id: str,
+            endpoints: Tuple[str, ...],
+            stop_at_ids: Optional[Set[str]] = None,
+            recheck_from_ts: Optional[Timestamp] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Queries the given history endpoints of a single coinbase account and
+        returns the raw entries found per endpoint
+
+        From the "transactions" endpoint only the "sends" are kept, which in
+        Coinbase is the way to send crypto out of the exchange.
+
+        May raise:
+        - RemoteError if coinbase can't be reached
+        """
+        raw_data = {}
+        for endpoint in endpoints:
+            result = self._api_query(
+                f'accounts/{account_id}/{endpoint}',
+                stop_at_ids=stop_at_ids,
+                recheck_from_ts=recheck_from_ts,
+            )
+            if endpoint == 'transactions':
+                result = [tx for tx in result if tx.get('type') == 'send']
+            raw_data[endpoint] = result
+
+        return raw_data
+
+    def _query_accounts_history(
+            self,
+            account_ids: List[str],
+            endpoints: Tuple[str, ...],
+            stop_at_ids: Optional[Set[str]] = None,
+            recheck_from: Optional[Dict[str, Timestamp]] = None,
+    ) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Queries the given history endpoints of all given accounts concurrently
+
+        Returns a mapping of account id to the raw entries found per endpoint.
+        recheck_from optionally maps account ids to the recheck_from_ts of their queries.
+
+        May raise:
+        - RemoteError if coinbase can't be reached for any of the accounts
+        """
+        pool = Pool(COINBASE_CONCURRENT_ACCOUNT_QUERIES)
+        greenlets = {
+            account_id: pool.spawn(
+                self._query_account_history,
+                account_id=account_id,
+                endpoints=endpoints,
+                stop_at_ids=stop_at_ids,
+                recheck_from_ts=recheck_from.get(account_id) if recheck_from else None,
+            )
+            for account_id in account_ids
+        }
+        try:
+            gevent.joinall(list(greenlets.values()), raise_error=True)
+        finally:
+            # If one account failed there is no point in querying the rest
+            pool.kill()
+
+        return {account_id: greenlet.get() for account_id, greenlet in greenlets.items()}
+
+    def _deserialize_trade(self, raw_trade: Dict[str, Any]) -> Optional[Trade]:
+        """Processes a single buy/sell from coinbase and deserializes it
+
+        Can log error/warning and return None if something went wrong at deserialization
+        """
+        try:
+            return trade_from_coinbase(raw_trade)
+        except UnknownAsset as e:
+            self.msg_aggregator.add_warning(
+                f'Found coinbase transaction with unknown asset '
+                f'{e.asset_name}. Ignoring it.',
+            )
+        except UnsupportedAsset as e:
+            self.msg_aggregator.add_warning(
+                f'Found coinbase trade with unsupported asset '
+                f'{e.asset_name}. Ignoring it.',
+            )
+        except (DeserializationError, KeyError) as e:
+            msg = str(e)
+            if isinstance(e, KeyError):
+                msg = f'Missing key entry for {msg}.'
+            self.msg_aggregator.add_error(
+                'Error processing a coinbase trade. Check logs '
+                'for details. Ignoring it.',
+            )
+            log.error(
+                'Error processing a coinbase trade',
+                trade=raw_trade,
+                error=msg,
+            )
+
+        return None
+
     def query_online_trade_history(
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
     ) -> List[Trade]:
-        account_data = self._api_query('accounts')
+        account_data = self._query_accounts()
         # now get the account ids and for each one query buys/sells
         # Looking at coinbase's API no other type of transaction
         # https://developers.coinbase.com/api/v2?python#list-transactions
         # consitutes something that Rotkehlchen would need to return in query_trade_history
         account_ids = self._get_account_ids(account_data)
-
-        raw_data = []
-        for account_id in account_ids:
-            raw_data.extend(self._api_query(f'accounts/{account_id}/buys'))
-            raw_data.extend(self._api_query(f'accounts/{account_id}/sells'))
+        accounts_data = self._query_accounts_history(account_ids, COINBASE_TRADE_ENDPOINTS)
+        raw_data = [
+            entry
+            for endpoints_data in accounts_data.values()
+            for entries in endpoints_data.values()
+            for entry in entries
+        ]
         log.debug('coinbase buys/sells history result', results_num=len(raw_data))
 
         trades = []
         for raw_trade in raw_data:
-            try:
-                trade = trade_from_coinbase(raw_trade)
-            except UnknownAsset as e:
-                self.msg_aggregator.add_warning(
-                    f'Found coinbase transaction with unknown asset '
-                    f'{e.asset_name}. Ignoring it.',
-                )
-                continue
-            except UnsupportedAsset as e:
-                self.msg_aggregator.add_warning(
-                    f'Found coinbase trade with unsupported asset '
-                    f'{e.asset_name}. Ignoring it.',
-                )
-                continue
-            except (DeserializationError, KeyError) as e:
-                msg = str(e)
-                if isinstance(e, KeyError):
-                    msg = f'Missing key entry for {msg}.'
-                self.msg_aggregator.add_error(
-                    'Error processing a coinbase trade. Check logs '
-                    'for details. Ignoring it.',
-                )
-                log.error(
-                    'Error processing a coinbase trade',
-                    trade=raw_trade,
-                    error=msg,
-                )
-                continue
-
+            trade = self._deserialize_trade(raw_trade)
             # limit coinbase trades in the requested time range here since there
             # is no argument in the API call
             if trade and trade.timestamp >= start_ts and trade.timestamp <= end_ts:
@@ -552,21 +721,15 @@ class Coinbase(ExchangeInterface):
             start_ts: Timestamp,
             end_ts: Timestamp,
     ) -> List[AssetMovement]:
-        account_data = self._api_query('accounts')
+        account_data = self._query_accounts()
         account_ids = self._get_account_ids(account_data)
-        raw_data = []
-        for account_id in account_ids:
-            raw_data.extend(self._api_query(f'accounts/{account_id}/deposits'))
-            raw_data.extend(self._api_query(f'accounts/{account_id}/withdrawals'))
-            # also get transactions to get the "sends", which in Coinbase is the
-            # way to send Crypto out of the exchange
-            txs = self._api_query(f'accounts/{account_id}/transactions')
-            for tx in txs:
-                if 'type' not in tx:
-                    continue
-                if tx['type'] == 'send':
-                    raw_data.append(tx)
-
+        accounts_data = self._query_accounts_history(account_ids, COINBASE_MOVEMENT_ENDPOINTS)
+        raw_data = [
+            entry
+            for endpoints_data in accounts_data.values()
+            for entries in endpoints_data.values()
+            for entry in entries
+        ]
         log.debug('coinbase deposits/withdrawals history result', results_num=len(raw_data))
 
         movements = []
@@ -578,3 +741,141 @@ class Coinbase(ExchangeInterface):
                 movements.append(movement)
 
         return movements
+
+    def _accounts_to_sync(
+            self,
+            accounts: List[Dict[str, Any]],
+    ) -> Tuple[List[str], Dict[str, Timestamp]]:
+        """Splits the accounts to those that need a full history query and those that
+        only need the entries after the last sync. Accounts not updated since their
+        last sync and without entries that were still pending at it are skipped.
+
+        The incremental sync accounts are returned along with the timestamp from
+        which on their entries need to be queried again, which is the creation time
+        of their oldest entry that was still pending at the last sync.
+        """
+        accounts_by_id = {
+            x['id']: x for x in accounts
+            if isinstance(x, dict) and isinstance(x.get('id'), str)
+        }
+        full_sync_ids: List[str] = []
+        incremental_sync_ids: Dict[str, Timestamp] = {}
+        for account_id in self._get_account_ids(accounts):
+            last_sync = self.db.get_used_query_range(f'{self.name}_account_{account_id}')
+            if last_sync is None:
+                full_sync_ids.append(account_id)
+                continue
+
+            recheck_from_ts, last_sync_ts = last_sync
+            updated_at = accounts_by_id[account_id].get('updated_at')
+            if updated_at and recheck_from_ts >= last_sync_ts:
+                updated_ts: Optional[Timestamp]
+                try:
+                    updated_ts = deserialize_timestamp_from_date(updated_at, 'iso8601', 'coinbase')
+                except DeserializationError:
+                    updated_ts = None  # query the account to be on the safe side
+                if updated_ts is not None and updated_ts < last_sync_ts:
+                    continue  # no activity since the last sync
+
+            incremental_sync_ids[account_id] = recheck_from_ts
+
+        return full_sync_ids, incremental_sync_ids
+
+    @protect_with_lock()
+    def sync_history(self, start_ts: Timestamp, end_ts: Timestamp) -> None:
+        """Syncs both trades and deposits/withdrawals of all coinbase accounts in one go
+
+        Since the coinbase API has no time range argument the whole history of each
+        account is saved in the DB, not only the requested range. Then each later
+        sync skips the accounts that have not been updated since and stops
+        paginating at the first already stored entry.
+
+        Entries that are not completed yet, like pending deposits, are not saved.
+        So the used query range of each account starts at the creation time of its
+        oldest pending entry and later syncs page back at least until then.
+
+        May raise:
+        - RemoteError if coinbase can't be reached
+        """
+        ranges = DBQueryRanges(self.db)
+        trade_ranges = ranges.get_location_query_ranges(
+            location_string=f'{self.name}_trades',
+            start_ts=start_ts,
+            end_ts=end_ts,
+        )
+        movement_ranges = ranges.get_location_query_ranges(
+            location_string=f'{self.name}_asset_movements',
+            start_ts=start_ts,
+            end_ts=end_ts,
+        )
+        if len(trade_ranges) == 0 and len(movement_ranges) == 0:
+            return
+
+        sync_ts = ts_now()
+        full_sync_ids, incremental_sync_ids = self._accounts_to_sync(
+            self._query_accounts(ignore_cache=True),
+        )
+        endpoints = COINBASE_TRADE_ENDPOINTS + COINBASE_MOVEMENT_ENDPOINTS
+        accounts_data = self._query_accounts_history(full_sync_ids, endpoints)
+        if len(incremental_sync_ids) != 0:
+            accounts_data.update(self._query_accounts_history(
+                account_ids=list(incremental_sync_ids.keys()),
+                endpoints=endpoints,
+                stop_at_ids=self.db.get_location_links(Location.COINBASE),
+                recheck_from=incremental_sync_ids,
+            ))
+
+        new_trades: List[Trade] = []
+        new_movements: List[AssetMovement] = []
+        for endpoints_data in accounts_data.values():
+            for endpoint, raw_entries in endpoints_data.items():
+                for raw_entry in raw_entries:
+                    if endpoint in COINBASE_TRADE_ENDPOINTS:
+                        trade = self._deserialize_trade(raw_entry)
+                        if trade:
+                            new_trades.append(trade)
+                    else:
+                        movement = self._deserialize_asset_movement(raw_entry)
+                        if movement:
+                            new_movements.append(movement)
+
+        if new_trades != []:
+            self.db.add_trades(new_trades)
+        if new_movements != []:
+            self.db.add_asset_movements(new_movements)
+        for account_id, endpoints_data in accounts_data.items():
+            pending_timestamps = [
+                _entry_created_ts(raw_entry)
+                for raw_entries in endpoints_data.values()
+                for raw_entry in raw_entries
+                if isinstance(raw_entry, dict) and
+                raw_entry.get('status') not in COINBASE_FINAL_STATUSES
+            ]
+            # If a pending entry has no valid creation time recheck the whole history
+            recheck_from_ts = min(
+                (x if x is not None else Timestamp(0) for x in pending_timestamps),
+                default=sync_ts,
+            )
+            self.db.update_used_query_range(
+                name=f'{self.name}_account_{account_id}',
+                start_ts=recheck_from_ts,
+                end_ts=sync_ts,
+            )
+        ranges.update_used_query_range(
+            location_string=f'{self.name}_trades',
+            start_ts=start_ts,
+            end_ts=end_ts,
+            ranges_to_query=trade_ranges,
+        )
+        ranges.update_used_query_range(
+            location_string=f'{self.name}_asset_movements',
+            start_ts=start_ts,
+            end_ts=end_ts,
+            ranges_to_query=movement_ranges,
+        )
+
+    def sync_trade_history(self, start_ts: Timestamp, end_ts: Timestamp) -> None:
+        self.sync_history(start_ts=start_ts, end_ts=end_ts)
+
+    def sync_deposits_withdrawals(self, start_ts: Timestamp, end_ts: Timestamp) -> None:
+        self.sync_history(start_ts=start_ts, end_ts=end_ts)
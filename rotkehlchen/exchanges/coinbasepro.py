@@ -28,7 +28,7 @@ from rotkehlchen.errors import (
     UnsupportedAsset,
 )
 from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
-from rotkehlchen.exchanges.exchange import ExchangeInterface
+from rotkehlchen.exchanges.exchange import ExchangeInterface, balances_query_failed
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import (
@@ -42,7 +42,7 @@ from rotkehlchen.serialization.deserialize import (
 )
 from rotkehlchen.typing import ApiKey, ApiSecret, Fee, Location, Timestamp, TradePair
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.interfaces import cache_response_timewise, protect_with_lock
+from rotkehlchen.utils.interfaces import cache_response_stale_while_revalidate, protect_with_lock
 from rotkehlchen.utils.misc import timestamp_to_iso8601, ts_now
 from rotkehlchen.utils.serialization import rlk_jsonloads_dict, rlk_jsonloads_list
 
@@ -256,8 +256,8 @@ class Coinbasepro(ExchangeInterface):
 
         return json_ret
 
+    @cache_response_stale_while_revalidate(keep_stale_if=balances_query_failed)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> Tuple[Optional[Dict[Asset, Dict[str, Any]]], str]:
         try:
             accounts = self._api_query('accounts')
@@ -26,6 +26,11 @@ ExchangeHistorySuccessCallback = Callable[
 ExchangeHistoryFailCallback = Callable[[str], None]
 
 
+def balances_query_failed(result: Tuple[Optional[dict], str]) -> bool:
+    """Used so that a failed balances query does not replace the last cached balances"""
+    return result[0] is None
+
+
 class ExchangeInterface(CacheableObject, LockableQueryObject):
 
     def __init__(
@@ -127,17 +132,16 @@ class ExchangeInterface(CacheableObject, LockableQueryObject):
         )
 
     @protect_with_lock()
-    def query_trade_history(
+    def sync_trade_history(
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
-    ) -> List[Trade]:
-        """Queries the local DB and the remote exchange for the trade history of the user"""
-        trades = self.db.get_trades(
-            from_ts=start_ts,
-            to_ts=end_ts,
-            location=deserialize_location(self.name),
-        )
+    ) -> None:
+        """Queries the remote exchange for the trades of all time ranges not yet
+        queried and saves them in the DB.
+
+        The saved trades can then be read, filtered and paginated via the DB.
+        """
         ranges = DBQueryRanges(self.db)
         ranges_to_query = ranges.get_location_query_ranges(
             location_string=f'{self.name}_trades',
@@ -158,20 +162,30 @@ class ExchangeInterface(CacheableObject, LockableQueryObject):
                 msg = 'query_online_trade_history should only not be implemented by bitmex'
                 assert self.name == 'bitmex', msg
 
-        # make sure to add them to the DB
-        if new_trades != []:
-            self.db.add_trades(new_trades)
-        # and also set the used queried timestamp range for the exchange
-        ranges.update_used_query_range(
-            location_string=f'{self.name}_trades',
-            start_ts=start_ts,
-            end_ts=end_ts,
-            ranges_to_query=ranges_to_query,
-        )
-        # finally append them to the already returned DB trades
-        trades.extend(new_trades)
+        with self.db.write_batch():
+            # make sure to add them to the DB
+            if new_trades != []:
+                self.db.add_trades(new_trades)
+            # and also set the used queried timestamp range for the exchange
+            ranges.update_used_query_range(
+                location_string=f'{self.name}_trades',
+                start_ts=start_ts,
+                end_ts=end_ts,
+                ranges_to_query=ranges_to_query,
+            )
 
-        return trades
+    def query_trade_history(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> List[Trade]:
+        """Queries the local DB and the remote exchange for the trade history of the user"""
+        self.sync_trade_history(start_ts=start_ts, end_ts=end_ts)
+        return self.db.get_trades(
+            from_ts=start_ts,
+            to_ts=end_ts,
+            location=deserialize_location(self.name),
+        )
 
     def query_margin_history(
             self,
@@ -201,33 +215,31 @@ class ExchangeInterface(CacheableObject, LockableQueryObject):
             except NotImplementedError:
                 pass
 
-        # make sure to add them to the DB
-        if new_positions != []:
-            self.db.add_margin_positions(new_positions)
-        # and also set the last queried timestamp for the exchange
-        ranges.update_used_query_range(
-            location_string=f'{self.name}_margins',
-            start_ts=start_ts,
-            end_ts=end_ts,
-            ranges_to_query=ranges_to_query,
-        )
+        with self.db.write_batch():
+            # make sure to add them to the DB
+            if new_positions != []:
+                self.db.add_margin_positions(new_positions)
+            # and also set the last queried timestamp for the exchange
+            ranges.update_used_query_range(
+                location_string=f'{self.name}_margins',
+                start_ts=start_ts,
+                end_ts=end_ts,
+                ranges_to_query=ranges_to_query,
+            )
         # finally append them to the already returned DB margin positions
         margin_positions.extend(new_positions)
 
         return margin_positions
 
     @protect_with_lock()
-    def query_deposits_withdrawals(
+    def sync_deposits_withdrawals(
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
-    ) -> List[AssetMovement]:
-        """Queries the local DB and the exchange for the deposits/withdrawal history of the user"""
-        asset_movements = self.db.get_asset_movements(
-            from_ts=start_ts,
-            to_ts=end_ts,
-            location=self.name,
-        )
+    ) -> None:
+        """Queries the remote exchange for the deposits/withdrawals of all time ranges
+        not yet queried and saves them in the DB.
+        """
         ranges = DBQueryRanges(self.db)
         ranges_to_query = ranges.get_location_query_ranges(
             location_string=f'{self.name}_asset_movements',
@@ -241,17 +253,28 @@ class ExchangeInterface(CacheableObject, LockableQueryObject):
                 end_ts=query_end_ts,
             ))
 
-        if new_movements != []:
-            self.db.add_asset_movements(new_movements)
-        ranges.update_used_query_range(
-            location_string=f'{self.name}_asset_movements',
-            start_ts=start_ts,
-            end_ts=end_ts,
-            ranges_to_query=ranges_to_query,
-        )
-        asset_movements.extend(new_movements)
+        with self.db.write_batch():
+            if new_movements != []:
+                self.db.add_asset_movements(new_movements)
+            ranges.update_used_query_range(
+                location_string=f'{self.name}_asset_movements',
+                start_ts=start_ts,
+                end_ts=end_ts,
+                ranges_to_query=ranges_to_query,
+            )
 
-        return asset_movements
+    def query_deposits_withdrawals(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> List[AssetMovement]:
+        """Queries the local DB and the exchange for the deposits/withdrawal history of the user"""
+        self.sync_deposits_withdrawals(start_ts=start_ts, end_ts=end_ts)
+        return self.db.get_asset_movements(
+            from_ts=start_ts,
+            to_ts=end_ts,
+            location=self.name,
+        )
 
     def query_history_with_callbacks(
             self,
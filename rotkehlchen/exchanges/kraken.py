@@ -6,8 +6,9 @@ import hmac
 import json
 import logging
 import time
+from collections import defaultdict
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, Optional, Set, Tuple, Union
 from urllib.parse import urlencode
 
 import gevent
@@ -19,6 +20,7 @@ from rotkehlchen.assets.converters import KRAKEN_TO_WORLD, asset_from_kraken
 from rotkehlchen.constants import KRAKEN_API_VERSION, KRAKEN_BASE_URL
 from rotkehlchen.constants.assets import A_DAI, A_ETH
 from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.db.ranges import DBQueryRanges, merge_query_ranges
 from rotkehlchen.errors import (
     DeserializationError,
     RemoteError,
@@ -31,7 +33,7 @@ from rotkehlchen.exchanges.data_structures import (
     get_pair_position_asset,
     trade_pair_from_assets,
 )
-from rotkehlchen.exchanges.exchange import ExchangeInterface
+from rotkehlchen.exchanges.exchange import ExchangeInterface, balances_query_failed
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -45,10 +47,19 @@ from rotkehlchen.serialization.deserialize import (
     deserialize_trade_type,
     pair_get_assets,
 )
-from rotkehlchen.typing import ApiKey, ApiSecret, Location, Timestamp, TradePair
+from rotkehlchen.typing import (
+    ApiKey,
+    ApiSecret,
+    AssetAmount,
+    Fee,
+    Location,
+    Price,
+    Timestamp,
+    TradePair,
+    TradeType,
+)
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.interfaces import cache_response_timewise, protect_with_lock
-from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.interfaces import cache_response_stale_while_revalidate, protect_with_lock
 from rotkehlchen.utils.serialization import rlk_jsonloads_dict
 
 if TYPE_CHECKING:
@@ -62,7 +73,20 @@ log = RotkehlchenLogsAdapter(logger)
 KRAKEN_DELISTED = ('XDAO', 'XXVN', 'ZKRW', 'XNMC', 'BSV', 'XICN')
 KRAKEN_PUBLIC_METHODS = ('AssetPairs', 'Assets')
 KRAKEN_QUERY_TRIES = 8
-MAX_CALL_COUNTER_INCREASE = 2  # Trades and Ledger produce the max increase
+KRAKEN_RATE_LIMITED_MSG = 'Rate limited exceeded'
+# Ledger types whose entries come in pairs sharing a refid, one per asset traded
+KRAKEN_LEDGER_TRADE_TYPES = ('trade', 'spend', 'receive')
+KRAKEN_LEDGER_MOVEMENT_TYPES = ('deposit', 'withdrawal')
+
+
+def kraken_call_cost(method: str) -> int:
+    """Returns by how much a call to the given method increases kraken's call counter
+
+    https://support.kraken.com/hc/en-us/articles/206548367
+    """
+    if method in ('Ledgers', 'TradesHistory'):
+        return 2
+    return 1
 
 
 def kraken_to_world_pair(pair: str) -> TradePair:
@@ -214,6 +238,95 @@ def trade_from_kraken(kraken_trade: Dict[str, Any]) -> Trade:
     )
 
 
+def trade_from_kraken_ledger(
+        refid: str,
+        entries: List[Dict[str, Any]],
+        tradeable_pairs: Set[TradePair],
+) -> Trade:
+    """Turn the ledger entries of a single kraken trade, as grouped by their refid,
+    to our common trade history format
+
+    A trade is recorded in the ledger as one entry for the asset spent (negative amount)
+    and one entry for the asset received. Which one is the base asset is decided from
+    the kraken tradeable pairs and if the pair is not known, for example due to a
+    delisting, the spent asset is considered the quote asset. Any fee charged in the
+    base asset is converted to the quote asset at the rate of the trade.
+
+    - Can raise UnknownAsset due to asset_from_kraken
+    - Can raise DeserializationError due to dict entries not being as expected
+    - Can raise KeyError due to dict entries missing an expected entry
+    """
+    if len(entries) != 2:
+        raise DeserializationError(
+            f'Expected 2 ledger entries for kraken trade {refid} but got {len(entries)}',
+        )
+
+    legs = []
+    for entry in entries:
+        legs.append((
+            asset_from_kraken(entry['asset']),
+            deserialize_asset_amount(entry['amount']),
+            deserialize_fee(entry['fee']),
+        ))
+    legs.sort(key=lambda x: x[1])
+    spent_asset, spent_amount, spent_fee = legs[0]
+    received_asset, received_amount, received_fee = legs[1]
+    if spent_amount >= ZERO or received_amount <= ZERO:
+        raise DeserializationError(
+            f'Kraken trade {refid} ledger entries do not consist of a spend and a receive',
+        )
+    spent_amount = AssetAmount(abs(spent_amount))
+
+    if trade_pair_from_assets(base=spent_asset, quote=received_asset) in tradeable_pairs:
+        trade_type = TradeType.SELL
+        pair = trade_pair_from_assets(base=spent_asset, quote=received_asset)
+        amount, quote_amount = spent_amount, received_amount
+        base_fee, quote_fee = spent_fee, received_fee
+        quote_asset = received_asset
+    else:
+        trade_type = TradeType.BUY
+        pair = trade_pair_from_assets(base=received_asset, quote=spent_asset)
+        amount, quote_amount = received_amount, spent_amount
+        base_fee, quote_fee = received_fee, spent_fee
+        quote_asset = spent_asset
+
+    rate = Price(quote_amount / amount)
+    timestamp = max(deserialize_timestamp_from_kraken(entry['time']) for entry in entries)
+    return Trade(
+        timestamp=timestamp,
+        location=Location.KRAKEN,
+        pair=pair,
+        trade_type=trade_type,
+        amount=amount,
+        rate=rate,
+        fee=Fee(quote_fee + base_fee * rate),
+        fee_currency=quote_asset,
+        link=refid,
+    )
+
+
+def asset_movement_from_kraken_ledger(entry: Dict[str, Any]) -> AssetMovement:
+    """Turn a kraken deposit/withdrawal ledger entry to our common asset movement format
+
+    - Can raise UnknownAsset due to asset_from_kraken
+    - Can raise DeserializationError due to dict entries not being as expected
+    - Can raise KeyError due to dict entries missing an expected entry
+    """
+    asset = asset_from_kraken(entry['asset'])
+    return AssetMovement(
+        location=Location.KRAKEN,
+        category=deserialize_asset_movement_category(entry['type']),
+        timestamp=deserialize_timestamp_from_kraken(entry['time']),
+        address=None,  # no data from kraken ledger endpoint
+        transaction_id=None,  # no data from kraken ledger endpoint
+        asset=asset,
+        amount=deserialize_asset_amount_force_positive(entry['amount']),
+        fee_asset=asset,
+        fee=deserialize_fee(entry['fee']),
+        link=str(entry['refid']),
+    )
+
+
 def _check_and_get_response(response: Response, method: str) -> Union[str, Dict]:
     """Checks the kraken response and if it's succesfull returns the result.
 
@@ -247,7 +360,7 @@ def _check_and_get_response(response: Response, method: str) -> Union[str, Dict]
 
             if 'Rate limit exceeded' in error:
                 log.debug(f'Kraken: Got rate limit exceeded error: {error}')
-                return 'Rate limited exceeded'
+                return KRAKEN_RATE_LIMITED_MSG
             else:
                 raise RemoteError(error)
 
@@ -296,6 +409,7 @@ class Kraken(ExchangeInterface):
             database: 'DBHandler',
             msg_aggregator: MessagesAggregator,
             account_type: KrakenAccountType = KrakenAccountType.STARTER,
+            use_ledger_sync: bool = False,
     ):
         super(Kraken, self).__init__('kraken', api_key, secret, database)
         self.msg_aggregator = msg_aggregator
@@ -304,8 +418,11 @@ class Kraken(ExchangeInterface):
         })
         self.nonce_lock = Semaphore()
         self.set_account_type(account_type)
-        self.call_counter = 0
-        self.last_query_ts = 0
+        # If True the trades and deposits/withdrawals are derived from a single ledger query
+        self.use_ledger_sync = use_ledger_sync
+        self.tradeable_pairs_set: Optional[Set[TradePair]] = None
+        self.call_counter = 0.0
+        self.last_query_ts = 0.0
 
     def set_account_type(self, account_type: KrakenAccountType) -> None:
         self.account_type = account_type
@@ -376,12 +493,18 @@ class Kraken(ExchangeInterface):
     def first_connection(self) -> None:
         self.first_connection_made = True
 
+    def _decay_call_counter(self) -> None:
+        """Reduces the call counter by the amount kraken would have reduced it since the
+        last time we looked at it. The reduction is continuous, at a rate of 1 every
+        `reduction_every_secs` seconds."""
+        now = time.time()
+        elapsed_secs = max(0.0, now - self.last_query_ts)
+        self.call_counter = max(0.0, self.call_counter - elapsed_secs / self.reduction_every_secs)
+        self.last_query_ts = now
+
     def _manage_call_counter(self, method: str) -> None:
-        self.last_query_ts = ts_now()
-        if method in ('Ledgers', 'TradesHistory'):
-            self.call_counter += 2
-        else:
-            self.call_counter += 1
+        self._decay_call_counter()
+        self.call_counter += kraken_call_cost(method)
 
     def _query_public(self, method: str, req: Optional[dict] = None) -> Union[Dict, str]:
         """API queries that do not require a valid key/secret pair.
@@ -406,25 +529,22 @@ class Kraken(ExchangeInterface):
         query_method = (
             self._query_public if method in KRAKEN_PUBLIC_METHODS else self._query_private
         )
+        call_cost = kraken_call_cost(method)
         while tries > 0:
-            if self.call_counter + MAX_CALL_COUNTER_INCREASE > self.call_limit:
-                # If we are close to the limit, check how much our call counter reduced
-                # https://www.kraken.com/features/api#api-call-rate-limit
-                secs_since_last_call = ts_now() - self.last_query_ts
-                self.call_counter = max(
-                    0,
-                    self.call_counter - int(secs_since_last_call / self.reduction_every_secs),
+            # Token bucket: sleep exactly as long as it takes for kraken to reduce our
+            # call counter enough so that this call does not exceed the limit
+            # https://www.kraken.com/features/api#api-call-rate-limit
+            self._decay_call_counter()
+            excess = self.call_counter + call_cost - self.call_limit
+            if excess > 0:
+                backoff_in_seconds = excess * self.reduction_every_secs
+                log.debug(
+                    f'Doing a Kraken API call would now exceed our call counter limit. '
+                    f'Backing off for {backoff_in_seconds:.2f} seconds',
+                    call_counter=self.call_counter,
                 )
-                # If still at limit, sleep for an amount big enough for smallest tier reduction
-                if self.call_counter + MAX_CALL_COUNTER_INCREASE > self.call_limit:
-                    backoff_in_seconds = self.reduction_every_secs * 2
-                    log.debug(
-                        f'Doing a Kraken API call would now exceed our call counter limit. '
-                        f'Backing off for {backoff_in_seconds} seconds',
-                        call_counter=self.call_counter,
-                    )
-                    gevent.sleep(backoff_in_seconds)
-                    continue
+                gevent.sleep(backoff_in_seconds)
+                continue
 
             log.debug(
                 'Kraken API query',
@@ -435,12 +555,17 @@ class Kraken(ExchangeInterface):
             result = query_method(method, req)
             if isinstance(result, str):
                 # Got a recoverable error
+                if result == KRAKEN_RATE_LIMITED_MSG:
+                    # Our view of the call counter drifted from kraken's. Consider the
+                    # bucket full so that the next attempt waits for it to drain.
+                    self.call_counter = float(self.call_limit)
                 backoff_in_seconds = int(15 / tries)
                 log.debug(
                     f'Got recoverable error {result} in a Kraken query of {method}. Will backoff '
                     f'for {backoff_in_seconds} seconds',
                 )
                 gevent.sleep(backoff_in_seconds)
+                tries -= 1
                 continue
 
             # else success
@@ -490,8 +615,8 @@ class Kraken(ExchangeInterface):
         return _check_and_get_response(response, method)
 
     # ---- General exchanges interface ----
+    @cache_response_stale_while_revalidate(keep_stale_if=balances_query_failed)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> Tuple[Optional[dict], str]:
         try:
             old_balances = self.api_query('Balance', req={})
@@ -704,27 +829,16 @@ class Kraken(ExchangeInterface):
         ))
 
         log.debug('Kraken deposit/withdrawals query result', num_results=len(result))
+        return self._process_ledger_movements(result)
 
+    def _process_ledger_movements(self, entries: List[Dict[str, Any]]) -> List[AssetMovement]:
         movements = []
-        for movement in result:
+        for movement in entries:
             try:
-                asset = asset_from_kraken(movement['asset'])
-                movement_type = movement['type']
-                if movement_type not in ('deposit', 'withdrawal'):
+                if movement['type'] not in KRAKEN_LEDGER_MOVEMENT_TYPES:
                     # Other known types: 'transfer'
                     continue  # Can be for moving funds from spot to stake etc.
-                movements.append(AssetMovement(
-                    location=Location.KRAKEN,
-                    category=deserialize_asset_movement_category(movement_type),
-                    timestamp=deserialize_timestamp_from_kraken(movement['time']),
-                    address=None,  # no data from kraken ledger endpoint
-                    transaction_id=None,  # no data from kraken ledger endpoint
-                    asset=asset,
-                    amount=deserialize_asset_amount_force_positive(movement['amount']),
-                    fee_asset=asset,
-                    fee=deserialize_fee(movement['fee']),
-                    link=str(movement['refid']),
-                ))
+                movements.append(asset_movement_from_kraken_ledger(movement))
             except UnknownAsset as e:
                 self.msg_aggregator.add_warning(
                     f'Found unknown kraken asset {e.asset_name}. '
@@ -747,3 +861,138 @@ class Kraken(ExchangeInterface):
                 continue
 
         return movements
+
+    def _get_tradeable_pairs(self) -> Set[TradePair]:
+        """Returns the kraken tradeable pairs in our pair format. Queried once per instance.
+
+        May raise:
+        - RemoteError if kraken can't be reached
+        """
+        if self.tradeable_pairs_set is not None:
+            return self.tradeable_pairs_set
+
+        pairs: Set[TradePair] = set()
+        for kraken_pair in self.api_query('AssetPairs').keys():
+            try:
+                pairs.add(kraken_to_world_pair(kraken_pair))
+            except (UnknownAsset, UnprocessableTradePair, DeserializationError):
+                continue
+
+        self.tradeable_pairs_set = pairs
+        return pairs
+
+    def _process_ledger_trades(self, entries: List[Dict[str, Any]]) -> List[Trade]:
+        """Groups the trade ledger entries by refid and derives a trade from each group"""
+        trade_entries: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for entry in entries:
+            if entry.get('type') in KRAKEN_LEDGER_TRADE_TYPES and 'refid' in entry:
+                trade_entries[str(entry['refid'])].append(entry)
+
+        if len(trade_entries) == 0:
+            return []
+
+        tradeable_pairs = self._get_tradeable_pairs()
+        trades = []
+        for refid, grouped_entries in trade_entries.items():
+            try:
+                trades.append(trade_from_kraken_ledger(
+                    refid=refid,
+                    entries=grouped_entries,
+                    tradeable_pairs=tradeable_pairs,
+                ))
+            except UnknownAsset as e:
+                self.msg_aggregator.add_warning(
+                    f'Found kraken trade with unknown asset '
+                    f'{e.asset_name}. Ignoring it.',
+                )
+                continue
+            except (DeserializationError, KeyError) as e:
+                msg = str(e)
+                if isinstance(e, KeyError):
+                    msg = f'Missing key entry for {msg}.'
+                self.msg_aggregator.add_error(
+                    'Error processing a kraken trade. Check logs '
+                    'for details. Ignoring it.',
+                )
+                log.error(
+                    'Error processing a kraken trade from the ledger',
+                    ledger_entries=grouped_entries,
+                    error=msg,
+                )
+                continue
+
+        return trades
+
+    @protect_with_lock()
+    def sync_ledger(self, start_ts: Timestamp, end_ts: Timestamp) -> None:
+        """Queries the whole kraken ledger, without a type filter, once for every time
+        range for which either the trades or the deposits/withdrawals have not yet been
+        queried and derives both from it, saving them in the DB.
+
+        The ranges used are the same as the ones of the separate trades and
+        deposits/withdrawals queries so switching between the two sync modes
+        does not query any period twice. Overlapping trades and deposits/withdrawals
+        ranges are merged so the ledger of each period is only queried once.
+
+        May raise:
+        - RemoteError if kraken can't be reached
+        """
+        ranges = DBQueryRanges(self.db)
+        trade_ranges = ranges.get_location_query_ranges(
+            location_string=f'{self.name}_trades',
+            start_ts=start_ts,
+            end_ts=end_ts,
+        )
+        movement_ranges = ranges.get_location_query_ranges(
+            location_string=f'{self.name}_asset_movements',
+            start_ts=start_ts,
+            end_ts=end_ts,
+        )
+        new_trades: List[Trade] = []
+        new_movements: List[AssetMovement] = []
+        for query_start_ts, query_end_ts in merge_query_ranges(trade_ranges + movement_ranges):
+            entries = self.query_until_finished(
+                endpoint='Ledgers',
+                keyname='ledger',
+                start_ts=query_start_ts,
+                end_ts=query_end_ts,
+            )
+            log.debug('Kraken ledger query result', num_results=len(entries))
+            # Only keep what falls in the ranges not yet queried for each type
+            new_trades.extend(
+                x for x in self._process_ledger_trades(entries)
+                if any(start <= x.timestamp <= end for start, end in trade_ranges)
+            )
+            new_movements.extend(
+                x for x in self._process_ledger_movements(entries)
+                if any(start <= x.timestamp <= end for start, end in movement_ranges)
+            )
+
+        if new_trades != []:
+            self.db.add_trades(new_trades)
+        if new_movements != []:
+            self.db.add_asset_movements(new_movements)
+        ranges.update_used_query_range(
+            location_string=f'{self.name}_trades',
+            start_ts=start_ts,
+            end_ts=end_ts,
+            ranges_to_query=trade_ranges,
+        )
+        ranges.update_used_query_range(
+            location_string=f'{self.name}_asset_movements',
+            start_ts=start_ts,
+            end_ts=end_ts,
+            ranges_to_query=movement_ranges,
+        )
+
+    def sync_trade_history(self, start_ts: Timestamp, end_ts: Timestamp) -> None:
+        if self.use_ledger_sync:
+            self.sync_ledger(start_ts=start_ts, end_ts=end_ts)
+        else:
+            super().sync_trade_history(start_ts=start_ts, end_ts=end_ts)
+
+    def sync_deposits_withdrawals(self, start_ts: Timestamp, end_ts: Timestamp) -> None:
+        if self.use_ledger_sync:
+            self.sync_ledger(start_ts=start_ts, end_ts=end_ts)
+        else:
+            super().sync_deposits_withdrawals(start_ts=start_ts, end_ts=end_ts)
@@ -45,15 +45,18 @@ class ExchangeManager():
                     f'connected exchanges mapping. Removing stale exchange from '
                     f'mapping. This should not happen.',
                 )
-                self.connected_exchanges.pop(name)
+                self.connected_exchanges.pop(name).kill_background_refreshes()
             return False
 
         return name in self.connected_exchanges
 
     def delete_exchange(self, name: str) -> None:
-        self.connected_exchanges.pop(name)
+        exchange = self.connected_exchanges.pop(name)
+        exchange.kill_background_refreshes()
 
     def delete_all_exchanges(self) -> None:
+        for exchange in self.connected_exchanges.values():
+            exchange.kill_background_refreshes()
         self.connected_exchanges.clear()
 
     def get_connected_exchange_names(self) -> List[str]:
@@ -127,6 +130,7 @@ class ExchangeManager():
                 if name == 'kraken':
                     settings = database.get_settings()
                     extra_args['account_type'] = settings.kraken_account_type
+                    extra_args['use_ledger_sync'] = settings.kraken_ledger_sync
                 exchange_obj = exchange_ctor(
                     api_key=credentials.api_key,
                     secret=credentials.api_secret,
@@ -119,6 +119,7 @@ class Etherscan(ExternalServiceWithApiKey):
                 'tokenbalance',
                 'eth_blockNumber',
                 'eth_getCode',
+                'eth_getTransactionCount',
                 'eth_call',
             ],
             options: Optional[Dict[str, Any]] = None,
@@ -334,6 +335,25 @@ class Etherscan(ExternalServiceWithApiKey):
         result = self._query(module='proxy', action='eth_getCode', options={'address': account})
         return result
 
+    def get_transaction_count(self, account: ChecksumEthAddress) -> int:
+        """Gets the number of transactions sent from the given address
+
+        May raise:
+        - RemoteError if there are any problems with reaching Etherscan or if
+        an unexpected response is returned
+        """
+        result = self._query(
+            module='proxy',
+            action='eth_getTransactionCount',
+            options={'address': account, 'tag': 'latest'},
+        )
+        try:
+            return hex_or_bytes_to_int(result)
+        except ConversionError as e:
+            raise RemoteError(
+                f'Got unexpected etherscan response: {result} to eth_getTransactionCount call',
+            ) from e
+
     def get_transaction_receipt(self, tx_hash: str) -> Dict[str, Any]:
         """Gets the receipt for the given transaction hash
 
@@ -388,13 +408,15 @@ class Etherscan(ExternalServiceWithApiKey):
     def get_logs(
             self,
             contract_address: ChecksumEthAddress,
-            topics: List[str],
+            topics: List[Optional[str]],
             from_block: int,
             to_block: Union[int, str] = 'latest',
     ) -> List[Dict[str, Any]]:
         """Performs the etherscan style of eth_getLogs as explained here:
         https://etherscan.io/apis#logs
 
+        A None topic matches any value.
+
         May raise:
         - RemoteError if there are any problems with reaching Etherscan or if
         an unexpected response is returned
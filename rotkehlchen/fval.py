@@ -1,5 +1,5 @@
 from decimal import Decimal, InvalidOperation
-from typing import Any, Union
+from typing import Any, Iterable, Union
 
 from rotkehlchen.errors import ConversionError
 
@@ -7,6 +7,8 @@ from rotkehlchen.errors import ConversionError
 AcceptableFValInitInput = Union[float, bytes, Decimal, int, str, 'FVal']
 AcceptableFValOtherInput = Union[int, 'FVal']
 
+DECIMAL_ZERO = Decimal(0)
+
 
 class FVal():
     """A value to represent numbers for financial applications. At the moment
@@ -45,6 +47,15 @@ class FVal():
                 'Found {}.'.format(type(data)),
             )
 
+    @staticmethod
+    def _from_decimal(num: Decimal) -> 'FVal':
+        """Creates an FVal out of a Decimal skipping the input checks of the constructor
+
+        Only meant for the results of operations between Decimals"""
+        result = object.__new__(FVal)
+        result.num = num
+        return result
+
     def __str__(self) -> str:
         return str(self.num)
 
@@ -53,75 +64,75 @@ class FVal():
 
     def __gt__(self, other: AcceptableFValOtherInput) -> bool:
         evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('1')
+        return self.num > evaluated_other
 
     def __lt__(self, other: AcceptableFValOtherInput) -> bool:
         evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('-1')
+        return self.num < evaluated_other
 
     def __le__(self, other: AcceptableFValOtherInput) -> bool:
         evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('-1'), Decimal('0'))
+        return self.num <= evaluated_other
 
     def __ge__(self, other: AcceptableFValOtherInput) -> bool:
         evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('1'), Decimal('0'))
+        return self.num >= evaluated_other
 
     def __eq__(self, other: object) -> bool:
         evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('0')
+        return self.num == evaluated_other
 
     def __add__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__add__(evaluated_other))
+        return FVal._from_decimal(self.num.__add__(evaluated_other))
 
     def __sub__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__sub__(evaluated_other))
+        return FVal._from_decimal(self.num.__sub__(evaluated_other))
 
     def __mul__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__mul__(evaluated_other))
+        return FVal._from_decimal(self.num.__mul__(evaluated_other))
 
     def __truediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__truediv__(evaluated_other))
+        return FVal._from_decimal(self.num.__truediv__(evaluated_other))
 
     def __floordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__floordiv__(evaluated_other))
+        return FVal._from_decimal(self.num.__floordiv__(evaluated_other))
 
     def __pow__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__pow__(evaluated_other))
+        return FVal._from_decimal(self.num.__pow__(evaluated_other))
 
     def __radd__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__radd__(evaluated_other))
+        return FVal._from_decimal(self.num.__radd__(evaluated_other))
 
     def __rsub__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rsub__(evaluated_other))
+        return FVal._from_decimal(self.num.__rsub__(evaluated_other))
 
     def __rmul__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rmul__(evaluated_other))
+        return FVal._from_decimal(self.num.__rmul__(evaluated_other))
 
     def __rtruediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rtruediv__(evaluated_other))
+        return FVal._from_decimal(self.num.__rtruediv__(evaluated_other))
 
     def __rfloordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rfloordiv__(evaluated_other))
+        return FVal._from_decimal(self.num.__rfloordiv__(evaluated_other))
 
     def __mod__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__mod__(evaluated_other))
+        return FVal._from_decimal(self.num.__mod__(evaluated_other))
 
     def __rmod__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rmod__(evaluated_other))
+        return FVal._from_decimal(self.num.__rmod__(evaluated_other))
 
     def __float__(self) -> float:
         return float(self.num)
@@ -129,10 +140,10 @@ class FVal():
     # --- Unary operands
 
     def __neg__(self) -> 'FVal':
-        return FVal(self.num.__neg__())
+        return FVal._from_decimal(self.num.__neg__())
 
     def __abs__(self) -> 'FVal':
-        return FVal(self.num.copy_abs())
+        return FVal._from_decimal(self.num.copy_abs())
 
     # --- Other operations
 
@@ -143,7 +154,7 @@ class FVal():
         """
         evaluated_other = evaluate_input(other)
         evaluated_third = evaluate_input(third)
-        return FVal(self.num.fma(evaluated_other, evaluated_third))
+        return FVal._from_decimal(self.num.fma(evaluated_other, evaluated_third))
 
     def to_percentage(self, precision: int = 4) -> str:
         return '{:.{}%}'.format(self.num, precision)
@@ -161,13 +172,16 @@ class FVal():
         return int(self.num)
 
     def is_close(self, other: AcceptableFValInitInput, max_diff: str = "1e-6") -> bool:
-        evaluated_max_diff = FVal(max_diff)
-
         if not isinstance(other, FVal):
             other = FVal(other)
 
         diff_num = abs(self.num - other.num)
-        return diff_num <= evaluated_max_diff.num
+        return diff_num <= Decimal(max_diff)
+
+
+def sum_fvals(values: Iterable[FVal]) -> FVal:
+    """Sums the given FVals by adding their Decimals and creating a single FVal at the end"""
+    return FVal._from_decimal(sum((value.num for value in values), DECIMAL_ZERO))
 
 
 def evaluate_input(other: Any) -> Union[Decimal, int]:
@@ -1,4 +1,3 @@
-import base64
 import logging
 import shutil
 from enum import Enum
@@ -15,6 +14,7 @@ from rotkehlchen.errors import (
 )
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import Premium, PremiumCredentials, premium_create_and_verify
+from rotkehlchen.typing import B64EncodedBytes
 from rotkehlchen.utils.misc import timestamp_to_date, ts_now
 
 logger = logging.getLogger(__name__)
@@ -35,6 +35,11 @@ class SyncCheckResult(NamedTuple):
     payload: Optional[Dict[str, Any]]
 
 
+def _b64_decoded_size(data: B64EncodedBytes) -> int:
+    """Returns the size of the given base64 data once decoded without decoding it"""
+    return len(data) * 3 // 4 - data[-2:].count(b'=')
+
+
 class PremiumSyncManager():
 
     def __init__(self, data: DataHandler, password: str) -> None:
@@ -56,8 +61,6 @@ class PremiumSyncManager():
         if self.premium is None:
             return SyncCheckResult(can_sync=CanSync.NO, message='', payload=None)
 
-        b64_encoded_data, our_hash = self.data.compress_and_encrypt_db(self.password)
-
         try:
             metadata = self.premium.query_last_data_metadata()
         except RemoteError as e:
@@ -71,6 +74,9 @@ class PremiumSyncManager():
             # If it's not a new account and the db setting for premium syncing is off stop
             return SyncCheckResult(can_sync=CanSync.NO, message='', payload=None)
 
+        # Only export the DB once we know its hash and size are needed
+        b64_encoded_data, our_hash = self.data.compress_and_encrypt_db(self.password)
+
         log.debug(
             'CAN_PULL',
             ours=our_hash,
@@ -82,7 +88,7 @@ class PremiumSyncManager():
             return SyncCheckResult(can_sync=CanSync.NO, message='', payload=None)
 
         our_last_write_ts = self.data.db.get_last_write_ts()
-        data_bytes_size = len(base64.b64decode(b64_encoded_data))
+        data_bytes_size = _b64_decoded_size(b64_encoded_data)
 
         local_more_recent = our_last_write_ts >= metadata.last_modify_ts
         local_bigger = data_bytes_size >= metadata.data_size
@@ -154,11 +160,26 @@ class PremiumSyncManager():
         if diff < 3600 and not force_upload:
             return False
 
+        # The DB export is expensive so first check that anything changed locally
+        our_last_write_ts = self.data.db.get_last_write_ts()
+        if our_last_write_ts < self.last_data_upload_ts and not force_upload:
+            log.debug('upload to server stopped -- no local changes since the last upload')
+            return False
+
         try:
             metadata = self.premium.query_last_data_metadata()
         except RemoteError as e:
             log.debug('upload to server -- fetching metadata error', error=str(e))
             return False
+
+        if our_last_write_ts <= metadata.last_modify_ts and not force_upload:
+            # Server's DB was modified after our local DB
+            log.debug(
+                f'upload to server stopped -- remote db({metadata.last_modify_ts}) '
+                f'more recent than local({our_last_write_ts})',
+            )
+            return False
+
         b64_encoded_data, our_hash = self.data.compress_and_encrypt_db(self.password)
 
         log.debug(
@@ -171,16 +192,7 @@ class PremiumSyncManager():
             # same hash -- no need to upload anything
             return False
 
-        our_last_write_ts = self.data.db.get_last_write_ts()
-        if our_last_write_ts <= metadata.last_modify_ts and not force_upload:
-            # Server's DB was modified after our local DB
-            log.debug(
-                f'upload to server stopped -- remote db({metadata.last_modify_ts}) '
-                f'more recent than local({our_last_write_ts})',
-            )
-            return False
-
-        data_bytes_size = len(base64.b64decode(b64_encoded_data))
+        data_bytes_size = _b64_decoded_size(b64_encoded_data)
         if data_bytes_size < metadata.data_size and not force_upload:
             # Let's be conservative.
             # TODO: Here perhaps prompt user in the future
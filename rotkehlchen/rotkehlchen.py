@@ -6,14 +6,16 @@ import os
 import time
 from collections import defaultdict
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union, overload
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union, cast, overload
 
 import gevent
 from gevent.lock import Semaphore
 from typing_extensions import Literal
 
 from rotkehlchen.accounting.accountant import Accountant
+from rotkehlchen.assets.asset import Asset, EthereumToken
 from rotkehlchen.assets.resolver import AssetResolver
+from rotkehlchen.assets.unknown_asset import UnknownEthereumToken
 from rotkehlchen.balances.manual import account_for_manually_tracked_balances
 from rotkehlchen.chain.bitcoin.xpub import XpubManager
 from rotkehlchen.chain.ethereum.manager import (
@@ -21,18 +23,21 @@ from rotkehlchen.chain.ethereum.manager import (
     EthereumManager,
     NodeName,
 )
-from rotkehlchen.chain.ethereum.trades import AMMTrade
+from rotkehlchen.chain.ethereum.trades import AMMTrade, AMMTradeLocations
+from rotkehlchen.chain.ethereum.transactions import FREE_ETH_TX_LIMIT
 from rotkehlchen.chain.manager import BlockchainBalancesUpdate, ChainManager
 from rotkehlchen.config import default_data_directory
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.data.importer import DataImporter
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.db.settings import DBSettings, ModifiableDBSettings
+from rotkehlchen.db.utils import DBPagination
 from rotkehlchen.errors import (
     EthSyncError,
     InputError,
     PremiumAuthenticationError,
     RemoteError,
+    StartupError,
     SystemPermissionError,
 )
 from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
@@ -41,7 +46,7 @@ from rotkehlchen.exchanges.manager import ExchangeManager
 from rotkehlchen.externalapis.coingecko import Coingecko
 from rotkehlchen.externalapis.cryptocompare import Cryptocompare
 from rotkehlchen.externalapis.etherscan import Etherscan
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FVal, sum_fvals
 from rotkehlchen.greenlets import GreenletManager
 from rotkehlchen.history import PriceHistorian, TradesHistorian
 from rotkehlchen.icons import IconManager
@@ -55,18 +60,24 @@ from rotkehlchen.logging import (
 from rotkehlchen.premium.premium import Premium, PremiumCredentials, premium_create_and_verify
 from rotkehlchen.premium.sync import PremiumSyncManager
 from rotkehlchen.serialization.deserialize import deserialize_location
+from rotkehlchen.startup import StartupManager
 from rotkehlchen.typing import (
     ApiKey,
     ApiSecret,
+    AssetMovementCategory,
     BlockchainAccountData,
+    ChecksumEthAddress,
+    EthereumTransaction,
     ListOfBlockchainAddresses,
     Location,
     SupportedBlockchain,
     Timestamp,
+    TradeType,
 )
 from rotkehlchen.usage_analytics import maybe_submit_usage_analytics
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import combine_stat_dicts, dict_get_sumof, merge_dicts
+from rotkehlchen.utils.profiling import PhaseTimer
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.xpub import XpubData
@@ -80,6 +91,7 @@ FREE_ASSET_MOVEMENTS_LIMIT = 100
 LIMITS_MAPPING = {
     'trade': FREE_TRADES_LIMIT,
     'asset_movement': FREE_ASSET_MOVEMENTS_LIMIT,
+    'ethereum_transaction': FREE_ETH_TX_LIMIT,
 }
 
 ICONS_BATCH_SIZE = 5
@@ -89,6 +101,38 @@ ICONS_QUERY_SLEEP = 10
 TRADES_LIST = List[Union[Trade, AMMTrade]]
 
 
+def _trade_sort_key(
+        trade: Union[Trade, AMMTrade],
+        attribute: str,
+) -> Tuple[Any, Timestamp, str]:
+    """Sort key for trades that matches the ordering the DB applies for the attribute"""
+    value: Any
+    if attribute == 'location':
+        value = trade.location.serialize_for_db()
+    elif attribute == 'pair':
+        value = trade.pair
+    elif attribute == 'type':
+        value = trade.trade_type.serialize_for_db()
+    else:
+        value = trade.timestamp
+    return value, trade.timestamp, trade.identifier
+
+
+def _amm_trade_has_asset(trade: AMMTrade, asset: Asset) -> bool:
+    """Whether the asset is one of the tokens of the AMM trade"""
+    for token in (trade.base_asset, trade.quote_asset):
+        if isinstance(token, UnknownEthereumToken):
+            if (
+                isinstance(asset, EthereumToken) and
+                token.ethereum_address == asset.ethereum_address
+            ):
+                return True
+        elif token.identifier == asset.identifier:
+            return True
+
+    return False
+
+
 class Rotkehlchen():
     def __init__(self, args: argparse.Namespace) -> None:
         """Initialize the Rotkehlchen object
@@ -120,8 +164,22 @@ class Rotkehlchen():
         self.msg_aggregator = MessagesAggregator()
         self.greenlet_manager = GreenletManager(msg_aggregator=self.msg_aggregator)
         self.exchange_manager = ExchangeManager(msg_aggregator=self.msg_aggregator)
-        # Initialize the AssetResolver singleton
-        AssetResolver(data_directory=self.data_dir)
+        self.startup = StartupManager(
+            greenlet_manager=self.greenlet_manager,
+            msg_aggregator=self.msg_aggregator,
+        )
+        # Set up in the background after login. See the chain_manager property
+        self._chain_manager: ChainManager
+        self._trades_historian: TradesHistorian
+        # Initialize the AssetResolver singleton with the locally saved assets. Checking
+        # the remote for newer assets needs network access so it happens in the background
+        AssetResolver(data_directory=self.data_dir, check_remote=False)
+        self.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name='check_for_newer_assets',
+            method=AssetResolver,
+            data_directory=self.data_dir,
+        )
         self.data = DataHandler(self.data_dir, self.msg_aggregator)
         self.cryptocompare = Cryptocompare(data_directory=self.data_dir, database=None)
         self.coingecko = Coingecko()
@@ -183,97 +241,155 @@ class Rotkehlchen():
             initial_settings=initial_settings,
         )
 
-        # unlock or create the DB
-        self.password = password
-        self.user_directory = self.data.unlock(user, password, create_new, initial_settings)
-        self.data_importer = DataImporter(db=self.data.db)
-        self.last_data_upload_ts = self.data.db.get_last_data_upload_ts()
-        self.premium_sync_manager = PremiumSyncManager(data=self.data, password=password)
-        # set the DB in the external services instances that need it
-        self.cryptocompare.set_database(self.data.db)
+        login_timer = PhaseTimer('Login')
+        with login_timer.phase('unlock the DB'):
+            # unlock or create the DB
+            self.password = password
+            self.user_directory = self.data.unlock(user, password, create_new, initial_settings)
+            self.data_importer = DataImporter(db=self.data.db)
+            self.last_data_upload_ts = self.data.db.get_last_data_upload_ts()
+            self.premium_sync_manager = PremiumSyncManager(data=self.data, password=password)
+            # set the DB in the external services instances that need it
+            self.cryptocompare.set_database(self.data.db)
 
         # Anything that was set above here has to be cleaned in case of failure in the next step
         # by reset_after_failed_account_creation_or_login()
-        try:
-            self.premium = self.premium_sync_manager.try_premium_at_start(
-                given_premium_credentials=premium_credentials,
-                username=user,
-                create_new=create_new,
-                sync_approval=sync_approval,
+        with login_timer.phase('premium'):
+            try:
+                self.premium = self.premium_sync_manager.try_premium_at_start(
+                    given_premium_credentials=premium_credentials,
+                    username=user,
+                    create_new=create_new,
+                    sync_approval=sync_approval,
+                )
+            except PremiumAuthenticationError:
+                # Reraise it only if this is during the creation of a new account where
+                # the premium credentials were given by the user
+                if create_new:
+                    raise
+                self.msg_aggregator.add_error(
+                    'Tried to synchronize the database from remote but the local password '
+                    'does not match the one the remote DB has. Please change the password '
+                    'to be the same as the password of the account you want to sync from ',
+                )
+                # else let's just continue. User signed in succesfully, but he just
+                # has unauthenticable/invalid premium credentials remaining in his DB
+
+        with login_timer.phase('accountant and price historian'):
+            settings = self.get_settings()
+            self.greenlet_manager.spawn_and_track(
+                after_seconds=None,
+                task_name='submit_usage_analytics',
+                method=maybe_submit_usage_analytics,
+                should_submit=settings.submit_usage_analytics,
             )
-        except PremiumAuthenticationError:
-            # Reraise it only if this is during the creation of a new account where
-            # the premium credentials were given by the user
-            if create_new:
-                raise
-            self.msg_aggregator.add_error(
-                'Tried to synchronize the database from remote but the local password '
-                'does not match the one the remote DB has. Please change the password '
-                'to be the same as the password of the account you want to sync from ',
+            self.etherscan = Etherscan(database=self.data.db, msg_aggregator=self.msg_aggregator)
+            historical_data_start = settings.historical_data_start
+            eth_rpc_endpoint = settings.eth_rpc_endpoint
+            # Initialize the price historian singleton
+            PriceHistorian(
+                data_directory=self.data_dir,
+                history_date_start=historical_data_start,
+                cryptocompare=self.cryptocompare,
+            )
+            self.accountant = Accountant(
+                db=self.data.db,
+                user_directory=self.user_directory,
+                msg_aggregator=self.msg_aggregator,
+                create_csv=True,
             )
-            # else let's just continue. User signed in succesfully, but he just
-            # has unauthenticable/invalid premium credentials remaining in his DB
-
-        settings = self.get_settings()
-        self.greenlet_manager.spawn_and_track(
-            after_seconds=None,
-            task_name='submit_usage_analytics',
-            method=maybe_submit_usage_analytics,
-            should_submit=settings.submit_usage_analytics,
-        )
-        self.etherscan = Etherscan(database=self.data.db, msg_aggregator=self.msg_aggregator)
-        historical_data_start = settings.historical_data_start
-        eth_rpc_endpoint = settings.eth_rpc_endpoint
-        # Initialize the price historian singleton
-        PriceHistorian(
-            data_directory=self.data_dir,
-            history_date_start=historical_data_start,
-            cryptocompare=self.cryptocompare,
-        )
-        self.accountant = Accountant(
-            db=self.data.db,
-            user_directory=self.user_directory,
-            msg_aggregator=self.msg_aggregator,
-            create_csv=True,
-        )
 
         # Initialize the rotkehlchen logger
         LoggingSettings(anonymized_logs=settings.anonymized_logs)
-        exchange_credentials = self.data.db.get_exchange_credentials()
-        self.exchange_manager.initialize_exchanges(
-            exchange_credentials=exchange_credentials,
-            database=self.data.db,
-        )
+        with login_timer.phase('exchanges'):
+            exchange_credentials = self.data.db.get_exchange_credentials()
+            self.exchange_manager.initialize_exchanges(
+                exchange_credentials=exchange_credentials,
+                database=self.data.db,
+            )
 
         # Initialize blockchain querying modules
-        ethereum_manager = EthereumManager(
-            ethrpc_endpoint=eth_rpc_endpoint,
-            etherscan=self.etherscan,
-            database=self.data.db,
-            msg_aggregator=self.msg_aggregator,
-            greenlet_manager=self.greenlet_manager,
-            connect_at_start=ETHEREUM_NODES_TO_CONNECT_AT_START,
+        with login_timer.phase('ethereum manager'):
+            ethereum_manager = EthereumManager(
+                ethrpc_endpoint=eth_rpc_endpoint,
+                etherscan=self.etherscan,
+                database=self.data.db,
+                msg_aggregator=self.msg_aggregator,
+                greenlet_manager=self.greenlet_manager,
+                connect_at_start=ETHEREUM_NODES_TO_CONNECT_AT_START,
+            )
+            Inquirer().inject_ethereum(ethereum_manager)
+
+        # The DB is ready so the login can return. The ethereum modules need to contact
+        # remote servers to initialize so they are set up in the background
+        self.startup.run(
+            name='chain manager',
+            method=self._initialize_chain_manager,
+            ethereum_manager=ethereum_manager,
+            premium=self.premium,
+            eth_modules=settings.active_modules,
         )
-        Inquirer().inject_ethereum(ethereum_manager)
-        self.chain_manager = ChainManager(
+        self.startup.run(
+            name='trades historian',
+            method=self._initialize_trades_historian,
+            dependencies=('chain manager',),
+        )
+        if self.args.profile_startup:
+            log.info(login_timer.report())
+            self.greenlet_manager.spawn_and_track(
+                after_seconds=None,
+                task_name='report startup step timings',
+                method=self._report_startup_steps,
+            )
+        else:
+            log.debug(login_timer.report())
+        self.user_is_logged_in = True
+        log.debug('User unlocking complete')
+
+    def _initialize_chain_manager(
+            self,
+            ethereum_manager: EthereumManager,
+            premium: Optional[Premium],
+            eth_modules: List[str],
+    ) -> None:
+        self._chain_manager = ChainManager(
             blockchain_accounts=self.data.db.get_blockchain_accounts(),
             ethereum_manager=ethereum_manager,
             msg_aggregator=self.msg_aggregator,
             database=self.data.db,
             greenlet_manager=self.greenlet_manager,
-            premium=self.premium,
-            eth_modules=settings.active_modules,
+            premium=premium,
+            eth_modules=eth_modules,
             data_directory=self.data_dir,
         )
-        self.trades_historian = TradesHistorian(
+
+    def _initialize_trades_historian(self) -> None:
+        self._trades_historian = TradesHistorian(
             user_directory=self.user_directory,
             db=self.data.db,
             msg_aggregator=self.msg_aggregator,
             exchange_manager=self.exchange_manager,
             chain_manager=self.chain_manager,
         )
-        self.user_is_logged_in = True
-        log.debug('User unlocking complete')
+
+    def _report_startup_steps(self) -> None:
+        try:
+            self.startup.wait_all()
+        except StartupError:
+            pass  # the failure is already reported by the startup manager
+        log.info(self.startup.report())
+
+    @property
+    def chain_manager(self) -> ChainManager:
+        """May raise StartupError if the chain manager could not be initialized at login"""
+        self.startup.wait('chain manager')
+        return self._chain_manager
+
+    @property
+    def trades_historian(self) -> TradesHistorian:
+        """May raise StartupError if the trades historian could not be initialized at login"""
+        self.startup.wait('trades historian')
+        return self._trades_historian
 
     def logout(self) -> None:
         if not self.user_is_logged_in:
@@ -285,14 +401,17 @@ class Rotkehlchen():
             user=user,
         )
         self.greenlet_manager.clear()
-        del self.chain_manager
+        if hasattr(self, '_chain_manager'):
+            del self._chain_manager
         self.exchange_manager.delete_all_exchanges()
 
         # Reset rotkehlchen logger to default
         LoggingSettings(anonymized_logs=DEFAULT_ANONYMIZED_LOGS)
 
         del self.accountant
-        del self.trades_historian
+        if hasattr(self, '_trades_historian'):
+            del self._trades_historian
+        self.startup.clear()
         del self.data_importer
 
         if self.premium is not None:
@@ -358,11 +477,18 @@ class Rotkehlchen():
                 log.debug('Main loop start')
                 self.premium_sync_manager.maybe_upload_data_to_server()
                 if not xpub_derivation_scheduled:
+                    try:
+                        xpub_manager = XpubManager(self.chain_manager)
+                    except StartupError:
+                        # The failure was reported to the user already. Nothing to derive
+                        # with until the next login.
+                        xpub_derivation_scheduled = True
+                        continue
                     # 1 minute in the app's startup try to derive new xpub addresses
                     self.greenlet_manager.spawn_and_track(
                         after_seconds=60.0,
                         task_name='Derive new xpub addresses',
-                        method=XpubManager(self.chain_manager).check_for_new_xpub_addresses,
+                        method=xpub_manager.check_for_new_xpub_addresses,
                     )
                     xpub_derivation_scheduled = True
                 log.debug('Main loop end')
@@ -595,7 +721,10 @@ class Rotkehlchen():
         else:
             trades = self.query_location_trades(from_ts, to_ts, Location.EXTERNAL)
             for name, exchange in self.exchange_manager.connected_exchanges.items():
-                exchange_trades = exchange.query_trade_history(start_ts=from_ts, end_ts=to_ts)
+                exchange_trades = cast(
+                    TRADES_LIST,
+                    exchange.query_trade_history(start_ts=from_ts, end_ts=to_ts),
+                )
                 if self.premium is None:
                     trades = self._apply_actions_limit(
                         location=deserialize_location(name),
@@ -657,7 +786,10 @@ class Rotkehlchen():
                 )
                 return []
 
-            location_trades = exchange.query_trade_history(start_ts=from_ts, end_ts=to_ts)
+            location_trades = cast(
+                TRADES_LIST,
+                exchange.query_trade_history(start_ts=from_ts, end_ts=to_ts),
+            )
 
         trades: TRADES_LIST = []
         if self.premium is None:
@@ -672,6 +804,237 @@ class Rotkehlchen():
 
         return trades
 
+    def _limit_pagination_for_tier(
+            self,
+            action_type: Literal['trade', 'asset_movement', 'ethereum_transaction'],
+            pagination: DBPagination,
+    ) -> Optional[DBPagination]:
+        """Makes sure that non premium users can't page beyond their actions limit
+
+        Returns None if the requested page is completely outside of the limit
+        """
+        if self.premium is not None:
+            return pagination
+
+        limit = LIMITS_MAPPING[action_type]
+        if pagination.offset >= limit:
+            return None
+
+        allowed_num = limit - pagination.offset
+        if pagination.limit is not None:
+            allowed_num = min(allowed_num, pagination.limit)
+        return pagination._replace(limit=allowed_num)
+
+    def query_trades_page(
+            self,
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+            location: Optional[Location],
+            asset: Optional[Asset],
+            trade_type: Optional[TradeType],
+            pagination: DBPagination,
+    ) -> Tuple[TRADES_LIST, int]:
+        """Queries a single page of the trades matching the given filters.
+
+        All exchanges in question are first synced with the DB so that filtering,
+        ordering and pagination can all happen in the DB. AMM trades are not in the
+        trades table so they are merged in with the first entries of the DB page.
+
+        Returns the page of trades and the number of all trades that match the filters.
+
+        May raise:
+        - RemoteError: If there are problems connecting to any of the remote exchanges
+        """
+        if location is not None:
+            locations = [location]
+        else:
+            locations = [Location.EXTERNAL]
+            locations.extend(
+                deserialize_location(name) for name in self.exchange_manager.connected_exchanges
+            )
+            locations.append(Location.UNISWAP)
+
+        db_locations = []
+        for entry in locations:
+            if entry in (Location.EXTERNAL, *AMMTradeLocations):
+                db_locations.append(entry)
+                continue
+
+            exchange = self.exchange_manager.get(str(entry))
+            if not exchange:
+                logger.warn(
+                    f'Tried to query trades from {entry} which is either not an '
+                    f'exchange or not an exchange the user has connected to',
+                )
+                continue
+            exchange.sync_trade_history(start_ts=from_ts, end_ts=to_ts)
+            db_locations.append(entry)
+
+        amm_trades: List[AMMTrade] = []
+        uniswap = self.chain_manager.uniswap
+        if Location.UNISWAP in db_locations:
+            db_locations.remove(Location.UNISWAP)
+            if self.premium is not None and uniswap is not None:
+                amm_trades = [
+                    trade for trade in uniswap.get_trades(
+                        addresses=self.chain_manager.queried_addresses_for_module('uniswap'),
+                        from_timestamp=from_ts,
+                        to_timestamp=to_ts,
+                    ) if (
+                        (trade_type is None or trade.trade_type == trade_type) and
+                        (asset is None or _amm_trade_has_asset(trade, asset))
+                    )
+                ]
+
+        trades: TRADES_LIST = []
+        entries_found = 0
+        if len(db_locations) != 0:
+            entries_found = self.data.db.get_trades_count(
+                from_ts=from_ts,
+                to_ts=to_ts,
+                locations=db_locations,
+                asset=asset,
+                trade_type=trade_type,
+            )
+            db_pagination = self._limit_pagination_for_tier('trade', pagination)
+            if db_pagination is not None and len(amm_trades) != 0:
+                # To merge with the AMM trades we need all DB entries up to the page end
+                page_end = None
+                if pagination.limit is not None:
+                    page_end = pagination.offset + pagination.limit
+                db_pagination = db_pagination._replace(limit=page_end, offset=0)
+            if db_pagination is not None:
+                trades = self.data.db.get_trades(  # type: ignore  # list invariance
+                    from_ts=from_ts,
+                    to_ts=to_ts,
+                    locations=db_locations,
+                    asset=asset,
+                    trade_type=trade_type,
+                    pagination=db_pagination,
+                )
+
+        if len(amm_trades) != 0:
+            entries_found += len(amm_trades)
+            trades.extend(amm_trades)
+            trades.sort(
+                key=lambda x: _trade_sort_key(x, pagination.order_by_attribute),
+                reverse=not pagination.ascending,
+            )
+            end = None if pagination.limit is None else pagination.offset + pagination.limit
+            trades = trades[pagination.offset:end]
+
+        return trades, entries_found
+
+    def query_asset_movements_page(
+            self,
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+            location: Optional[Location],
+            asset: Optional[Asset],
+            category: Optional[AssetMovementCategory],
+            pagination: DBPagination,
+    ) -> Tuple[List[AssetMovement], int]:
+        """Queries a single page of the asset movements matching the given filters.
+
+        All exchanges in question are first synced with the DB so that filtering,
+        ordering and pagination can all happen in the DB.
+
+        Returns the page of movements and the number of all movements that match the filters.
+
+        May raise:
+        - RemoteError: If there are problems connecting to any of the remote exchanges
+        """
+        exchanges: List[ExchangeInterface] = []
+        if location is not None:
+            exchange = self.exchange_manager.get(str(location))
+            if not exchange:
+                logger.warn(
+                    f'Tried to query deposits/withdrawals from {location} which is either not an '
+                    f'exchange or not an exchange the user has connected to',
+                )
+                return [], 0
+            exchanges.append(exchange)
+        else:
+            exchanges.extend(self.exchange_manager.connected_exchanges.values())
+
+        if len(exchanges) == 0:
+            return [], 0
+
+        for exchange in exchanges:
+            exchange.sync_deposits_withdrawals(start_ts=from_ts, end_ts=to_ts)
+
+        locations = [deserialize_location(exchange.name) for exchange in exchanges]
+        entries_found = self.data.db.get_asset_movements_count(
+            from_ts=from_ts,
+            to_ts=to_ts,
+            locations=locations,
+            asset=asset,
+            category=category,
+        )
+        db_pagination = self._limit_pagination_for_tier('asset_movement', pagination)
+        if db_pagination is None:
+            return [], entries_found
+
+        movements = self.data.db.get_asset_movements(
+            from_ts=from_ts,
+            to_ts=to_ts,
+            locations=locations,
+            asset=asset,
+            category=category,
+            pagination=db_pagination,
+        )
+        return movements, entries_found
+
+    def query_ethereum_transactions_page(
+            self,
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+            address: Optional[ChecksumEthAddress],
+            pagination: DBPagination,
+    ) -> Tuple[List[EthereumTransaction], int]:
+        """Queries a single page of the ethereum transactions of the given or of all
+        tracked ethereum accounts.
+
+        The accounts are first synced with the DB so that ordering and pagination
+        can happen in the DB.
+
+        Returns the page of transactions and the number of all transactions that
+        match the filters.
+
+        May raise:
+        - RemoteError if etherscan is used and there is a problem with reaching it or
+        with parsing the response.
+        """
+        if address is not None:
+            addresses = [address]
+        else:
+            addresses = self.data.db.get_blockchain_accounts().eth
+
+        if len(addresses) == 0:
+            return [], 0
+
+        self.chain_manager.ethereum.transactions.sync(
+            addresses=addresses,
+            from_ts=from_ts,
+            to_ts=to_ts,
+        )
+        entries_found = self.data.db.get_ethereum_transactions_count(
+            from_ts=from_ts,
+            to_ts=to_ts,
+            addresses=addresses,
+        )
+        db_pagination = self._limit_pagination_for_tier('ethereum_transaction', pagination)
+        if db_pagination is None:
+            return [], entries_found
+
+        transactions = self.data.db.get_ethereum_transactions(
+            from_ts=from_ts,
+            to_ts=to_ts,
+            addresses=addresses,
+            pagination=db_pagination,
+        )
+        return transactions, entries_found
+
     def query_balances(
             self,
             requested_save_data: bool = False,
@@ -725,7 +1088,7 @@ class Rotkehlchen():
         for _, v in combined.items():
             net_usd += FVal(v['usd_value'])
         # subtract liabilities
-        liabilities_total_usd = sum(x['usd_value'] for _, x in liabilities.items())
+        liabilities_total_usd = sum_fvals(x['usd_value'] for _, x in liabilities.items())
         net_usd -= liabilities_total_usd
 
         stats: Dict[str, Any] = {
@@ -864,6 +1227,11 @@ class Rotkehlchen():
                 if kraken:
                     kraken.set_account_type(settings.kraken_account_type)  # type: ignore
 
+            if settings.kraken_ledger_sync is not None:
+                kraken = self.exchange_manager.get('kraken')
+                if kraken:
+                    kraken.use_ledger_sync = settings.kraken_ledger_sync  # type: ignore
+
             self.data.db.set_settings(settings)
             return True, ''
 
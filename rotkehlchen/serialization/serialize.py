@@ -104,6 +104,7 @@ def _process_entry(entry: Any) -> Union[str, List[Any], Dict[str, Any], Any]:
             YearnVaultEvent,
             YearnVaultBalance,
             AaveEvent,
+            VaultEvent,
             UniswapPool,
             UniswapPoolAsset,
             UnknownEthereumToken,
@@ -118,7 +119,6 @@ def _process_entry(entry: Any) -> Union[str, List[Any], Dict[str, Any], Any]:
             DBSettings,
             DSRCurrentBalances,
             ManuallyTrackedBalanceWithValue,
-            VaultEvent,
             MakerDAOVaultDetails,
             AaveBalances,
             AaveHistory,
@@ -0,0 +1,162 @@
+import logging
+import time
+import traceback
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from gevent.event import Event
+
+from rotkehlchen.errors import StartupError
+from rotkehlchen.greenlets import GreenletManager
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.user_messages import MessagesAggregator
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+class StartupStatus(Enum):
+    PENDING = 1
+    RUNNING = 2
+    READY = 3
+    FAILED = 4
+
+    def __str__(self) -> str:
+        return self.name.lower()  # pylint: disable=no-member
+
+
+class StartupStep():
+    """A step of the login that runs in the background once its dependencies are ready"""
+
+    def __init__(
+            self,
+            name: str,
+            method: Callable,
+            dependencies: Sequence[str],
+            kwargs: Dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.method = method
+        self.dependencies = dependencies
+        self.kwargs = kwargs
+        self.status = StartupStatus.PENDING
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self.done = Event()
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            'status': str(self.status),
+            'dependencies': list(self.dependencies),
+            'error': self.error,
+        }
+
+
+class StartupManager():
+    """Runs the steps of the login that do not need to finish before the login returns
+
+    Each step runs in its own greenlet as soon as all the steps it depends on are
+    ready, so that independent steps which wait on remote servers overlap. Anything
+    that needs the result of a step should wait() for it first.
+    """
+
+    def __init__(self, greenlet_manager: GreenletManager, msg_aggregator: MessagesAggregator):
+        self.greenlet_manager = greenlet_manager
+        self.msg_aggregator = msg_aggregator
+        self.steps: Dict[str, StartupStep] = {}
+
+    def run(
+            self,
+            name: str,
+            method: Callable,
+            dependencies: Sequence[str] = (),
+            **kwargs: Any,
+    ) -> None:
+        """Starts a step in the background. The steps it depends on have to be run first"""
+        for dependency in dependencies:
+            assert dependency in self.steps, f'Startup step {dependency} should run before {name}'
+
+        step = StartupStep(name=name, method=method, dependencies=dependencies, kwargs=kwargs)
+        self.steps[name] = step
+        self.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name=f'startup step {name}',
+            method=self._run_step,
+            step=step,
+        )
+
+    def _run_step(self, step: StartupStep) -> None:
+        try:
+            for dependency in step.dependencies:
+                self.steps[dependency].done.wait()
+                if self.steps[dependency].status != StartupStatus.READY:
+                    step.status = StartupStatus.FAILED
+                    step.error = f'Startup step {dependency} it depends on failed'
+                    return
+
+            step.status = StartupStatus.RUNNING
+            start = time.perf_counter()
+            try:
+                step.method(**step.kwargs)
+            except Exception as e:  # pylint: disable=broad-except
+                # Report the failure of the step instead of losing it with the greenlet
+                step.status = StartupStatus.FAILED
+                step.error = str(e)
+                log.error(
+                    f'Startup step {step.name} failed with {str(e)}. '
+                    f'Traceback:\n{traceback.format_exc()}',
+                )
+                self.msg_aggregator.add_error(
+                    f'Failed to initialize {step.name} after login due to {str(e)}. '
+                    f'Check the logs for more details',
+                )
+                return
+            finally:
+                step.seconds = time.perf_counter() - start
+
+            step.status = StartupStatus.READY
+            log.debug(f'Startup step {step.name} finished in {step.seconds:.3f} seconds')
+        finally:
+            # Set even if the greenlet gets killed so that nothing waits forever
+            step.done.set()
+
+    def wait(self, name: str) -> None:
+        """Blocks until the step with the given name finishes
+
+        Does not block if no such step was run, for example if no user is logged in.
+
+        May raise:
+        - StartupError if the step failed or was stopped by a logout
+        """
+        step = self.steps.get(name, None)
+        if step is None:
+            return
+
+        step.done.wait()
+        if step.status != StartupStatus.READY:
+            raise StartupError(f'{name} could not be initialized. {step.error or ""}')
+
+    def wait_all(self) -> None:
+        """Blocks until all steps finish. May raise StartupError if any of them failed"""
+        steps = list(self.steps.keys())
+        for name in steps:
+            self.steps[name].done.wait()
+        for name in steps:
+            self.wait(name)
+
+    def report(self) -> str:
+        lines = ['Login background steps:']
+        for name, step in self.steps.items():
+            seconds = '' if step.seconds is None else f'{step.seconds * 1000:.1f} ms'
+            lines.append(f'{seconds:>12}  {name} ({str(step.status)})')
+        return '\n'.join(lines)
+
+    def clear(self) -> None:
+        """Forgets all steps. To be called at logout after the steps' greenlets are killed"""
+        self.steps = {}
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            'ready': all(x.status == StartupStatus.READY for x in self.steps.values()),
+            'steps': {name: step.serialize() for name, step in self.steps.items()},
+        }
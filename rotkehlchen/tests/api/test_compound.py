@@ -535,6 +535,14 @@ def test_query_compound_history(rotkehlchen_api_server, ethereum_accounts):  # p
         else:
             result = assert_proper_response_with_result(response)
 
+        # Query again. Events are now read from the DB and only the new range is queried
+        response = requests.get(api_url_for(
+            rotkehlchen_api_server,
+            "compoundhistoryresource",
+        ))
+        second_result = assert_proper_response_with_result(response)
+        assert second_result['events'][:len(result['events'])] == result['events']
+
     assert len(result) == 5
     expected_events = process_result_list(EXPECTED_EVENTS)
     # Check only 22 first events, since this is how many there were in the time of
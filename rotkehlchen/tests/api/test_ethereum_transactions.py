@@ -311,8 +311,7 @@ def test_query_transactions_over_limit(
             ranges_to_query=[],
         )
 
-    free_expected_entries = [FREE_ETH_TX_LIMIT - 10, 10]
-    premium_expected_entries = [FREE_ETH_TX_LIMIT - 10, 60]
+    expected_entries = [FREE_ETH_TX_LIMIT - 10, 60]
 
     # Check that we get all transactions correctly even if we query two times
     for _ in range(2):
@@ -324,15 +323,43 @@ def test_query_transactions_over_limit(
                 ), json={'from_timestamp': start_ts, 'to_timestamp': end_ts, 'address': address},
             )
             result = assert_proper_response_with_result(response)
+            # Each address on its own is below the limit
+            assert len(result['entries']) == expected_entries[idx]
+            assert result['entries_found'] == all_transactions_num
+            assert result['entries_filtered'] == expected_entries[idx]
+            expected_limit = -1 if start_with_valid_premium else FREE_ETH_TX_LIMIT
+            assert result['entries_limit'] == expected_limit
+
+        # All addresses together are over the limit
+        response = requests.get(
+            api_url_for(
+                rotkehlchen_api_server,
+                'ethereumtransactionsresource',
+            ), json={'from_timestamp': start_ts, 'to_timestamp': end_ts},
+        )
+        result = assert_proper_response_with_result(response)
+        assert result['entries_found'] == all_transactions_num
+        assert result['entries_filtered'] == all_transactions_num
+        if start_with_valid_premium:
+            assert len(result['entries']) == all_transactions_num
+        else:
+            assert len(result['entries']) == FREE_ETH_TX_LIMIT
 
-            if start_with_valid_premium:
-                assert len(result['entries']) == premium_expected_entries[idx]
-                assert result['entries_found'] == all_transactions_num
-                assert result['entries_limit'] == -1
-            else:
-                assert len(result['entries']) == free_expected_entries[idx]
-                assert result['entries_found'] == all_transactions_num
-                assert result['entries_limit'] == FREE_ETH_TX_LIMIT
+        # Pagination is also limited for non premium users
+        response = requests.get(
+            api_url_for(
+                rotkehlchen_api_server,
+                'ethereumtransactionsresource',
+            ), json={
+                'from_timestamp': start_ts,
+                'to_timestamp': end_ts,
+                'limit': 20,
+                'offset': FREE_ETH_TX_LIMIT - 5,
+                'ascending': True,
+            },
+        )
+        result = assert_proper_response_with_result(response)
+        assert len(result['entries']) == (20 if start_with_valid_premium else 5)
 
 
 @pytest.mark.parametrize('number_of_eth_accounts', [2])
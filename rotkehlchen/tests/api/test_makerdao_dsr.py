@@ -6,10 +6,17 @@ from unittest.mock import _patch, patch
 
 import pytest
 import requests
+from web3 import Web3
 
-from rotkehlchen.chain.ethereum.makerdao.dsr import _dsrdai_to_dai
+from rotkehlchen.chain.ethereum.makerdao.common import RAY
+from rotkehlchen.chain.ethereum.makerdao.dsr import (
+    POT_FILE_DSR_WHAT,
+    _dsrdai_to_dai,
+    _rpow,
+)
 from rotkehlchen.constants.assets import A_DAI
 from rotkehlchen.constants.ethereum import (
+    ETH_MULTICALL,
     MAKERDAO_DAI_JOIN,
     MAKERDAO_POT,
     MAKERDAO_PROXY_REGISTRY,
@@ -30,7 +37,7 @@ from rotkehlchen.tests.utils.checks import assert_serialized_lists_equal
 from rotkehlchen.tests.utils.factories import make_ethereum_address
 from rotkehlchen.tests.utils.makerdao import mock_proxies
 from rotkehlchen.tests.utils.mock import MockResponse
-from rotkehlchen.typing import ChecksumEthAddress
+from rotkehlchen.typing import ChecksumEthAddress, Timestamp
 
 mocked_prices = {
     'DAI': {
@@ -60,6 +67,11 @@ mocked_prices = {
 
 TEST_LATEST_BLOCKNUMBER = 9540749
 TEST_LATEST_BLOCKNUMBER_HEX = hex(TEST_LATEST_BLOCKNUMBER)
+TEST_CURRENT_DSR = 1000000002440418608258400030
+# The pot file() call that set the DSR to TEST_CURRENT_DSR
+TEST_DSR_FILE_BLOCKNUMBER = 8928160
+TEST_DSR_FILE_TIMESTAMP = 1575726133
+WEB3 = Web3()
 
 
 def int_to_32byteshexstr(value: int) -> str:
@@ -115,11 +127,11 @@ def mock_etherscan_for_dsr(
 
     account1_join1_deposit = params.account1_join1_normalized_balance * params.account1_join1_chi
     account1_join1_move_event = f"""{{"address": "{MAKERDAO_VAT.address}", "topics": ["0xbb35783b00000000000000000000000000000000000000000000000000000000", "{address_to_32byteshexstr(proxy1)}", "{MAKERDAO_POT.address}", "{int_to_32byteshexstr(account1_join1_deposit // 10 ** 27)}"], "data": "0x1", "blockNumber": "{hex(params.account1_join1_blocknumber)}", "timeStamp": "{hex(blocknumber_to_timestamp(params.account1_join1_blocknumber))}", "gasPrice": "0x1", "gasUsed": "0x1", "logIndex": "0x6c", "transactionHash": "0xf00", "transactionIndex": "0x79"}}"""  # noqa: E501
-    account1_join2_event = f"""{{"address": "{MAKERDAO_POT.address}", "topics": ["0x049878f300000000000000000000000000000000000000000000000000000000", "{address_to_32byteshexstr(proxy1)}", "{int_to_32byteshexstr(params.account1_join2_normalized_balance)}", "0x0000000000000000000000000000000000000000000000000000000000000000"], "data": "0x1", "blockNumber": "{hex(params.account1_join2_blocknumber)}", "timeStamp": "{hex(blocknumber_to_timestamp(params.account1_join2_blocknumber))}", "gasPrice": "0x1", "gasUsed": "0x1", "logIndex": "0x6c", "transactionHash": "0xf00", "transactionIndex": "0x79"}}"""  # noqa: E501
+    account1_join2_event = f"""{{"address": "{MAKERDAO_POT.address}", "topics": ["0x049878f300000000000000000000000000000000000000000000000000000000", "{address_to_32byteshexstr(proxy1)}", "{int_to_32byteshexstr(params.account1_join2_normalized_balance)}", "0x0000000000000000000000000000000000000000000000000000000000000000"], "data": "0x1", "blockNumber": "{hex(params.account1_join2_blocknumber)}", "timeStamp": "{hex(blocknumber_to_timestamp(params.account1_join2_blocknumber))}", "gasPrice": "0x1", "gasUsed": "0x1", "logIndex": "0x6d", "transactionHash": "0xf00", "transactionIndex": "0x79"}}"""  # noqa: E501
     account1_join2_deposit = params.account1_join2_normalized_balance * params.account1_join2_chi
     account1_join2_move_event = f"""{{"address": "{MAKERDAO_VAT.address}", "topics": ["0xbb35783b00000000000000000000000000000000000000000000000000000000", "{address_to_32byteshexstr(proxy1)}", "{MAKERDAO_POT.address}", "{int_to_32byteshexstr(account1_join2_deposit // 10 ** 27)}"], "data": "0x1", "blockNumber": "{hex(params.account1_join1_blocknumber)}", "timeStamp": "{hex(blocknumber_to_timestamp(params.account1_join2_blocknumber))}", "gasPrice": "0x1", "gasUsed": "0x1", "logIndex": "0x6c", "transactionHash": "0xf00", "transactionIndex": "0x79"}}"""  # noqa: E501
 
-    account1_exit1_event = f"""{{"address": "{MAKERDAO_POT.address}", "topics": ["0x7f8661a100000000000000000000000000000000000000000000000000000000", "{address_to_32byteshexstr(proxy1)}", "{int_to_32byteshexstr(params.account1_exit1_normalized_balance)}", "0x0000000000000000000000000000000000000000000000000000000000000000"], "data": "0x1", "blockNumber": "{hex(params.account1_exit1_blocknumber)}", "timeStamp": "{hex(blocknumber_to_timestamp(params.account1_exit1_blocknumber))}", "gasPrice": "0x1", "gasUsed": "0x1", "logIndex": "0x6c", "transactionHash": "0xf00", "transactionIndex": "0x79"}}"""  # noqa: E501
+    account1_exit1_event = f"""{{"address": "{MAKERDAO_POT.address}", "topics": ["0x7f8661a100000000000000000000000000000000000000000000000000000000", "{address_to_32byteshexstr(proxy1)}", "{int_to_32byteshexstr(params.account1_exit1_normalized_balance)}", "0x0000000000000000000000000000000000000000000000000000000000000000"], "data": "0x1", "blockNumber": "{hex(params.account1_exit1_blocknumber)}", "timeStamp": "{hex(blocknumber_to_timestamp(params.account1_exit1_blocknumber))}", "gasPrice": "0x1", "gasUsed": "0x1", "logIndex": "0x6e", "transactionHash": "0xf00", "transactionIndex": "0x79"}}"""  # noqa: E501
     account1_exit1_withdrawal = (
         params.account1_exit1_normalized_balance * params.account1_exit1_chi
     )
@@ -128,6 +140,59 @@ def mock_etherscan_for_dsr(
 
     account2_join1_deposit = params.account2_join1_normalized_balance * params.account2_join1_chi
     account2_join1_move_event = f"""{{"address": "{MAKERDAO_VAT.address}", "topics": ["0xbb35783b00000000000000000000000000000000000000000000000000000000", "{address_to_32byteshexstr(proxy2)}", "{MAKERDAO_POT.address}", "{int_to_32byteshexstr(account2_join1_deposit // 10 ** 27)}"], "data": "0x1", "blockNumber": "{hex(params.account2_join1_blocknumber)}", "timeStamp": "{hex(blocknumber_to_timestamp(params.account2_join1_blocknumber))}", "gasPrice": "0x1", "gasUsed": "0x1", "logIndex": "0x6c", "transactionHash": "0fx00", "transactionIndex": "0x79"}}"""  # noqa: E501
+    dsr_file_event = f"""{{"address": "{MAKERDAO_POT.address}", "topics": ["0x29ae811400000000000000000000000000000000000000000000000000000000", "{address_to_32byteshexstr(MAKERDAO_POT.address)}", "{int_to_32byteshexstr(POT_FILE_DSR_WHAT)}", "{int_to_32byteshexstr(params.current_dsr)}"], "data": "0x1", "blockNumber": "{hex(TEST_DSR_FILE_BLOCKNUMBER)}", "timeStamp": "{hex(TEST_DSR_FILE_TIMESTAMP)}", "gasPrice": "0x1", "gasUsed": "0x1", "logIndex": "0x6c", "transactionHash": "0xf00", "transactionIndex": "0x79"}}"""  # noqa: E501
+
+    def mock_eth_call(to_address: str, input_data: str) -> str:
+        if to_address == MAKERDAO_PROXY_REGISTRY.address:
+            if not input_data.startswith('0xc4552791'):
+                raise AssertionError(
+                    'Call to unexpected method of DSR ProxyRegistry during tests',
+                )
+
+            # It's a call to proxy registry. Return the mapping
+            if account1[2:].lower() in input_data:
+                proxy_account = address_to_32byteshexstr(proxy1)
+            elif account2[2:].lower() in input_data:
+                proxy_account = address_to_32byteshexstr(proxy2)
+            else:
+                proxy_account = '0x' + '0' * 64
+            return proxy_account
+
+        if to_address == MAKERDAO_POT.address:
+            if input_data.startswith('0x0bebac86'):  # pie
+                if proxy1[2:].lower() in input_data:
+                    result = int_to_32byteshexstr(params.account1_current_normalized_balance)
+                elif proxy2[2:].lower() in input_data:
+                    result = int_to_32byteshexstr(params.account2_current_normalized_balance)
+                else:
+                    # result = int_to_32byteshexstr(0)
+                    raise AssertionError('Pie call for unexpected account during tests')
+            elif input_data.startswith('0xc92aecc4'):  # chi
+                result = int_to_32byteshexstr(params.current_chi)
+            elif input_data.startswith('0x487bf082'):  # dsr
+                result = int_to_32byteshexstr(params.current_dsr)
+            else:
+                raise AssertionError(
+                    'Call to unexpected method of MakerDAO pot during tests',
+                )
+            return result
+
+        if to_address == ETH_MULTICALL.address:
+            contract = WEB3.eth.contract(address=ETH_MULTICALL.address, abi=ETH_MULTICALL.abi)
+            _, arguments = contract.decode_function_input(input_data)
+            outputs = [
+                bytes.fromhex(mock_eth_call(target, '0x' + calldata.hex())[2:])
+                for target, calldata in arguments['calls']
+            ]
+            encoded = WEB3.codec.encode_abi(
+                ['uint256', 'bytes[]'],
+                [TEST_LATEST_BLOCKNUMBER, outputs],
+            )
+            return '0x' + encoded.hex()
+
+        raise AssertionError(
+            f'Etherscan call to unknown contract {to_address} during tests',
+        )
 
     def mock_requests_get(url, *args, **kwargs):
         if 'etherscan.io/api?module=proxy&action=eth_blockNumber' in url:
@@ -138,48 +203,14 @@ def mock_etherscan_for_dsr(
                 'https://api.etherscan.io/api?module=proxy&action=eth_call&to=',
             )[1][:42]
             input_data = url.split('data=')[1].split('&apikey')[0]
-            if to_address == MAKERDAO_PROXY_REGISTRY.address:
-                if not input_data.startswith('0xc4552791'):
-                    raise AssertionError(
-                        'Call to unexpected method of DSR ProxyRegistry during tests',
-                    )
-
-                # It's a call to proxy registry. Return the mapping
-                if account1[2:].lower() in input_data:
-                    proxy_account = address_to_32byteshexstr(proxy1)
-                elif account2[2:].lower() in input_data:
-                    proxy_account = address_to_32byteshexstr(proxy2)
-                else:
-                    proxy_account = '0x' + '0' * 64
-                response = f'{{"status":"1","message":"OK","result":"{proxy_account}"}}'
-            elif to_address == MAKERDAO_POT.address:
-                if input_data.startswith('0x0bebac86'):  # pie
-                    if proxy1[2:].lower() in input_data:
-                        result = int_to_32byteshexstr(params.account1_current_normalized_balance)
-                    elif proxy2[2:].lower() in input_data:
-                        result = int_to_32byteshexstr(params.account2_current_normalized_balance)
-                    else:
-                        # result = int_to_32byteshexstr(0)
-                        raise AssertionError('Pie call for unexpected account during tests')
-                elif input_data.startswith('0xc92aecc4'):  # chi
-                    result = int_to_32byteshexstr(params.current_chi)
-                elif input_data.startswith('0x487bf082'):  # dsr
-                    result = int_to_32byteshexstr(params.current_dsr)
-                else:
-                    raise AssertionError(
-                        'Call to unexpected method of MakerDAO pot during tests',
-                    )
-
-                response = f'{{"status":"1","message":"OK","result":"{result}"}}'
-
-            else:
-                raise AssertionError(
-                    f'Etherscan call to unknown contract {to_address} during tests',
-                )
+            result = mock_eth_call(to_address, input_data)
+            response = f'{{"status":"1","message":"OK","result":"{result}"}}'
         elif 'etherscan.io/api?module=logs&action=getLogs' in url:
             contract_address = url.split('&address=')[1].split('&topic0')[0]
             topic0 = url.split('&topic0=')[1].split('&topic0_1')[0]
-            topic1 = url.split('&topic1=')[1].split('&topic1_2')[0]
+            topic1 = None
+            if '&topic1=' in url:
+                topic1 = url.split('&topic1=')[1].split('&topic1_2')[0]
             topic2 = None
             if '&topic2=' in url:
                 topic2 = url.split('&topic2=')[1].split('&')[0]
@@ -211,6 +242,12 @@ def mock_etherscan_for_dsr(
                         if from_block <= params.account1_exit1_blocknumber <= to_block:
                             events.append(account1_exit1_event)
 
+                    response = f'{{"status":"1","message":"OK","result":[{",".join(events)}]}}'
+                elif topic0.startswith('0x29ae8114'):  # file
+                    events = []
+                    if from_block <= TEST_DSR_FILE_BLOCKNUMBER <= to_block:
+                        events.append(dsr_file_event)
+
                     response = f'{{"status":"1","message":"OK","result":[{",".join(events)}]}}'
                 else:
                     raise AssertionError('Etherscan unknown log query to makerdao POT contract')
@@ -271,7 +308,7 @@ def setup_tests_for_dsr(
         original_requests_get,
 ) -> DSRTestSetup:
 
-    current_dsr = 1000000002440418608258400030
+    current_dsr = TEST_CURRENT_DSR
     current_chi = 1123323222211111111111001249911111
     chi_distance = 1010020050000000000050000000000
     params = DSRMockParameters(
@@ -548,6 +585,15 @@ def test_query_historical_dsr(
         else:
             outcome = assert_proper_response_with_result(response)
 
+        assert_dsr_history_result_is_correct(outcome, setup)
+        # Query again, now the movements should come from the DB
+        rotki.chain_manager.makerdao_dsr.last_historical_dsr_query_ts = 0
+        response = requests.get(api_url_for(
+            rotkehlchen_api_server,
+            "makerdaodsrhistoryresource",
+        ))
+        outcome = assert_proper_response_with_result(response)
+
     assert_dsr_history_result_is_correct(outcome, setup)
 
 
@@ -679,3 +725,24 @@ def test_dsr_for_account_with_proxy_but_no_dsr(
     json_data = response.json()
     assert json_data['message'] == ''
     assert len(json_data['result']) == 0
+
+
+@pytest.mark.parametrize('number_of_eth_accounts', [3])
+@pytest.mark.parametrize('ethereum_modules', [['makerdao_dsr']])
+def test_dsr_chi_from_pot_rate_changes(rotkehlchen_api_server, ethereum_accounts):
+    """Test that chi at a given time is calculated from the pot DSR changes in the chain"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    setup = setup_tests_for_dsr(
+        etherscan=rotki.etherscan,
+        account1=ethereum_accounts[0],
+        account2=ethereum_accounts[2],
+        original_requests_get=requests.get,
+    )
+    makerdao_dsr = rotki.chain_manager.makerdao_dsr
+    with setup.etherscan_patch as etherscan_mock:
+        chi = makerdao_dsr._get_chi_at(Timestamp(TEST_DSR_FILE_TIMESTAMP + 3600))
+        assert chi == FVal(_rpow(TEST_CURRENT_DSR, 3600))
+        # Before the first DSR change chi is ONE. The changes are not queried again.
+        calls_num = etherscan_mock.call_count
+        assert makerdao_dsr._get_chi_at(Timestamp(TEST_DSR_FILE_TIMESTAMP - 1)) == FVal(RAY)
+        assert etherscan_mock.call_count == calls_num
@@ -263,6 +263,14 @@ def test_query_only_details_and_not_vaults(rotkehlchen_api_server, ethereum_acco
         details=details,
         total_interest_owed_list=[FVal('0.2810015984764')],
     )
+    # Query the details again after the requery period. The events now come from the DB
+    rotki.chain_manager.makerdao_vaults.last_vault_details_query_ts = 0
+    response = requests.get(api_url_for(
+        rotkehlchen_api_server,
+        "makerdaovaultdetailsresource",
+    ))
+    second_details = assert_proper_response_with_result(response)
+    assert [x['events'] for x in second_details] == [x['events'] for x in details]
     # And then query the vaults, which should just use the cached value
     response = requests.get(api_url_for(
         rotkehlchen_api_server,
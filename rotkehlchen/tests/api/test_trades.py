@@ -204,6 +204,80 @@ def test_query_trades_over_limit(rotkehlchen_api_server_with_exchanges, start_wi
             assert result['entries_found'] == all_trades_num
 
 
+@pytest.mark.parametrize('start_with_valid_premium', [False, True])
+@pytest.mark.parametrize('added_exchanges', [('binance', 'poloniex')])
+def test_query_trades_pagination(rotkehlchen_api_server_with_exchanges, start_with_valid_premium):
+    """Test that the trades endpoint can filter, order and paginate trades in the DB"""
+    rotki = rotkehlchen_api_server_with_exchanges.rest_api.rotkehlchen
+    setup = mock_history_processing_and_exchanges(rotki)
+
+    spam_trades = [Trade(
+        timestamp=x,
+        location=Location.EXTERNAL,
+        pair='BTC_EUR',
+        trade_type=TradeType.BUY if x % 2 == 0 else TradeType.SELL,
+        amount=FVal(x + 1),
+        rate=FVal(1),
+        fee=FVal(0),
+        fee_currency=A_EUR,
+        link='',
+        notes='') for x in range(FREE_TRADES_LIMIT + 50)
+    ]
+    rotki.data.db.add_trades(spam_trades)
+    all_trades_num = FREE_TRADES_LIMIT + 50 + 5  # 5 = 3 polo and 2 binance
+
+    def query_page(**kwargs):
+        with setup.binance_patch, setup.polo_patch:
+            response = requests.get(
+                api_url_for(
+                    rotkehlchen_api_server_with_exchanges,
+                    "tradesresource",
+                ), json=kwargs,
+            )
+        return assert_proper_response_with_result(response)
+
+    result = query_page(location='external', limit=10, offset=5, ascending=True)
+    assert [x['timestamp'] for x in result['entries']] == list(range(5, 15))
+    assert result['entries_filtered'] == FREE_TRADES_LIMIT + 50
+    assert result['entries_found'] == all_trades_num
+
+    result = query_page(limit=20, offset=FREE_TRADES_LIMIT - 10)
+    if start_with_valid_premium:
+        assert len(result['entries']) == 20
+    else:  # can't page beyond the free limit
+        assert len(result['entries']) == 10
+    assert result['entries_filtered'] == all_trades_num
+
+    result = query_page(location='external', trade_type='sell', limit=3)
+    assert [x['timestamp'] for x in result['entries']] == [
+        FREE_TRADES_LIMIT + 49,
+        FREE_TRADES_LIMIT + 47,
+        FREE_TRADES_LIMIT + 45,
+    ]
+    assert result['entries_filtered'] == (FREE_TRADES_LIMIT + 50) // 2
+
+    result = query_page(asset='BTC', order_by_attribute='location', limit=5)
+    # BTC is the quote asset of 1 binance and 2 poloniex trades
+    assert [x['location'] for x in result['entries']] == [
+        'binance',
+        'poloniex',
+        'poloniex',
+        'external',
+        'external',
+    ]
+    assert result['entries_filtered'] == FREE_TRADES_LIMIT + 50 + 3
+
+    # invalid pagination arguments
+    for arguments in ({'limit': 0}, {'offset': -1}, {'order_by_attribute': 'rate'}):
+        response = requests.get(
+            api_url_for(
+                rotkehlchen_api_server_with_exchanges,
+                "tradesresource",
+            ), json=arguments,
+        )
+        assert_error_response(response=response, status_code=HTTPStatus.BAD_REQUEST)
+
+
 def test_add_trades(rotkehlchen_api_server):
     """Test that adding trades to the trades endpoint works as expected"""
     # add a new external trade
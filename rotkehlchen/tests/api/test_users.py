@@ -2,17 +2,22 @@ import os
 from http import HTTPStatus
 from pathlib import Path
 from typing import Any, Dict, Optional
+from unittest.mock import patch
 
 import pytest
 import requests
 
 from rotkehlchen.db.settings import ROTKEHLCHEN_DB_VERSION, DBSettings
+from rotkehlchen.errors import RemoteError, StartupError
 from rotkehlchen.premium.premium import PremiumCredentials
 from rotkehlchen.tests.utils.api import (
     api_url_for,
     assert_error_response,
+    assert_ok_async_response,
     assert_proper_response,
+    assert_proper_response_with_result,
     assert_simple_ok_response,
+    wait_for_async_task,
 )
 from rotkehlchen.tests.utils.premium import (
     VALID_PREMIUM_KEY,
@@ -853,3 +858,92 @@ def test_users_by_name_endpoint_errors(rotkehlchen_api_server, username, db_pass
         status_code=HTTPStatus.BAD_REQUEST,
     )
     assert rotki.user_is_logged_in is False
+
+
+def test_query_startup_status(rotkehlchen_api_server):
+    """Test that the status of the login steps that run in the background can be queried"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    rotki.startup.wait_all()
+
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'startupresource'))
+    result = assert_proper_response_with_result(response)
+    assert result['ready'] is True
+    assert result['steps'] == {
+        'chain manager': {'status': 'ready', 'dependencies': [], 'error': None},
+        'trades historian': {
+            'status': 'ready',
+            'dependencies': ['chain manager'],
+            'error': None,
+        },
+    }
+
+    # After logout there are no more steps
+    rotki.logout()
+    assert rotki.startup.serialize() == {'ready': True, 'steps': {}}
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'startupresource'))
+    assert_error_response(
+        response=response,
+        contained_in_msg='No user is currently logged in',
+        status_code=HTTPStatus.CONFLICT,
+    )
+
+
+def test_query_after_failed_startup_step(rotkehlchen_api_server, username, db_password):
+    """Test that queries needing a login step that failed in the background return an error"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    rotki.logout()
+
+    data = {'action': 'login', 'password': db_password, 'sync_approval': 'unknown'}
+    chain_manager_patch = patch(
+        'rotkehlchen.rotkehlchen.ChainManager',
+        side_effect=RemoteError('Could not connect to the ethereum node'),
+    )
+    with chain_manager_patch:
+        response = requests.patch(
+            api_url_for(rotkehlchen_api_server, 'usersbynameresource', name=username),
+            json=data,
+        )
+        assert_proper_response(response)
+        with pytest.raises(StartupError):
+            rotki.startup.wait_all()
+
+    expected_msg = 'chain manager could not be initialized. Could not connect to the ethereum node'
+    response = requests.get(api_url_for(
+        rotkehlchen_api_server,
+        'named_blockchain_balances_resource',
+        blockchain='ETH',
+    ))
+    assert_error_response(
+        response=response,
+        contained_in_msg=expected_msg,
+        status_code=HTTPStatus.CONFLICT,
+    )
+
+    # Also for async queries
+    response = requests.get(
+        api_url_for(
+            rotkehlchen_api_server,
+            'named_blockchain_balances_resource',
+            blockchain='ETH',
+        ),
+        json={'async_query': True},
+    )
+    task_id = assert_ok_async_response(response)
+    outcome = wait_for_async_task(rotkehlchen_api_server, task_id)
+    assert outcome['result'] is None
+    assert expected_msg in outcome['message']
+
+    # And for steps that depend on the failed one
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'historyprocessingresource'))
+    assert_error_response(
+        response=response,
+        contained_in_msg='trades historian could not be initialized',
+        status_code=HTTPStatus.CONFLICT,
+    )
+
+    # Endpoints that do not need the failed steps keep working
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'startupresource'))
+    result = assert_proper_response_with_result(response)
+    assert result['ready'] is False
+    assert result['steps']['chain manager']['status'] == 'failed'
+    assert result['steps']['trades historian']['status'] == 'failed'
@@ -4,6 +4,7 @@ from copy import deepcopy
 from shutil import copyfile
 from unittest.mock import patch
 
+import gevent
 import pytest
 
 from rotkehlchen.accounting.structures import BalanceType
@@ -24,6 +25,7 @@ from rotkehlchen.db.settings import (
     DEFAULT_INCLUDE_CRYPTO2CRYPTO,
     DEFAULT_INCLUDE_GAS_COSTS,
     DEFAULT_KRAKEN_ACCOUNT_TYPE,
+    DEFAULT_KRAKEN_LEDGER_SYNC,
     DEFAULT_MAIN_CURRENCY,
     DEFAULT_START_DATE,
     DEFAULT_THOUSAND_SEPARATOR,
@@ -32,7 +34,7 @@ from rotkehlchen.db.settings import (
     DBSettings,
     ModifiableDBSettings,
 )
-from rotkehlchen.db.utils import AssetBalance, BlockchainAccounts, LocationData
+from rotkehlchen.db.utils import AssetBalance, BlockchainAccounts, DBPagination, LocationData
 from rotkehlchen.errors import AuthenticationError, InputError
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
 from rotkehlchen.fval import FVal
@@ -65,7 +67,7 @@ from rotkehlchen.typing import (
 )
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import ts_now
-from rotkehlchen.utils.serialization import rlk_jsondumps
+from rotkehlchen.utils.serialization import rlk_jsondumps, rlk_jsonloads_dict
 
 TABLES_AT_INIT = [
     'aave_events',
@@ -93,6 +95,13 @@ TABLES_AT_INIT = [
     'xpubs',
     'xpub_mappings',
     'amm_swaps',
+    'eth2_deposits',
+    'compound_events',
+    'makerdao_vault_creations',
+    'makerdao_vault_events',
+    'dsr_movements',
+    'dsr_rate_changes',
+    'aave_interest_state',
 ]
 
 
@@ -276,6 +285,7 @@ def test_writing_fetching_data(data_dir, username):
         'submit_usage_analytics': True,
         'last_write_ts': 0,
         'kraken_account_type': DEFAULT_KRAKEN_ACCOUNT_TYPE,
+        'kraken_ledger_sync': DEFAULT_KRAKEN_LEDGER_SYNC,
         'active_modules': DEFAULT_ACTIVE_MODULES,
         'frontend_settings': '',
     }
@@ -306,6 +316,7 @@ def test_settings_entry_types(database):
         decimal_separator='.',
         currency_location='after',
         submit_usage_analytics=False,
+        kraken_ledger_sync=True,
     ))
 
     res = database.get_settings()
@@ -343,6 +354,8 @@ def test_settings_entry_types(database):
     assert res.currency_location == 'after'
     assert isinstance(res.submit_usage_analytics, bool)
     assert res.submit_usage_analytics is False
+    assert isinstance(res.kraken_ledger_sync, bool)
+    assert res.kraken_ledger_sync is True
     assert isinstance(res.active_modules, list)
     assert res.active_modules == DEFAULT_ACTIVE_MODULES
     assert isinstance(res.frontend_settings, str)
@@ -412,6 +425,25 @@ def test_upgrade_sqlcipher_v3_to_v4_with_dbinfo(user_data_dir):
     assert db.get_version() == ROTKEHLCHEN_DB_VERSION
 
 
+def test_dbinfo_fingerprint(user_data_dir):
+    """Test that the DB info written at teardown holds a cheap fingerprint and that
+    at startup the whole DB is not hashed when the sqlcipher version did not change"""
+    msg_aggregator = MessagesAggregator()
+    db = DBHandler(user_data_dir, '123', msg_aggregator, None)
+    del db
+    with open(user_data_dir / DBINFO_FILENAME, 'r') as f:
+        dbinfo = rlk_jsonloads_dict(f.read())
+    assert dbinfo['sqlcipher_version'] == detect_sqlcipher_version()
+    assert 'md5_hash' not in dbinfo
+    db_size = os.stat(user_data_dir / 'rotkehlchen.db').st_size
+    assert dbinfo['fingerprint'].startswith(f'{db_size}-')
+
+    with patch('rotkehlchen.db.dbhandler.file_md5') as md5_mock:
+        db = DBHandler(user_data_dir, '123', msg_aggregator, None)
+    assert md5_mock.call_count == 0
+    assert db.get_version() == ROTKEHLCHEN_DB_VERSION
+
+
 def test_sqlcipher_detect_version():
     class QueryMock():
         def __init__(self, version):
@@ -721,6 +753,55 @@ def test_add_trades(data_dir, username):
     assert returned_trades == [trade1, trade2, trade3]
 
 
+def test_get_trades_filtered_and_paginated(database):
+    """Test that filtering, ordering and pagination of trades all happen in the DB"""
+    trades = [Trade(
+        timestamp=Timestamp(1451606400 + x),
+        location=Location.KRAKEN if x % 2 == 0 else Location.BINANCE,
+        pair='ETH_EUR' if x % 3 == 0 else 'BTC_ETH',
+        trade_type=TradeType.BUY if x < 5 else TradeType.SELL,
+        amount=FVal(x + 1),
+        rate=FVal('10'),
+        fee=Fee(FVal('0.01')),
+        fee_currency=A_EUR,
+        link='',
+        notes='',
+    ) for x in range(10)]
+    database.add_trades(trades)
+
+    # no pagination means all trades from oldest to newest
+    assert database.get_trades() == trades
+    assert database.get_trades_count() == 10
+
+    most_recent_first = DBPagination(order_by_attribute='time', ascending=False, limit=3)
+    assert database.get_trades(pagination=most_recent_first) == trades[9:6:-1]
+    assert database.get_trades(
+        pagination=most_recent_first._replace(offset=8),
+    ) == [trades[1], trades[0]]
+
+    kraken_trades = [x for x in trades if x.location == Location.KRAKEN]
+    assert database.get_trades(locations=[Location.KRAKEN]) == kraken_trades
+    assert database.get_trades_count(locations=[Location.KRAKEN]) == len(kraken_trades)
+    assert database.get_trades_count(locations=[Location.KRAKEN, Location.BINANCE]) == 10
+
+    # the asset can be either the base or the quote asset of the pair
+    assert database.get_trades_count(asset=A_ETH) == 10
+    assert database.get_trades(asset=A_BTC) == [x for x in trades if x.pair == 'BTC_ETH']
+    assert database.get_trades_count(asset=A_EUR) == 4
+    assert database.get_trades_count(asset=A_USD) == 0
+
+    sell_trades = database.get_trades(
+        from_ts=Timestamp(1451606406),
+        trade_type=TradeType.SELL,
+        pagination=DBPagination(order_by_attribute='pair', ascending=True),
+    )
+    assert sell_trades == [trades[7], trades[8], trades[6], trades[9]]
+    assert database.get_trades_count(
+        from_ts=Timestamp(1451606406),
+        trade_type=TradeType.SELL,
+    ) == 4
+
+
 def test_add_margin_positions(data_dir, username):
     """Test that adding and retrieving margin positions from the DB works fine.
 
@@ -850,6 +931,38 @@ def test_add_asset_movements(data_dir, username):
     assert returned_movements == [movement1, movement2, movement3]
 
 
+def test_get_asset_movements_filtered_and_paginated(database):
+    """Test that filtering, ordering and pagination of asset movements happen in the DB"""
+    movements = [AssetMovement(
+        location=Location.KRAKEN if x % 2 == 0 else Location.BITTREX,
+        category=AssetMovementCategory.DEPOSIT if x < 3 else AssetMovementCategory.WITHDRAWAL,
+        address=None,
+        transaction_id=None,
+        timestamp=Timestamp(1451606400 + x),
+        asset=A_BTC if x % 3 == 0 else A_ETH,
+        amount=FVal(x + 1),
+        fee_asset=A_EUR,
+        fee=Fee(FVal('0')),
+        link='',
+    ) for x in range(6)]
+    database.add_asset_movements(movements)
+
+    assert database.get_asset_movements() == movements
+    assert database.get_asset_movements_count() == 6
+    assert database.get_asset_movements(
+        pagination=DBPagination(order_by_attribute='time', ascending=False, limit=2, offset=1),
+    ) == [movements[4], movements[3]]
+    assert database.get_asset_movements(
+        locations=[Location.BITTREX],
+        category=AssetMovementCategory.WITHDRAWAL,
+    ) == [movements[3], movements[5]]
+    assert database.get_asset_movements_count(asset=A_BTC) == 2
+    assert database.get_asset_movements_count(
+        to_ts=Timestamp(1451606402),
+        locations=[Location.KRAKEN],
+    ) == 2
+
+
 def test_add_ethereum_transactions(data_dir, username):
     """Test that adding and retrieving ethereum transactions from the DB works fine.
 
@@ -919,6 +1032,35 @@ def test_add_ethereum_transactions(data_dir, username):
     assert returned_transactions == [tx1, tx2, tx3]
 
 
+def test_add_internal_ethereum_transactions(database):
+    """Test that etherscan internal transactions of the same transaction hash get
+    deterministic nonces so that adding them again does not duplicate them"""
+    internal_txs = [EthereumTransaction(
+        tx_hash=b'1',
+        timestamp=Timestamp(1451606400),
+        block_number=1,
+        from_address=ETH_ADDRESS1,
+        to_address=to_address,
+        value=FVal('2000000'),
+        gas=FVal('0'),
+        gas_price=FVal('-1'),
+        gas_used=FVal('0'),
+        input_data=b'',
+        nonce=-1,
+    ) for to_address in (ETH_ADDRESS2, ETH_ADDRESS3)]
+
+    database.add_ethereum_transactions(internal_txs[:1], from_etherscan=True)
+    database.add_ethereum_transactions(internal_txs, from_etherscan=True)
+    database.add_ethereum_transactions(internal_txs[::-1], from_etherscan=True)
+    returned_transactions = database.get_ethereum_transactions()
+    assert len(returned_transactions) == 2
+    assert {(tx.to_address, tx.nonce) for tx in returned_transactions} == {
+        (ETH_ADDRESS2, -1),
+        (ETH_ADDRESS3, -2),
+    }
+    assert len(database.msg_aggregator.consume_warnings()) == 0
+
+
 @pytest.mark.parametrize('ethereum_accounts', [[]])
 def test_non_checksummed_eth_account_in_db(database):
     """
@@ -1168,3 +1310,70 @@ def test_remove_queried_address_on_account_remove(data_dir, username):
     )
     addresses = queried_addresses.get_queried_addresses_for_module('makerdao_vaults')
     assert not addresses
+
+
+def test_write_batch(database):
+    """Test that the writes inside a write batch, including nested ones, are
+    committed once at the end along with the last write timestamp"""
+    with patch('rotkehlchen.db.dbhandler.ts_now', return_value=1):
+        database.update_last_write()
+
+    with patch('rotkehlchen.db.dbhandler.ts_now', return_value=2):
+        with database.write_batch():
+            database.add_to_ignored_assets(A_DAO)
+            with database.write_batch():
+                database.add_to_ignored_assets(A_DOGE)
+            # The nested batch should not have committed or saved the last write
+            assert database.conn.in_transaction
+            assert database.get_last_write_ts() == 1
+
+    assert not database.conn.in_transaction
+    assert database.get_last_write_ts() == 2
+    assert set(database.get_ignored_assets()) == {A_DAO, A_DOGE}
+
+
+def test_write_batch_other_greenlet_commits(database):
+    """Test that a write batch only defers the commits of the greenlet that started it"""
+    def add_from_other_greenlet():
+        database.add_to_ignored_assets(A_DOGE)
+
+    with database.write_batch():
+        database.add_to_ignored_assets(A_DAO)
+        assert database.conn.in_transaction
+        gevent.spawn(add_from_other_greenlet).join()
+        # The other greenlet's write got committed, along with ours so far
+        assert not database.conn.in_transaction
+
+    assert set(database.get_ignored_assets()) == {A_DAO, A_DOGE}
+
+
+def test_write_tuples_constraint_violations(database):
+    """Test that writing tuples skips duplicates with a single warning, reports other
+    constraint violations as errors and still writes all the other tuples"""
+    query = 'INSERT INTO trades(id, time, location, pair, type) VALUES (?, ?, ?, ?, ?)'
+    database.write_tuples(
+        tuple_type='trade',
+        query=query,
+        tuples=[('id1', 1, 'B', 'ETH_EUR', 'A'), ('id2', 2, 'B', 'ETH_EUR', 'A')],
+    )
+    database.write_tuples(
+        tuple_type='trade',
+        query=query,
+        tuples=[
+            ('id3', 3, 'B', 'ETH_EUR', 'A'),
+            ('id1', 1, 'B', 'ETH_EUR', 'A'),
+            ('id4', 4, None, 'ETH_EUR', 'A'),
+            ('id2', 2, 'B', 'ETH_EUR', 'A'),
+            ('id5', 5, 'B', 'ETH_EUR', 'A'),
+        ],
+    )
+
+    errors = database.msg_aggregator.consume_errors()
+    warnings = database.msg_aggregator.consume_warnings()
+    assert len(errors) == 1
+    assert 'NOT NULL constraint failed' in errors[0]
+    assert len(warnings) == 1
+    assert 'Did not add 2 out of 5 trade entries' in warnings[0]
+    cursor = database.conn.cursor()
+    stored_ids = [x[0] for x in cursor.execute('SELECT id FROM trades ORDER BY id;')]
+    assert stored_ids == ['id1', 'id2', 'id3', 'id5']
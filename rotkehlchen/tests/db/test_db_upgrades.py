@@ -31,9 +31,12 @@ from rotkehlchen.tests.utils.constants import A_BCH, A_BSV, A_RDN
 from rotkehlchen.tests.utils.factories import make_ethereum_address
 from rotkehlchen.user_messages import MessagesAggregator
 
-creation_patch = patch(
-    'rotkehlchen.db.dbhandler.DB_SCRIPT_CREATE_TABLES',
-    new=OLD_DB_SCRIPT_CREATE_TABLES,
+# The indices refer to tables and columns of the latest schema so they are not
+# created for the old DBs the upgrades are tested on
+creation_patch = patch.multiple(
+    'rotkehlchen.db.dbhandler',
+    DB_SCRIPT_CREATE_TABLES=OLD_DB_SCRIPT_CREATE_TABLES,
+    DB_SCRIPT_CREATE_INDICES='',
 )
 
 
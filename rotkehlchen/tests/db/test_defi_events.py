@@ -5,6 +5,7 @@ from rotkehlchen.chain.ethereum.structures import (
     AaveLiquidationEvent,
     AaveRepayEvent,
     AaveSimpleEvent,
+    CompoundEvent,
     YearnVaultEvent,
 )
 from rotkehlchen.chain.ethereum.yearn.vaults import YEARN_VAULTS
@@ -135,6 +136,25 @@ def test_add_and_get_aave_events(data_dir, username):
     assert len(test_set) == len(addr3_events)
 
 
+def test_set_and_get_aave_interest_state(data_dir, username):
+    """Test that the aave interest checkpoint is saved and replaced per address and asset"""
+    msg_aggregator = MessagesAggregator()
+    data = DataHandler(data_dir, msg_aggregator)
+    data.unlock(username, '123', create_new=True)
+
+    addr1 = make_ethereum_address()
+    addr2 = make_ethereum_address()
+    assert data.db.get_aave_interest_state(addr1) == {}
+    data.db.set_aave_interest_state(addr1, {A_DAI: FVal('1.5'), Asset('USDC'): FVal('2')})
+    data.db.set_aave_interest_state(addr2, {A_DAI: FVal('3')})
+    data.db.set_aave_interest_state(addr1, {A_DAI: FVal('4.25')})
+    assert data.db.get_aave_interest_state(addr1) == {
+        A_DAI: FVal('4.25'),
+        Asset('USDC'): FVal('2'),
+    }
+    assert data.db.get_aave_interest_state(addr2) == {A_DAI: FVal('3')}
+
+
 def test_add_and_get_yearn_vault_events(data_dir, username):
     """Test that get yearn vault events works fine and returns only events for what we need"""
     msg_aggregator = MessagesAggregator()
@@ -196,3 +216,40 @@ def test_add_and_get_yearn_vault_events(data_dir, username):
     assert events == addr1_events
     events = data.db.get_yearn_vaults_events(address=addr2, vault=YEARN_VAULTS['yDAI'])
     assert events == addr2_events
+
+
+def test_add_and_get_compound_events(data_dir, username):
+    """Test that the compound events of an address are found and returned in the given range"""
+    msg_aggregator = MessagesAggregator()
+    data = DataHandler(data_dir, msg_aggregator)
+    data.unlock(username, '123', create_new=True)
+
+    addr1 = make_ethereum_address()
+    addr2 = make_ethereum_address()
+    assert data.db.has_compound_events(addr1) is False
+    events = [CompoundEvent(
+        event_type='mint',
+        address=address,
+        block_number=timestamp,
+        timestamp=Timestamp(timestamp),
+        asset=A_DAI,
+        value=Balance(amount=FVal(1), usd_value=FVal(1)),
+        to_asset=Asset('cDAI'),
+        to_value=Balance(amount=FVal(50), usd_value=FVal(1)),
+        realized_pnl=None,
+        tx_hash=f'0x{idx:064x}',
+        log_index=1,
+    ) for idx, (address, timestamp) in enumerate(
+        ((addr1, 10), (addr1, 20), (addr1, 30), (addr2, 20)),
+    )]
+    data.db.add_compound_events(events)
+
+    assert data.db.has_compound_events(addr1) is True
+    assert data.db.has_compound_events(make_ethereum_address()) is False
+    assert data.db.get_compound_events(addr1) == events[:3]
+    assert data.db.get_compound_events(addr2) == events[3:]
+    assert data.db.get_compound_events(addr1, from_ts=Timestamp(15), to_ts=Timestamp(30)) == [
+        events[1],
+        events[2],
+    ]
+    assert data.db.get_compound_events(addr1, from_ts=Timestamp(11), to_ts=Timestamp(19)) == []
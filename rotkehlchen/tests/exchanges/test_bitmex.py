@@ -113,7 +113,8 @@ def test_bitmex_api_withdrawals_deposit_and_query_after_subquery(sandbox_bitmex)
             link='bf19ca4e-e084-11f9-12cd-6ae41e26f9db',
         ),
     ]
-    assert result == expected_result
+    # The movements are returned from the DB ordered by time, oldest first
+    assert result == sorted(expected_result, key=lambda x: x.timestamp)
     # also make sure that asset movements contain Asset and not strings
     for movement in result:
         assert isinstance(movement.asset, Asset)
@@ -18,7 +18,7 @@ def test_coinbase_query_balances(function_scope_coinbase):
     """Test that coinbase balance query works fine for the happy path"""
     coinbase = function_scope_coinbase
 
-    def mock_coinbase_accounts(url):  # pylint: disable=unused-argument
+    def mock_coinbase_accounts(url, **kwargs):  # pylint: disable=unused-argument
         response = MockResponse(
             200,
             """
@@ -130,7 +130,7 @@ def test_coinbase_query_balances_unexpected_data(function_scope_coinbase):
             expected_errors_num,
             contains_expected_msg=None,
     ):
-        def mock_coinbase_accounts(url):  # pylint: disable=unused-argument
+        def mock_coinbase_accounts(url, **kwargs):  # pylint: disable=unused-argument
             return MockResponse(200, response_str)
 
         with patch.object(coinbase.session, 'get', side_effect=mock_coinbase_accounts):
@@ -411,7 +411,7 @@ TRANSACTIONS_RESPONSE = """{
 }]}"""
 
 
-def mock_normal_coinbase_query(url):  # pylint: disable=unused-argument
+def mock_normal_coinbase_query(url, **kwargs):  # pylint: disable=unused-argument
     if 'buys' in url:
         return MockResponse(200, BUYS_RESPONSE)
     elif 'sells' in url:
@@ -465,7 +465,8 @@ def test_coinbase_query_trade_history(function_scope_coinbase):
         fee_currency=A_USD,
         link='1e14d574-30fa-5d85-b02c-6be0d851d61d',
     )]
-    assert trades == expected_trades
+    # The trades are returned from the DB ordered by time, oldest first
+    assert trades == expected_trades[::-1]
 
     # and now try only a smaller time range
     with patch.object(coinbase.session, 'get', side_effect=mock_normal_coinbase_query):
@@ -497,7 +498,7 @@ def query_coinbase_and_test(
         # Since this test only mocks as breaking only one of the two actions by default
         expected_actions_num=1,
 ):
-    def mock_coinbase_query(url):  # pylint: disable=unused-argument
+    def mock_coinbase_query(url, **kwargs):  # pylint: disable=unused-argument
         if 'buys' in url:
             if 'next-page' in url:
                 return MockResponse(200, buys_paginated_end)
@@ -847,3 +848,147 @@ def test_coinbase_query_deposit_withdrawals_unexpected_data(function_scope_coinb
         expected_warnings_num=0,
         expected_errors_num=1,
     )
+
+
+def test_coinbase_sync_skips_unchanged_accounts(function_scope_coinbase):
+    """Test that a coinbase sync skips the accounts not updated since the last sync
+    and stops paginating an updated account once it reaches already stored entries"""
+    coinbase = function_scope_coinbase
+    account_updated_at = '2015-01-31T20:49:02Z'
+    paginate_buys = False
+    queried_urls = []
+
+    def mock_coinbase_query(url, **kwargs):  # pylint: disable=unused-argument
+        queried_urls.append(url)
+        if 'next-page' in url:
+            raise AssertionError('Should not paginate past already stored entries')
+        if 'buys' in url and paginate_buys:
+            return MockResponse(200, BUYS_RESPONSE.replace(
+                '"next_uri": null',
+                '"next_uri": "/v2/buys/?next-page"',
+            ))
+        if url.endswith('/v2/accounts'):
+            return MockResponse(
+                200,
+                f'{{"data": [{{"id": "5fs23", "updated_at": "{account_updated_at}"}}]}}',
+            )
+        return mock_normal_coinbase_query(url)
+
+    with patch.object(coinbase.session, 'get', side_effect=mock_coinbase_query):
+        # first sync queries the whole history of the account
+        trades = coinbase.query_trade_history(start_ts=0, end_ts=1451606400)
+        assert len(trades) == 1
+        assert any('buys' in url for url in queried_urls)
+        queried_urls.clear()
+
+        # not updated since the last sync so only the accounts are queried
+        trades = coinbase.query_trade_history(start_ts=0, end_ts=TEST_END_TS)
+        assert len(trades) == 2
+        assert len(queried_urls) == 1 and queried_urls[0].endswith('/v2/accounts')
+        queried_urls.clear()
+
+        # updated since the last sync, but stops at the first page with known entries
+        account_updated_at = '2100-01-31T20:49:02Z'
+        paginate_buys = True
+        trades = coinbase.query_trade_history(start_ts=0, end_ts=TEST_END_TS + 1)
+
+    assert len(trades) == 2
+    assert any('buys' in url for url in queried_urls)
+    assert len(coinbase.msg_aggregator.consume_errors()) == 0
+    assert len(coinbase.msg_aggregator.consume_warnings()) == 0
+
+
+def test_coinbase_sync_stops_at_transactions_of_stored_entries(function_scope_coinbase):
+    """Test that an incremental coinbase sync stops paginating the transactions
+    endpoint once it reaches the transaction of an already stored buy"""
+    coinbase = function_scope_coinbase
+    account_updated_at = '2015-01-31T20:49:02Z'
+    paginate_transactions = False
+
+    def mock_coinbase_query(url, **kwargs):  # pylint: disable=unused-argument
+        if 'next-page' in url:
+            raise AssertionError('Should not paginate past already stored entries')
+        if 'transactions' in url and paginate_transactions:
+            return MockResponse(200, """{
+            "pagination": {"next_uri": "/v2/transactions/?next-page"},
+            "data": [{
+              "id": "4117f7d6-5694-5b36-bc8f-847509850ea4",
+              "type": "buy",
+              "status": "completed",
+              "created_at": "2015-01-31T20:49:02Z",
+              "buy": {"id": "9e14d574-30fa-5d85-b02c-6be0d851d61d", "resource": "buy"}
+            }]}""")
+        if url.endswith('/v2/accounts'):
+            return MockResponse(
+                200,
+                f'{{"data": [{{"id": "5fs23", "updated_at": "{account_updated_at}"}}]}}',
+            )
+        return mock_normal_coinbase_query(url)
+
+    with patch.object(coinbase.session, 'get', side_effect=mock_coinbase_query):
+        trades = coinbase.query_trade_history(start_ts=0, end_ts=1451606400)
+        assert len(trades) == 1
+
+        # the buy of the transaction is stored so pagination stops at the first page
+        account_updated_at = '2100-01-31T20:49:02Z'
+        paginate_transactions = True
+        trades = coinbase.query_trade_history(start_ts=0, end_ts=TEST_END_TS)
+
+    assert len(trades) == 2
+    assert len(coinbase.msg_aggregator.consume_errors()) == 0
+    assert len(coinbase.msg_aggregator.consume_warnings()) == 0
+
+
+def test_coinbase_sync_rechecks_pending_entries(function_scope_coinbase):
+    """Test that entries still pending at a coinbase sync are queried again by the
+    next sync, even if newer entries are already stored and the account is not updated"""
+    coinbase = function_scope_coinbase
+    end_ts = 1576726126
+    deposit_status = 'created'
+    queried_urls = []
+
+    def mock_coinbase_query(url, **kwargs):  # pylint: disable=unused-argument
+        queried_urls.append(url)
+        if 'next-page' in url:
+            return MockResponse(200, '{"pagination": {"next_uri": null}, "data": []}')
+        if 'buys' in url:
+            return MockResponse(200, BUYS_RESPONSE.replace(
+                '"next_uri": null',
+                '"next_uri": "/v2/buys/?next-page"',
+            ))
+        if 'deposits' in url:
+            return MockResponse(200, DEPOSITS_RESPONSE.replace(
+                '"status": "completed"',
+                f'"status": "{deposit_status}"',
+            ))
+        if url.endswith('/v2/accounts'):
+            return MockResponse(
+                200,
+                '{"data": [{"id": "5fs23", "updated_at": "2015-01-31T20:49:02Z"}]}',
+            )
+        return mock_normal_coinbase_query(url)
+
+    with patch.object(coinbase.session, 'get', side_effect=mock_coinbase_query):
+        # the pending deposit is not saved
+        movements = coinbase.query_deposits_withdrawals(start_ts=0, end_ts=end_ts)
+        assert len(movements) == 2
+        assert all(x.category == AssetMovementCategory.WITHDRAWAL for x in movements)
+        queried_urls.clear()
+
+        # the account is not updated, but the deposit was pending so it is queried
+        # again, paging past the already stored buy which is newer than the deposit
+        deposit_status = 'completed'
+        movements = coinbase.query_deposits_withdrawals(start_ts=0, end_ts=end_ts + 1)
+        assert len(movements) == 3
+        assert any(x.category == AssetMovementCategory.DEPOSIT for x in movements)
+        assert any('deposits' in url for url in queried_urls)
+        assert any('buys/?next-page' in url for url in queried_urls)
+        queried_urls.clear()
+
+        # nothing is pending anymore so the account is skipped
+        movements = coinbase.query_deposits_withdrawals(start_ts=0, end_ts=end_ts + 2)
+        assert len(movements) == 3
+        assert len(queried_urls) == 1 and queried_urls[0].endswith('/v2/accounts')
+
+    assert len(coinbase.msg_aggregator.consume_errors()) == 0
+    assert len(coinbase.msg_aggregator.consume_warnings()) == 0
@@ -311,8 +311,8 @@ def test_gemini_query_deposits_withdrawals(sandbox_gemini):
         fee=ZERO,
         link='341167014',
     )]
-    # The deposits should be returned with the oldest first (so given list is reversed)
-    assert movements == expected_movements[::-1]
+    # The movements are returned from the DB ordered by time, oldest first
+    assert movements == sorted(expected_movements, key=lambda x: x.timestamp)
 
 
 def test_gemini_symbol_to_pair():
@@ -1,3 +1,4 @@
+import time
 import warnings as test_warnings
 from unittest.mock import patch
 
@@ -5,13 +6,13 @@ import pytest
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.converters import KRAKEN_TO_WORLD, asset_from_kraken
-from rotkehlchen.constants.assets import A_BTC, A_ETH
+from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR
 from rotkehlchen.errors import UnprocessableTradePair
 from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.exchanges.kraken import KRAKEN_DELISTED, Kraken, kraken_to_world_pair
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.history import TEST_END_TS
-from rotkehlchen.typing import AssetMovementCategory
+from rotkehlchen.typing import AssetMovementCategory, TradePair, TradeType
 from rotkehlchen.utils.misc import ts_now
 
 
@@ -353,3 +354,130 @@ def test_trade_from_kraken_unexpected_data(function_scope_kraken):
     input_trades = test_trades
     input_trades = input_trades.replace('"vol": "1",', '')
     query_kraken_and_test(input_trades, expected_warnings_num=0, expected_errors_num=1)
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_kraken_ledger_sync(function_scope_kraken):
+    """Test that in ledger sync mode trades and deposits/withdrawals are derived from
+    a single untyped ledger query, grouping trade entries by their refid"""
+    kraken = function_scope_kraken
+    kraken.use_ledger_sync = True
+    kraken.tradeable_pairs_set = {TradePair('BTC_EUR'), TradePair('ETH_BTC')}
+    ledger = [{
+        'refid': 'TRADE1', 'time': '1458994442.1', 'type': 'trade', 'aclass': 'currency',
+        'asset': 'XXBT', 'amount': '1.0', 'balance': '1.0', 'fee': '0.0',
+    }, {
+        'refid': 'TRADE1', 'time': '1458994442.1', 'type': 'trade', 'aclass': 'currency',
+        'asset': 'ZEUR', 'amount': '-100.0', 'balance': '0.0', 'fee': '0.26',
+    }, {
+        'refid': 'TRADE2', 'time': '1458994500', 'type': 'trade', 'aclass': 'currency',
+        'asset': 'XETH', 'amount': '-10.0', 'balance': '0.0', 'fee': '0.0',
+    }, {
+        'refid': 'TRADE2', 'time': '1458994500', 'type': 'trade', 'aclass': 'currency',
+        'asset': 'XXBT', 'amount': '0.5', 'balance': '1.499', 'fee': '0.001',
+    }, {
+        'refid': 'DEPOSIT1', 'time': '1458994400', 'type': 'deposit', 'aclass': 'currency',
+        'asset': 'ZEUR', 'amount': '100.0', 'balance': '100.0', 'fee': '0.0',
+    }, {
+        'refid': 'STAKING1', 'time': '1458994600', 'type': 'staking', 'aclass': 'currency',
+        'asset': 'XTZ.S', 'amount': '0.1', 'balance': '0.1', 'fee': '0.0',
+    }]
+
+    with patch.object(kraken, 'query_until_finished', return_value=ledger) as ledger_query:
+        trades = kraken.query_trade_history(start_ts=0, end_ts=TEST_END_TS)
+        movements = kraken.query_deposits_withdrawals(start_ts=0, end_ts=TEST_END_TS)
+        # querying again should not hit kraken since the range is already synced
+        kraken.query_trade_history(start_ts=0, end_ts=TEST_END_TS)
+
+    assert ledger_query.call_count == 1
+    assert 'extra_dict' not in ledger_query.call_args[1]
+    assert len(trades) == 2
+    assert trades[0].pair == 'BTC_EUR'
+    assert trades[0].trade_type == TradeType.BUY
+    assert trades[0].amount == FVal('1')
+    assert trades[0].rate == FVal('100')
+    assert trades[0].fee == FVal('0.26')
+    assert trades[0].fee_currency == A_EUR
+    assert trades[0].link == 'TRADE1'
+    assert trades[1].pair == 'ETH_BTC'
+    assert trades[1].trade_type == TradeType.SELL
+    assert trades[1].amount == FVal('10')
+    assert trades[1].rate == FVal('0.05')
+    assert trades[1].fee == FVal('0.001')
+    assert trades[1].fee_currency == A_BTC
+    assert len(movements) == 1
+    assert movements[0].category == AssetMovementCategory.DEPOSIT
+    assert movements[0].asset == A_EUR
+    assert movements[0].link == 'DEPOSIT1'
+    assert len(kraken.msg_aggregator.consume_errors()) == 0
+    assert len(kraken.msg_aggregator.consume_warnings()) == 0
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_kraken_ledger_sync_overlapping_ranges(function_scope_kraken):
+    """Test that in ledger sync mode overlapping trades and deposits/withdrawals ranges
+    are queried only once and that only the entries of the not yet queried ranges are kept"""
+    kraken = function_scope_kraken
+    kraken.use_ledger_sync = True
+    kraken.tradeable_pairs_set = {TradePair('BTC_EUR')}
+    ledger = [{
+        'refid': 'TRADE1', 'time': '1458994442.1', 'type': 'trade', 'aclass': 'currency',
+        'asset': 'XXBT', 'amount': '1.0', 'balance': '1.0', 'fee': '0.0',
+    }, {
+        'refid': 'TRADE1', 'time': '1458994442.1', 'type': 'trade', 'aclass': 'currency',
+        'asset': 'ZEUR', 'amount': '-100.0', 'balance': '0.0', 'fee': '0.26',
+    }, {
+        'refid': 'TRADE2', 'time': '1458994500', 'type': 'trade', 'aclass': 'currency',
+        'asset': 'XXBT', 'amount': '-1.0', 'balance': '0.0', 'fee': '0.0',
+    }, {
+        'refid': 'TRADE2', 'time': '1458994500', 'type': 'trade', 'aclass': 'currency',
+        'asset': 'ZEUR', 'amount': '110.0', 'balance': '110.0', 'fee': '0.26',
+    }, {
+        'refid': 'DEPOSIT1', 'time': '1458994400', 'type': 'deposit', 'aclass': 'currency',
+        'asset': 'ZEUR', 'amount': '100.0', 'balance': '100.0', 'fee': '0.0',
+    }]
+    # The trades were already queried up to after TRADE1 but the movements not at all
+    kraken.db.update_used_query_range(
+        name=f'{kraken.name}_trades',
+        start_ts=0,
+        end_ts=1458994450,
+    )
+
+    with patch.object(kraken, 'query_until_finished', return_value=ledger) as ledger_query:
+        kraken.sync_ledger(start_ts=0, end_ts=TEST_END_TS)
+
+    assert ledger_query.call_count == 1
+    assert ledger_query.call_args[1]['start_ts'] == 0
+    assert ledger_query.call_args[1]['end_ts'] == TEST_END_TS
+    trades = kraken.db.get_trades()
+    assert len(trades) == 1
+    assert trades[0].link == 'TRADE2'
+    movements = kraken.db.get_asset_movements()
+    assert len(movements) == 1
+    assert movements[0].link == 'DEPOSIT1'
+
+
+def test_kraken_call_counter_token_bucket(function_scope_kraken):
+    """Test that the kraken rate limiter waits exactly as long as needed for the
+    call counter to drain enough for the next call"""
+    kraken = function_scope_kraken
+    kraken.use_original_kraken = True
+    kraken.call_counter = float(kraken.call_limit)
+    kraken.last_query_ts = time.time()
+    sleeps = []
+
+    def mock_sleep(seconds):
+        sleeps.append(seconds)
+        kraken.last_query_ts -= seconds  # pretend the time has passed
+
+    with patch('rotkehlchen.exchanges.kraken.gevent.sleep', side_effect=mock_sleep):
+        with patch.object(kraken, '_query_private', return_value={}) as private_query:
+            kraken.api_query('Balance')
+
+    assert private_query.call_count == 1
+    assert len(sleeps) == 1
+    # A Balance call costs 1 and the starter tier drains 1 every 3 seconds
+    assert FVal(sleeps[0]).is_close(FVal(3), max_diff='0.1')
+    # and now the counter is drained by the time that passed
+    kraken._decay_call_counter()
+    assert kraken.call_counter <= kraken.call_limit - 1 + 0.1
@@ -57,9 +57,11 @@ def cli_args(data_dir, ethrpc_endpoint):
         'logtarget',
         'loglevel',
         'logfromothermodules',
+        'profile_startup',
     ])
     args.loglevel = 'debug'
     args.logfromothermodules = False
+    args.profile_startup = False
     args.sleep_secs = 60
     args.data_dir = data_dir
     args.ethrpc_endpoint = ethrpc_endpoint
@@ -120,6 +120,30 @@ def test_upload_data_to_server_same_hash(rotkehlchen_instance, db_password):
         assert not put_mock.called
 
 
+@pytest.mark.parametrize('start_with_valid_premium', [True])
+def test_upload_data_to_server_no_local_changes(rotkehlchen_instance):
+    """Test that if nothing was written since the last upload the DB is not
+    even exported and nothing is queried from the server"""
+    now = ts_now()
+    sync_manager = rotkehlchen_instance.premium_sync_manager
+    sync_manager.last_data_upload_ts = now - 3700
+
+    patched_put = patch.object(rotkehlchen_instance.premium.session, 'put')
+    patched_get = patch.object(rotkehlchen_instance.premium.session, 'get')
+    patched_last_write = patch.object(
+        rotkehlchen_instance.data.db,
+        'get_last_write_ts',
+        return_value=now - 4000,
+    )
+    patched_export = patch.object(rotkehlchen_instance.data, 'compress_and_encrypt_db')
+    with patched_get as get_mock, patched_put as put_mock:
+        with patched_last_write, patched_export as export_mock:
+            assert sync_manager.maybe_upload_data_to_server() is False
+            assert not export_mock.called
+            assert not get_mock.called
+            assert not put_mock.called
+
+
 @pytest.mark.parametrize('start_with_valid_premium', [True])
 def test_upload_data_to_server_smaller_db(rotkehlchen_instance, db_password):
     """Test that if the server has bigger DB size no upload happens"""
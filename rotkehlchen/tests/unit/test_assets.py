@@ -1,8 +1,11 @@
 import json
 import warnings as test_warnings
+from copy import deepcopy
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
+import requests
 from eth_utils import is_checksum_address
 
 from rotkehlchen.assets.asset import Asset, EthereumToken
@@ -44,6 +47,25 @@ def test_asset_hashes_properly():
     assert mapping['ETH'] == 200
 
 
+def test_assets_are_interned():
+    """Test that creating an asset again returns the same instance for any letter case
+    of its identifier and that each asset class gets its own instances"""
+    eth_asset = Asset('ETH')
+    assert Asset('ETH') is eth_asset
+    assert Asset('eth') is eth_asset
+    assert deepcopy(eth_asset) is eth_asset
+
+    dai_token = EthereumToken('DAI')
+    assert EthereumToken('dai') is dai_token
+    assert isinstance(dai_token, EthereumToken)
+    assert Asset('DAI') is not dai_token
+    assert Asset('DAI') == dai_token
+    assert type(Asset('DAI')) == Asset  # pylint: disable=unidiomatic-typecheck
+
+    with pytest.raises(DeserializationError):
+        EthereumToken('ETH')
+
+
 def test_asset_equals():
     btc_asset = Asset('BTC')
     eth_asset = Asset('ETH')
@@ -242,6 +264,29 @@ def test_asset_with_unknown_type_does_not_crash(asset_resolver):  # pylint: disa
     AssetResolver._AssetResolver__instance = None
 
 
+def test_asset_resolver_without_remote_check(data_dir):
+    """Test that the AssetResolver can be initialized from the local assets without
+    contacting the remote and that the remote check can happen later"""
+    AssetResolver._AssetResolver__instance = None
+    with patch('requests.get') as get_mock:
+        resolver = AssetResolver(data_dir, check_remote=False)
+        assert get_mock.call_count == 0
+        assert resolver.remote_check_happened is False
+        assert resolver.lowercase_mapping is None
+        assert Asset('eth').identifier == 'ETH'
+        # get the singleton again since the mapping is only set as a side effect
+        assert AssetResolver().lowercase_mapping is not None
+
+    with patch('requests.get', side_effect=requests.exceptions.ConnectionError) as get_mock:
+        resolver = AssetResolver(data_dir)
+        assert get_mock.call_count == 1
+    assert resolver.remote_check_happened is True
+    assert Asset('eth').identifier == 'ETH'
+    # After the test runs we must reset the asset resolver so that it goes back to
+    # the normal list of assets
+    AssetResolver._AssetResolver__instance = None
+
+
 def test_get_ethereum_token():
     assert A_DAI == get_ethereum_token(
         symbol='DAI',
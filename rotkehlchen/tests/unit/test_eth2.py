@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 
 from rotkehlchen.accounting.structures import Balance
@@ -16,6 +18,7 @@ from rotkehlchen.user_messages import MessagesAggregator
 @pytest.mark.parametrize('default_mock_price_value', [FVal(2)])
 def test_get_eth2_staked_amount(  # pylint: disable=unused-argument
         ethereum_manager,
+        database,
         call_order,
         ethereum_manager_connect_at_start,
         inquirer,
@@ -31,6 +34,7 @@ def test_get_eth2_staked_amount(  # pylint: disable=unused-argument
     addr3 = '0x3266F3546a1e5Dc6A15588f3324741A0E20a3B6c'
     result = get_eth2_staked_amount(
         ethereum=ethereum_manager,
+        database=database,
         addresses=[addr1, addr2, addr3],
         has_premium=True,
         msg_aggregator=MessagesAggregator(),
@@ -187,6 +191,23 @@ def test_get_eth2_staked_amount(  # pylint: disable=unused-argument
     assert result.totals[addr2].amount >= FVal(480)
     assert result.totals[addr3].amount >= FVal(480)
 
+    # Querying again should only look for new transactions and take the
+    # already seen deposits from the DB without querying any receipts
+    receipt_patch = patch.object(
+        ethereum_manager,
+        'get_transaction_receipt',
+        side_effect=AssertionError('No receipt should be queried again'),
+    )
+    with receipt_patch:
+        second_result = get_eth2_staked_amount(
+            ethereum=ethereum_manager,
+            database=database,
+            addresses=[addr1, addr2, addr3],
+            has_premium=True,
+            msg_aggregator=MessagesAggregator(),
+        )
+    assert second_result == result
+
 
 def test_eth2_result_serialization():
     addr1 = make_ethereum_address()
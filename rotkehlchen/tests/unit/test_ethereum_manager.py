@@ -1,17 +1,22 @@
+from unittest.mock import patch
+
 import pytest
 
-from rotkehlchen.chain.ethereum.manager import NodeName
+from rotkehlchen.chain.ethereum.manager import NodeName, _expand_topics
+from rotkehlchen.chain.ethereum.utils import MulticallBatch, multicall
 from rotkehlchen.constants.ethereum import (
     ATOKEN_ABI,
     ERC20TOKEN_ABI,
     YEARN_YCRV_VAULT,
     ZERO_ADDRESS,
 )
+from rotkehlchen.errors import RemoteError
 from rotkehlchen.tests.utils.checks import assert_serialized_dicts_equal
 from rotkehlchen.tests.utils.ethereum import (
     ETHEREUM_TEST_PARAMETERS,
     wait_until_all_nodes_connected,
 )
+from rotkehlchen.tests.utils.factories import make_ethereum_address
 
 
 @pytest.mark.parametrize(*ETHEREUM_TEST_PARAMETERS)
@@ -101,6 +106,41 @@ def test_call_contract(ethereum_manager, call_order, ethereum_manager_connect_at
     assert result >= 0
 
 
+@pytest.mark.parametrize(*ETHEREUM_TEST_PARAMETERS)
+def test_multicall_batch(ethereum_manager, call_order, ethereum_manager_connect_at_start):
+    """Test that batched calls give the same results as the direct contract calls
+    and that a failing aggregate call is split"""
+    wait_until_all_nodes_connected(
+        ethereum_manager_connect_at_start=ethereum_manager_connect_at_start,
+        ethereum=ethereum_manager,
+    )
+    address = '0x5dbcF33D8c2E976c6b560249878e6F1491Bca25c'
+    aggregated_calls = []
+
+    def mock_multicall(ethereum, calls, call_order):
+        aggregated_calls.append(len(calls))
+        if len(calls) > 2:
+            raise RemoteError('Out of gas')
+        return multicall(ethereum=ethereum, calls=calls, call_order=call_order)
+
+    with patch('rotkehlchen.chain.ethereum.utils.multicall', side_effect=mock_multicall):
+        with MulticallBatch(ethereum_manager, call_order=call_order) as batch:
+            symbol = batch.add(YEARN_YCRV_VAULT, 'symbol')
+            decimals = batch.add(YEARN_YCRV_VAULT, 'decimals')
+            balance = batch.add(YEARN_YCRV_VAULT, 'balanceOf', [address])
+            token = batch.add(YEARN_YCRV_VAULT, 'token')
+
+    assert aggregated_calls == [4, 2, 2]
+    assert symbol.result == 'yyDAI+yUSDC+yUSDT+yTUSD'
+    assert decimals.result == YEARN_YCRV_VAULT.call(
+        ethereum_manager,
+        'decimals',
+        call_order=call_order,
+    )
+    assert balance.result >= 0
+    assert token.result == YEARN_YCRV_VAULT.call(ethereum_manager, 'token', call_order=call_order)
+
+
 @pytest.mark.parametrize(*ETHEREUM_TEST_PARAMETERS)
 def test_get_logs(ethereum_manager, call_order, ethereum_manager_connect_at_start):
     wait_until_all_nodes_connected(
@@ -149,6 +189,53 @@ def test_get_logs(ethereum_manager, call_order, ethereum_manager_connect_at_star
     )
 
 
+@pytest.mark.parametrize(*ETHEREUM_TEST_PARAMETERS)
+def test_get_logs_with_multiple_argument_values(
+        ethereum_manager,
+        call_order,
+        ethereum_manager_connect_at_start,
+):
+    """Test that an argument filter with multiple values matches the logs of any of them"""
+    wait_until_all_nodes_connected(
+        ethereum_manager_connect_at_start=ethereum_manager_connect_at_start,
+        ethereum=ethereum_manager,
+    )
+
+    argument_filters = {
+        'from': [
+            '0x7780E86699e941254c8f4D9b7eB08FF7e96BBE10',
+            make_ethereum_address(),
+        ],
+        'to': YEARN_YCRV_VAULT.address,
+    }
+    events = ethereum_manager.get_logs(
+        contract_address='0xdF5e0e81Dff6FAF3A7e52BA697820c5e32D806A8',
+        abi=ERC20TOKEN_ABI,
+        event_name='Transfer',
+        argument_filters=argument_filters,
+        from_block=10712531,
+        to_block=10712753,
+        call_order=call_order,
+    )
+    assert len(events) == 1
+    assert events[0]['transactionHash'] == '0xca33e56e1e529dacc9aa1261c8ba9230927329eb609fbe252e5bd3c2f5f3bcc9'  # noqa: E501
+    assert events[0]['logIndex'] == 157
+
+
+def test_expand_topics():
+    assert _expand_topics(['0xa', None, '0xb']) == [['0xa', None, '0xb']]
+    assert _expand_topics(['0xa', ['0xb', '0xc'], '0xd']) == [
+        ['0xa', '0xb', '0xd'],
+        ['0xa', '0xc', '0xd'],
+    ]
+    assert _expand_topics(['0xa', ['0xb', '0xc'], ['0xd', '0xe']]) == [
+        ['0xa', '0xb', '0xd'],
+        ['0xa', '0xb', '0xe'],
+        ['0xa', '0xc', '0xd'],
+        ['0xa', '0xc', '0xe'],
+    ]
+
+
 @pytest.mark.parametrize(*ETHEREUM_TEST_PARAMETERS)
 def test_get_log_and_receipt_etherscan_bad_tx_index(
         ethereum_manager,
@@ -1,7 +1,7 @@
 import pytest
 
 from rotkehlchen.errors import ConversionError
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FVal, sum_fvals
 from rotkehlchen.utils.serialization import rlk_jsondumps, rlk_jsonloads
 
 
@@ -52,6 +52,16 @@ def test_arithmetic_with_int():
     assert 2 // a == FVal('0')
 
 
+def test_sum_fvals():
+    values = [FVal('5.21'), FVal('2.12'), FVal('-23.124')]
+    result = sum_fvals(values)
+    assert isinstance(result, FVal)
+    assert result == FVal('-15.794')
+    assert sum_fvals(x for x in values if x > 0) == FVal('7.33')
+    assert sum_fvals([]) == FVal(0)
+    assert isinstance(sum_fvals([]), FVal)
+
+
 def test_comparison():
     a = FVal('1.348938409')
     b = FVal('0.123432434')
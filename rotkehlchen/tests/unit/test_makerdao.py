@@ -1,9 +1,17 @@
 from collections import defaultdict
+from unittest.mock import patch
 
 import pytest
 from web3 import Web3
 
 from rotkehlchen.accounting.structures import Balance, BalanceSheet
+from rotkehlchen.chain.ethereum.makerdao.common import RAY
+from rotkehlchen.chain.ethereum.makerdao.dsr import (
+    POT_CREATION_TIMESTAMP,
+    POT_FILE_DSR_WHAT,
+    MakerDAODSR,
+    _rpow,
+)
 from rotkehlchen.chain.ethereum.makerdao.vaults import (
     COLLATERAL_TYPE_MAPPING,
     GEMJOIN_MAPPING,
@@ -11,6 +19,7 @@ from rotkehlchen.chain.ethereum.makerdao.vaults import (
     MakerDAOVaults,
 )
 from rotkehlchen.constants.assets import A_DAI, A_ETH
+from rotkehlchen.constants.ethereum import DSR_RATE_CHANGES_RANGE, MAKERDAO_POT
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.fval import FVal
 from rotkehlchen.premium.premium import Premium
@@ -158,3 +167,110 @@ def test_vault_types():
             continue
 
         assert asset.identifier == collateral_type.split('-')[0]
+
+
+# Per second rates that the Pot's dsr is set to for the given yearly savings rate
+DSR_1_PERCENT = 1000000000315522921573372069
+DSR_2_PERCENT = 1000000000627937192491029810
+DSR_8_PERCENT = 1000000002440418608258400030
+SECONDS_PER_YEAR = 31536000
+
+
+def test_rpow():
+    """Test that _rpow accumulates the Pot's per second rates like the contract does"""
+    assert _rpow(RAY, SECONDS_PER_YEAR) == RAY
+    assert _rpow(DSR_2_PERCENT, 0) == RAY
+    assert _rpow(DSR_2_PERCENT, 1) == DSR_2_PERCENT
+    assert _rpow(0, 0) == RAY
+    assert _rpow(0, 5) == 0
+    # Each step rounds to the closest RAY like the contract and not down
+    assert _rpow(DSR_2_PERCENT, 3) == 1000000001883811578656004784
+    # A year at the known rates gives the yearly rate minus the rounding error
+    assert _rpow(DSR_1_PERCENT, SECONDS_PER_YEAR) == 1009999999999999999986080875
+    assert _rpow(DSR_2_PERCENT, SECONDS_PER_YEAR) == 1019999999999999999972831879
+    assert _rpow(DSR_8_PERCENT, SECONDS_PER_YEAR) == 1079999999999999999951590734
+
+
+def _make_pot_file_event(block_number: int, timestamp: int, what: int, data: int):
+    return {
+        'address': MAKERDAO_POT.address,
+        'topics': [
+            '0x29ae8114' + '0' * 56,
+            '0x' + '0' * 64,
+            '0x' + what.to_bytes(32, byteorder='big').hex(),
+            '0x' + data.to_bytes(32, byteorder='big').hex(),
+        ],
+        'blockNumber': block_number,
+        'logIndex': 1,
+        'timeStamp': timestamp,
+    }
+
+
+def test_dsr_chi_across_rate_changes(
+        ethereum_manager,
+        database,
+        function_scope_messages_aggregator,
+):
+    """Test that chi is interpolated from the saved DSR changes and that syncing the
+    changes only scans the blocks after the last scanned one"""
+    makerdao_dsr = MakerDAODSR(
+        ethereum_manager=ethereum_manager,
+        database=database,
+        premium=None,
+        msg_aggregator=function_scope_messages_aggregator,
+    )
+    first_ts = POT_CREATION_TIMESTAMP + 3600
+    second_ts = first_ts + 86400
+    events = [
+        _make_pot_file_event(9000000, first_ts, POT_FILE_DSR_WHAT, DSR_2_PERCENT),
+        # a file() of another parameter of the pot is ignored
+        _make_pot_file_event(9000001, first_ts + 1, 1, 42),
+        _make_pot_file_event(9006000, second_ts, POT_FILE_DSR_WHAT, DSR_8_PERCENT),
+    ]
+    latest_block_patch = patch.object(
+        ethereum_manager,
+        'get_latest_block_number',
+        return_value=9010000,
+    )
+    get_logs_patch = patch.object(ethereum_manager, 'get_logs', return_value=events)
+    with latest_block_patch, get_logs_patch as get_logs_mock:
+        # Until the first change the dsr is ONE so chi stays ONE
+        assert makerdao_dsr._get_chi_at(first_ts - 1) == FVal(RAY)
+        assert get_logs_mock.call_count == 1
+        assert get_logs_mock.call_args[1]['from_block'] == MAKERDAO_POT.deployed_block
+        assert get_logs_mock.call_args[1]['to_block'] == 9010000
+        assert makerdao_dsr._get_chi_at(first_ts) == FVal(RAY)
+        assert makerdao_dsr._get_chi_at(first_ts + 60) == FVal(_rpow(DSR_2_PERCENT, 60))
+
+        # At the change chi has accumulated the old rate and then the new one applies
+        chi_at_change = _rpow(DSR_2_PERCENT, 86400)
+        assert makerdao_dsr._get_chi_at(second_ts) == FVal(chi_at_change)
+        assert makerdao_dsr._get_chi_at(second_ts + 60) == FVal(
+            _rpow(DSR_8_PERCENT, 60) * chi_at_change // RAY,
+        )
+        # All were answered by the first sync
+        assert get_logs_mock.call_count == 1
+
+    rate_changes = database.get_dsr_rate_changes()
+    assert [(x.block_number, x.dsr, x.chi) for x in rate_changes] == [
+        (9000000, DSR_2_PERCENT, RAY),
+        (9006000, DSR_8_PERCENT, chi_at_change),
+    ]
+    assert database.get_used_query_range(DSR_RATE_CHANGES_RANGE) == (
+        MAKERDAO_POT.deployed_block,
+        9010000,
+    )
+
+    # A new sync only scans the blocks after the last scanned one
+    latest_block_patch = patch.object(
+        ethereum_manager,
+        'get_latest_block_number',
+        return_value=9020000,
+    )
+    get_logs_patch = patch.object(ethereum_manager, 'get_logs', return_value=[])
+    with latest_block_patch, get_logs_patch as get_logs_mock:
+        makerdao_dsr._sync_dsr_rate_changes()
+        assert get_logs_mock.call_args[1]['from_block'] == 9010001
+        assert get_logs_mock.call_args[1]['to_block'] == 9020000
+
+    assert len(database.get_dsr_rate_changes()) == 2
@@ -0,0 +1,127 @@
+from unittest.mock import patch
+
+import gevent
+import pytest
+
+from rotkehlchen.chain.ethereum.yearn import YearnVaults
+from rotkehlchen.chain.manager import ChainManager
+from rotkehlchen.errors import RemoteError, StartupError
+from rotkehlchen.greenlets import GreenletManager
+from rotkehlchen.startup import StartupManager, StartupStatus
+from rotkehlchen.user_messages import MessagesAggregator
+
+
+@pytest.fixture(name='msg_aggregator')
+def fixture_msg_aggregator():
+    return MessagesAggregator()
+
+
+@pytest.fixture(name='startup_manager')
+def fixture_startup_manager(msg_aggregator):
+    return StartupManager(
+        greenlet_manager=GreenletManager(msg_aggregator=msg_aggregator),
+        msg_aggregator=msg_aggregator,
+    )
+
+
+def test_startup_steps_respect_dependencies(startup_manager):
+    """Test that independent steps overlap and that steps wait for their dependencies"""
+    events = []
+
+    def step(label, seconds):
+        events.append(f'{label} start')
+        gevent.sleep(seconds)
+        events.append(f'{label} end')
+
+    startup_manager.run(name='a', method=step, label='a', seconds=0.1)
+    startup_manager.run(name='b', method=step, label='b', seconds=0.05)
+    startup_manager.run(name='c', method=step, dependencies=('a', 'b'), label='c', seconds=0)
+    assert startup_manager.serialize()['ready'] is False
+
+    startup_manager.wait('b')
+    assert startup_manager.steps['b'].status == StartupStatus.READY
+    assert startup_manager.steps['c'].status == StartupStatus.PENDING
+    startup_manager.wait_all()
+
+    assert events == ['a start', 'b start', 'b end', 'a end', 'c start', 'c end']
+    assert startup_manager.serialize() == {
+        'ready': True,
+        'steps': {
+            'a': {'status': 'ready', 'dependencies': [], 'error': None},
+            'b': {'status': 'ready', 'dependencies': [], 'error': None},
+            'c': {'status': 'ready', 'dependencies': ['a', 'b'], 'error': None},
+        },
+    }
+    # Steps that were never run do not block
+    startup_manager.wait('d')
+
+
+def test_failed_startup_step(startup_manager, msg_aggregator):
+    """Test that a failed step is reported and fails the steps that depend on it"""
+
+    def failing_step():
+        raise ValueError('node unreachable')
+
+    startup_manager.run(name='a', method=failing_step)
+    startup_manager.run(name='b', method=lambda: None, dependencies=('a',))
+    with pytest.raises(StartupError):
+        startup_manager.wait_all()
+
+    result = startup_manager.serialize()
+    assert result['ready'] is False
+    assert result['steps']['a'] == {
+        'status': 'failed',
+        'dependencies': [],
+        'error': 'node unreachable',
+    }
+    assert result['steps']['b']['status'] == 'failed'
+    with pytest.raises(StartupError):
+        startup_manager.wait('b')
+
+    errors = msg_aggregator.consume_errors()
+    assert len(errors) == 1
+    assert 'Failed to initialize a after login due to node unreachable' in errors[0]
+
+
+def test_killed_startup_step(startup_manager):
+    """Test that waiting on a step that was killed, for example by a logout, does not hang"""
+    startup_manager.run(name='a', method=gevent.sleep, seconds=10)
+    gevent.sleep(0)  # let the step start
+    startup_manager.greenlet_manager.clear()
+
+    with pytest.raises(StartupError):
+        startup_manager.wait('a')
+    startup_manager.clear()
+    assert startup_manager.serialize() == {'ready': True, 'steps': {}}
+
+
+def test_failed_ethereum_module_is_skipped(
+        ethereum_manager,
+        blockchain_accounts,
+        database,
+        greenlet_manager,
+        messages_aggregator,
+        data_dir,
+):
+    """Test that an ethereum module failing to initialize does not stop the others"""
+    maker_patch = patch(
+        'rotkehlchen.chain.manager.MakerDAODSR',
+        side_effect=RemoteError('Subgraph is down'),
+    )
+    with maker_patch:
+        chain_manager = ChainManager(
+            blockchain_accounts=blockchain_accounts,
+            ethereum_manager=ethereum_manager,
+            msg_aggregator=messages_aggregator,
+            database=database,
+            greenlet_manager=greenlet_manager,
+            premium=None,
+            eth_modules=['makerdao_dsr', 'yearn_vaults'],
+            data_directory=data_dir,
+        )
+
+    assert chain_manager.makerdao_dsr is None
+    assert isinstance(chain_manager.yearn_vaults, YearnVaults)
+    errors = messages_aggregator.consume_errors()
+    assert len(errors) == 1
+    assert 'Failed to initialize the makerdao_dsr module due to Subgraph is down' in errors[0]
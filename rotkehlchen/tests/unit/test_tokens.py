@@ -3,6 +3,7 @@ from unittest.mock import patch
 import pytest
 import requests
 
+from rotkehlchen.assets.asset import EthereumToken
 from rotkehlchen.chain.ethereum.tokens import EthTokens
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.fval import FVal
@@ -33,8 +34,9 @@ def test_detect_tokens_for_addresses(ethtokens, inquirer):  # pylint: disable=un
     result, token_usd_prices = ethtokens.query_tokens_for_addresses([addr1, addr2], False)
 
     assert len(result[addr1]) >= 170
-    balance = result[addr1]['BAT']
-    assert isinstance(balance, FVal)
+    raw_balance = result[addr1]['BAT']
+    assert isinstance(raw_balance, int)
+    balance = token_normalized_value(raw_balance, EthereumToken('BAT'))
     assert balance > FVal('478763')  # BAT burned at time of test writing
     assert len(result[addr2]) >= 20
 
@@ -81,4 +83,5 @@ def test_detected_tokens_cache(ethtokens, inquirer):  # pylint: disable=unused-a
             eth_map_entry = eth_map[key]
             assert len(entry) == len(eth_map_entry)
             for token, val in entry.items():
-                assert token_normalized_value(eth_map_entry[token], token) == val
+                # balances are returned in the token's base units
+                assert eth_map_entry[token] == val
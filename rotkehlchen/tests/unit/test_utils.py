@@ -1,7 +1,10 @@
 import json
+import sys
 import time
+from importlib import import_module
 from unittest.mock import patch
 
+import gevent
 import pytest
 from hexbytes import HexBytes
 
@@ -10,13 +13,18 @@ from rotkehlchen.exchanges.data_structures import invert_pair
 from rotkehlchen.fval import FVal
 from rotkehlchen.serialization.serialize import process_result
 from rotkehlchen.tests.utils.mock import MockResponse
-from rotkehlchen.utils.interfaces import CacheableObject, cache_response_timewise
+from rotkehlchen.utils.interfaces import (
+    CacheableObject,
+    cache_response_stale_while_revalidate,
+    cache_response_timewise,
+)
 from rotkehlchen.utils.misc import (
     combine_dicts,
     combine_stat_dicts,
     convert_to_int,
     iso8601ts_to_timestamp,
 )
+from rotkehlchen.utils.profiling import ImportTimer, PhaseTimer
 from rotkehlchen.utils.version_check import check_if_version_up_to_date
 
 
@@ -246,6 +254,77 @@ def test_cache_response_timewise_with_arguments_matter_false():
     assert instance.do_something_arguments_dont_matter_count == 2
 
 
+class Bar(CacheableObject):
+    def __init__(self):
+        super().__init__()
+        self.balances_call_count = 0
+        self.fail = False
+        self.delay = 0
+
+    @cache_response_stale_while_revalidate(keep_stale_if=lambda result: result[0] is None)
+    def query_balances(self, **kwargs):  # pylint: disable=unused-argument
+        gevent.sleep(self.delay)
+        self.balances_call_count += 1
+        if self.fail:
+            return None, 'failed'
+        return self.balances_call_count, ''
+
+
+def test_cache_response_stale_while_revalidate():
+    """Test that a stale cached value is returned at once and refreshed in the background,
+    that a failed refresh keeps the stale value and that a too stale value is not served"""
+    instance = Bar()
+    now = 1000
+    with patch('rotkehlchen.utils.interfaces.ts_now', side_effect=lambda: now):
+        assert instance.query_balances() == (1, '')
+        now += instance.cache_ttl_secs - 1
+        assert instance.query_balances() == (1, '')
+        assert instance.balances_call_count == 1
+
+        # past the TTL the cached value is returned and refreshed in the background
+        now += 2
+        assert instance.query_balances() == (1, '')
+        gevent.sleep(0)
+        assert instance.balances_call_count == 2
+        assert instance.query_balances() == (2, '')
+
+        # a failed background refresh does not replace the cached value
+        instance.fail = True
+        now += instance.cache_ttl_secs
+        assert instance.query_balances() == (2, '')
+        gevent.sleep(0)
+        assert instance.balances_call_count == 3
+        assert instance.query_balances() == (2, '')
+        gevent.sleep(0)
+
+        # too stale to be served, so the caller waits for the query
+        instance.fail = False
+        now += instance.cache_max_stale_secs
+        call_count = instance.balances_call_count
+        assert instance.query_balances() == (call_count + 1, '')
+        # and ignore_cache also waits for the query
+        assert instance.query_balances(ignore_cache=True) == (call_count + 2, '')
+
+
+def test_kill_background_refreshes():
+    """Test that the background refreshes of a discarded object can be stopped"""
+    instance = Bar()
+    now = 1000
+    with patch('rotkehlchen.utils.interfaces.ts_now', side_effect=lambda: now):
+        assert instance.query_balances() == (1, '')
+        instance.delay = 10
+        now += instance.cache_ttl_secs
+        assert instance.query_balances() == (1, '')
+        gevent.sleep(0)
+        refreshes = list(instance.results_refresh.values())
+        assert len(refreshes) == 1
+
+        instance.kill_background_refreshes()
+        assert instance.results_refresh == {}
+        assert refreshes[0].dead
+        assert instance.balances_call_count == 1
+
+
 def test_convert_to_int():
     assert convert_to_int('5') == 5
     assert convert_to_int('37451082560000003241000000000003221111111111') == 37451082560000003241000000000003221111111111  # noqa: E501
@@ -269,3 +348,47 @@ def test_convert_to_int():
     assert convert_to_int(b'5.44', accept_only_exact=False) == 5
     assert convert_to_int(b'5.65', accept_only_exact=False) == 5
     assert convert_to_int(b'4', accept_only_exact=False) == 4
+
+
+def test_import_timer(tmp_path, monkeypatch):
+    """Test that the import timer records the self and cumulative time of nested imports"""
+    package_dir = tmp_path / 'timed_package'
+    package_dir.mkdir()
+    (package_dir / '__init__.py').write_text('')
+    (package_dir / 'outer.py').write_text('import time\nimport timed_package.inner\n')
+    (package_dir / 'inner.py').write_text('import time\ntime.sleep(0.05)\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    import_timer = ImportTimer()
+    import_timer.install()
+    try:
+        import_module('timed_package.outer')
+    finally:
+        import_timer.uninstall()
+        for name in ('timed_package', 'timed_package.outer', 'timed_package.inner'):
+            monkeypatch.delitem(sys.modules, name, raising=False)
+
+    assert import_timer not in sys.meta_path
+    inner = import_timer.timings['timed_package.inner']
+    outer = import_timer.timings['timed_package.outer']
+    assert inner.self_seconds >= 0.05
+    assert outer.cumulative_seconds >= inner.cumulative_seconds
+    assert outer.self_seconds < 0.05
+    assert import_timer.slowest(limit=1) == [inner]
+    assert 'timed_package.inner' in import_timer.report()
+
+
+def test_phase_timer():
+    def failing_step():
+        raise ValueError('phases that fail are still timed')
+
+    timer = PhaseTimer('Login')
+    with timer.phase('first'):
+        time.sleep(0.01)
+    with pytest.raises(ValueError):
+        with timer.phase('second'):
+            failing_step()
+
+    assert list(timer.phases.keys()) == ['first', 'second']
+    assert timer.phases['first'] >= 0.01
+    assert timer.report().startswith('Login took')
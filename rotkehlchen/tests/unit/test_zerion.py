@@ -1,9 +1,11 @@
 import warnings as test_warnings
+from unittest.mock import patch
 
 import pytest
 
-from rotkehlchen.chain.ethereum.zerion import Zerion
+from rotkehlchen.chain.ethereum.zerion import ZERION_EMPTY_ACCOUNT_RECHECK_SECONDS, Zerion
 from rotkehlchen.fval import FVal
+from rotkehlchen.tests.utils.factories import make_ethereum_address
 
 
 @pytest.mark.parametrize('mocked_current_prices', [{
@@ -36,3 +38,39 @@ def test_query_all_protocol_balances_for_account(
     assert len(errors) == 0
     warnings = function_scope_messages_aggregator.consume_warnings()
     assert len(warnings) == 0
+
+
+def test_accounts_without_defi_balances_are_skipped(
+        ethereum_manager,
+        function_scope_messages_aggregator,
+):
+    """Test that an account with no DeFi balances is only requeried after a new transaction
+    or after some time, since positions it only received don't change its transaction count"""
+    zerion = Zerion(ethereum_manager, function_scope_messages_aggregator)
+    account = make_ethereum_address()
+    transaction_count = 5
+    now = 1600000000
+
+    def mock_get_transaction_count(account):  # pylint: disable=unused-argument
+        return transaction_count
+
+    call_patch = patch.object(ethereum_manager, 'call_contract', return_value=[])
+    count_patch = patch.object(
+        ethereum_manager,
+        'get_transaction_count',
+        side_effect=mock_get_transaction_count,
+    )
+    now_patch = patch('rotkehlchen.chain.ethereum.zerion.ts_now', side_effect=lambda: now)
+    with call_patch as call_mock, count_patch, now_patch:
+        assert zerion.all_balances_for_accounts([account]) == {}
+        assert zerion.all_balances_for_accounts([account]) == {}
+        assert call_mock.call_count == 1
+        transaction_count = 6
+        assert zerion.all_balances_for_accounts([account]) == {}
+        assert call_mock.call_count == 2
+        now += ZERION_EMPTY_ACCOUNT_RECHECK_SECONDS - 1
+        assert zerion.all_balances_for_accounts([account]) == {}
+        assert call_mock.call_count == 2
+        now += 1
+        assert zerion.all_balances_for_accounts([account]) == {}
+        assert call_mock.call_count == 3
@@ -33,7 +33,7 @@ def uniswap_module(
 @pytest.fixture
 def patch_graph_query_limit(graph_query_limit):
     with patch(
-        'rotkehlchen.chain.ethereum.uniswap.uniswap.GRAPH_QUERY_LIMIT',
+        'rotkehlchen.chain.ethereum.graph.GRAPH_QUERY_LIMIT',
         new_callable=MagicMock(return_value=graph_query_limit),
     ):
         yield
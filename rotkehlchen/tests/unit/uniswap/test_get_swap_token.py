@@ -0,0 +1,23 @@
+from unittest.mock import patch
+
+from rotkehlchen.assets.utils import get_ethereum_token
+
+from .utils import ASSET_SHUF, ASSET_USDT, LIQUIDITY_POSITION_1, LIQUIDITY_POSITION_2
+
+
+def test_swap_token_is_resolved_once_per_address(uniswap_module):
+    """Test a swap token is only resolved once and then reused for every swap
+    with the same token address.
+    """
+    token_shuf = LIQUIDITY_POSITION_1['pair']['token0']
+    token_usdt = LIQUIDITY_POSITION_2['pair']['token1']
+
+    with patch(
+        'rotkehlchen.chain.ethereum.uniswap.uniswap.get_ethereum_token',
+        side_effect=get_ethereum_token,
+    ) as resolve_token:
+        for _ in range(3):
+            assert uniswap_module._get_swap_token(token_shuf) == ASSET_SHUF
+            assert uniswap_module._get_swap_token(token_usdt) == ASSET_USDT
+
+    assert resolve_token.call_count == 2
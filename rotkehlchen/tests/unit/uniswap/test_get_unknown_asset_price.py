@@ -64,7 +64,7 @@ def test_pagination(
         patch_graph_query_limit,  # pylint: disable=unused-argument
 ):
     """Test an extra graph request is done when the number of items in the
-    response equals GRAPH_QUERY_LIMIT.
+    response equals GRAPH_QUERY_LIMIT, starting after the id of the last item.
     """
     def get_graph_response():
         responses = [
@@ -94,8 +94,9 @@ def test_pagination(
 
     assert len(fake_graph_query.calls) == no_requests
 
-    # Check limit and offset
+    # Check limit and that each page continues after the last id of the previous one
+    expected_last_ids = ['', TOKEN_DAY_DATA_SHUF['id']]
     for idx, call_args in enumerate(fake_graph_query.calls):
         param_values = call_args['kwargs']['param_values']
         assert param_values['limit'] == graph_query_limit
-        assert param_values['offset'] == idx * graph_query_limit
+        assert param_values['last_id'] == expected_last_ids[idx]
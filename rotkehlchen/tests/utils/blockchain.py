@@ -413,6 +413,11 @@ def mock_etherscan_query(
                 return original_requests_get(url, *args, **kwargs)
             # By default when mocking don't query blocknobytime
             response = '{"status":"1","message":"OK","result":"1"}'
+        elif 'api.etherscan.io/api?module=proxy&action=eth_getTransactionCount&' in url:
+            if 'zerion' in original_queries:
+                return original_requests_get(url, *args, **kwargs)
+            # By default when mocking, accounts have sent no transactions
+            response = '{"jsonrpc":"2.0","id":1,"result":"0x0"}'
         elif f'api.etherscan.io/api?module=proxy&action=eth_call&to={ZERION_ADAPTER_ADDRESS}' in url:  # noqa: E501
             if 'zerion' in original_queries:
                 return original_requests_get(url, *args, **kwargs)
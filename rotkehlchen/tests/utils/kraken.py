@@ -256,12 +256,15 @@ def generate_random_kraken_trade_data(
 def generate_random_single_kraken_ledger_data(
         start_ts: Timestamp,
         end_ts: Timestamp,
-        ledger_type: str,
+        ledger_type: Optional[str],
 ) -> Dict[str, str]:
     ledger = {}
     ledger['refid'] = str(generate_random_kraken_id())
     ledger['time'] = str(make_random_timestamp(start=start_ts, end=end_ts)) + '.0000'
-    ledger['type'] = ledger_type
+    if ledger_type:
+        ledger['type'] = ledger_type
+    else:
+        ledger['type'] = random.choice(('deposit', 'withdrawal'))
     ledger['aclass'] = 'currency'
     ledger['asset'] = get_random_kraken_asset()
     ledger['amount'] = str(make_random_positive_fval())
@@ -270,7 +273,11 @@ def generate_random_single_kraken_ledger_data(
     return ledger
 
 
-def generate_random_kraken_ledger_data(start: Timestamp, end: Timestamp, ledger_type: str):
+def generate_random_kraken_ledger_data(
+        start: Timestamp,
+        end: Timestamp,
+        ledger_type: Optional[str],
+):
     ledgers_num = random.randint(1, 49)
     # Ledgers is a dict with txid as the key
     ledgers = {}
@@ -358,7 +365,7 @@ class MockKraken(Kraken):
             return rlk_jsonloads_dict(KRAKEN_SPECIFIC_TRADES_HISTORY_RESPONSE)
         elif method == 'Ledgers':
             assert req, 'Should have given arguments for kraken Ledgers endpoint call'
-            ledger_type = req['type']
+            ledger_type = req.get('type')
             if self.random_ledgers_data:
                 return generate_random_kraken_ledger_data(
                     start=req['start'],
@@ -367,20 +374,26 @@ class MockKraken(Kraken):
                 )
 
             # else use specific data
-            if ledger_type in ('deposit', 'withdrawal'):
-                data = json.loads(
-                    KRAKEN_SPECIFIC_DEPOSITS_RESPONSE if ledger_type == 'deposit'
-                    else KRAKEN_SPECIFIC_WITHDRAWALS_RESPONSE,
-                )
+            if ledger_type in ('deposit', 'withdrawal', None):
+                # Querying the ledger without a type gives back entries of all types
+                responses = []
+                if ledger_type in ('deposit', None):
+                    responses.append(('deposit', KRAKEN_SPECIFIC_DEPOSITS_RESPONSE))
+                if ledger_type in ('withdrawal', None):
+                    responses.append(('withdrawal', KRAKEN_SPECIFIC_WITHDRAWALS_RESPONSE))
                 new_data: Dict[str, Any] = {'ledger': {}}
-                for key, val in data['ledger'].items():
-                    try:
-                        ts = int(val['time'])
-                    except ValueError:
-                        ts = req['start']  # can happen for tests of invalid data -- let it through
-                    if ts < req['start'] or ts > req['end']:
-                        continue
-                    new_data['ledger'][key] = val
+                for response_type, response_str in responses:
+                    data = json.loads(response_str)
+                    for key, val in data['ledger'].items():
+                        try:
+                            ts = int(val['time'])
+                        except ValueError:
+                            ts = req['start']  # can happen for tests of invalid data
+                        if ts < req['start'] or ts > req['end']:
+                            continue
+                        if ledger_type is None:
+                            key = f'{response_type}_{key}'
+                        new_data['ledger'][key] = val
 
                 new_data['count'] = len(new_data['ledger'])
                 response = json.dumps(new_data)
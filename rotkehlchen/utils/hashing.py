@@ -1,4 +1,5 @@
 import hashlib
+import os
 from pathlib import Path
 
 from rotkehlchen.errors import SystemPermissionError
@@ -22,3 +23,25 @@ def file_md5(filepath: Path) -> str:
         raise SystemPermissionError(f'Failed to open: {filepath}. {str(e)}')
 
     return md5_hash.hexdigest()
+
+
+def file_fingerprint(filepath: Path, header_size: int = 4096) -> str:
+    """Gets a cheap fingerprint of filepath that changes whenever the file is written
+
+    It consists of the file's size, its modification time and the md5 hash of
+    its first header_size bytes. So unlike file_md5 it does not need to read
+    the whole file.
+
+    Before calling the function, caller has to make sure path exists and is a file
+
+    May raise:
+    - SystemPermissionError if the file can't be accessed for some reason
+    """
+    try:
+        stat = os.stat(filepath)
+        with open(filepath, 'rb') as f:
+            header = f.read(header_size)
+    except PermissionError as e:
+        raise SystemPermissionError(f'Failed to open: {filepath}. {str(e)}')
+
+    return f'{stat.st_size}-{stat.st_mtime_ns}-{hashlib.md5(header).hexdigest()}'
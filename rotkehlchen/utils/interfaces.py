@@ -1,14 +1,21 @@
+import logging
+import time
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
 from functools import wraps
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 
+import gevent
 from gevent.lock import Semaphore
 
-from rotkehlchen.constants import CACHE_RESPONSE_FOR_SECS
+from rotkehlchen.constants import CACHE_MAX_STALE_SECS, CACHE_RESPONSE_FOR_SECS
+from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import ChecksumEthAddress, ResultCache
 from rotkehlchen.utils.misc import ts_now
 
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
 
 def _function_sig_key(name: str, arguments_matter: bool, *args: Any, **kwargs: Any) -> int:
     """Return a unique int identifying a function's call signature"""
@@ -34,6 +41,18 @@ class CacheableObject():
         self.results_cache: Dict[int, ResultCache] = {}
         # Can also be 0 which means cache is disabled.
         self.cache_ttl_secs = CACHE_RESPONSE_FOR_SECS
+        # Only used by @cache_response_stale_while_revalidate
+        self.cache_max_stale_secs = CACHE_MAX_STALE_SECS
+        self.results_latency: Dict[int, float] = {}
+        self.results_refresh: Dict[int, gevent.Greenlet] = {}
+
+    def kill_background_refreshes(self) -> None:
+        """Stops any running background refresh of the cached results
+
+        To be called when the object is discarded, for example when an exchange is removed
+        """
+        gevent.killall(list(self.results_refresh.values()))
+        self.results_refresh.clear()
 
 
 def cache_response_timewise(arguments_matter: bool = True) -> Callable:
@@ -78,6 +97,109 @@ def cache_response_timewise(arguments_matter: bool = True) -> Callable:
     return _cache_response_timewise
 
 
+def _query_and_cache(
+        wrappingobj: CacheableObject,
+        f: Callable,
+        cache_key: int,
+        keep_stale_if: Optional[Callable[[Any], bool]],
+        *args: Any,
+        **kwargs: Any,
+) -> Any:
+    """Calls the function, remembers how long it took and caches the result"""
+    start = time.time()
+    result = f(wrappingobj, *args, **kwargs)
+    latency = time.time() - start
+    previous_latency = wrappingobj.results_latency.get(cache_key)
+    if previous_latency is not None:
+        latency = (latency + previous_latency) / 2
+    wrappingobj.results_latency[cache_key] = latency
+
+    old = wrappingobj.results_cache.get(cache_key)
+    if old is None or keep_stale_if is None or not keep_stale_if(result):
+        wrappingobj.results_cache[cache_key] = ResultCache(result, ts_now())
+    return result
+
+
+def _refresh_in_background(
+        wrappingobj: CacheableObject,
+        f: Callable,
+        cache_key: int,
+        keep_stale_if: Optional[Callable[[Any], bool]],
+        *args: Any,
+        **kwargs: Any,
+) -> None:
+    try:
+        _query_and_cache(wrappingobj, f, cache_key, keep_stale_if, *args, **kwargs)
+    except Exception as e:  # pylint: disable=broad-except
+        # The stale result stays in the cache until the next refresh attempt
+        log.error(f'Background refresh of {f.__name__} failed: {str(e)}')
+    finally:
+        wrappingobj.results_refresh.pop(cache_key, None)
+
+
+def cache_response_stale_while_revalidate(
+        arguments_matter: bool = True,
+        keep_stale_if: Optional[Callable[[Any], bool]] = None,
+) -> Callable:
+    """ This is a decorator for caching results of functions of objects with
+    stale-while-revalidate semantics. The objects must adhere to the CachableOject interface.
+
+    A cached result is returned immediately as long as it is younger than the object's
+    `cache_max_stale_secs`. Once it gets older than `cache_ttl_secs`, minus twice the
+    time the function usually takes, a refresh is started in a background greenlet so
+    that a fresh result is ready before the cached one expires. Callers only wait if
+    there is no cached result at all or it is too stale.
+
+    If keep_stale_if is given and returns True for a new result, that result is returned
+    to the caller but does not replace an already cached one. Used to not replace a good
+    result with a failed query.
+
+    If the special keyword argument ignore_cache=True is given then the cache is skipped
+    and the caller waits for a fresh result.
+    """
+    def _cache_response_stale_while_revalidate(f: Callable) -> Callable:
+        @wraps(f)
+        def wrapper(wrappingobj: CacheableObject, *args: Any, **kwargs: Any) -> Any:
+            ignore_cache = kwargs.pop('ignore_cache', False)
+            cache_key = _function_sig_key(f.__name__, arguments_matter, *args, **kwargs)
+            if ignore_cache is True or wrappingobj.cache_ttl_secs == 0:
+                return _query_and_cache(wrappingobj, f, cache_key, keep_stale_if, *args, **kwargs)
+
+            max_stale_secs = max(wrappingobj.cache_ttl_secs, wrappingobj.cache_max_stale_secs)
+            cached = wrappingobj.results_cache.get(cache_key)
+            if cached is None or ts_now() - cached.timestamp >= max_stale_secs:
+                refresh = wrappingobj.results_refresh.get(cache_key)
+                if refresh is not None:
+                    # A refresh is already running. Wait for it instead of querying again
+                    refresh.join()
+                    cached = wrappingobj.results_cache.get(cache_key)
+                    if cached is not None and ts_now() - cached.timestamp < max_stale_secs:
+                        return cached.result
+
+                return _query_and_cache(wrappingobj, f, cache_key, keep_stale_if, *args, **kwargs)
+
+            latency = wrappingobj.results_latency.get(cache_key, 0)
+            refresh_after_secs = wrappingobj.cache_ttl_secs - 2 * latency
+            if (
+                    ts_now() - cached.timestamp >= refresh_after_secs and
+                    cache_key not in wrappingobj.results_refresh
+            ):
+                wrappingobj.results_refresh[cache_key] = gevent.spawn(
+                    _refresh_in_background,
+                    wrappingobj,
+                    f,
+                    cache_key,
+                    keep_stale_if,
+                    *args,
+                    **kwargs,
+                )
+
+            return cached.result
+
+        return wrapper
+    return _cache_response_stale_while_revalidate
+
+
 class LockableQueryObject():
     """Interface for objects who have queries that disallow concurrency
 
@@ -7,6 +7,7 @@ import operator
 import re
 import sys
 import time
+from collections import defaultdict
 from http import HTTPStatus
 from pathlib import Path
 from typing import Any, Callable, DefaultDict, Dict, Iterator, List, TypeVar, Union, overload
@@ -16,7 +17,7 @@ import requests
 from eth_utils.address import to_checksum_address
 from rlp.sedes import big_endian_int
 
-from rotkehlchen.constants import ALL_REMOTES_TIMEOUT, ZERO
+from rotkehlchen.constants import ALL_REMOTES_TIMEOUT
 from rotkehlchen.constants.timing import QUERY_RETRY_TIMES
 from rotkehlchen.errors import (
     ConversionError,
@@ -24,7 +25,7 @@ from rotkehlchen.errors import (
     RemoteError,
     UnableToDecryptRemoteData,
 )
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FVal, sum_fvals
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import ChecksumEthAddress, Fee, Timestamp, TimestampMS
 from rotkehlchen.utils.serialization import rlk_jsondumps, rlk_jsonloads
@@ -98,8 +99,11 @@ def timestamp_to_date(ts: Timestamp, formatstr: str = '%d/%m/%Y %H:%M:%S') -> st
     return datetime.datetime.utcfromtimestamp(ts).strftime(formatstr)
 
 
+WEI_IN_ETH = FVal(10 ** 18)
+
+
 def from_wei(wei_value: FVal) -> FVal:
-    return wei_value / FVal(10 ** 18)
+    return wei_value / WEI_IN_ETH
 
 
 K = TypeVar('K')
@@ -134,29 +138,32 @@ def combine_dicts(
     return new_dict
 
 
-def _add_entries(a: Dict[str, FVal], b: Dict[str, FVal]) -> Dict[str, FVal]:
-    return {
-        'amount': a['amount'] + b['amount'],
-        'usd_value': a['usd_value'] + b['usd_value'],
-    }
-
-
 def combine_stat_dicts(list_of_dicts: List[Dict]) -> Dict:
-    if len(list_of_dicts) == 0:
-        return {}
-
-    combined_dict = list_of_dicts[0]
-    for d in list_of_dicts[1:]:
-        combined_dict = combine_dicts(combined_dict, d, _add_entries)
+    """Combines the amount and usd_value of the entries of all dicts per key
+
+    The entries of each key are all summed in one go instead of combining
+    the dicts one by one and creating the intermediate sums"""
+    entries_per_key: Dict[Any, List[Dict[str, FVal]]] = defaultdict(list)
+    for d in list_of_dicts:
+        for key, entry in d.items():
+            entries_per_key[key].append(entry)
+
+    combined_dict = {}
+    for key, entries in entries_per_key.items():
+        if len(entries) == 1:
+            combined_dict[key] = entries[0]
+            continue
+
+        combined_dict[key] = {
+            'amount': sum_fvals(entry['amount'] for entry in entries),
+            'usd_value': sum_fvals(entry['usd_value'] for entry in entries),
+        }
 
     return combined_dict
 
 
 def dict_get_sumof(d: Dict[str, Dict[str, FVal]], attribute: str) -> FVal:
-    sum_ = ZERO
-    for _, value in d.items():
-        sum_ += value[attribute]
-    return sum_
+    return sum_fvals(value[attribute] for value in d.values())
 
 
 def merge_dicts(*dict_args: Dict) -> Dict:
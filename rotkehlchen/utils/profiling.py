@@ -0,0 +1,137 @@
+"""Startup profiling helpers
+
+This module should only depend on the standard library since the import timer has
+to be installed before any other rotkehlchen module gets imported.
+"""
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import Loader, MetaPathFinder
+from importlib.machinery import ModuleSpec
+from types import ModuleType
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+PROFILE_STARTUP_ARG = '--profile-startup'
+DEFAULT_REPORT_LIMIT = 40
+
+
+class ModuleImportTime(NamedTuple):
+    name: str
+    # Seconds executing the module including the modules it imported
+    cumulative_seconds: float
+    # Seconds executing the module without the modules it imported
+    self_seconds: float
+
+
+class ImportTimer(MetaPathFinder):
+    """Records how long executing each newly imported module takes
+
+    Installed at the front of sys.meta_path it lets the other finders locate each
+    module and then times the exec_module() of the loader they found. The time of
+    nested imports is subtracted from the importing module, so like `python -X importtime`
+    both the cumulative and the self time of each module are known.
+    """
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, ModuleImportTime] = {}
+        # Seconds spent importing other modules, per module currently being executed
+        self._nested_seconds: List[float] = []
+
+    def install(self) -> None:
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(
+            self,
+            fullname: str,
+            path: Optional[Sequence[Union[bytes, str]]],
+            target: Optional[ModuleType] = None,
+    ) -> Optional[ModuleSpec]:
+        for finder in sys.meta_path:
+            # Legacy finders only have a find_module()
+            finder_find_spec = getattr(finder, 'find_spec', None)
+            if finder is self or finder_find_spec is None:
+                continue
+
+            spec = finder_find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        # Builtin and frozen modules are loaded by a class and not by a loader instance
+        if isinstance(spec.loader, Loader) and not isinstance(spec.loader, type):
+            self._time_exec_module(spec.loader)
+        return spec
+
+    def _time_exec_module(self, loader: Loader) -> None:
+        if 'exec_module' in getattr(loader, '__dict__', {}):
+            return  # loader instance shared by many modules whose exec_module is timed already
+
+        original_exec_module = loader.exec_module
+
+        def exec_module(module: ModuleType) -> None:
+            self._nested_seconds.append(0.0)
+            start = time.perf_counter()
+            try:
+                original_exec_module(module)
+            finally:
+                cumulative_seconds = time.perf_counter() - start
+                nested_seconds = self._nested_seconds.pop()
+                if len(self._nested_seconds) != 0:
+                    self._nested_seconds[-1] += cumulative_seconds
+                self.timings[module.__name__] = ModuleImportTime(
+                    name=module.__name__,
+                    cumulative_seconds=cumulative_seconds,
+                    self_seconds=cumulative_seconds - nested_seconds,
+                )
+
+        try:
+            loader.exec_module = exec_module  # type: ignore
+        except AttributeError:
+            pass  # loaders with __slots__ can't be timed
+
+    def slowest(self, limit: int = DEFAULT_REPORT_LIMIT) -> List[ModuleImportTime]:
+        """Returns the modules that took the longest to import by their self time"""
+        timings = sorted(self.timings.values(), key=lambda x: x.self_seconds, reverse=True)
+        return timings[:limit]
+
+    def report(self, limit: int = DEFAULT_REPORT_LIMIT) -> str:
+        total_seconds = sum(x.self_seconds for x in self.timings.values())
+        lines = [
+            f'Imported {len(self.timings)} modules in {total_seconds:.3f} seconds. '
+            f'Slowest {limit} modules by self time:',
+            f'{"self ms":>9} {"cumulative ms":>14}  module',
+        ]
+        for entry in self.slowest(limit):
+            lines.append(
+                f'{entry.self_seconds * 1000:>9.1f} '
+                f'{entry.cumulative_seconds * 1000:>14.1f}  {entry.name}',
+            )
+        return '\n'.join(lines)
+
+
+class PhaseTimer():
+    """Measures how long each named phase of a longer process, like the login, takes"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def report(self) -> str:
+        total_seconds = sum(self.phases.values())
+        lines = [f'{self.name} took {total_seconds:.3f} seconds:']
+        for name, seconds in self.phases.items():
+            lines.append(f'{seconds * 1000:>9.1f} ms  {name}')
+        return '\n'.join(lines)
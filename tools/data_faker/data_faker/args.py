@@ -1,4 +1,5 @@
 import argparse
+from typing import List
 
 from rotkehlchen.args import app_args
 
@@ -95,3 +96,103 @@ def data_faker_args() -> argparse.ArgumentParser:
         help='Number between 0 and 1.0 indicating probability that at each step number will go up',
     )
     return p
+
+
+def benchmark_args(exchanges: List[str]) -> argparse.ArgumentParser:
+    """Create the argument parser of the exchange history benchmark"""
+    p = argparse.ArgumentParser(
+        prog='data_faker.benchmark',
+        description=(
+            'Benchmark the exchange history queries of Rotkehlchen against local mock '
+            'exchange APIs'
+        ),
+    )
+    p.add_argument(
+        '--exchanges',
+        nargs='+',
+        choices=exchanges,
+        default=exchanges,
+        help='The exchanges to benchmark. Default is all supported exchanges',
+    )
+    p.add_argument(
+        '--trades-number',
+        type=int,
+        default=10000,
+        help='The number of trades each mock exchange should have',
+    )
+    p.add_argument(
+        '--latency-ms',
+        type=int,
+        default=0,
+        help='The milliseconds each mock exchange request takes to be served',
+    )
+    p.add_argument(
+        '--page-size',
+        type=int,
+        default=50,
+        help=(
+            'The max number of entries in each page of endpoints whose page size '
+            'is decided by the exchange. Default is the kraken page size'
+        ),
+    )
+    p.add_argument(
+        '--rate-limit-every',
+        type=int,
+        default=0,
+        help='Rate limit every nth request of each exchange. Default is to never rate limit',
+    )
+    p.add_argument(
+        '--kraken-account-type',
+        choices=['starter', 'intermediate', 'pro'],
+        default='starter',
+        help='The kraken account type whose API rate limits should be respected',
+    )
+    p.add_argument(
+        '--port',
+        type=int,
+        default=5001,
+        help='The port in which to run the mock exchange APIs',
+    )
+    return p
+
+
+def db_benchmark_args() -> argparse.ArgumentParser:
+    """Create the argument parser of the DB trades reading benchmark"""
+    p = argparse.ArgumentParser(
+        prog='data_faker.db_benchmark',
+        description='Benchmark reading trades from the Rotkehlchen DB',
+    )
+    p.add_argument(
+        '--trades-number',
+        type=int,
+        default=100000,
+        help='The number of trades to write in the DB',
+    )
+    p.add_argument(
+        '--runs',
+        type=int,
+        default=3,
+        help='How many times to read all trades after the first cold run',
+    )
+    return p
+
+
+def fval_benchmark_args() -> argparse.ArgumentParser:
+    """Create the argument parser of the FVal and history processing benchmark"""
+    p = argparse.ArgumentParser(
+        prog='data_faker.fval_benchmark',
+        description='Benchmark the FVal operators and the processing of a synthetic history',
+    )
+    p.add_argument(
+        '--number',
+        type=int,
+        default=1000000,
+        help='How many times to run each FVal operator',
+    )
+    p.add_argument(
+        '--trades-number',
+        type=int,
+        default=100000,
+        help='The number of trades in the processed history. 0 skips history processing',
+    )
+    return p
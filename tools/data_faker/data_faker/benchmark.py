@@ -0,0 +1,226 @@
+from gevent import monkey  # isort:skip # noqa
+monkey.patch_all()  # isort:skip # noqa
+import logging
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from unittest.mock import patch
+
+from data_faker.args import benchmark_args
+from data_faker.fake_binance import FakeBinance
+from data_faker.fake_kraken import FakeKraken
+from data_faker.mock_apis.api import APIServer, MockBehaviour, RestAPI
+
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.exchanges.binance import Binance
+from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
+from rotkehlchen.exchanges.exchange import ExchangeInterface
+from rotkehlchen.exchanges.kraken import Kraken, KrakenAccountType
+from rotkehlchen.tests.utils.factories import make_random_b64bytes
+from rotkehlchen.typing import ApiKey, ApiSecret, Timestamp
+from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.misc import ts_now
+
+logger = logging.getLogger(__name__)
+
+# 01/01/2016. The synthetic trades are created one minute apart from here on
+BENCHMARK_START_TS = Timestamp(1451606400)
+
+
+class ExchangeBenchmark(NamedTuple):
+    """How to benchmark one exchange against the mock exchange APIs"""
+    # Populates the exchange's fake with the given number of trades
+    populate: Callable[[RestAPI, int], None]
+    # Creates the real exchange object pointed at the mock APIs url. Any
+    # patching needed to do so should be entered into the given exit stack
+    create: Callable[[str, DBHandler, MessagesAggregator, Any, ExitStack], ExchangeInterface]
+
+
+class BenchmarkResult(NamedTuple):
+    exchange: str
+    trades: int
+    asset_movements: int
+    seconds: float
+    requests: int
+    peak_memory_bytes: int
+    error: Optional[str]
+
+    @property
+    def trades_per_sec(self) -> float:
+        return self.trades / self.seconds if self.seconds else 0.0
+
+
+def _random_credentials() -> Dict[str, Any]:
+    return {
+        'api_key': ApiKey(str(make_random_b64bytes(128))),
+        'secret': ApiSecret(make_random_b64bytes(128)),
+    }
+
+
+def _create_kraken(
+        url: str,
+        database: DBHandler,
+        msg_aggregator: MessagesAggregator,
+        args: Any,
+        stack: ExitStack,
+) -> ExchangeInterface:
+    stack.enter_context(patch.multiple(
+        'rotkehlchen.exchanges.kraken',
+        KRAKEN_BASE_URL=f'{url}/kraken',
+        KRAKEN_API_VERSION='mock',
+    ))
+    return Kraken(
+        database=database,
+        msg_aggregator=msg_aggregator,
+        account_type=KrakenAccountType.deserialize(args.kraken_account_type),
+        **_random_credentials(),
+    )
+
+
+def _create_binance(
+        url: str,
+        database: DBHandler,
+        msg_aggregator: MessagesAggregator,
+        args: Any,  # pylint: disable=unused-argument
+        stack: ExitStack,
+) -> ExchangeInterface:
+    stack.enter_context(patch('rotkehlchen.exchanges.binance.BINANCE_BASE_URL', f'{url}/binance/'))
+    return Binance(
+        database=database,
+        msg_aggregator=msg_aggregator,
+        **_random_credentials(),
+    )
+
+
+BENCHMARK_EXCHANGES: Dict[str, ExchangeBenchmark] = {
+    'kraken': ExchangeBenchmark(
+        populate=lambda rest_api, number: rest_api.kraken.populate_trades(
+            trades_number=number,
+            start_ts=BENCHMARK_START_TS,
+        ),
+        create=_create_kraken,
+    ),
+    'binance': ExchangeBenchmark(
+        populate=lambda rest_api, number: rest_api.binance.populate_trades(
+            trades_number=number,
+            start_ts=BENCHMARK_START_TS,
+        ),
+        create=_create_binance,
+    ),
+}
+
+
+def benchmark_exchange(
+        name: str,
+        rest_api: RestAPI,
+        url: str,
+        data_dir: Path,
+        args: Any,
+) -> BenchmarkResult:
+    """Queries the whole history of an exchange from the mock APIs through
+    query_history_with_callbacks and measures how long it took, how many requests it
+    needed and the peak memory allocated while doing so"""
+    user_dir = data_dir / name
+    user_dir.mkdir(parents=True, exist_ok=True)
+    msg_aggregator = MessagesAggregator()
+    database = DBHandler(
+        user_data_dir=user_dir,
+        password='123',
+        msg_aggregator=msg_aggregator,
+        initial_settings=None,
+    )
+    counts = {'trades': 0, 'asset_movements': 0}
+    errors: List[str] = []
+
+    def success_callback(
+            trades: List[Trade],
+            margin_positions: List[MarginPosition],  # pylint: disable=unused-argument
+            asset_movements: List[AssetMovement],
+            exchange_specific_data: Any,  # pylint: disable=unused-argument
+    ) -> None:
+        counts['trades'] = len(trades)
+        counts['asset_movements'] = len(asset_movements)
+
+    with ExitStack() as stack:
+        exchange = BENCHMARK_EXCHANGES[name].create(url, database, msg_aggregator, args, stack)
+        requests_before = rest_api.requests_count[name]
+        tracemalloc.start()
+        start = time.perf_counter()
+        exchange.query_history_with_callbacks(
+            start_ts=Timestamp(0),
+            end_ts=ts_now(),
+            success_callback=success_callback,
+            fail_callback=errors.append,
+        )
+        seconds = time.perf_counter() - start
+        _, peak_memory_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    database.disconnect()
+    return BenchmarkResult(
+        exchange=name,
+        trades=counts['trades'],
+        asset_movements=counts['asset_movements'],
+        seconds=seconds,
+        requests=rest_api.requests_count[name] - requests_before,
+        peak_memory_bytes=peak_memory_bytes,
+        error=errors[0] if len(errors) != 0 else None,
+    )
+
+
+def print_results(results: List[BenchmarkResult]) -> None:
+    print(
+        f'{"exchange":<10} {"trades":>9} {"movements":>9} {"seconds":>9} '
+        f'{"trades/sec":>11} {"requests":>9} {"peak MB":>9}',
+    )
+    for result in results:
+        print(
+            f'{result.exchange:<10} {result.trades:>9} {result.asset_movements:>9} '
+            f'{result.seconds:>9.2f} {result.trades_per_sec:>11.1f} {result.requests:>9} '
+            f'{result.peak_memory_bytes / (1024 * 1024):>9.1f}',
+        )
+        if result.error is not None:
+            print(f'    {result.exchange} history query failed: {result.error}')
+
+
+def main() -> None:
+    args = benchmark_args(list(BENCHMARK_EXCHANGES.keys())).parse_args()
+    behaviour = MockBehaviour(
+        latency_secs=args.latency_ms / 1000,
+        page_size=args.page_size,
+        rate_limit_every=args.rate_limit_every,
+    )
+    rest_api = RestAPI(
+        fake_kraken=FakeKraken(),
+        fake_binance=FakeBinance(),
+        behaviour=behaviour,
+    )
+    for name in args.exchanges:
+        BENCHMARK_EXCHANGES[name].populate(rest_api, args.trades_number)
+
+    server = APIServer(rest_api)
+    server.start(host='127.0.0.1', port=args.port)
+    url = f'http://127.0.0.1:{args.port}'
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            for name in args.exchanges:
+                logger.info(f'Benchmarking {name} history query with {args.trades_number} trades')
+                results.append(benchmark_exchange(
+                    name=name,
+                    rest_api=rest_api,
+                    url=url,
+                    data_dir=Path(data_dir),
+                    args=args,
+                ))
+    finally:
+        server.stop()
+
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
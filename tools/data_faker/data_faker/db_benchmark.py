@@ -0,0 +1,105 @@
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import List, NamedTuple
+
+from data_faker.args import db_benchmark_args
+
+from rotkehlchen.assets.asset import Asset, InternedAssetMeta
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.exchanges.data_structures import Trade
+from rotkehlchen.fval import FVal
+from rotkehlchen.typing import (
+    AssetAmount,
+    Fee,
+    Location,
+    Price,
+    Timestamp,
+    TradePair,
+    TradeType,
+)
+from rotkehlchen.user_messages import MessagesAggregator
+
+logger = logging.getLogger(__name__)
+
+# 01/01/2016. The synthetic trades are created one minute apart from here on
+BENCHMARK_START_TS = Timestamp(1451606400)
+BENCHMARK_PAIRS = ['ETH_EUR', 'BTC_EUR', 'ETH_BTC', 'DAI_USD', 'XMR_BTC', 'LINK_ETH']
+BENCHMARK_LOCATIONS = [Location.KRAKEN, Location.BINANCE, Location.POLONIEX]
+
+
+class RunResult(NamedTuple):
+    name: str
+    trades: int
+    seconds: float
+
+    @property
+    def trades_per_sec(self) -> float:
+        return self.trades / self.seconds if self.seconds else 0.0
+
+
+def make_trades(trades_number: int) -> List[Trade]:
+    trades = []
+    for idx in range(trades_number):
+        pair = TradePair(BENCHMARK_PAIRS[idx % len(BENCHMARK_PAIRS)])
+        trades.append(Trade(
+            timestamp=Timestamp(BENCHMARK_START_TS + idx * 60),
+            location=BENCHMARK_LOCATIONS[idx % len(BENCHMARK_LOCATIONS)],
+            pair=pair,
+            trade_type=TradeType.BUY if idx % 2 == 0 else TradeType.SELL,
+            amount=AssetAmount(FVal(idx + 1)),
+            rate=Price(FVal('1.5')),
+            fee=Fee(FVal('0.01')),
+            fee_currency=Asset(pair.split('_')[1]),
+            link=str(idx),
+        ))
+
+    return trades
+
+
+def time_get_trades(name: str, database: DBHandler, cold: bool) -> RunResult:
+    """Reads all trades from the DB and resolves the assets of each one like the
+    accountant does. If cold is True the interned assets are forgotten first so
+    that every asset is resolved from scratch once more"""
+    if cold:
+        InternedAssetMeta._instances_assets = None
+
+    start = time.perf_counter()
+    trades = database.get_trades()
+    for trade in trades:
+        _ = trade.base_asset, trade.quote_asset, trade.fee_currency
+    return RunResult(name=name, trades=len(trades), seconds=time.perf_counter() - start)
+
+
+def print_results(results: List[RunResult]) -> None:
+    print(f'{"run":<10} {"trades":>9} {"seconds":>9} {"trades/sec":>11}')
+    for result in results:
+        print(
+            f'{result.name:<10} {result.trades:>9} {result.seconds:>9.2f} '
+            f'{result.trades_per_sec:>11.1f}',
+        )
+
+
+def main() -> None:
+    args = db_benchmark_args().parse_args()
+    results = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        database = DBHandler(
+            user_data_dir=Path(data_dir),
+            password='123',
+            msg_aggregator=MessagesAggregator(),
+            initial_settings=None,
+        )
+        logger.info(f'Writing {args.trades_number} trades to the DB')
+        database.add_trades(make_trades(args.trades_number))
+        results.append(time_get_trades(name='cold', database=database, cold=True))
+        for run in range(args.runs):
+            results.append(time_get_trades(name=f'warm {run}', database=database, cold=False))
+        database.disconnect()
+
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,8 @@ import json
 import os
 import random
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, Dict, List, Optional
 
 from data_faker.utils import assets_exist_at_time
 
@@ -15,6 +16,7 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.serialization.deserialize import pair_get_assets
 from rotkehlchen.serialization.serialize import process_result, process_result_list
 from rotkehlchen.typing import Timestamp, TradePair
+from rotkehlchen.utils.misc import ts_now_in_ms
 
 # Disallow some assets for simplicity
 DISALLOWED_ASSETS = (
@@ -50,7 +52,9 @@ class FakeBinance():
 
         self._symbols_to_pair = create_binance_symbols_to_pair(self._exchange_info)
 
-        self.trades_list: List[Dict[str, Any]] = []
+        # Trades of each symbol ordered by trade id. The id of a trade is its index
+        # in the symbol's list so that pages can be served from a given id
+        self.trades_by_symbol: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
         self.balances_dict: Dict[str, FVal] = {}
         self.deposits_ledger: List[Dict[str, Any]] = []
         self.withdrawals_ledger: List[Dict[str, Any]] = []
@@ -119,7 +123,32 @@ class FakeBinance():
 
     def append_trade(self, trade: Trade):
         trade_data = self.trade_to_binance(trade)
-        self.trades_list.append(trade_data)
+        self._append_binance_trade(trade_data)
+
+    def _append_binance_trade(self, trade_data: Dict[str, Any]) -> None:
+        symbol_trades = self.trades_by_symbol[trade_data['symbol']]
+        trade_data['id'] = len(symbol_trades)
+        trade_data['orderId'] = len(symbol_trades)
+        symbol_trades.append(trade_data)
+
+    def populate_trades(self, trades_number: int, start_ts: Timestamp) -> None:
+        """Populates the exchange with a number of synthetic ETHBTC trades one minute apart
+
+        Unlike the trades created by the action writer these do not depend on historical
+        prices, so large datasets can be created without any remote queries.
+        """
+        for idx in range(trades_number):
+            self._append_binance_trade({
+                'symbol': 'ETHBTC',
+                'price': str(FVal(random.randint(1, 100)) / 1000),
+                'qty': str(FVal(random.randint(1, 1000)) / 100),
+                'commission': '0.0001',
+                'commissionAsset': 'BNB',
+                'time': (start_ts + idx * 60) * 1000,
+                'isBuyer': idx % 2 == 0,
+                'isMaker': True,
+                'isBestMatch': True,
+            })
 
     def trade_to_binance(self, trade: Trade) -> Dict[str, Any]:
         """Turns our trade into a binance trade"""
@@ -134,8 +163,6 @@ class FakeBinance():
 
         trade_data = {
             'symbol': binance_symbol,
-            'id': 1,
-            'orderId': 1,
             'price': str(trade.rate),
             'qty': str(trade.amount),
             'commission': str(trade.fee),
@@ -172,11 +199,16 @@ class FakeBinance():
         result_data['balances'] = balances
         return process_result(result_data)
 
-    def query_my_trades(self, symbol):
-        # Ignore all other options and just use the symbol
-        result = []
-        for trade in self.trades_list:
-            if trade['symbol'] == symbol:
-                result.append(trade)
+    def query_time(self):
+        return {'serverTime': ts_now_in_ms()}
+
+    def query_deposit_history(self):
+        return {'depositList': [], 'success': True}
+
+    def query_withdraw_history(self):
+        return {'withdrawList': [], 'success': True}
 
+    def query_my_trades(self, symbol: str, from_id: int = 0, limit: int = 500):
+        # Ignore the time range options and just use the symbol and the pagination
+        result = self.trades_by_symbol.get(symbol, [])[from_id:from_id + limit]
         return process_result_list(result)
@@ -6,7 +6,7 @@ from typing import Any, Callable, Dict, List, Optional
 from data_faker.utils import assets_exist_at_time
 
 from rotkehlchen.assets.asset import Asset
-from rotkehlchen.exchanges.data_structures import Trade, trade_pair_from_assets
+from rotkehlchen.exchanges.data_structures import Trade, TradeType, trade_pair_from_assets
 from rotkehlchen.exchanges.kraken import kraken_to_world_pair
 from rotkehlchen.fval import FVal
 from rotkehlchen.serialization.deserialize import pair_get_assets
@@ -31,6 +31,8 @@ class FakeKraken():
             self.ticker = json.loads(f.read())
 
         self.trades_dict: Dict[str, Dict[str, Any]] = {}
+        # Trade ids in insertion order so that pages can be served by offset
+        self.trade_ids: List[str] = []
         self.balances_dict: Dict[str, FVal] = {}
         self.deposits_ledger: List[Dict[str, Any]] = []
         self.withdrawals_ledger: List[Dict[str, Any]] = []
@@ -113,6 +115,27 @@ class FakeKraken():
             fee=trade.fee,
         )
         self.trades_dict[kraken_trade['ordertxid']] = kraken_trade
+        self.trade_ids.append(kraken_trade['ordertxid'])
+
+    def populate_trades(self, trades_number: int, start_ts: Timestamp) -> None:
+        """Populates the exchange with a number of synthetic ETH/EUR trades one minute apart
+
+        Unlike the trades created by the action writer these do not depend on historical
+        prices, so large datasets can be created without any remote queries.
+        """
+        tradeable_pairs = list(self.asset_pairs['result'].keys())
+        for idx in range(trades_number):
+            kraken_trade = create_kraken_trade(
+                tradeable_pairs=tradeable_pairs,
+                pair=TradePair('ETH_EUR'),
+                time=Timestamp(start_ts + idx * 60),
+                trade_type=TradeType.BUY if idx % 2 == 0 else TradeType.SELL,
+                rate=FVal(random.randint(100, 300)),
+                amount=FVal(random.randint(1, 1000)) / 100,
+                fee=FVal('0.1'),
+            )
+            self.trades_dict[kraken_trade['ordertxid']] = kraken_trade
+            self.trade_ids.append(kraken_trade['ordertxid'])
 
     # From here and on it's the exchange's API
     def query_asset_pairs(self):
@@ -125,17 +148,25 @@ class FakeKraken():
         response = {'result': self.balances_dict, 'error': []}
         return process_result(response)
 
-    def query_trade_history(self):
+    def query_trade_history(self, offset: int = 0, page_size: Optional[int] = None):
         trades_length = len(self.trades_dict)
-        response = {'result': {'trades': self.trades_dict, 'count': trades_length}, 'error': []}
+        if page_size is None:
+            trades = self.trades_dict
+        else:
+            page_ids = self.trade_ids[offset:offset + page_size]
+            trades = {trade_id: self.trades_dict[trade_id] for trade_id in page_ids}
+        response = {'result': {'trades': trades, 'count': trades_length}, 'error': []}
         return process_result(response)
 
-    def query_ledgers(self, ledger_type: str):
+    def query_ledgers(
+            self,
+            ledger_type: str,
+            offset: int = 0,
+            page_size: Optional[int] = None,
+    ):
         if ledger_type == 'all':
-            result_list = self.deposits_ledger
-            result_list.extend(self.withdrawals_ledger)
-            count = len(self.deposits_ledger)
-            count += len(self.withdrawals_ledger)
+            result_list = self.deposits_ledger + self.withdrawals_ledger
+            count = len(result_list)
         elif ledger_type == 'deposit':
             count = len(self.deposits_ledger)
             result_list = self.deposits_ledger
@@ -145,6 +176,9 @@ class FakeKraken():
         else:
             raise ValueError(f'Invalid ledger_type {ledger_type} requested')
 
+        if page_size is not None:
+            result_list = result_list[offset:offset + page_size]
+
         ledger_dict = {}
         for entry in result_list:
             ledger_dict[entry['refid']] = entry
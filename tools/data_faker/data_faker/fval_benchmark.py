@@ -0,0 +1,109 @@
+import logging
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict
+from unittest.mock import patch
+
+from data_faker.args import fval_benchmark_args
+from data_faker.db_benchmark import make_trades
+
+from rotkehlchen.accounting.accountant import Accountant
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.fval import FVal, sum_fvals
+from rotkehlchen.typing import Price, Timestamp
+from rotkehlchen.user_messages import MessagesAggregator
+
+logger = logging.getLogger(__name__)
+
+
+class FixedPriceHistorian():
+    """Stands in for the PriceHistorian so that no price is queried from the network"""
+
+    @staticmethod
+    def query_historical_price(**kwargs: Any) -> Price:  # pylint: disable=unused-argument
+        return Price(FVal('101.5'))
+
+
+def benchmark_operators(number: int) -> Dict[str, float]:
+    """Returns the seconds each FVal operator takes when run number times"""
+    a = FVal('1.348938409')
+    b = FVal('0.123432434')
+    values = [FVal(x) for x in range(number)]
+
+    def sum_loop() -> FVal:
+        total = FVal(0)
+        for value in values:
+            total += value
+        return total
+
+    operators: Dict[str, Callable[[], Any]] = {
+        'a + b': lambda: a + b,
+        'a - b': lambda: a - b,
+        'a * b': lambda: a * b,
+        'a / b': lambda: a / b,
+        'a > b': lambda: a > b,
+        'a <= b': lambda: a <= b,
+        'a == b': lambda: a == b,
+        'a + 1': lambda: a + 1,
+    }
+    results = {name: timeit.timeit(op, number=number) for name, op in operators.items()}
+    results[f'+= over {number} values'] = timeit.timeit(sum_loop, number=1)
+    results[f'sum_fvals over {number} values'] = timeit.timeit(
+        lambda: sum_fvals(values),
+        number=1,
+    )
+    return results
+
+
+def benchmark_process_history(trades_number: int) -> float:
+    """Returns the seconds the accountant takes to process a history of synthetic trades"""
+    trades = make_trades(trades_number)
+    with tempfile.TemporaryDirectory() as data_dir:
+        msg_aggregator = MessagesAggregator()
+        database = DBHandler(
+            user_data_dir=Path(data_dir),
+            password='123',
+            msg_aggregator=msg_aggregator,
+            initial_settings=None,
+        )
+        accountant = Accountant(
+            db=database,
+            user_directory=Path(data_dir),
+            msg_aggregator=msg_aggregator,
+            create_csv=False,
+        )
+        with patch('rotkehlchen.accounting.accountant.PriceHistorian', FixedPriceHistorian), \
+                patch('rotkehlchen.accounting.events.PriceHistorian', FixedPriceHistorian), \
+                patch('rotkehlchen.accounting.accountant.Inquirer'):
+            start = time.perf_counter()
+            accountant.process_history(
+                start_ts=Timestamp(0),
+                end_ts=trades[-1].timestamp,
+                trade_history=trades,  # type: ignore
+                loan_history=[],
+                asset_movements=[],
+                eth_transactions=[],
+                defi_events=[],
+            )
+            seconds = time.perf_counter() - start
+        database.disconnect()
+
+    return seconds
+
+
+def main() -> None:
+    args = fval_benchmark_args().parse_args()
+    print(f'{"operation":<30} {"seconds":>9}')
+    for name, seconds in benchmark_operators(args.number).items():
+        print(f'{name:<30} {seconds:>9.3f}')
+
+    if args.trades_number != 0:
+        logger.info(f'Processing a history of {args.trades_number} trades')
+        seconds = benchmark_process_history(args.trades_number)
+        print(f'{"process_history":<30} {seconds:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
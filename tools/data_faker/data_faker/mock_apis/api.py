@@ -1,12 +1,17 @@
 import json
 import logging
+from collections import defaultdict
 from http import HTTPStatus
-from typing import Optional
+from typing import Any, Callable, DefaultDict, NamedTuple, Optional
 
+import gevent
 from data_faker.mock_apis.resources import (
     BinanceAccountResource,
+    BinanceDepositHistoryResource,
     BinanceExchangeInfoResource,
     BinanceMyTradesResource,
+    BinanceTimeResource,
+    BinanceWithdrawHistoryResource,
     KrakenAssetPairsResource,
     KrakenBalanceResource,
     KrakenLedgersResource,
@@ -27,6 +32,9 @@ URLS = [
     ('/kraken/mock/private/TradesHistory', KrakenTradesHistoryResource),
     ('/kraken/mock/private/Ledgers', KrakenLedgersResource),
     ('/binance/api/v1/exchangeInfo', BinanceExchangeInfoResource),
+    ('/binance/api/v1/time', BinanceTimeResource),
+    ('/binance/wapi/v3/depositHistory.html', BinanceDepositHistoryResource),
+    ('/binance/wapi/v3/withdrawHistory.html', BinanceWithdrawHistoryResource),
     ('/binance/api/v3/account', BinanceAccountResource),
     ('/binance/api/v3/myTrades', BinanceMyTradesResource),
 ]
@@ -106,31 +114,108 @@ class APIServer():
             self.wsgiserver = None
 
 
+# The max number of entries binance returns for a paginated query
+BINANCE_MAX_LIMIT = 1000
+
+
+class MockBehaviour(NamedTuple):
+    """How the mock exchange APIs should behave. The defaults make them
+    respond immediately, with everything in one page and never rate limit"""
+    # Seconds each request takes to be served
+    latency_secs: float = 0
+    # Max number of entries returned in each page of a paginated endpoint whose page
+    # size is decided by the exchange (kraken). None means all entries in one page.
+    # Endpoints paginated by the client (binance) respect the client's limit.
+    page_size: Optional[int] = None
+    # Every nth request of an exchange is rate limited. 0 means never.
+    rate_limit_every: int = 0
+
+
+def kraken_rate_limited() -> Any:
+    """Kraken responds to rate limited calls with a successful response containing an error"""
+    return {'error': ['EAPI:Rate limit exceeded']}
+
+
+def binance_rate_limited() -> Any:
+    return {'code': -1003, 'msg': 'Too many requests'}, HTTPStatus.TOO_MANY_REQUESTS
+
+
 class RestAPI():
-    def __init__(self, fake_kraken, fake_binance) -> None:
+    def __init__(
+            self,
+            fake_kraken,
+            fake_binance,
+            behaviour: Optional[MockBehaviour] = None,
+    ) -> None:
         self.kraken = fake_kraken
         self.binance = fake_binance
+        self.behaviour = MockBehaviour() if behaviour is None else behaviour
+        # Number of requests received per exchange, including rate limited ones
+        self.requests_count: DefaultDict[str, int] = defaultdict(int)
+
+    def _serve(
+            self,
+            exchange: str,
+            rate_limited_response: Callable[[], Any],
+            query: Callable[[], Any],
+    ) -> Any:
+        self.requests_count[exchange] += 1
+        if self.behaviour.latency_secs:
+            gevent.sleep(self.behaviour.latency_secs)
+
+        rate_limit_every = self.behaviour.rate_limit_every
+        if rate_limit_every != 0 and self.requests_count[exchange] % rate_limit_every == 0:
+            return rate_limited_response()
+
+        return query()
+
+    def _serve_kraken(self, query: Callable[[], Any]) -> Any:
+        return self._serve('kraken', kraken_rate_limited, query)
+
+    def _serve_binance(self, query: Callable[[], Any]) -> Any:
+        return self._serve('binance', binance_rate_limited, query)
 
     def kraken_ticker(self):
-        return self.kraken.query_ticker()
+        return self._serve_kraken(self.kraken.query_ticker)
 
     def kraken_asset_pairs(self):
-        return self.kraken.query_asset_pairs()
+        return self._serve_kraken(self.kraken.query_asset_pairs)
 
     def kraken_balances(self):
-        return self.kraken.query_balances()
+        return self._serve_kraken(self.kraken.query_balances)
 
-    def kraken_trade_history(self):
-        return self.kraken.query_trade_history()
+    def kraken_trade_history(self, offset):
+        return self._serve_kraken(lambda: self.kraken.query_trade_history(
+            offset=offset,
+            page_size=self.behaviour.page_size,
+        ))
 
-    def kraken_ledgers(self, ledger_type):
-        return self.kraken.query_ledgers(ledger_type)
+    def kraken_ledgers(self, ledger_type, offset):
+        return self._serve_kraken(lambda: self.kraken.query_ledgers(
+            ledger_type=ledger_type,
+            offset=offset,
+            page_size=self.behaviour.page_size,
+        ))
 
     def binance_exchange_info(self):
-        return self.binance.query_exchange_info()
+        return self._serve_binance(self.binance.query_exchange_info)
+
+    def binance_time(self):
+        return self._serve_binance(self.binance.query_time)
 
     def binance_account(self):
-        return self.binance.query_account()
+        return self._serve_binance(self.binance.query_account)
+
+    def binance_deposit_history(self):
+        return self._serve_binance(self.binance.query_deposit_history)
+
+    def binance_withdraw_history(self):
+        return self._serve_binance(self.binance.query_withdraw_history)
 
-    def binance_my_trades(self, symbol):
-        return self.binance.query_my_trades(symbol)
+    def binance_my_trades(self, symbol, from_id, limit):
+        limit = min(limit, BINANCE_MAX_LIMIT)
+        return self._serve_binance(lambda: self.binance.query_my_trades(
+            symbol=symbol,
+            from_id=from_id,
+            limit=limit,
+        ))
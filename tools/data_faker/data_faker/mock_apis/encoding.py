@@ -24,6 +24,8 @@ class BaseSchema(Schema):
 class BinanceMyTradesSchema(BaseSchema):
 
     symbol = fields.String(required=True)
+    fromId = fields.Integer(missing=0)
+    limit = fields.Integer(missing=500)
 
     class Meta:
         strict = True
@@ -1,3 +1,6 @@
+from typing import Dict
+from urllib.parse import parse_qs
+
 from flask import Blueprint, request
 from flask_restful import Resource
 from webargs.flaskparser import use_kwargs
@@ -12,6 +15,20 @@ def create_blueprint() -> Blueprint:
     return Blueprint('v1_resources', __name__)
 
 
+def kraken_request_data() -> Dict[str, str]:
+    """Returns the form data of the current kraken request
+
+    Not using a marshmallow schema here because no schema worked with
+    the way rotkehlchen queries kraken. Not sure why yet. But one hacky way
+    is to inspect the flask request directly
+    """
+    content_length = int(request.environ.get('CONTENT_LENGTH') or 0)
+    if content_length == 0:
+        return {}
+    data = request.environ['wsgi.input'].peek(content_length)[:content_length]
+    return {key: values[0] for key, values in parse_qs(data.decode()).items()}
+
+
 class BaseResource(Resource):
     def __init__(self, rest_api_object, **kwargs):
         super().__init__(**kwargs)
@@ -35,7 +52,8 @@ class KrakenBalanceResource(BaseResource):
 
 class KrakenTradesHistoryResource(BaseResource):
     def post(self):
-        return self.rest_api.kraken_trade_history()
+        data = kraken_request_data()
+        return self.rest_api.kraken_trade_history(offset=int(data.get('ofs', 0)))
 
 
 class KrakenLedgersResource(BaseResource):
@@ -44,18 +62,11 @@ class KrakenLedgersResource(BaseResource):
             self,
             **kwargs,  # pylint: disable=unused-argument
     ):
-        # Not using a marshmallow schema here because no schema worked with
-        # the way rotkehlchen queries kraken. Not sure why yet. But one hacky way
-        # is to inspect the flask request directly
-        content_length = int(request.environ['CONTENT_LENGTH'])
-        data = str(request.environ['wsgi.input'].peek(content_length))
-        if 'deposit' in data:
-            ledger_type = 'deposit'
-        elif 'withdrawal' in data:
-            ledger_type = 'withdrawal'
-        else:
-            ledger_type = 'all'
-        return self.rest_api.kraken_ledgers(ledger_type=ledger_type)
+        data = kraken_request_data()
+        return self.rest_api.kraken_ledgers(
+            ledger_type=data.get('type', 'all'),
+            offset=int(data.get('ofs', 0)),
+        )
 
 
 class BinanceAccountResource(BaseResource):
@@ -68,8 +79,27 @@ class BinanceExchangeInfoResource(BaseResource):
         return self.rest_api.binance_exchange_info()
 
 
+class BinanceTimeResource(BaseResource):
+    def get(self):
+        return self.rest_api.binance_time()
+
+
+class BinanceDepositHistoryResource(BaseResource):
+    def get(self):
+        return self.rest_api.binance_deposit_history()
+
+
+class BinanceWithdrawHistoryResource(BaseResource):
+    def get(self):
+        return self.rest_api.binance_withdraw_history()
+
+
 class BinanceMyTradesResource(BaseResource):
 
     @use_kwargs(BinanceMyTradesSchema)
     def get(self, **kwargs):
-        return self.rest_api.binance_my_trades(symbol=kwargs['symbol'])
+        return self.rest_api.binance_my_trades(
+            symbol=kwargs['symbol'],
+            from_id=kwargs['fromId'],
+            limit=kwargs['limit'],
+        )